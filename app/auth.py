@@ -51,3 +51,44 @@ async def verify_api_key(api_key: Optional[str] = Security(api_key_header)) -> s
         )
     
     return api_key
+
+
+async def verify_admin_api_key(api_key: Optional[str] = Security(api_key_header)) -> str:
+    """
+    Verify an API key is allowed to call admin endpoints
+    
+    Without ADMIN_API_KEYS, any valid API key is accepted in development and
+    admin endpoints are disabled in production.
+    
+    Args:
+        api_key: API key from X-API-Key header
+        
+    Returns:
+        The validated API key
+        
+    Raises:
+        HTTPException: If the API key is missing, invalid or not an admin key
+    """
+    admin_api_keys = settings.get_admin_api_keys_list()
+    
+    if not admin_api_keys:
+        if settings.env == "production":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Admin endpoints are disabled: no admin API keys configured.",
+            )
+        return await verify_api_key(api_key)
+    
+    if not api_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing API key. Please provide X-API-Key header.",
+        )
+    
+    if not any(hmac.compare_digest(api_key, admin_key) for admin_key in admin_api_keys):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API key is not allowed to call admin endpoints.",
+        )
+    
+    return api_key
@@ -39,6 +39,10 @@ class Settings(BaseSettings):
         default="",
         description="Comma-separated list of API keys for authentication"
     )
+    admin_api_keys: str = Field(
+        default="",
+        description="Comma-separated API keys allowed to call admin endpoints (empty = any API key in development, none in production)"
+    )
     host: str = Field(default="0.0.0.0", description="Server host")
     port: int = Field(default=8000, description="Server port")
     cors_origins: str = Field(
@@ -78,6 +82,50 @@ class Settings(BaseSettings):
         default=False,
         description="Preload all models on startup (requires more GPU memory)"
     )
+    model_preload_concurrency: int = Field(
+        default=3,
+        description="Maximum number of models loaded and warmed up at the same time during preloading"
+    )
+    model_memory_budget_gb: float = Field(
+        default=0.0,
+        description="Total parameter memory resident models may use in GB; least recently used models are unloaded to stay within it (0 = unlimited)"
+    )
+    model_size_estimate_gb: float = Field(
+        default=4.5,
+        description="Memory assumed for a model type before it has been loaded once (its measured size is used afterwards)"
+    )
+    model_drain_timeout_seconds: float = Field(
+        default=120.0,
+        description="Maximum time to wait for in-flight requests before unloading a model"
+    )
+    model_load_wait_seconds: float = Field(
+        default=60.0,
+        description="How long a request waits for a model that is loading in the background before it gets 503 (about one load by default; 0 = respond 503 immediately)"
+    )
+    model_load_retry_after_seconds: int = Field(
+        default=60,
+        description="Retry-After sent with 503 responses before any load of the model has been timed"
+    )
+    custom_voice_idle_timeout_minutes: float = Field(
+        default=0.0,
+        description="Unload the CustomVoice model after this many minutes without requests (0 = never)"
+    )
+    voice_design_idle_timeout_minutes: float = Field(
+        default=0.0,
+        description="Unload the VoiceDesign model after this many minutes without requests (0 = never)"
+    )
+    base_idle_timeout_minutes: float = Field(
+        default=0.0,
+        description="Unload the Base model after this many minutes without requests (0 = never)"
+    )
+    model_prewarm_schedule: str = Field(
+        default="",
+        description="Semicolon-separated 'model_type=cron' entries (minute hour day month weekday, server local time) loading and warming a model ahead of known peaks"
+    )
+    model_lifecycle_check_seconds: float = Field(
+        default=30.0,
+        description="Interval of the idle-unload and pre-warm checks in seconds"
+    )
     
     # Cache Configuration
     voice_cache_enabled: bool = Field(
@@ -92,6 +140,60 @@ class Settings(BaseSettings):
         default=3600,
         description="Time-to-live for cached voice prompts in seconds"
     )
+    voice_cache_disk_dir: Optional[str] = Field(
+        default=None,
+        description="Directory for the on-disk voice prompt cache tier (disabled if unset)"
+    )
+    voice_cache_disk_max_mb: float = Field(
+        default=1024.0,
+        description="Maximum total size of the on-disk voice prompt cache in MB"
+    )
+    
+    # Voice Clone Prompt Store (/create-prompt)
+    prompt_store_backend: str = Field(
+        default="memory",
+        description="Prompt store backend: 'memory' or 'sqlite' (durable across restarts)"
+    )
+    prompt_store_path: str = Field(
+        default="data/voice_prompts.db",
+        description="SQLite database path for the 'sqlite' prompt store backend"
+    )
+    prompt_store_memory_size: int = Field(
+        default=100,
+        description="Maximum number of prompts kept in memory"
+    )
+    prompt_store_max_size: int = Field(
+        default=10000,
+        description="Maximum number of prompts kept by a durable backend (0 = unlimited)"
+    )
+    prompt_store_ttl_seconds: int = Field(
+        default=3600,
+        description="Time a prompt may go unused before it expires (0 = never)"
+    )
+    
+    # Output Audio Cache
+    output_cache_enabled: bool = Field(
+        default=False,
+        description="Cache encoded output audio for repeated identical requests"
+    )
+    output_cache_max_mb: float = Field(
+        default=256.0,
+        description="Maximum total size of cached output audio in MB"
+    )
+    output_cache_ttl_seconds: int = Field(
+        default=86400,
+        description="Time-to-live for cached output audio in seconds"
+    )
+    
+    # Reference Audio Cache
+    ref_audio_cache_enabled: bool = Field(
+        default=True,
+        description="Cache preprocessed reference audio keyed on the raw encoded bytes"
+    )
+    ref_audio_cache_max_mb: float = Field(
+        default=256.0,
+        description="Maximum total size of cached reference audio in MB"
+    )
     
     # Audio Preprocessing
     audio_preprocessing_enabled: bool = Field(
@@ -107,6 +209,12 @@ class Settings(BaseSettings):
         description="Minimum target duration for reference audio in seconds"
     )
     
+    # DSP Offload
+    dsp_pool_workers: int = Field(
+        default=0,
+        description="Worker processes for audio decode, preprocessing and speed adjustment (0 = run on threads)"
+    )
+    
     # Validation
     audio_upload_max_size_mb: float = Field(
         default=5.0,
@@ -124,13 +232,153 @@ class Settings(BaseSettings):
     )
     enable_warmup: bool = Field(
         default=True,
-        description="Run model warmup on startup"
+        description="Run a warmup generation after each model load, before the model serves requests"
     )
     warmup_text: str = Field(
         default="This is a warmup test to initialize the model.",
         description="Test text for model warmup"
     )
+
+    # Inference Concurrency
+    custom_voice_max_concurrency: int = Field(
+        default=1,
+        description="Maximum concurrent inference calls on the CustomVoice model"
+    )
+    voice_design_max_concurrency: int = Field(
+        default=1,
+        description="Maximum concurrent inference calls on the VoiceDesign model"
+    )
+    base_max_concurrency: int = Field(
+        default=1,
+        description="Maximum concurrent inference calls on the Base model"
+    )
     
+    # Request Coalescing
+    request_coalescing_enabled: bool = Field(
+        default=True,
+        description="Share results between identical generation requests that are in flight at the same time"
+    )
+    
+    # Incremental Streaming
+    stream_segment_max_chars: int = Field(
+        default=150,
+        description="Preferred maximum characters per streamed text segment (0 = generate the whole text at once)"
+    )
+    stream_segment_min_chars: int = Field(
+        default=20,
+        description="Streamed segments shorter than this are merged into a neighbour"
+    )
+    stream_max_buffered_segments: int = Field(
+        default=2,
+        description="Maximum generated segments waiting to be sent to a streaming client"
+    )
+    
+    # Long-form Synthesis
+    longform_max_chars: int = Field(
+        default=50000,
+        description="Maximum characters accepted by the long-form endpoints"
+    )
+    longform_segment_max_chars: int = Field(
+        default=300,
+        description="Preferred maximum characters per long-form segment (segments never span paragraphs)"
+    )
+    longform_batch_size: int = Field(
+        default=4,
+        description="Long-form segments rendered per batched model call"
+    )
+    longform_max_concurrent_batches: int = Field(
+        default=2,
+        description="Long-form batches rendered at the same time per request"
+    )
+    longform_crossfade_ms: float = Field(
+        default=30.0,
+        description="Crossfade between consecutive long-form segments in milliseconds (0 = butt joins)"
+    )
+    longform_segment_cache_enabled: bool = Field(
+        default=True,
+        description="Cache rendered long-form segments so edited documents only re-render changed text"
+    )
+    longform_segment_cache_max_mb: float = Field(
+        default=256.0,
+        description="Maximum total size of cached long-form segment audio in MB"
+    )
+    
+    # Asynchronous Jobs (/api/v1/jobs)
+    job_queue_max_size: int = Field(
+        default=100,
+        description="Maximum number of queued jobs; further submissions are rejected with 429"
+    )
+    job_workers: int = Field(
+        default=1,
+        description="Jobs rendered at the same time"
+    )
+    job_batch_size: int = Field(
+        default=8,
+        description="Batch job items rendered per model call (progress is reported per call)"
+    )
+    job_results_dir: str = Field(
+        default="data/jobs",
+        description="Directory where job results are stored (one subdirectory per job)"
+    )
+    job_retention_seconds: int = Field(
+        default=86400,
+        description="Time finished jobs and their results are kept (0 = until deleted)"
+    )
+    job_callback_allowed_hosts: str = Field(
+        default="localhost,127.0.0.1,::1",
+        description="Comma-separated hosts completion callbacks may be sent to ('*' = any host)"
+    )
+    job_callback_timeout: float = Field(
+        default=10.0,
+        description="Timeout of each completion callback attempt in seconds"
+    )
+    job_callback_retries: int = Field(
+        default=3,
+        description="Completion callback attempts before giving up"
+    )
+    
+    # Micro-batching (CustomVoice)
+    custom_voice_batching_enabled: bool = Field(
+        default=True,
+        description="Coalesce concurrent CustomVoice requests into batched model calls"
+    )
+    custom_voice_max_batch_size: int = Field(
+        default=8,
+        description="Maximum number of CustomVoice requests per batched call"
+    )
+    custom_voice_batch_wait_ms: float = Field(
+        default=10.0,
+        description="Maximum time (ms) a CustomVoice request waits for a batch to fill"
+    )
+    
+    # Micro-batching (VoiceDesign)
+    voice_design_batching_enabled: bool = Field(
+        default=True,
+        description="Coalesce concurrent VoiceDesign requests into batched model calls"
+    )
+    voice_design_max_batch_size: int = Field(
+        default=4,
+        description="Maximum number of VoiceDesign requests per batched call"
+    )
+    voice_design_batch_wait_ms: float = Field(
+        default=20.0,
+        description="Maximum time (ms) a VoiceDesign request waits for a batch to fill"
+    )
+    
+    # Micro-batching (Base voice cloning)
+    base_batching_enabled: bool = Field(
+        default=True,
+        description="Coalesce concurrent voice clone requests (any prompt) into batched model calls"
+    )
+    base_max_batch_size: int = Field(
+        default=4,
+        description="Maximum number of voice clone requests per batched call"
+    )
+    base_batch_wait_ms: float = Field(
+        default=20.0,
+        description="Maximum time (ms) a voice clone request waits for a batch to fill"
+    )
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -141,6 +389,18 @@ class Settings(BaseSettings):
         if not self.api_keys:
             return []
         return [key.strip() for key in self.api_keys.split(",") if key.strip()]
+
+    def get_admin_api_keys_list(self) -> List[str]:
+        """Parse admin API keys from comma-separated string"""
+        return [key.strip() for key in self.admin_api_keys.split(",") if key.strip()]
+
+    def get_max_concurrency(self, model_type: str) -> int:
+        """Get the inference concurrency limit for a model type"""
+        return getattr(self, f"{model_type}_max_concurrency", 1)
+
+    def get_idle_timeout(self, model_type: str) -> float:
+        """Get the idle unload timeout for a model type in seconds (0 = never)"""
+        return getattr(self, f"{model_type}_idle_timeout_minutes", 0.0) * 60
     
     def get_torch_dtype(self):
         """Convert dtype string to torch dtype"""
@@ -4,7 +4,6 @@ Main FastAPI application
 import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
-import numpy as np
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -12,7 +11,11 @@ from fastapi.responses import FileResponse
 from app import __version__
 from app.config import settings
 from app.models.manager import model_manager
-from app.routers import health, custom_voice, voice_design, base
+from app.models.jobs import shutdown_job_manager
+from app.models.lifecycle import get_model_lifecycle, shutdown_model_lifecycle
+from app.models.prompt_store import shutdown_prompt_store
+from app.routers import health, custom_voice, voice_design, base, cache, jobs, admin
+from app.utils.dsp_pool import shutdown_dsp_pool
 
 # Configure logging
 logging.basicConfig(
@@ -30,83 +33,23 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Qwen3-TTS API Server")
     logger.info(f"Version: {__version__}")
     
-    # Preload models if configured
+    # Preload (and warm up) models if configured
     if settings.preload_models:
         logger.info("Preloading models on startup...")
         model_manager.preload_all_models()
-        
-        # Run warmup if enabled
-        if settings.enable_warmup:
-            await warmup_models()
     else:
         logger.info("Models will be loaded on first request (lazy loading)")
     
+    # Start idle unloading and scheduled pre-warming (if configured)
+    get_model_lifecycle().start()
+    
     yield
     
     logger.info("Shutting down Qwen3-TTS API Server")
-
-
-async def warmup_models():
-    """
-    Warm up loaded models with test generations
-    """
-    logger.info("Running model warmup...")
-    
-    try:
-        # Warmup CustomVoice if loaded
-        if model_manager.is_loaded("custom_voice"):
-            logger.info("Warming up CustomVoice model...")
-            model = model_manager.get_custom_voice_model()
-            _ = model.generate_custom_voice(
-                text=settings.warmup_text,
-                language="Auto",
-                speaker="Ryan",
-                instruct="",
-            )
-            logger.info("CustomVoice model warmed up")
-        
-        # Warmup VoiceDesign if loaded
-        if model_manager.is_loaded("voice_design"):
-            logger.info("Warming up VoiceDesign model...")
-            model = model_manager.get_voice_design_model()
-            _ = model.generate_voice_design(
-                text=settings.warmup_text,
-                language="Auto",
-                instruct="A clear professional voice",
-            )
-            logger.info("VoiceDesign model warmed up")
-        
-        # Warmup Base model if loaded (requires creating a dummy voice prompt)
-        if model_manager.is_loaded("base"):
-            logger.info("Warming up Base model...")
-            model = model_manager.get_base_model()
-            
-            # Create a simple sine wave as dummy reference audio
-            duration = 1.0  # 1 second
-            sample_rate = 24000
-            frequency = 440.0  # A4 note
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            dummy_audio = np.sin(2 * np.pi * frequency * t).astype(np.float32)
-            
-            # Create dummy voice prompt
-            dummy_prompt = model.create_voice_clone_prompt(
-                ref_audio=(dummy_audio, sample_rate),
-                ref_text=settings.warmup_text,
-                x_vector_only_mode=False,
-            )
-            
-            # Generate with dummy prompt
-            _ = model.generate_voice_clone(
-                text=settings.warmup_text,
-                language="Auto",
-                voice_clone_prompt=dummy_prompt,
-            )
-            logger.info("Base model warmed up")
-        
-        logger.info("Model warmup complete")
-        
-    except Exception as e:
-        logger.warning(f"Warmup failed (non-critical): {e}")
+    await shutdown_model_lifecycle()
+    await shutdown_job_manager()
+    shutdown_dsp_pool()
+    shutdown_prompt_store()
 
 
 # Create FastAPI application
@@ -146,6 +89,9 @@ app.include_router(health.router)
 app.include_router(custom_voice.router)
 app.include_router(voice_design.router)
 app.include_router(base.router)
+app.include_router(cache.router)
+app.include_router(jobs.router)
+app.include_router(admin.router)
 
 
 @app.get("/demo")
@@ -0,0 +1,272 @@
+"""
+Dynamic micro-batching for single generation requests
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+import numpy as np
+from app.utils.metrics import Histogram, PerformanceTracker
+
+logger = logging.getLogger(__name__)
+
+# Bucket bounds for batch sizes and per-request batching wait (ms)
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64]
+WAIT_TIME_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+
+def stack_params(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Turn a list of per-request kwargs into list-valued kwargs for one call
+
+    Args:
+        items: Keyword arguments of each request (same keys)
+
+    Returns:
+        Keyword arguments where every value is the list of per-request values
+    """
+    return {key: [item[key] for item in items] for key in items[0]}
+
+
+@dataclass
+class _PendingRequest:
+    """A request waiting to be batched"""
+    params: Dict[str, Any]
+    future: asyncio.Future
+    enqueued_at: float
+    tracker: Optional[PerformanceTracker] = None
+
+
+@dataclass
+class _LoopState:
+    """Batcher state bound to one event loop"""
+    loop: asyncio.AbstractEventLoop
+    slots: asyncio.Semaphore
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    pending: Deque[_PendingRequest] = field(default_factory=deque)
+    collector: Optional[asyncio.Task] = None
+    batches: Set[asyncio.Task] = field(default_factory=set)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single requests into list-valued model calls
+
+    Requests are collected until ``max_batch_size`` is reached or the oldest
+    request has waited ``max_wait_ms``, then issued as one call and the
+    resulting ``wavs`` are fanned back to the waiting requests. While all
+    batch slots are busy, requests keep accumulating so the next batch forms
+    while the model is working. If a batch fails, its requests are re-run
+    one at a time so a bad request (e.g. an unknown speaker) only fails
+    itself.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[..., Awaitable[Tuple[List[np.ndarray], int]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_concurrent_batches: int = 1,
+        build_kwargs: Callable[[List[Dict[str, Any]]], Dict[str, Any]] = stack_params,
+        batchable: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ):
+        """
+        Initialize batcher
+
+        Args:
+            name: Name used in logs and stats
+            run: Async callable taking model kwargs (and ``tracker``) and returning (wavs, sr)
+            max_batch_size: Maximum number of requests per model call
+            max_wait_ms: Maximum time the oldest request waits for a batch to fill
+            max_concurrent_batches: Number of batches allowed in flight at once
+            build_kwargs: Builds list-valued kwargs from per-request kwargs
+            batchable: Optional predicate; requests it rejects bypass batching
+        """
+        self.name = name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._run = run
+        self._build_kwargs = build_kwargs
+        self._batchable = batchable
+        self._state: Optional[_LoopState] = None
+        self._batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self._wait_times = Histogram(WAIT_TIME_BUCKETS_MS)
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._split_batches = 0
+        self._unbatched = 0
+
+    def _get_state(self) -> _LoopState:
+        """Get state for the running loop (recreated if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._state is None or self._state.loop is not loop:
+            self._state = _LoopState(
+                loop=loop,
+                slots=asyncio.Semaphore(self.max_concurrent_batches),
+            )
+        return self._state
+
+    async def submit(
+        self,
+        params: Dict[str, Any],
+        tracker: Optional[PerformanceTracker] = None,
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Submit a single request and wait for its share of a batch
+
+        Args:
+            params: Model keyword arguments for this request (scalar values)
+            tracker: Optional tracker that receives batching and queue wait time
+
+        Returns:
+            Tuple of (audio_data, sample_rate) for this request
+        """
+        if self._batchable is not None and not self._batchable(params):
+            self._unbatched += 1
+            wavs, sr = await self._run(tracker=tracker, **params)
+            return wavs[0], sr
+
+        state = self._get_state()
+        future = state.loop.create_future()
+        state.pending.append(_PendingRequest(
+            params=params,
+            future=future,
+            enqueued_at=time.perf_counter(),
+            tracker=tracker,
+        ))
+        self._requests += 1
+        state.wakeup.set()
+
+        if state.collector is None or state.collector.done():
+            state.collector = state.loop.create_task(self._collect(state))
+
+        return await future
+
+    async def _collect(self, state: _LoopState):
+        """Form batches from pending requests until none are left"""
+        while state.pending:
+            await state.slots.acquire()
+            batch = [state.pending.popleft()]
+            deadline = batch[0].enqueued_at + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                if state.pending:
+                    batch.append(state.pending.popleft())
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                state.wakeup.clear()
+                try:
+                    await asyncio.wait_for(state.wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            task = state.loop.create_task(self._dispatch(state, batch))
+            state.batches.add(task)
+            task.add_done_callback(state.batches.discard)
+
+    async def _dispatch(self, state: _LoopState, batch: List[_PendingRequest]):
+        """Run one batch and fan results back to the waiting requests"""
+        try:
+            # Drop requests whose callers have gone away
+            batch = [item for item in batch if not item.future.done()]
+            if not batch:
+                return
+
+            dispatched_at = time.perf_counter()
+            self._batches += 1
+            self._batch_sizes.observe(len(batch))
+            for item in batch:
+                self._wait_times.observe((dispatched_at - item.enqueued_at) * 1000)
+
+            try:
+                await self._run_batch(batch, dispatched_at)
+            except Exception as e:
+                self._errors += 1
+                if len(batch) == 1:
+                    raise
+                # Find the failing request(s) instead of failing the whole batch
+                self._split_batches += 1
+                logger.warning(f"{self.name} batch of {len(batch)} failed ({e}); retrying its requests one at a time")
+                for item in batch:
+                    if item.future.done():
+                        continue
+                    try:
+                        await self._run_batch([item], dispatched_at)
+                    except Exception as item_error:
+                        self._errors += 1
+                        logger.error(f"{self.name} request failed: {item_error}")
+                        if not item.future.done():
+                            item.future.set_exception(item_error)
+
+        except Exception as e:
+            logger.error(f"{self.name} batch of {len(batch)} failed: {e}")
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+
+        finally:
+            state.slots.release()
+
+    async def _run_batch(self, batch: List[_PendingRequest], dispatched_at: float):
+        """
+        Issue one model call for a batch and resolve its requests
+
+        Raises:
+            Exception: If the call fails (no request is resolved)
+        """
+        batch_tracker = PerformanceTracker()
+        if len(batch) == 1:
+            wavs, sr = await self._run(tracker=batch_tracker, **batch[0].params)
+        else:
+            kwargs = self._build_kwargs([item.params for item in batch])
+            wavs, sr = await self._run(tracker=batch_tracker, **kwargs)
+
+        if len(wavs) != len(batch):
+            raise RuntimeError(
+                f"{self.name} batch returned {len(wavs)} results for {len(batch)} requests"
+            )
+
+        for item, wav in zip(batch, wavs):
+            if item.tracker is not None:
+                item.tracker.mark_queue_wait(
+                    dispatched_at - item.enqueued_at + (batch_tracker.queue_wait_time or 0.0)
+                )
+            if not item.future.done():
+                item.future.set_result((wav, sr))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics
+
+        Returns:
+            Dictionary with policy, counters and histograms
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "requests": self._requests,
+            "batches": self._batches,
+            "errors": self._errors,
+            "split_batches": self._split_batches,
+            "unbatched": self._unbatched,
+            "batch_size_histogram": self._batch_sizes.to_dict(),
+            "wait_time_ms_histogram": self._wait_times.to_dict(),
+        }
+
+    def reset_stats(self):
+        """Reset batching statistics"""
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._split_batches = 0
+        self._unbatched = 0
+        self._batch_sizes.reset()
+        self._wait_times.reset()
@@ -0,0 +1,118 @@
+"""
+Inference execution layer that keeps blocking model calls off the event loop
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceExecutor:
+    """
+    Bounded worker pool for a single model type
+
+    Model calls (generation, prompt extraction, lazy loading) are synchronous
+    and can take seconds, so they run on dedicated threads while request
+    handlers await the result. The number of workers caps how many calls can
+    hit the model at once; anything beyond that waits in the pool queue.
+    """
+
+    def __init__(self, model_type: str, max_workers: int = 1):
+        """
+        Initialize executor
+
+        Args:
+            model_type: Model type served by this pool (used for thread names)
+            max_workers: Maximum number of concurrent inference calls
+        """
+        self.model_type = model_type
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"inference-{model_type}",
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_queue_wait = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, float]:
+        """
+        Run a blocking callable on the pool and await its result
+
+        Args:
+            fn: Callable to execute
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Tuple of (result, queue_wait_seconds)
+        """
+        submitted_at = time.perf_counter()
+        state = {"status": "queued", "queue_wait": 0.0}
+
+        def call():
+            with self._lock:
+                if state["status"] == "cancelled":
+                    return None
+                state["status"] = "running"
+                state["queue_wait"] = time.perf_counter() - submitted_at
+                self._queued -= 1
+                self._running += 1
+                self._total_queue_wait += state["queue_wait"]
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        with self._lock:
+            self._queued += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._pool, call)
+        except asyncio.CancelledError:
+            # The caller went away; drop the call if it has not started yet
+            with self._lock:
+                if state["status"] == "queued":
+                    state["status"] = "cancelled"
+                    self._queued -= 1
+            raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+
+        with self._lock:
+            self._completed += 1
+        return result, state["queue_wait"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics
+
+        Returns:
+            Dictionary with executor stats
+        """
+        with self._lock:
+            started = self._completed + self._failed + self._running
+            avg_wait = (self._total_queue_wait / started) if started > 0 else 0.0
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_queue_wait_seconds": round(avg_wait, 4),
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the worker pool"""
+        self._pool.shutdown(wait=wait)
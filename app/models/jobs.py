@@ -0,0 +1,688 @@
+"""
+Asynchronous render jobs
+
+Large batches and long documents can take longer to render than a proxy
+holds an HTTP connection open. A job is submitted and rendered in the
+background instead: clients poll its status and download each item as soon
+as it is written, or receive a completion callback.
+
+Jobs wait in a bounded queue served by a fixed number of workers, so a burst
+of submissions queues up rather than oversubscribing the models. Results are
+written to a local directory (one subdirectory per job, with its record in
+job.json) and removed once the retention period has passed.
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Type
+from urllib.parse import urlparse
+import httpx
+import numpy as np
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from app.models.loading import ModelNotReadyError
+from app.utils.codecs import AudioFileWriter, encode_audio, get_codec
+from app.utils.dsp_pool import run_dsp
+from app.utils.metrics import PerformanceTracker
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = ("queued", "running")
+FINISHED_STATES = ("completed", "failed", "cancelled")
+
+RECORD_FILE = "job.json"
+
+
+class Job:
+    """A submitted render and its results"""
+
+    def __init__(
+        self,
+        job_id: str,
+        job_type: str,
+        request: Any,
+        directory: Path,
+        callback_url: Optional[str] = None,
+    ):
+        """
+        Initialize a job
+
+        Args:
+            job_id: Job ID
+            job_type: Registered job type name
+            request: Validated request model of the job type
+            directory: Directory the job's results are written to
+            callback_url: URL notified when the job finishes
+        """
+        self.id = job_id
+        self.type = job_type
+        self.request = request
+        self.directory = directory
+        self.callback_url = callback_url
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.total = 0
+        self.completed = 0
+        self.items: Dict[int, Dict[str, Any]] = {}
+        self.callback: Optional[Dict[str, Any]] = None
+        self.tracker = PerformanceTracker()
+        self.task: Optional[asyncio.Task] = None
+
+    def set_total(self, total: int):
+        """Set the number of work units (items or segments) the job renders"""
+        self.total = total
+
+    def set_progress(self, completed: int):
+        """Set the number of work units rendered so far"""
+        self.completed = completed
+
+    def item_path(self, name: str, audio_format: str) -> Path:
+        """
+        Get the path an item's file is written to
+
+        Args:
+            name: File name without extension
+            audio_format: Codec name
+
+        Returns:
+            Path inside the job directory
+        """
+        return self.directory / f"{name}.{get_codec(audio_format).extension}"
+
+    def add_item(self, index: int, path: Path, sample_rate: int, duration: float, audio_format: str):
+        """
+        Record a result file that has been written
+
+        Args:
+            index: Item index
+            path: Path of the written file
+            sample_rate: Sample rate of the generated audio in Hz
+            duration: Audio duration in seconds
+            audio_format: Codec name
+        """
+        self.items[index] = {
+            "index": index,
+            "filename": path.name,
+            "format": audio_format,
+            "sample_rate": sample_rate,
+            "duration": round(duration, 3),
+            "size_bytes": path.stat().st_size,
+        }
+
+    async def save_item(
+        self,
+        index: int,
+        name: str,
+        audio_bytes: bytes,
+        sample_rate: int,
+        duration: float,
+        audio_format: str,
+    ):
+        """
+        Write an encoded item, record it and count it as completed
+
+        Args:
+            index: Item index
+            name: File name without extension
+            audio_bytes: Encoded audio
+            sample_rate: Sample rate of the generated audio in Hz
+            duration: Audio duration in seconds
+            audio_format: Codec name
+        """
+        path = self.item_path(name, audio_format)
+        await asyncio.to_thread(path.write_bytes, audio_bytes)
+        self.add_item(index, path, sample_rate, duration, audio_format)
+        self.completed += 1
+
+    def item_file(self, index: int) -> Optional[Path]:
+        """Get the file of a completed item, or None"""
+        item = self.items.get(index)
+        return self.directory / item["filename"] if item else None
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Get the public description of the job
+
+        Returns:
+            Dictionary with status, progress and completed items
+        """
+        return {
+            "job_id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "completed": self.completed,
+            "total": self.total,
+            "progress": round(self.completed / self.total, 4) if self.total else 0.0,
+            "items": [self.items[index] for index in sorted(self.items)],
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "callback_url": self.callback_url,
+            "callback": self.callback,
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """Get the job.json record of the job"""
+        request = self.request.model_dump() if isinstance(self.request, BaseModel) else self.request
+        return {**self.info(), "request": request}
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], directory: Path) -> "Job":
+        """Restore a job from its job.json record"""
+        job = cls(record["job_id"], record["type"], record.get("request"), directory, record.get("callback_url"))
+        job.status = record["status"]
+        job.error = record.get("error")
+        job.created_at = record["created_at"]
+        job.started_at = record.get("started_at")
+        job.finished_at = record.get("finished_at")
+        job.total = record.get("total", 0)
+        job.completed = record.get("completed", 0)
+        job.items = {item["index"]: item for item in record.get("items", [])}
+        job.callback = record.get("callback")
+        return job
+
+
+JobRunner = Callable[[Any, Job], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class JobType:
+    """A kind of job: its request schema and the coroutine that renders it"""
+    name: str
+    schema: Type[BaseModel]
+    runner: JobRunner
+    validate: Optional[Callable[[Any], None]] = None
+
+
+# Job types registered by the routers that own the rendering code
+_job_types: Dict[str, JobType] = {}
+
+
+def register_job_type(
+    name: str,
+    schema: Type[BaseModel],
+    runner: JobRunner,
+    validate: Optional[Callable[[Any], None]] = None,
+):
+    """
+    Register a kind of job
+
+    Args:
+        name: Job type name used in submissions
+        schema: Request model the submitted request is validated against
+        runner: Coroutine function (request, job) rendering the job into the
+            job directory and recording its items
+        validate: Optional check run at submission; raises HTTPException
+    """
+    _job_types[name] = JobType(name, schema, runner, validate)
+
+
+def get_job_types() -> List[str]:
+    """Get the names of the registered job types"""
+    return sorted(_job_types)
+
+
+async def run_batch_job(
+    job: Job,
+    count: int,
+    render: Callable[[int, int], Awaitable[Any]],
+    names: List[str],
+    audio_format: str,
+    batch_size: int,
+):
+    """
+    Render a batch a model call at a time, saving each item as it is encoded
+
+    Args:
+        job: Job being run
+        count: Number of items
+        render: Coroutine function (start, end) rendering items [start, end)
+            to (audio_list, sample_rate)
+        names: File name (without extension) of each item
+        audio_format: Codec name
+        batch_size: Items per render call
+    """
+    job.set_total(count)
+    for start in range(0, count, max(1, batch_size)):
+        wavs, sample_rate = await render(start, min(count, start + batch_size))
+        for index, audio_data in enumerate(wavs, start):
+            audio_bytes = await run_dsp("encode", encode_audio, audio_data, sample_rate, audio_format, tracker=job.tracker)
+            await job.save_item(index, names[index], audio_bytes, sample_rate, len(audio_data) / sample_rate, audio_format)
+
+
+async def run_longform_job(job: Job, render, name: str, audio_format: str):
+    """
+    Render a long document into a single file, encoding segments as they arrive
+
+    Args:
+        job: Job being run
+        render: LongFormRender of the document
+        name: File name without extension
+        audio_format: Codec name
+    """
+    job.set_total(len(render.segments))
+    path = job.item_path(name, audio_format)
+    writer: Optional[AudioFileWriter] = None
+    samples = 0
+    try:
+        while (piece := await render.next()) is not None:
+            audio_data, sample_rate = piece
+            if writer is None:
+                writer = await asyncio.to_thread(AudioFileWriter, path, audio_format, sample_rate)
+            await asyncio.to_thread(writer.write, np.asarray(audio_data, dtype=np.float32))
+            samples += len(audio_data)
+            job.set_progress(render.progress()["segment"] + 1)
+    finally:
+        if writer is not None:
+            await asyncio.to_thread(writer.close)
+        await render.aclose()
+
+    job.add_item(0, path, sample_rate, samples / sample_rate, audio_format)
+
+
+class JobManager:
+    """
+    Bounded job queue, its workers and the on-disk result store
+    """
+
+    def __init__(
+        self,
+        results_dir: str,
+        max_queue_size: int = 100,
+        workers: int = 1,
+        retention_seconds: int = 86400,
+        callback_allowed_hosts: str = "localhost,127.0.0.1,::1",
+        callback_timeout: float = 10.0,
+        callback_retries: int = 3,
+    ):
+        """
+        Initialize the manager
+
+        Args:
+            results_dir: Directory job results are stored in (created if missing)
+            max_queue_size: Maximum number of queued jobs
+            workers: Jobs rendered at the same time
+            retention_seconds: Time finished jobs are kept (0 = until deleted)
+            callback_allowed_hosts: Comma-separated callback hosts ('*' = any)
+            callback_timeout: Timeout of each callback attempt in seconds
+            callback_retries: Callback attempts before giving up
+        """
+        self.results_dir = Path(results_dir)
+        self.max_queue_size = max(1, max_queue_size)
+        self.num_workers = max(1, workers)
+        self.retention_seconds = retention_seconds
+        self.callback_allowed_hosts = {host.strip().lower() for host in callback_allowed_hosts.split(",") if host.strip()}
+        self.callback_timeout = callback_timeout
+        self.callback_retries = max(1, callback_retries)
+
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._callbacks: Set[asyncio.Task] = set()
+
+        # Statistics
+        self._submitted = 0
+        self._rejected = 0
+        self._finished = {state: 0 for state in FINISHED_STATES}
+        self._callbacks_delivered = 0
+        self._callbacks_failed = 0
+
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Restore job records left by a previous run"""
+        for record_path in self.results_dir.glob(f"*/{RECORD_FILE}"):
+            try:
+                job = Job.from_record(json.loads(record_path.read_text()), record_path.parent)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping unreadable job record {record_path}: {e}")
+                continue
+            if job.status in ACTIVE_STATES:
+                # The render did not survive the restart; completed items remain downloadable
+                job.status = "failed"
+                job.error = "Interrupted by server restart"
+                job.finished_at = time.time()
+                self._save(job)
+            self._jobs[job.id] = job
+        if self._jobs:
+            logger.info(f"Restored {len(self._jobs)} job records from {self.results_dir}")
+
+    def _save(self, job: Job):
+        """Write a job's record atomically"""
+        record_path = job.directory / RECORD_FILE
+        tmp_path = record_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(job.to_record()))
+        os.replace(tmp_path, record_path)
+
+    async def _persist(self, job: Job):
+        """Write a job's record off the event loop"""
+        try:
+            await asyncio.to_thread(self._save, job)
+        except OSError as e:
+            logger.warning(f"Failed to save record of job {job.id}: {e}")
+
+    def _ensure_workers(self):
+        """Start the queue and workers on first use"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.num_workers)]
+
+    def _check_callback_url(self, url: str):
+        """Reject callback URLs outside the allowed hosts"""
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise HTTPException(status_code=400, detail="callback_url must be an http(s) URL")
+        if "*" not in self.callback_allowed_hosts and parsed.hostname.lower() not in self.callback_allowed_hosts:
+            raise HTTPException(
+                status_code=400,
+                detail=f"callback_url host '{parsed.hostname}' is not allowed"
+            )
+
+    async def submit(
+        self,
+        job_type: str,
+        request: Dict[str, Any],
+        callback_url: Optional[str] = None,
+    ) -> Job:
+        """
+        Validate and queue a job
+
+        Args:
+            job_type: Registered job type name
+            request: Request body for the job type
+            callback_url: URL notified when the job finishes
+
+        Returns:
+            The queued job
+
+        Raises:
+            HTTPException: 400/422 for invalid submissions, 429 if the queue is full
+        """
+        if job_type not in _job_types:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown job type: {job_type}. Supported: {', '.join(get_job_types())}"
+            )
+        spec = _job_types[job_type]
+        try:
+            parsed = spec.schema.model_validate(request)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+        if spec.validate is not None:
+            spec.validate(parsed)
+        if callback_url:
+            self._check_callback_url(callback_url)
+
+        await self.purge_expired()
+        self._ensure_workers()
+        if self._queue.full():
+            self._rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail=f"Job queue is full ({self.max_queue_size} jobs queued)"
+            )
+
+        job_id = uuid.uuid4().hex
+        job = Job(job_id, job_type, parsed, self.results_dir / job_id, callback_url)
+        await asyncio.to_thread(job.directory.mkdir, parents=True, exist_ok=True)
+        await self._persist(job)
+        self._jobs[job_id] = job
+        self._queue.put_nowait(job)
+        self._submitted += 1
+        logger.info(f"Queued {job_type} job {job_id} ({self._queue.qsize()} queued)")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """
+        Look up a job
+
+        Raises:
+            HTTPException: 404 if the job does not exist
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        return job
+
+    def list(self, status: Optional[str] = None) -> List[Job]:
+        """Get jobs, newest first, optionally with a given status"""
+        jobs = sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+        return [job for job in jobs if status is None or job.status == status]
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """Get the number of queued jobs ahead of a queued job"""
+        if job.status != "queued":
+            return None
+        return sum(1 for other in self._jobs.values() if other.status == "queued" and other.created_at < job.created_at)
+
+    async def _work(self):
+        """Render queued jobs one at a time"""
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == "queued":
+                    await self._run(job)
+            except Exception as e:
+                logger.error(f"Job worker error on {job.id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        """Render a job and record how it ended"""
+        spec = _job_types[job.type]
+        job.status = "running"
+        job.started_at = time.time()
+        job.tracker.start()
+        job.tracker.mark_queue_wait(job.started_at - job.created_at)
+        await self._persist(job)
+        if job.status != "running":
+            # Cancelled before the render started
+            return
+        logger.info(f"Running {job.type} job {job.id}")
+
+        job.task = asyncio.create_task(self._render(spec, job))
+        await asyncio.wait({job.task})
+        task, job.task = job.task, None
+        if job.status in FINISHED_STATES:
+            # Cancelled while running; cancel() has recorded it
+            return
+        if task.cancelled():
+            await self._finish(job, "cancelled")
+        elif task.exception() is not None:
+            error = task.exception()
+            detail = error.detail if isinstance(error, HTTPException) else str(error)
+            logger.error(f"Job {job.id} failed: {detail}")
+            await self._finish(job, "failed", str(detail))
+        else:
+            await self._finish(job, "completed")
+
+    async def _render(self, spec: JobType, job: Job):
+        """Run a job's renderer, starting over once a model loading in the background may be ready"""
+        while True:
+            try:
+                return await spec.runner(job.request, job)
+            except ModelNotReadyError as e:
+                logger.info(f"Job {job.id} waiting {e.retry_after}s for the {e.model_type} model to load")
+                job.items.clear()
+                job.set_progress(0)
+                await asyncio.sleep(e.retry_after)
+
+    async def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        """Record a finished job and send its callback"""
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        self._finished[status] += 1
+        await self._persist(job)
+        logger.info(f"Job {job.id} {status} ({len(job.items)} items)")
+
+        if job.callback_url:
+            task = asyncio.create_task(self._notify(job))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    async def _notify(self, job: Job):
+        """POST the finished job to its callback URL, retrying with backoff"""
+        result: Dict[str, Any] = {"delivered": False, "attempts": 0}
+        async with httpx.AsyncClient(timeout=self.callback_timeout) as client:
+            for attempt in range(self.callback_retries):
+                result["attempts"] = attempt + 1
+                try:
+                    response = await client.post(job.callback_url, json=job.info())
+                    result["status_code"] = response.status_code
+                    if response.status_code < 400:
+                        result["delivered"] = True
+                        break
+                except httpx.HTTPError as e:
+                    result["error"] = str(e) or type(e).__name__
+                if attempt + 1 < self.callback_retries:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+
+        if result["delivered"]:
+            self._callbacks_delivered += 1
+        else:
+            self._callbacks_failed += 1
+            logger.warning(f"Callback for job {job.id} to {job.callback_url} failed: {result}")
+        job.callback = result
+        await self._persist(job)
+
+    async def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a queued or running job
+
+        Items already written stay available.
+
+        Raises:
+            HTTPException: 404 if the job does not exist, 409 if it has finished
+        """
+        job = self.get(job_id)
+        if job.status in FINISHED_STATES:
+            raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job.status}")
+
+        task = job.task
+        await self._finish(job, "cancelled")
+        if task is not None:
+            task.cancel()
+            await asyncio.wait({task})
+        return job
+
+    async def delete(self, job_id: str):
+        """
+        Cancel a job if it is active and remove it and its results
+
+        Raises:
+            HTTPException: 404 if the job does not exist
+        """
+        job = self.get(job_id)
+        if job.status in ACTIVE_STATES:
+            await self.cancel(job_id)
+        self._jobs.pop(job_id, None)
+        await asyncio.to_thread(shutil.rmtree, job.directory, True)
+
+    async def purge_expired(self) -> int:
+        """
+        Remove finished jobs older than the retention period
+
+        Returns:
+            Number of jobs removed
+        """
+        if self.retention_seconds <= 0:
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job for job in self._jobs.values()
+            if job.status in FINISHED_STATES and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job in expired:
+            self._jobs.pop(job.id, None)
+            await asyncio.to_thread(shutil.rmtree, job.directory, True)
+        if expired:
+            logger.info(f"Removed {len(expired)} expired jobs")
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get job queue statistics
+
+        Returns:
+            Dictionary with queue depth, job counts by state and callback counts
+        """
+        by_status = {state: 0 for state in ACTIVE_STATES + FINISHED_STATES}
+        for job in self._jobs.values():
+            by_status[job.status] += 1
+        return {
+            "queued": by_status["queued"],
+            "running": by_status["running"],
+            "max_queue_size": self.max_queue_size,
+            "workers": self.num_workers,
+            "stored_jobs": len(self._jobs),
+            "jobs_by_status": by_status,
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "finished": dict(self._finished),
+            "callbacks_delivered": self._callbacks_delivered,
+            "callbacks_failed": self._callbacks_failed,
+            "retention_seconds": self.retention_seconds,
+            "job_types": get_job_types(),
+        }
+
+    async def shutdown(self):
+        """Stop the workers; running jobs are recorded as interrupted"""
+        for job in list(self._jobs.values()):
+            if job.task is not None:
+                task = job.task
+                await self._finish(job, "failed", "Interrupted by server shutdown")
+                task.cancel()
+                await asyncio.wait({task})
+        for task in [*self._workers, *self._callbacks]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._callbacks, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+
+# Global job manager instance
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """Get or create global job manager instance"""
+    global _job_manager
+
+    if _job_manager is None:
+        from app.config import settings
+        _job_manager = JobManager(
+            results_dir=settings.job_results_dir,
+            max_queue_size=settings.job_queue_max_size,
+            workers=settings.job_workers,
+            retention_seconds=settings.job_retention_seconds,
+            callback_allowed_hosts=settings.job_callback_allowed_hosts,
+            callback_timeout=settings.job_callback_timeout,
+            callback_retries=settings.job_callback_retries,
+        )
+        logger.info(
+            f"Initialized job manager: results_dir={settings.job_results_dir}, "
+            f"queue={settings.job_queue_max_size}, workers={settings.job_workers}"
+        )
+
+    return _job_manager
+
+
+async def shutdown_job_manager():
+    """Stop the global job manager (if it was started)"""
+    global _job_manager
+
+    if _job_manager is not None:
+        await _job_manager.shutdown()
+        _job_manager = None
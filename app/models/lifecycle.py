@@ -0,0 +1,305 @@
+"""
+Idle unloading and scheduled pre-warming of models
+
+Traffic for some model types is bursty (e.g. business hours only), but a
+model stays loaded forever once a request has touched it. ModelLifecycle
+runs a periodic check that unloads models idle for longer than their
+configured timeout, and loads and warms models on a cron-like schedule so
+that known peaks do not start with a cold load.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL_TYPES = ("custom_voice", "voice_design", "base")
+
+# (low, high) of the minute, hour, day of month, month and weekday fields
+_CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    """Expand one cron field ('*', '5', '1-5', '*/15', '0,30') into its values"""
+    values = set()
+    for part in field.split(","):
+        base, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start_text, _, end_text = base.partition("-")
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(base)
+            end = high if step_text else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron field '{field}' (allowed {low}-{high})")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month weekday"""
+
+    def __init__(self, expression: str):
+        """
+        Parse a cron expression
+
+        Args:
+            expression: e.g. "45 7 * * 1-5" (weekdays at 07:45); weekday 0
+                and 7 are Sunday
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: '{expression}'")
+        self.expression = " ".join(fields)
+        try:
+            parsed = [_parse_cron_field(field, low, high) for field, (low, high) in zip(fields, _CRON_RANGES)]
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression '{expression}': {e}") from None
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}
+        # Like cron, a restricted day of month and weekday match either one
+        self._either_day = fields[2] != "*" and fields[4] != "*"
+
+    def matches(self, moment: datetime) -> bool:
+        """Check if the schedule fires in the minute of moment"""
+        if moment.minute not in self.minutes or moment.hour not in self.hours or moment.month not in self.months:
+            return False
+        day = moment.day in self.days
+        weekday = moment.isoweekday() % 7 in self.weekdays
+        return (day or weekday) if self._either_day else (day and weekday)
+
+    def next_after(self, moment: datetime, horizon_days: int = 8) -> Optional[datetime]:
+        """
+        Find the next minute the schedule fires after moment
+
+        Args:
+            moment: Start time
+            horizon_days: How far ahead to search
+
+        Returns:
+            Next firing time, or None if there is none within the horizon
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(horizon_days * 24 * 60):
+            if self.matches(candidate):
+                return candidate
+            candidate += timedelta(minutes=1)
+        return None
+
+
+def parse_prewarm_schedule(spec: str) -> List[Tuple[str, CronSchedule]]:
+    """
+    Parse the pre-warm schedule setting
+
+    Args:
+        spec: Semicolon-separated "model_type=cron" entries
+
+    Returns:
+        List of (model_type, CronSchedule)
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown model type
+    """
+    entries = []
+    for entry in spec.split(";"):
+        if not entry.strip():
+            continue
+        model_type, separator, expression = entry.partition("=")
+        model_type = model_type.strip()
+        if not separator or model_type not in MODEL_TYPES:
+            raise ValueError(
+                f"Invalid pre-warm entry '{entry.strip()}': expected model_type=cron "
+                f"with model_type one of {', '.join(MODEL_TYPES)}"
+            )
+        entries.append((model_type, CronSchedule(expression)))
+    return entries
+
+
+class ModelLifecycle:
+    """
+    Periodic idle-unload and pre-warm checks for the model manager
+    """
+
+    def __init__(
+        self,
+        manager,
+        idle_timeouts: Dict[str, float],
+        prewarm_schedule: List[Tuple[str, CronSchedule]],
+        check_interval: float = 30.0,
+    ):
+        """
+        Initialize the lifecycle checks
+
+        Args:
+            manager: ModelManager whose models are unloaded and pre-warmed
+            idle_timeouts: Idle seconds before unloading, per model type (0 = never)
+            prewarm_schedule: (model_type, CronSchedule) entries
+            check_interval: Seconds between checks (at most a minute, so no
+                scheduled minute is missed)
+        """
+        self.manager = manager
+        self.idle_timeouts = {model_type: timeout for model_type, timeout in idle_timeouts.items() if timeout > 0}
+        self.prewarm_schedule = prewarm_schedule
+        self.check_interval = min(max(1.0, check_interval), 60.0)
+        self._task: Optional[asyncio.Task] = None
+        self._last_minute: Optional[datetime] = None
+
+        # Statistics
+        self._idle_unloads = {model_type: 0 for model_type in MODEL_TYPES}
+        self._prewarms = {model_type: 0 for model_type in MODEL_TYPES}
+        self._prewarm_failures = {model_type: 0 for model_type in MODEL_TYPES}
+
+    @property
+    def enabled(self) -> bool:
+        """True if any idle timeout or pre-warm entry is configured"""
+        return bool(self.idle_timeouts or self.prewarm_schedule)
+
+    def start(self):
+        """Start the periodic checks"""
+        if self._task is None and self.enabled:
+            self._last_minute = datetime.now().replace(second=0, microsecond=0)
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"Model lifecycle started: idle timeouts {self.idle_timeouts}, "
+                f"pre-warm {[(m, s.expression) for m, s in self.prewarm_schedule]}"
+            )
+
+    async def stop(self):
+        """Stop the periodic checks"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        """Run the checks every check_interval seconds"""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Model lifecycle check failed: {e}")
+
+    async def check(self, now: Optional[datetime] = None):
+        """
+        Unload idle models and pre-warm models whose schedule is due
+
+        Args:
+            now: Current local time (defaults to datetime.now())
+        """
+        now = now or datetime.now()
+        await self._unload_idle(now.timestamp())
+        for model_type in self._due_prewarms(now):
+            await self.prewarm(model_type)
+
+    async def _unload_idle(self, now: float):
+        """Unload models unused for longer than their idle timeout"""
+        for model_type, timeout in self.idle_timeouts.items():
+            idle_since = self.manager.residency.idle_since(model_type)
+            if idle_since is None or now - idle_since < timeout:
+                continue
+            logger.info(f"Unloading {model_type} model after {(now - idle_since) / 60:.1f} idle minutes")
+            await asyncio.to_thread(self.manager.unload_model, model_type)
+            self._idle_unloads[model_type] += 1
+
+    def _due_prewarms(self, now: datetime) -> List[str]:
+        """Get model types scheduled in any minute since the last check"""
+        minute = now.replace(second=0, microsecond=0)
+        start = self._last_minute + timedelta(minutes=1) if self._last_minute else minute
+        # A stalled loop does not replay more than a day of schedule
+        start = max(start, minute - timedelta(days=1))
+        self._last_minute = minute
+
+        due = []
+        while start <= minute:
+            for model_type, schedule in self.prewarm_schedule:
+                if model_type not in due and schedule.matches(start):
+                    due.append(model_type)
+            start += timedelta(minutes=1)
+        return due
+
+    async def prewarm(self, model_type: str):
+        """
+        Load and warm up a model ahead of demand
+
+        The manager runs the warmup as part of the load. Models that are
+        already loaded are left as they are.
+
+        Args:
+            model_type: Model type to pre-warm
+        """
+        if self.manager.is_loaded(model_type):
+            return
+        logger.info(f"Pre-warming {model_type} model")
+        try:
+            await asyncio.to_thread(self.manager.get_model, model_type)
+        except Exception as e:
+            self._prewarm_failures[model_type] += 1
+            logger.warning(f"Pre-warming {model_type} model failed: {e}")
+            return
+        self.manager.residency.mark_prewarmed(model_type)
+        self._prewarms[model_type] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get idle-unload and pre-warm statistics
+
+        Returns:
+            Dictionary with the configuration, next scheduled pre-warms and
+            counters, including cold starts avoided by pre-warming
+        """
+        now = datetime.now()
+        residency = self.manager.residency.get_stats()["models"]
+        next_runs = [
+            {"model_type": model_type, "cron": schedule.expression, "next_run": next_run.isoformat() if next_run else None}
+            for model_type, schedule in self.prewarm_schedule
+            for next_run in [schedule.next_after(now)]
+        ]
+        avoided = {model_type: residency[model_type]["cold_starts_avoided"] for model_type in MODEL_TYPES}
+        return {
+            "enabled": self.enabled,
+            "idle_timeout_seconds": dict(self.idle_timeouts),
+            "prewarm_schedule": next_runs,
+            "idle_unloads": dict(self._idle_unloads),
+            "prewarms": dict(self._prewarms),
+            "prewarm_failures": dict(self._prewarm_failures),
+            "cold_starts_avoided": avoided,
+            "cold_starts_avoided_total": sum(avoided.values()),
+        }
+
+
+# Global lifecycle instance (created at startup)
+_lifecycle: Optional[ModelLifecycle] = None
+
+
+def get_model_lifecycle() -> ModelLifecycle:
+    """Get or create the global model lifecycle from settings"""
+    global _lifecycle
+
+    if _lifecycle is None:
+        from app.config import settings
+        from app.models.manager import model_manager
+        _lifecycle = ModelLifecycle(
+            model_manager,
+            {model_type: settings.get_idle_timeout(model_type) for model_type in MODEL_TYPES},
+            parse_prewarm_schedule(settings.model_prewarm_schedule),
+            check_interval=settings.model_lifecycle_check_seconds,
+        )
+
+    return _lifecycle
+
+
+async def shutdown_model_lifecycle():
+    """Stop the global model lifecycle checks (if they were started)"""
+    global _lifecycle
+
+    if _lifecycle is not None:
+        await _lifecycle.stop()
+        _lifecycle = None
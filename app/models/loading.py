@@ -0,0 +1,191 @@
+"""
+Background model loading state
+
+Loading a model takes a minute or more. Instead of every request for a cold
+model blocking behind the load, the load runs on a background thread and
+moves through unloaded -> loading -> warming -> ready (or failed).
+Requests arriving in the meantime are answered with 503 and a Retry-After
+estimated from how long earlier loads of the model took.
+"""
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+UNLOADED = "unloaded"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+IN_PROGRESS_STATES = (LOADING, WARMING)
+
+
+class ModelNotReadyError(HTTPException):
+    """Raised when a request needs a model that is still loading (HTTP 503)"""
+
+    def __init__(self, model_type: str, state: str, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail=f"The {model_type} model is {state}; retry in {retry_after} seconds",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.model_type = model_type
+        self.state = state
+        self.retry_after = retry_after
+
+
+class ModelLoadTracker:
+    """
+    Thread-safe load state of every model type
+    """
+
+    def __init__(self, model_types: List[str], default_retry_after: int = 60):
+        """
+        Initialize load tracking
+
+        Args:
+            model_types: Model types that can be loaded
+            default_retry_after: Retry-After (seconds) before any load has been timed
+        """
+        self.default_retry_after = max(1, default_retry_after)
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, Any]] = {
+            model_type: {
+                "state": UNLOADED,
+                "event": threading.Event(),
+                "error": None,
+                "started_at": None,
+                "ready_at": None,
+                "loads": 0,
+                "failures": 0,
+                "last_load_seconds": None,
+                "last_warmup_seconds": None,
+                "total_ready_seconds": 0.0,
+            }
+            for model_type in model_types
+        }
+
+    def begin(self, model_type: str) -> Tuple[threading.Event, bool]:
+        """
+        Start a load unless the model is loading or ready
+
+        Args:
+            model_type: Model type to load
+
+        Returns:
+            Tuple of (event set when the load finishes, True if the caller
+            must run the load)
+        """
+        with self._lock:
+            state = self._models[model_type]
+            if state["state"] in IN_PROGRESS_STATES or state["state"] == READY:
+                return state["event"], False
+            state["state"] = LOADING
+            state["event"] = threading.Event()
+            state["error"] = None
+            state["started_at"] = time.time()
+            return state["event"], True
+
+    def set_warming(self, model_type: str):
+        """Record that a model has loaded and is running its warmup"""
+        with self._lock:
+            self._models[model_type]["state"] = WARMING
+
+    def finish(self, model_type: str, load_seconds: float, warmup_seconds: float):
+        """
+        Record a model as ready and wake up waiters
+
+        Args:
+            model_type: Model type loaded
+            load_seconds: Time the load took
+            warmup_seconds: Time the warmup took
+        """
+        with self._lock:
+            state = self._models[model_type]
+            state["state"] = READY
+            state["ready_at"] = time.time()
+            state["loads"] += 1
+            state["last_load_seconds"] = load_seconds
+            state["last_warmup_seconds"] = warmup_seconds
+            state["total_ready_seconds"] += load_seconds + warmup_seconds
+            state["event"].set()
+
+    def fail(self, model_type: str, error: BaseException):
+        """Record a failed load and wake up waiters"""
+        with self._lock:
+            state = self._models[model_type]
+            state["state"] = FAILED
+            state["error"] = str(error)
+            state["failures"] += 1
+            state["event"].set()
+
+    def reset(self, model_type: str):
+        """Record that a model was unloaded"""
+        with self._lock:
+            state = self._models[model_type]
+            if state["state"] == READY:
+                state["state"] = UNLOADED
+                state["ready_at"] = None
+
+    def state(self, model_type: str) -> str:
+        """Get the load state of a model"""
+        with self._lock:
+            return self._models[model_type]["state"]
+
+    def error(self, model_type: str) -> Optional[str]:
+        """Get the error of the last failed load"""
+        with self._lock:
+            return self._models[model_type]["error"]
+
+    def in_progress(self, model_type: str) -> bool:
+        """Check if a model is loading or warming up"""
+        return self.state(model_type) in IN_PROGRESS_STATES
+
+    def retry_after(self, model_type: str) -> int:
+        """
+        Estimate the seconds until a model is ready
+
+        Uses the average duration of earlier loads (load and warmup) minus
+        the time the current load has been running.
+
+        Returns:
+            Whole seconds, at least 1
+        """
+        with self._lock:
+            state = self._models[model_type]
+            if not state["loads"]:
+                return self.default_retry_after
+            remaining = state["total_ready_seconds"] / state["loads"]
+            if state["state"] in IN_PROGRESS_STATES:
+                remaining -= time.time() - state["started_at"]
+            return max(1, math.ceil(remaining))
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get load states
+
+        Returns:
+            Per-model state, last error, current load duration and timings
+        """
+        now = time.time()
+        with self._lock:
+            stats = {}
+            for name, state in self._models.items():
+                loads = state["loads"]
+                in_progress = state["state"] in IN_PROGRESS_STATES
+                stats[name] = {
+                    "state": state["state"],
+                    "error": state["error"],
+                    "loading_seconds": round(now - state["started_at"], 3) if in_progress else None,
+                    "loads": loads,
+                    "failures": state["failures"],
+                    "last_load_seconds": round(state["last_load_seconds"], 3) if loads else None,
+                    "last_warmup_seconds": round(state["last_warmup_seconds"], 3) if loads else None,
+                    "avg_ready_seconds": round(state["total_ready_seconds"] / loads, 3) if loads else None,
+                }
+            return stats
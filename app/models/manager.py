@@ -1,16 +1,63 @@
 """
 Model manager for lazy loading and caching TTS models
 """
+import asyncio
+import gc
+import hashlib
 import logging
+import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 from qwen_tts import Qwen3TTSModel
 from app.config import settings
+from app.models.executor import InferenceExecutor
+from app.models.loading import FAILED, ModelLoadTracker, ModelNotReadyError
+from app.models.prompt_store import get_prompt_store
+from app.models.residency import ModelResidency, parameter_bytes
+from app.models.warmup import warmup_model
 
 logger = logging.getLogger(__name__)
 
 
+def model_version_tag(model_path: str) -> str:
+    """
+    Tag the checkpoint at a model path for cache keys
+    
+    The tag is the path followed by a hash of the name, size and
+    modification time of every checkpoint file, so it is the same after a
+    restart and changes whenever the weights at the path change. Local
+    directories are hashed directly; HuggingFace IDs are resolved to their
+    snapshot in the local HuggingFace cache (nothing is downloaded).
+    
+    Args:
+        model_path: Path or HuggingFace ID of the model
+        
+    Returns:
+        Version tag, or just the path if the checkpoint is not available locally
+    """
+    directory = model_path if os.path.isdir(model_path) else None
+    if directory is None:
+        try:
+            from huggingface_hub import snapshot_download
+            directory = snapshot_download(model_path, local_files_only=True)
+        except Exception:
+            return model_path
+    
+    hasher = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)  # follows the links of HuggingFace snapshots
+            except OSError:
+                continue
+            hasher.update(f"{os.path.relpath(path, directory)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return f"{model_path}@{hasher.hexdigest()[:12]}"
+
+
 class ModelManager:
     """Manages TTS model loading and caching"""
     
@@ -39,19 +86,55 @@ class ModelManager:
                 "description": "Base model for voice cloning"
             },
         }
+        self._executors: Dict[str, InferenceExecutor] = {
+            model_type: InferenceExecutor(
+                model_type, max_workers=settings.get_max_concurrency(model_type)
+            )
+            for model_type in self._models
+        }
+        self.residency = ModelResidency(
+            list(self._models),
+            budget_bytes=int(settings.model_memory_budget_gb * 2**30),
+            default_size_bytes=int(settings.model_size_estimate_gb * 2**30),
+        )
+        # Serializes eviction decisions so concurrent loads see each other's reservations
+        self._residency_lock = threading.Lock()
+        self.loads = ModelLoadTracker(
+            list(self._models),
+            default_retry_after=settings.model_load_retry_after_seconds,
+        )
+        self._startup_report: Optional[Dict[str, Any]] = None
+        
+        # Hot reloads: version tag of each model type, in-flight calls per
+        # model generation (so a swapped-out model can be drained) and the
+        # status of the latest reload
+        self._versions = {
+            model_type: {
+                "model_path": config["model_path"],
+                # Tagged on first use or load, not at import time
+                "version": None,
+                "reloads": 0,
+            }
+            for model_type, config in self._model_configs.items()
+        }
+        self._generation_cond = threading.Condition()
+        self._generations = {model_type: 0 for model_type in self._models}
+        self._generation_users: Dict[str, Dict[int, int]] = {model_type: {} for model_type in self._models}
+        self._reloads: Dict[str, Optional[Dict[str, Any]]] = {model_type: None for model_type in self._models}
     
-    def _load_model(self, model_type: str) -> Qwen3TTSModel:
+    def _load_model(self, model_type: str, model_path: Optional[str] = None) -> Qwen3TTSModel:
         """
         Load a TTS model
         
         Args:
             model_type: Type of model to load (custom_voice, voice_design, base)
+            model_path: Path or HuggingFace ID to load (defaults to the configured one)
             
         Returns:
             Loaded model instance
         """
         config = self._model_configs[model_type]
-        model_path = config["model_path"]
+        model_path = model_path or config["model_path"]
         
         logger.info(f"Loading {config['description']} from {model_path}")
         
@@ -77,130 +160,563 @@ class ModelManager:
             logger.error(f"Failed to load {config['description']}: {e}")
             raise
     
-    def get_model(self, model_type: str) -> Qwen3TTSModel:
+    def get_model(self, model_type: str, timeout: Optional[float] = None) -> Qwen3TTSModel:
         """
         Get a TTS model (loads if not already cached)
         
+        A model that is not loaded is loaded (and warmed up) in the
+        background; this waits for it up to timeout.
+        
         Args:
             model_type: Type of model (custom_voice, voice_design, base)
+            timeout: Maximum seconds to wait for a load (None = until it finishes)
             
         Returns:
             The requested model instance
             
         Raises:
             ValueError: If model_type is invalid
+            ModelNotReadyError: If the model is still loading after timeout
             RuntimeError: If model loading fails
         """
         if model_type not in self._models:
             raise ValueError(f"Invalid model type: {model_type}")
         
         # Check if model is already loaded
-        if self._models[model_type] is not None:
-            return self._models[model_type]
+        model = self._models[model_type]
+        if model is not None:
+            return model
+        
+        # Start a background load (or join the one in progress) and wait for it
+        finished = self.start_loading(model_type)
+        if not finished.wait(timeout):
+            raise ModelNotReadyError(model_type, self.loads.state(model_type), self.loads.retry_after(model_type))
+        if self.loads.state(model_type) == FAILED:
+            raise RuntimeError(f"Failed to load {model_type} model: {self.loads.error(model_type)}")
+        
+        model = self._models[model_type]
+        if model is None:
+            # Evicted again right after loading; treat it like a load in progress
+            raise ModelNotReadyError(model_type, self.loads.state(model_type), self.loads.retry_after(model_type))
+        return model
+    
+    def start_loading(self, model_type: str, model_path: Optional[str] = None) -> threading.Event:
+        """
+        Load a model on a background thread unless it is loading or loaded
         
-        # Load model with thread-safe lock
+        Args:
+            model_type: Type of model to load
+            model_path: Path to switch the model type to once it has loaded
+                (defaults to the configured one; ignored if a load is
+                already running)
+            
+        Returns:
+            Event set once the model is ready or its load has failed
+        """
         with self._locks[model_type]:
-            # Double-check after acquiring lock
-            if self._models[model_type] is not None:
-                return self._models[model_type]
+            finished, started = self.loads.begin(model_type)
+            if started:
+                threading.Thread(
+                    target=self._load_in_background,
+                    args=(model_type, model_path),
+                    name=f"model-load-{model_type}",
+                    daemon=True,
+                ).start()
+        return finished
+    
+    def _load_in_background(self, model_type: str, model_path: Optional[str] = None):
+        """
+        Load and warm up a model, then make it available to requests
+        
+        Args:
+            model_type: Type of model to load
+            model_path: Path to load instead of the configured one; the model
+                type only switches to it if the load succeeds
+        """
+        try:
+            # Make room within the memory budget, then load
+            self._make_room(model_type)
+            start = time.perf_counter()
+            try:
+                model = self._load_model(model_type, model_path) if model_path else self._load_model(model_type)
+            except BaseException:
+                self.residency.release_reservation(model_type)
+                raise
+            load_seconds = time.perf_counter() - start
+            
+            # Requests are still turned away while the warmup runs
+            self.loads.set_warming(model_type)
+            start = time.perf_counter()
+            if settings.enable_warmup:
+                try:
+                    warmup_model(model_type, model)
+                except Exception as e:
+                    logger.warning(f"Warmup of {model_type} model failed (non-critical): {e}")
+            warmup_seconds = time.perf_counter() - start
+            
+            with self._locks[model_type]:
+                # Tagged after every load, as the weights may have changed on disk
+                if model_path:
+                    self._set_version(model_type, model_path)
+                else:
+                    self._tag_version(model_type)
+                self.residency.record_load(model_type, parameter_bytes(model), load_seconds)
+                self._models[model_type] = model
+                self.loads.finish(model_type, load_seconds, warmup_seconds)
+            logger.info(f"{model_type} model ready (load {load_seconds:.1f}s, warmup {warmup_seconds:.1f}s)")
+        except Exception as e:
+            logger.error(f"Failed to load {model_type} model: {e}")
+            self.loads.fail(model_type, e)
+    
+    def _make_room(self, model_type: str):
+        """
+        Evict least recently used models until model_type fits the memory budget
+        
+        Args:
+            model_type: Model type about to be loaded
             
-            # Load model
-            self._models[model_type] = self._load_model(model_type)
-            return self._models[model_type]
+        Raises:
+            RuntimeError: If a model to evict does not drain in time
+        """
+        with self._residency_lock:
+            needed = self.residency.expected_bytes(model_type)
+            for victim in self.residency.eviction_candidates(model_type, needed):
+                logger.info(f"Evicting {victim} model to make room for {model_type}")
+                self._release_model(victim, evicted=True)
+            self.residency.reserve(model_type, needed)
+    
+    def _release_model(self, model_type: str, evicted: bool = False):
+        """
+        Drain a model's in-flight requests and free it
+        
+        Args:
+            model_type: Model type to free
+            evicted: True if it is freed to make room for another model
+            
+        Raises:
+            RuntimeError: If in-flight requests do not finish within the drain timeout
+        """
+        try:
+            if not self.residency.drain(model_type, timeout=settings.model_drain_timeout_seconds):
+                raise RuntimeError(
+                    f"Timed out waiting for {self.residency.in_flight(model_type)} "
+                    f"in-flight {model_type} requests to finish"
+                )
+            if self._models[model_type] is None:
+                return
+            self._models[model_type] = None
+            self.residency.record_unload(model_type, evicted=evicted)
+            self.loads.reset(model_type)
+        finally:
+            self.residency.end_drain(model_type)
+        
+        self._free_memory()
+    
+    @staticmethod
+    def _free_memory():
+        """Collect garbage and return freed GPU memory to the driver"""
+        import torch
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
     
     def get_custom_voice_model(self) -> Qwen3TTSModel:
-        """Get CustomVoice model"""
-        return self.get_model("custom_voice")
+        """Get CustomVoice model if it is ready (starts a background load otherwise)"""
+        return self.get_model("custom_voice", timeout=0)
     
     def get_voice_design_model(self) -> Qwen3TTSModel:
-        """Get VoiceDesign model"""
-        return self.get_model("voice_design")
+        """Get VoiceDesign model if it is ready (starts a background load otherwise)"""
+        return self.get_model("voice_design", timeout=0)
     
     def get_base_model(self) -> Qwen3TTSModel:
-        """Get Base model"""
-        return self.get_model("base")
+        """Get Base model if it is ready (starts a background load otherwise)"""
+        return self.get_model("base", timeout=0)
+    
+    async def run_inference(
+        self,
+        model_type: str,
+        method: str,
+        tracker=None,
+        **kwargs
+    ) -> Any:
+        """
+        Run a model method on the model's inference pool
+        
+        Generation runs on a worker thread, so it does not block the event
+        loop. A model that is not loaded is loaded in the background and
+        waited for here, on the event loop, so a load never holds an
+        inference worker; calls fail with ModelNotReadyError (503 with
+        Retry-After) if it is not ready within model_load_wait_seconds.
+        
+        Args:
+            model_type: Type of model (custom_voice, voice_design, base)
+            method: Name of the model method to call (e.g. generate_custom_voice)
+            tracker: Optional PerformanceTracker that receives the queue wait time
+            **kwargs: Keyword arguments passed to the model method
+            
+        Returns:
+            Return value of the model method
+            
+        Raises:
+            ModelNotReadyError: If the model is still loading
+            RuntimeError: If loading the model fails
+        """
+        if model_type not in self._executors:
+            raise ValueError(f"Invalid model type: {model_type}")
+        
+        getter = getattr(self, f"get_{model_type}_model")
+        try:
+            # Starts a background load if the model is not loaded
+            getter()
+        except ModelNotReadyError:
+            await self._wait_for_load(model_type)
+        
+        def call():
+            # Counted as in flight so the model is not evicted (or freed
+            # after a hot reload) mid-call
+            self.residency.begin_use(model_type)
+            generation = self._enter_generation(model_type)
+            try:
+                return getattr(getter(), method)(**kwargs)
+            finally:
+                self._exit_generation(model_type, generation)
+                self.residency.end_use(model_type)
+        
+        result, queue_wait = await self._executors[model_type].run(call)
+        if tracker is not None:
+            tracker.mark_queue_wait(queue_wait)
+        return result
+    
+    async def _wait_for_load(self, model_type: str):
+        """
+        Wait up to model_load_wait_seconds for the background load of a model
+        
+        Raises:
+            ModelNotReadyError: If the model is still loading afterwards
+            RuntimeError: If the load fails
+        """
+        deadline = time.monotonic() + settings.model_load_wait_seconds
+        while self.loads.in_progress(model_type):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ModelNotReadyError(model_type, self.loads.state(model_type), self.loads.retry_after(model_type))
+            await asyncio.sleep(min(0.1, remaining))
+        if self.loads.state(model_type) == FAILED:
+            raise RuntimeError(f"Failed to load {model_type} model: {self.loads.error(model_type)}")
+    
+    def get_executor_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get inference pool statistics for every model type"""
+        return {
+            model_type: executor.get_stats()
+            for model_type, executor in self._executors.items()
+        }
+    
+    def get_model_path(self, model_type: str) -> str:
+        """Get the configured path or HuggingFace ID for a model type"""
+        return self._model_configs[model_type]["model_path"]
+    
+    def get_model_version(self, model_type: str) -> str:
+        """
+        Get the version tag of a model type for cache keys
+        
+        The tag identifies the checkpoint files (see model_version_tag), so
+        cached output of other weights is never served, even across restarts.
+        It is computed when first needed and again after every load.
+        """
+        version = self._versions[model_type]["version"]
+        if version is None:
+            self._tag_version(model_type)
+            version = self._versions[model_type]["version"]
+        return version
+    
+    def _enter_generation(self, model_type: str) -> int:
+        """Count a call against the current model generation"""
+        with self._generation_cond:
+            generation = self._generations[model_type]
+            users = self._generation_users[model_type]
+            users[generation] = users.get(generation, 0) + 1
+            return generation
+    
+    def _exit_generation(self, model_type: str, generation: int):
+        """Count a call as done with its model generation"""
+        with self._generation_cond:
+            users = self._generation_users[model_type]
+            users[generation] -= 1
+            if not users[generation]:
+                del users[generation]
+            self._generation_cond.notify_all()
+    
+    def _drain_generation(self, model_type: str, generation: int, timeout: float) -> bool:
+        """Wait for calls that may be using model generation (or older) to finish"""
+        with self._generation_cond:
+            return self._generation_cond.wait_for(
+                lambda: all(g > generation for g in self._generation_users[model_type]),
+                timeout=timeout,
+            )
+    
+    def reload_model(self, model_type: str, model_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start a hot reload of a model on a background thread
+        
+        The new version is loaded and warmed up alongside the current one,
+        which keeps serving requests. Once the warmup passes, the new model
+        replaces the old one for all new calls; the old model is freed after
+        its in-flight calls finish. If the load or warmup fails, the old
+        model stays in place.
+        
+        Args:
+            model_type: Type of model to reload
+            model_path: Path or HuggingFace ID of the new version (defaults to
+                the current one, e.g. to pick up updated weights)
+            
+        Returns:
+            Status of the reload
+            
+        Raises:
+            ValueError: If model_type is invalid
+            RuntimeError: If a reload (or a load) of the model type is already running
+        """
+        if model_type not in self._models:
+            raise ValueError(f"Invalid model type: {model_type}")
+        
+        with self._locks[model_type]:
+            current = self._reloads[model_type]
+            if current is not None and current["state"] not in ("completed", "failed"):
+                raise RuntimeError(f"A reload of the {model_type} model is already running")
+            if self.loads.in_progress(model_type):
+                raise RuntimeError(f"The {model_type} model is loading; reload it once it is ready")
+            status = {
+                "state": "loading",
+                "model_path": model_path or self.get_model_path(model_type),
+                "previous_version": self.get_model_version(model_type),
+                "version": None,
+                "error": None,
+                "started_at": time.time(),
+                "finished_at": None,
+            }
+            self._reloads[model_type] = status
+            started = dict(status)
+        
+        threading.Thread(
+            target=self._reload_in_background,
+            args=(model_type, status),
+            name=f"model-reload-{model_type}",
+            daemon=True,
+        ).start()
+        return started
+    
+    def _reload_in_background(self, model_type: str, status: Dict[str, Any]):
+        """
+        Load, warm up and swap in a new model version, then drain the old one
+        
+        Args:
+            model_type: Type of model to reload
+            status: Reload status, updated as the reload progresses
+        """
+        model_path = status["model_path"]
+        try:
+            reloads = self._versions[model_type]["reloads"]
+            if not self.is_loaded(model_type):
+                # Nothing to swap out: load the new version like a cold start.
+                # The model type keeps its current version unless it loads.
+                self.start_loading(model_type, model_path).wait()
+                if self.loads.state(model_type) == FAILED:
+                    raise RuntimeError(f"Failed to load {model_type} model: {self.loads.error(model_type)}")
+            if self._versions[model_type]["reloads"] == reloads:
+                # Loaded already (or by a request that started its load first)
+                self._swap_in_new_version(model_type, model_path, status)
+            status["version"] = self.get_model_version(model_type)
+            status["state"] = "completed"
+            logger.info(f"Reloaded {model_type} model: now {status['version']}")
+        except Exception as e:
+            logger.error(f"Reload of {model_type} model failed: {e}")
+            status["error"] = str(e)
+            status["state"] = "failed"
+        finally:
+            status["finished_at"] = time.time()
+    
+    def _swap_in_new_version(self, model_type: str, model_path: str, status: Dict[str, Any]):
+        """
+        Load a model version alongside the resident one and swap it in
+        
+        Raises:
+            Exception: If the new version fails to load or warm up (the
+                resident model is left in place)
+        """
+        # Room for the second copy is reserved within the memory budget
+        self._make_room(model_type)
+        start = time.perf_counter()
+        try:
+            model = self._load_model(model_type, model_path)
+            load_seconds = time.perf_counter() - start
+            # The swap only happens once the new version has generated audio
+            status["state"] = "warming"
+            warmup_model(model_type, model)
+        except BaseException:
+            self.residency.release_reservation(model_type)
+            model = None
+            self._free_memory()
+            raise
+        
+        with self._locks[model_type]:
+            if self._models[model_type] is None:
+                # Unloaded meanwhile; the next load picks up the new version
+                self.residency.release_reservation(model_type)
+                self._set_version(model_type, model_path)
+                old_generation = None
+            else:
+                with self._generation_cond:
+                    old_generation = self._generations[model_type]
+                    self._generations[model_type] += 1
+                    self._models[model_type] = model
+                self._set_version(model_type, model_path)
+                # The old model stays charged to the budget until it is freed
+                self.residency.retire(model_type)
+                self.residency.record_load(model_type, parameter_bytes(model), load_seconds)
+        
+        # Calls that started before the swap may still be using the old model
+        status["state"] = "draining"
+        model = None
+        if old_generation is not None:
+            if not self._drain_generation(model_type, old_generation, settings.model_drain_timeout_seconds):
+                logger.warning(
+                    f"In-flight {model_type} calls still use the previous version after "
+                    f"{settings.model_drain_timeout_seconds}s; it is freed when they finish"
+                )
+                self._drain_generation(model_type, old_generation, None)
+            self._free_memory()
+            self.residency.release_retired(model_type)
+        else:
+            self._free_memory()
+    
+    def _set_version(self, model_type: str, model_path: str):
+        """Switch a model type to a reloaded path and tag its version"""
+        version = self._versions[model_type]
+        version["reloads"] += 1
+        version["model_path"] = model_path
+        self._model_configs[model_type]["model_path"] = model_path
+        self._tag_version(model_type)
+    
+    def _tag_version(self, model_type: str):
+        """Tag the version of a model type from the checkpoint files at its path"""
+        version = self._versions[model_type]
+        version["version"] = model_version_tag(version["model_path"])
+    
+    def get_model_versions(self) -> Dict[str, Dict[str, Any]]:
+        """Get the path, version tag, reload count and latest reload status of every model type"""
+        return {
+            model_type: {
+                **version,
+                "version": self.get_model_version(model_type),
+                "loaded": self.is_loaded(model_type),
+                "reload": dict(self._reloads[model_type]) if self._reloads[model_type] else None,
+            }
+            for model_type, version in self._versions.items()
+        }
     
     def is_loaded(self, model_type: str) -> bool:
         """Check if a model is loaded"""
         return self._models.get(model_type) is not None
     
-    def preload_all_models(self):
-        """Preload all models (useful for startup)"""
-        logger.info("Preloading all models...")
-        for model_type in self._models.keys():
+    def preload_all_models(self, concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Preload (and warm up) all models (useful for startup)
+        
+        Models are loaded concurrently, so preloading takes about as long as
+        the slowest model rather than the sum of all of them.
+        
+        Args:
+            concurrency: Maximum models loaded at once (defaults to model_preload_concurrency)
+            
+        Returns:
+            Startup report with the load and warmup time of every model
+        """
+        concurrency = max(1, concurrency or settings.model_preload_concurrency)
+        logger.info(f"Preloading all models ({concurrency} at a time)...")
+        started_at = time.time()
+        start = time.perf_counter()
+        
+        def preload(model_type: str):
             try:
                 self.get_model(model_type)
+                error = None
             except Exception as e:
                 logger.error(f"Failed to preload {model_type} model: {e}")
-        logger.info("Model preloading complete")
+                error = str(e)
+            return model_type, time.perf_counter() - start, error
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="model-preload") as pool:
+            results = list(pool.map(preload, self._models))
+        total_seconds = time.perf_counter() - start
+        
+        load_states = self.loads.get_stats()
+        models = {}
+        for model_type, ready_after, error in results:
+            state = load_states[model_type]
+            models[model_type] = {
+                "status": "failed" if error else "ready",
+                "load_seconds": None if error else state["last_load_seconds"],
+                "warmup_seconds": None if error else state["last_warmup_seconds"],
+                "ready_after_seconds": round(ready_after, 3),
+                "error": error,
+            }
+        self._startup_report = {
+            "started_at": started_at,
+            "concurrency": concurrency,
+            "total_seconds": round(total_seconds, 3),
+            # What loading the models one after another would have taken
+            "sequential_seconds": round(sum(
+                (model["load_seconds"] or 0.0) + (model["warmup_seconds"] or 0.0) for model in models.values()
+            ), 3),
+            "models": models,
+        }
+        logger.info(f"Model preloading complete in {total_seconds:.1f}s")
+        return self._startup_report
+    
+    def get_startup_report(self) -> Optional[Dict[str, Any]]:
+        """Get the report of the startup preload (None if models were not preloaded)"""
+        return self._startup_report
     
     def unload_model(self, model_type: str):
         """
         Unload a model to free memory
         
+        Waits for in-flight requests on the model to finish first.
+        
         Args:
             model_type: Type of model to unload
         """
         if model_type in self._models and self._models[model_type] is not None:
             with self._locks[model_type]:
+                if self._models[model_type] is None:
+                    return
                 logger.info(f"Unloading {model_type} model")
-                self._models[model_type] = None
-                
-                # Trigger garbage collection
-                import gc
-                import torch
-                gc.collect()
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
+                self._release_model(model_type)
+    
+    def get_residency_stats(self) -> Dict[str, Any]:
+        """Get memory budget, residency and load time statistics"""
+        return self.residency.get_stats()
+    
+    def get_load_states(self) -> Dict[str, Dict[str, Any]]:
+        """Get the background load state and load/warmup timings of every model type"""
+        return self.loads.get_stats()
 
 
 # Global model manager instance
 model_manager = ModelManager()
 
 
-# Voice clone prompt storage (in-memory with TTL and size limits)
-# In production, consider using Redis or similar
-_PROMPT_MAX_SIZE = 100
-_PROMPT_TTL_SECONDS = 3600  # 1 hour
-_voice_clone_prompts: Dict[str, Dict[str, Any]] = {}
-_prompts_lock = threading.Lock()
-
-
-def _cleanup_expired_prompts():
-    """Remove expired prompts (called under lock)"""
-    now = time.time()
-    expired = [k for k, v in _voice_clone_prompts.items()
-               if now - v.get("_created_at", 0) > _PROMPT_TTL_SECONDS]
-    for k in expired:
-        del _voice_clone_prompts[k]
-
-
+# Voice clone prompt storage (see app.models.prompt_store for backends)
 def store_voice_clone_prompt(prompt_id: str, prompt_data: Dict[str, Any]):
-    """Store a voice clone prompt (with TTL and size limits)"""
-    with _prompts_lock:
-        _cleanup_expired_prompts()
-        # Evict oldest if at capacity
-        while len(_voice_clone_prompts) >= _PROMPT_MAX_SIZE:
-            oldest_key = next(iter(_voice_clone_prompts))
-            del _voice_clone_prompts[oldest_key]
-        prompt_data["_created_at"] = time.time()
-        _voice_clone_prompts[prompt_id] = prompt_data
+    """Store a voice clone prompt"""
+    get_prompt_store().put(prompt_id, prompt_data)
 
 
 def get_voice_clone_prompt(prompt_id: str) -> Optional[Dict[str, Any]]:
-    """Retrieve a voice clone prompt (returns None if expired)"""
-    with _prompts_lock:
-        data = _voice_clone_prompts.get(prompt_id)
-        if data is None:
-            return None
-        if time.time() - data.get("_created_at", 0) > _PROMPT_TTL_SECONDS:
-            del _voice_clone_prompts[prompt_id]
-            return None
-        return data
+    """Retrieve a voice clone prompt (returns None if missing or expired)"""
+    return get_prompt_store().get(prompt_id)
 
 
-def delete_voice_clone_prompt(prompt_id: str):
-    """Delete a voice clone prompt"""
-    with _prompts_lock:
-        if prompt_id in _voice_clone_prompts:
-            del _voice_clone_prompts[prompt_id]
+def delete_voice_clone_prompt(prompt_id: str) -> bool:
+    """Delete a voice clone prompt (returns True if it existed)"""
+    return get_prompt_store().delete(prompt_id)
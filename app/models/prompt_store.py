@@ -0,0 +1,534 @@
+"""
+Storage for reusable voice clone prompts created via /create-prompt
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.utils.serialization import serialize_prompt, deserialize_prompt
+
+logger = logging.getLogger(__name__)
+
+
+def _prompt_info(prompt_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the public description of a stored prompt"""
+    return {
+        "prompt_id": prompt_id,
+        "ref_text": entry["data"].get("ref_text"),
+        "x_vector_only_mode": bool(entry["data"].get("x_vector_only_mode", False)),
+        "created_at": entry["created_at"],
+        "last_used_at": entry["last_used_at"],
+    }
+
+
+class PromptStoreBackend(ABC):
+    """
+    Durable storage behind the in-memory prompt cache
+
+    Implementations must be thread-safe. ``data`` is the prompt dictionary
+    passed to ``PromptStore.put`` (prompt items plus metadata).
+    """
+
+    @abstractmethod
+    def put(self, prompt_id: str, data: Dict[str, Any], created_at: float):
+        """Store a prompt (replacing any prompt with the same ID)"""
+
+    @abstractmethod
+    def get(self, prompt_id: str) -> Optional[Tuple[Dict[str, Any], float, float]]:
+        """Return (data, created_at, last_used_at) or None"""
+
+    @abstractmethod
+    def touch(self, last_used: Dict[str, float]):
+        """Update the last-used times of stored prompts (prompt ID -> timestamp)"""
+
+    @abstractmethod
+    def delete(self, prompt_id: str) -> bool:
+        """Delete a prompt; return True if it existed"""
+
+    @abstractmethod
+    def info(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata of a prompt (without its tensors) or None"""
+
+    @abstractmethod
+    def list(self, limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Return (prompt infos, total count), most recently used first"""
+
+    @abstractmethod
+    def remove_expired(self, cutoff: float) -> int:
+        """Remove prompts not used since cutoff; return the number removed"""
+
+    @abstractmethod
+    def trim(self, max_size: int) -> int:
+        """Remove least recently used prompts beyond max_size; return the number removed"""
+
+    def close(self):
+        """Release the backend's resources"""
+
+
+class SQLitePromptBackend(PromptStoreBackend):
+    """
+    Prompt storage in a local SQLite database
+
+    Prompt items are stored in the compact format from
+    ``app.utils.serialization`` alongside queryable metadata columns.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize backend
+
+        Args:
+            path: Database file path (parent directory is created if missing)
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS voice_prompts (
+                    prompt_id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    ref_text TEXT,
+                    x_vector_only_mode INTEGER NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_voice_prompts_last_used "
+                "ON voice_prompts (last_used_at)"
+            )
+            self._conn.commit()
+
+    def put(self, prompt_id: str, data: Dict[str, Any], created_at: float):
+        blob = serialize_prompt(data, {"prompt_id": prompt_id})
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO voice_prompts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    prompt_id,
+                    blob,
+                    data.get("ref_text"),
+                    int(bool(data.get("x_vector_only_mode", False))),
+                    len(blob),
+                    created_at,
+                    created_at,
+                ),
+            )
+            self._conn.commit()
+
+    def get(self, prompt_id: str) -> Optional[Tuple[Dict[str, Any], float, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, created_at, last_used_at FROM voice_prompts WHERE prompt_id = ?",
+                (prompt_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        data, _ = deserialize_prompt(row[0])
+        return data, row[1], row[2]
+
+    def touch(self, last_used: Dict[str, float]):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE voice_prompts SET last_used_at = ? WHERE prompt_id = ?",
+                [(last_used_at, prompt_id) for prompt_id, last_used_at in last_used.items()],
+            )
+            self._conn.commit()
+
+    def delete(self, prompt_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM voice_prompts WHERE prompt_id = ?", (prompt_id,)
+            )
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    @staticmethod
+    def _row_info(row: Tuple) -> Dict[str, Any]:
+        """Convert a metadata row into a prompt description"""
+        return {
+            "prompt_id": row[0],
+            "ref_text": row[1],
+            "x_vector_only_mode": bool(row[2]),
+            "created_at": row[4],
+            "last_used_at": row[5],
+            "size_bytes": row[3],
+        }
+
+    def info(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT prompt_id, ref_text, x_vector_only_mode, size_bytes, created_at, last_used_at "
+                "FROM voice_prompts WHERE prompt_id = ?",
+                (prompt_id,),
+            ).fetchone()
+        return self._row_info(row) if row is not None else None
+
+    def list(self, limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT prompt_id, ref_text, x_vector_only_mode, size_bytes, created_at, last_used_at "
+                "FROM voice_prompts ORDER BY last_used_at DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+            total = self._conn.execute("SELECT COUNT(*) FROM voice_prompts").fetchone()[0]
+        return [self._row_info(row) for row in rows], total
+
+    def remove_expired(self, cutoff: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM voice_prompts WHERE last_used_at < ?", (cutoff,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def trim(self, max_size: int) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM voice_prompts WHERE prompt_id IN ("
+                "SELECT prompt_id FROM voice_prompts ORDER BY last_used_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (max_size,),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class PromptStore:
+    """
+    Voice clone prompt store with an in-memory LRU front
+
+    Without a backend the memory front is the whole store, bounded by
+    ``memory_size``. With a durable backend every prompt is written through,
+    the front only holds recently used prompts, and ``max_size`` bounds the
+    backend. Prompts expire after ``ttl_seconds`` without being used
+    (0 disables expiry).
+
+    Uses do not write to the backend one by one; their last-used times are
+    written in one batch every ``touch_flush_seconds``, before the backend
+    orders or expires prompts by them (listing, expiry, trimming) and on
+    close.
+    """
+
+    def __init__(
+        self,
+        memory_size: int = 100,
+        ttl_seconds: int = 3600,
+        backend: Optional[PromptStoreBackend] = None,
+        max_size: int = 10000,
+        touch_flush_seconds: float = 30.0,
+    ):
+        """
+        Initialize store
+
+        Args:
+            memory_size: Maximum number of prompts kept in memory
+            ttl_seconds: Idle time after which a prompt expires (0 = never)
+            backend: Optional durable backend
+            max_size: Maximum number of prompts kept in the backend
+            touch_flush_seconds: Longest time last-used times stay unwritten
+        """
+        self.memory_size = max(1, memory_size)
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self.max_size = max_size
+        self.touch_flush_seconds = touch_flush_seconds
+        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Last-used times not yet written to the backend
+        self._pending_touches: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+        self._hits = 0
+        self._backend_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _expired(self, last_used_at: float, now: float) -> bool:
+        """Check whether a prompt has been idle longer than the TTL"""
+        return self.ttl_seconds > 0 and now - last_used_at > self.ttl_seconds
+
+    def _cache_entry(self, prompt_id: str, entry: Dict[str, Any]):
+        """Insert into the memory front, evicting the LRU entry (called under lock)"""
+        self._cache[prompt_id] = entry
+        self._cache.move_to_end(prompt_id)
+        while len(self._cache) > self.memory_size:
+            oldest_key, _ = self._cache.popitem(last=False)
+            self._evictions += 1
+            logger.debug(f"Evicted prompt from memory: {oldest_key}")
+
+    def flush(self, force: bool = True):
+        """
+        Write pending last-used times to the backend in one batch
+
+        Args:
+            force: Write now, even if touch_flush_seconds have not passed
+        """
+        if self.backend is None:
+            return
+        with self._lock:
+            if not self._pending_touches:
+                return
+            if not force and time.monotonic() - self._last_flush < self.touch_flush_seconds:
+                return
+            pending, self._pending_touches = self._pending_touches, {}
+            self._last_flush = time.monotonic()
+        self.backend.touch(pending)
+
+    def close(self):
+        """Write pending last-used times and close the backend"""
+        if self.backend is not None:
+            self.flush()
+            self.backend.close()
+
+    def put(self, prompt_id: str, data: Dict[str, Any]):
+        """
+        Store a voice clone prompt
+
+        Args:
+            prompt_id: Prompt identifier
+            data: Prompt dictionary (prompt_items, ref_text, x_vector_only_mode)
+        """
+        now = time.time()
+        if self.backend is not None:
+            self.backend.put(prompt_id, data, now)
+            if self.max_size > 0:
+                # Trimming picks the least recently used prompts
+                self.flush()
+                self.backend.trim(self.max_size)
+
+        with self._lock:
+            self._pending_touches.pop(prompt_id, None)
+            self._cache_entry(prompt_id, {"data": data, "created_at": now, "last_used_at": now})
+
+    def get(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a voice clone prompt, refreshing its last-used time
+
+        Args:
+            prompt_id: Prompt identifier
+
+        Returns:
+            Prompt dictionary or None if not found or expired
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(prompt_id)
+            if entry is not None:
+                if self._expired(entry["last_used_at"], now):
+                    del self._cache[prompt_id]
+                    entry = None
+                else:
+                    entry["last_used_at"] = now
+                    self._cache.move_to_end(prompt_id)
+                    self._hits += 1
+                    if self.backend is not None:
+                        self._pending_touches[prompt_id] = now
+
+        if entry is not None:
+            self.flush(force=False)
+            return entry["data"]
+
+        if self.backend is not None:
+            stored = self.backend.get(prompt_id)
+            if stored is not None:
+                data, created_at, last_used_at = stored
+                # The prompt may have been evicted with its last use unwritten
+                with self._lock:
+                    last_used_at = max(last_used_at, self._pending_touches.get(prompt_id, 0.0))
+                if self._expired(last_used_at, now):
+                    self.backend.delete(prompt_id)
+                else:
+                    with self._lock:
+                        self._backend_hits += 1
+                        self._pending_touches[prompt_id] = now
+                        self._cache_entry(
+                            prompt_id,
+                            {"data": data, "created_at": created_at, "last_used_at": now},
+                        )
+                    self.flush(force=False)
+                    return data
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def delete(self, prompt_id: str) -> bool:
+        """
+        Delete a voice clone prompt
+
+        Args:
+            prompt_id: Prompt identifier
+
+        Returns:
+            True if the prompt existed
+        """
+        with self._lock:
+            existed = self._cache.pop(prompt_id, None) is not None
+            self._pending_touches.pop(prompt_id, None)
+        if self.backend is not None:
+            existed = self.backend.delete(prompt_id) or existed
+        return existed
+
+    def info(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Describe a stored prompt without loading its tensors
+
+        Args:
+            prompt_id: Prompt identifier
+
+        Returns:
+            Prompt metadata or None if not found or expired
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(prompt_id)
+            in_memory = entry is not None
+            info = _prompt_info(prompt_id, entry) if in_memory else None
+
+        if self.backend is not None:
+            stored = self.backend.info(prompt_id)
+            if stored is not None:
+                with self._lock:
+                    pending = self._pending_touches.get(prompt_id, 0.0)
+                info = {**stored, "last_used_at": max(stored["last_used_at"], pending)}
+
+        if info is None or self._expired(info["last_used_at"], now):
+            return None
+        return {**info, "in_memory": in_memory}
+
+    def list(self, limit: int = 100, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        List stored prompts, most recently used first
+
+        Args:
+            limit: Maximum number of prompts to return
+            offset: Number of prompts to skip
+
+        Returns:
+            Tuple of (prompt metadata list, total count)
+        """
+        self.remove_expired()
+
+        if self.backend is not None:
+            self.flush()
+            infos, total = self.backend.list(limit, offset)
+            with self._lock:
+                for info in infos:
+                    info["in_memory"] = info["prompt_id"] in self._cache
+            return infos, total
+
+        with self._lock:
+            entries = list(reversed(self._cache.items()))
+            infos = [
+                {**_prompt_info(prompt_id, entry), "in_memory": True}
+                for prompt_id, entry in entries[offset:offset + limit]
+            ]
+            return infos, len(entries)
+
+    def remove_expired(self) -> int:
+        """
+        Remove prompts idle for longer than the TTL
+
+        Returns:
+            Number of prompts removed from the backend (or memory if no backend)
+        """
+        if self.ttl_seconds <= 0:
+            return 0
+
+        now = time.time()
+        with self._lock:
+            expired = [
+                prompt_id for prompt_id, entry in self._cache.items()
+                if self._expired(entry["last_used_at"], now)
+            ]
+            for prompt_id in expired:
+                del self._cache[prompt_id]
+
+        if self.backend is not None:
+            self.flush()
+            return self.backend.remove_expired(now - self.ttl_seconds)
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics
+
+        Returns:
+            Dictionary with store stats
+        """
+        total = self.backend.list(0, 0)[1] if self.backend is not None else None
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__ if self.backend is not None else "memory",
+                "memory_size": len(self._cache),
+                "max_memory_size": self.memory_size,
+                "stored": total if total is not None else len(self._cache),
+                "max_size": self.max_size if self.backend is not None else self.memory_size,
+                "ttl_seconds": self.ttl_seconds,
+                "memory_hits": self._hits,
+                "backend_hits": self._backend_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "pending_touches": len(self._pending_touches),
+            }
+
+
+# Global prompt store instance
+_prompt_store: Optional[PromptStore] = None
+_store_lock = threading.Lock()
+
+
+def get_prompt_store() -> PromptStore:
+    """Get or create global prompt store instance"""
+    global _prompt_store
+
+    if _prompt_store is None:
+        with _store_lock:
+            if _prompt_store is None:
+                from app.config import settings
+                backend = None
+                if settings.prompt_store_backend == "sqlite":
+                    backend = SQLitePromptBackend(settings.prompt_store_path)
+                elif settings.prompt_store_backend != "memory":
+                    raise ValueError(
+                        f"Unknown prompt store backend: {settings.prompt_store_backend}"
+                    )
+                _prompt_store = PromptStore(
+                    memory_size=settings.prompt_store_memory_size,
+                    ttl_seconds=settings.prompt_store_ttl_seconds,
+                    backend=backend,
+                    max_size=settings.prompt_store_max_size,
+                )
+                logger.info(
+                    f"Initialized prompt store: backend={settings.prompt_store_backend}, "
+                    f"memory_size={settings.prompt_store_memory_size}, "
+                    f"ttl={settings.prompt_store_ttl_seconds}s"
+                )
+
+    return _prompt_store
+
+
+def shutdown_prompt_store():
+    """Write pending state and close the global prompt store if it was created"""
+    global _prompt_store
+    with _store_lock:
+        store, _prompt_store = _prompt_store, None
+    if store is not None:
+        store.close()
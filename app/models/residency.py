@@ -0,0 +1,323 @@
+"""
+Memory-budgeted model residency
+
+Each model type is a separate ~1.7B parameter model. With a fixed memory
+budget not all of them fit at once, so loading one may first require
+unloading another. ModelResidency does the bookkeeping: it tracks the
+parameter bytes of every resident model, reserves room for loads in
+progress, counts requests using each model and picks the least recently
+used models to evict. Victims are drained (new requests wait, in-flight
+requests finish) before the manager frees them.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parameter_bytes(model: Any) -> Optional[int]:
+    """
+    Measure the parameter memory of a loaded model
+
+    Args:
+        model: Model object (a torch module, or a wrapper holding one in .model)
+
+    Returns:
+        Total bytes of all parameters, or None if they cannot be enumerated
+    """
+    for module in (model, getattr(model, "model", None)):
+        parameters = getattr(module, "parameters", None)
+        if not callable(parameters):
+            continue
+        try:
+            return sum(p.numel() * p.element_size() for p in parameters())
+        except Exception:
+            continue
+    return None
+
+
+class ModelResidency:
+    """
+    Thread-safe residency accounting for the model manager
+    """
+
+    def __init__(self, model_types: List[str], budget_bytes: int = 0, default_size_bytes: int = 0):
+        """
+        Initialize residency accounting
+
+        Args:
+            model_types: Model types that can be loaded
+            budget_bytes: Total parameter bytes allowed to be resident (0 = unlimited)
+            default_size_bytes: Size assumed for a model type never loaded before
+        """
+        self.budget_bytes = max(0, budget_bytes)
+        self.default_size_bytes = max(0, default_size_bytes)
+        self._cond = threading.Condition()
+        self._models: Dict[str, Dict[str, Any]] = {
+            model_type: {
+                "resident": False,
+                "size_bytes": None,
+                "reserved_bytes": 0,
+                "retired_bytes": 0,
+                "in_flight": 0,
+                "draining": False,
+                "last_used_at": None,
+                "loaded_at": None,
+                "loads": 0,
+                "last_load_seconds": None,
+                "total_load_seconds": 0.0,
+                "evictions": 0,
+                "unloads": 0,
+                "requests": 0,
+                "cold_start_requests": 0,
+                "prewarmed": False,
+                "cold_starts_avoided": 0,
+            }
+            for model_type in model_types
+        }
+        self._evictions = 0
+
+    def begin_use(self, model_type: str):
+        """
+        Count a request using a model
+
+        Waits while the model is being drained for eviction, so that a model
+        under eviction is not picked up by new requests.
+        """
+        with self._cond:
+            state = self._models[model_type]
+            while state["draining"]:
+                self._cond.wait()
+            state["in_flight"] += 1
+            state["last_used_at"] = time.time()
+            state["requests"] += 1
+            if not state["resident"]:
+                state["cold_start_requests"] += 1
+            elif state["prewarmed"]:
+                # First request served by a model loaded ahead of demand
+                state["prewarmed"] = False
+                state["cold_starts_avoided"] += 1
+
+    def end_use(self, model_type: str):
+        """Count a request as done with a model"""
+        with self._cond:
+            state = self._models[model_type]
+            state["in_flight"] -= 1
+            state["last_used_at"] = time.time()
+            self._cond.notify_all()
+
+    def in_flight(self, model_type: str) -> int:
+        """Get the number of requests using a model"""
+        with self._cond:
+            return self._models[model_type]["in_flight"]
+
+    def idle_since(self, model_type: str) -> Optional[float]:
+        """
+        Get when a resident model was last used, if nothing is using it
+
+        Returns:
+            Timestamp of the last use (or of the load), or None if the model
+            is not resident or has requests in flight
+        """
+        with self._cond:
+            state = self._models[model_type]
+            if not state["resident"] or state["in_flight"] or state["draining"]:
+                return None
+            return state["last_used_at"]
+
+    def mark_prewarmed(self, model_type: str):
+        """Mark a resident model as loaded ahead of demand (by the pre-warm schedule)"""
+        with self._cond:
+            state = self._models[model_type]
+            if state["resident"]:
+                state["prewarmed"] = True
+
+    def expected_bytes(self, model_type: str) -> int:
+        """Get the size a model type is expected to occupy once loaded"""
+        with self._cond:
+            known = [state["size_bytes"] for state in self._models.values() if state["size_bytes"]]
+            size = self._models[model_type]["size_bytes"]
+            return size or (max(known) if known else self.default_size_bytes)
+
+    def _used_bytes(self) -> int:
+        """Resident, reserved and retired bytes (caller holds the lock)"""
+        return sum(
+            ((state["size_bytes"] or 0) if state["resident"] else 0)
+            + state["reserved_bytes"]
+            + state["retired_bytes"]
+            for state in self._models.values()
+        )
+
+    def used_bytes(self) -> int:
+        """Get the bytes occupied by resident models, loads in progress and replaced models not yet freed"""
+        with self._cond:
+            return self._used_bytes()
+
+    def eviction_candidates(self, model_type: str, needed_bytes: int) -> List[str]:
+        """
+        Pick the models to evict so that a load fits within the budget
+
+        Idle models are chosen before busy ones, least recently used first.
+
+        Args:
+            model_type: Model type about to be loaded (never a candidate)
+            needed_bytes: Bytes the load will occupy
+
+        Returns:
+            Model types to evict, in order (may not free enough if the
+            budget is smaller than the model)
+        """
+        if not self.budget_bytes:
+            return []
+        with self._cond:
+            excess = self._used_bytes() + needed_bytes - self.budget_bytes
+            if excess <= 0:
+                return []
+            resident = [
+                (name, state) for name, state in self._models.items()
+                if state["resident"] and name != model_type
+            ]
+            resident.sort(key=lambda item: (item[1]["in_flight"] > 0, item[1]["last_used_at"] or 0.0))
+            victims = []
+            for name, state in resident:
+                if excess <= 0:
+                    break
+                victims.append(name)
+                excess -= state["size_bytes"] or 0
+            return victims
+
+    def drain(self, model_type: str, timeout: Optional[float] = None) -> bool:
+        """
+        Stop new requests from using a model and wait for in-flight ones
+
+        Call end_drain() afterwards, whether or not the model was unloaded.
+
+        Args:
+            model_type: Model type to drain
+            timeout: Maximum seconds to wait (None = no limit)
+
+        Returns:
+            True if no requests are using the model, False on timeout
+        """
+        with self._cond:
+            state = self._models[model_type]
+            state["draining"] = True
+            return self._cond.wait_for(lambda: state["in_flight"] == 0, timeout=timeout)
+
+    def end_drain(self, model_type: str):
+        """Let requests use a model type again"""
+        with self._cond:
+            self._models[model_type]["draining"] = False
+            self._cond.notify_all()
+
+    def reserve(self, model_type: str, size_bytes: int):
+        """Hold room for a model that is being loaded"""
+        with self._cond:
+            self._models[model_type]["reserved_bytes"] = size_bytes
+
+    def release_reservation(self, model_type: str):
+        """Drop the reservation of a load that failed"""
+        with self._cond:
+            self._models[model_type]["reserved_bytes"] = 0
+
+    def retire(self, model_type: str):
+        """
+        Keep the bytes of a resident model charged after a new version replaces it
+
+        The replaced model stays in memory until the requests using it
+        finish; call release_retired() once it is freed.
+        """
+        with self._cond:
+            state = self._models[model_type]
+            if state["resident"]:
+                state["retired_bytes"] += state["size_bytes"] or 0
+
+    def release_retired(self, model_type: str):
+        """Stop charging the bytes of replaced models that have been freed"""
+        with self._cond:
+            self._models[model_type]["retired_bytes"] = 0
+
+    def record_load(self, model_type: str, size_bytes: Optional[int], load_seconds: float):
+        """
+        Record a completed load
+
+        Args:
+            model_type: Model type loaded
+            size_bytes: Measured parameter bytes (None keeps the expected size)
+            load_seconds: Time the load took
+        """
+        with self._cond:
+            state = self._models[model_type]
+            state["size_bytes"] = size_bytes or state["reserved_bytes"] or state["size_bytes"]
+            state["reserved_bytes"] = 0
+            state["resident"] = True
+            state["prewarmed"] = False
+            state["loaded_at"] = time.time()
+            state["last_used_at"] = state["loaded_at"]
+            state["loads"] += 1
+            state["last_load_seconds"] = load_seconds
+            state["total_load_seconds"] += load_seconds
+            over = self.budget_bytes and self._used_bytes() > self.budget_bytes
+        if over:
+            logger.warning(
+                f"Resident models exceed the memory budget after loading {model_type}: "
+                f"{self.used_bytes() / 2**30:.2f} GiB of {self.budget_bytes / 2**30:.2f} GiB"
+            )
+
+    def record_unload(self, model_type: str, evicted: bool = False):
+        """
+        Record that a model was freed
+
+        Args:
+            model_type: Model type unloaded
+            evicted: True if it was unloaded to make room for another model
+        """
+        with self._cond:
+            state = self._models[model_type]
+            state["resident"] = False
+            state["prewarmed"] = False
+            state["loaded_at"] = None
+            if evicted:
+                state["evictions"] += 1
+                self._evictions += 1
+            else:
+                state["unloads"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get residency statistics
+
+        Returns:
+            Dictionary with the budget, bytes in use, evictions and per-model
+            residency, size, in-flight requests and load times
+        """
+        with self._cond:
+            models = {}
+            for name, state in self._models.items():
+                loads = state["loads"]
+                models[name] = {
+                    "resident": state["resident"],
+                    "loading": state["reserved_bytes"] > 0,
+                    "size_bytes": state["size_bytes"],
+                    "retired_bytes": state["retired_bytes"],
+                    "in_flight": state["in_flight"],
+                    "draining": state["draining"],
+                    "last_used_at": state["last_used_at"],
+                    "loaded_at": state["loaded_at"],
+                    "loads": loads,
+                    "last_load_seconds": round(state["last_load_seconds"], 3) if loads else None,
+                    "avg_load_seconds": round(state["total_load_seconds"] / loads, 3) if loads else None,
+                    "evictions": state["evictions"],
+                    "unloads": state["unloads"],
+                    "requests": state["requests"],
+                    "cold_start_requests": state["cold_start_requests"],
+                    "cold_starts_avoided": state["cold_starts_avoided"],
+                }
+            return {
+                "budget_bytes": self.budget_bytes or None,
+                "used_bytes": self._used_bytes(),
+                "evictions": self._evictions,
+                "models": models,
+            }
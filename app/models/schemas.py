@@ -1,9 +1,12 @@
 """
 Pydantic models for request and response schemas
 """
-from typing import List, Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 from pydantic import BaseModel, Field
 
+# Output audio codecs (see app.utils.codecs)
+AudioFormat = Literal["wav", "flac", "opus", "mp3"]
+
 
 class ErrorResponse(BaseModel):
     """Error response model"""
@@ -29,9 +32,13 @@ class CustomVoiceRequest(BaseModel):
         le=2.0,
         description="Speech speed multiplier (0.5-2.0, default 1.0)"
     )
-    response_format: Literal["wav", "base64"] = Field(
+    response_format: Literal["wav", "flac", "opus", "mp3", "base64"] = Field(
+        default="wav",
+        description="Response format: 'wav', 'flac', 'opus' (Ogg) or 'mp3' for audio file download, 'base64' for base64 encoded JSON"
+    )
+    audio_format: AudioFormat = Field(
         default="wav",
-        description="Response format: 'wav' for audio file download, 'base64' for base64 encoded JSON"
+        description="Codec of base64 encoded audio: 'wav', 'flac', 'opus' (Ogg) or 'mp3'"
     )
 
 
@@ -46,7 +53,11 @@ class CustomVoiceBatchRequest(BaseModel):
     )
     response_format: Literal["wav", "base64", "zip"] = Field(
         default="zip",
-        description="Response format: 'zip' for multiple files, 'base64' for JSON array"
+        description="Response format: 'zip' (or 'wav') for a streamed archive of audio files, 'base64' for JSON array"
+    )
+    audio_format: AudioFormat = Field(
+        default="wav",
+        description="Codec of each generated audio: 'wav', 'flac', 'opus' (Ogg) or 'mp3'"
     )
 
 
@@ -68,9 +79,13 @@ class VoiceDesignRequest(BaseModel):
         le=2.0,
         description="Speech speed multiplier (0.5-2.0, default 1.0)"
     )
-    response_format: Literal["wav", "base64"] = Field(
+    response_format: Literal["wav", "flac", "opus", "mp3", "base64"] = Field(
+        default="wav",
+        description="Response format: 'wav', 'flac', 'opus' (Ogg) or 'mp3' for audio file download, 'base64' for base64 encoded JSON"
+    )
+    audio_format: AudioFormat = Field(
         default="wav",
-        description="Response format: 'wav' for audio file download, 'base64' for base64 encoded JSON"
+        description="Codec of base64 encoded audio: 'wav', 'flac', 'opus' (Ogg) or 'mp3'"
     )
 
 
@@ -81,7 +96,11 @@ class VoiceDesignBatchRequest(BaseModel):
     instructs: List[str] = Field(..., description="List of voice design instructions matching texts")
     response_format: Literal["wav", "base64", "zip"] = Field(
         default="zip",
-        description="Response format: 'zip' for multiple files, 'base64' for JSON array"
+        description="Response format: 'zip' (or 'wav') for a streamed archive of audio files, 'base64' for JSON array"
+    )
+    audio_format: AudioFormat = Field(
+        default="wav",
+        description="Codec of each generated audio: 'wav', 'flac', 'opus' (Ogg) or 'mp3'"
     )
 
 
@@ -114,9 +133,13 @@ class VoiceCloneRequest(BaseModel):
         le=2.0,
         description="Speech speed multiplier (0.5-2.0, default 1.0)"
     )
-    response_format: Literal["wav", "base64"] = Field(
+    response_format: Literal["wav", "flac", "opus", "mp3", "base64"] = Field(
         default="wav",
-        description="Response format: 'wav' for audio file download, 'base64' for base64 encoded JSON"
+        description="Response format: 'wav', 'flac', 'opus' (Ogg) or 'mp3' for audio file download, 'base64' for base64 encoded JSON"
+    )
+    audio_format: AudioFormat = Field(
+        default="wav",
+        description="Codec of base64 encoded audio: 'wav', 'flac', 'opus' (Ogg) or 'mp3'"
     )
 
 
@@ -146,6 +169,23 @@ class CreatePromptResponse(BaseModel):
     message: str = Field(default="Prompt created successfully")
 
 
+class PromptInfo(BaseModel):
+    """Metadata of a stored voice clone prompt"""
+    prompt_id: str = Field(..., description="Prompt identifier")
+    ref_text: Optional[str] = Field(default=None, description="Reference transcript used to create the prompt")
+    x_vector_only_mode: bool = Field(..., description="Whether the prompt only uses the speaker embedding")
+    created_at: float = Field(..., description="Creation time (Unix timestamp)")
+    last_used_at: float = Field(..., description="Last use time (Unix timestamp)")
+    size_bytes: Optional[int] = Field(default=None, description="Stored size (durable backends only)")
+    in_memory: bool = Field(..., description="Whether the prompt is currently held in memory")
+
+
+class PromptListResponse(BaseModel):
+    """Response schema for listing stored prompts"""
+    prompts: List[PromptInfo] = Field(..., description="Stored prompts, most recently used first")
+    total: int = Field(..., description="Total number of stored prompts")
+
+
 class GenerateWithPromptRequest(BaseModel):
     """Request schema for generating with saved prompt"""
     text: str = Field(..., description="Text to synthesize", min_length=1)
@@ -154,9 +194,13 @@ class GenerateWithPromptRequest(BaseModel):
         description="Language code (Chinese, English, Japanese, Korean, German, French, Russian, Portuguese, Spanish, Italian, or Auto)"
     )
     prompt_id: str = Field(..., description="ID of the saved voice clone prompt")
-    response_format: Literal["wav", "base64"] = Field(
+    response_format: Literal["wav", "flac", "opus", "mp3", "base64"] = Field(
         default="wav",
-        description="Response format: 'wav' for audio file download, 'base64' for base64 encoded JSON"
+        description="Response format: 'wav', 'flac', 'opus' (Ogg) or 'mp3' for audio file download, 'base64' for base64 encoded JSON"
+    )
+    audio_format: AudioFormat = Field(
+        default="wav",
+        description="Codec of base64 encoded audio: 'wav', 'flac', 'opus' (Ogg) or 'mp3'"
     )
 
 
@@ -174,6 +218,93 @@ class BatchAudioResponse(BaseModel):
     format: str = Field(default="wav", description="Audio format")
 
 
+class JobSubmitRequest(BaseModel):
+    """Request schema for submitting an asynchronous job"""
+    type: str = Field(
+        ...,
+        description="Job type: 'custom_voice_batch', 'voice_design_batch', 'custom_voice_longform', "
+                    "'voice_design_longform' or 'voice_clone_longform'"
+    )
+    request: Dict[str, Any] = Field(
+        ...,
+        description="Request body of the matching endpoint (/custom-voice/batch, /custom-voice/generate-longform, "
+                    "/voice-design/batch, /voice-design/generate-longform or /base/clone-longform)"
+    )
+    callback_url: Optional[str] = Field(
+        default=None,
+        description="URL the finished job is POSTed to (hosts limited by JOB_CALLBACK_ALLOWED_HOSTS)"
+    )
+
+
+class JobItem(BaseModel):
+    """A result file of a job"""
+    index: int = Field(..., description="Item index (batch position; 0 for long-form)")
+    filename: str = Field(..., description="File name")
+    url: str = Field(..., description="Download path")
+    format: str = Field(..., description="Audio codec")
+    sample_rate: int = Field(..., description="Sample rate of the generated audio in Hz")
+    duration: float = Field(..., description="Audio duration in seconds")
+    size_bytes: int = Field(..., description="File size in bytes")
+
+
+class JobInfo(BaseModel):
+    """Status, progress and results of a job"""
+    job_id: str
+    type: str
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    completed: int = Field(..., description="Items (batch) or segments (long-form) rendered")
+    total: int = Field(..., description="Items or segments to render (0 until the job starts)")
+    progress: float = Field(..., description="Fraction rendered (0-1)")
+    queue_position: Optional[int] = Field(default=None, description="Queued jobs ahead of this one")
+    items: List[JobItem] = Field(default_factory=list, description="Result files written so far")
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = Field(default=None, description="When the results are removed")
+    callback_url: Optional[str] = None
+    callback: Optional[Dict[str, Any]] = Field(default=None, description="Completion callback delivery result")
+
+
+class JobListResponse(BaseModel):
+    """Response schema for listing jobs"""
+    jobs: List[JobInfo]
+    total: int
+
+
+class ModelReloadRequest(BaseModel):
+    """Request schema for hot-reloading a model"""
+    model_path: Optional[str] = Field(
+        default=None,
+        description="Path or HuggingFace ID of the new version (defaults to the current one)"
+    )
+
+
+class ModelReloadStatus(BaseModel):
+    """Progress of a model hot reload"""
+    state: Literal["loading", "warming", "draining", "completed", "failed"]
+    model_path: str = Field(..., description="Path or HuggingFace ID being loaded")
+    previous_version: str = Field(..., description="Version tag before the reload")
+    version: Optional[str] = Field(default=None, description="Version tag after the reload")
+    error: Optional[str] = None
+    started_at: float
+    finished_at: Optional[float] = None
+
+
+class ModelVersionInfo(BaseModel):
+    """Version of a model type"""
+    model_path: str = Field(..., description="Path or HuggingFace ID in use")
+    version: str = Field(..., description="Version tag used in cache keys")
+    reloads: int = Field(..., description="Number of hot reloads")
+    loaded: bool
+    reload: Optional[ModelReloadStatus] = Field(default=None, description="Latest reload")
+
+
+class ModelVersionsResponse(BaseModel):
+    """Response schema for listing model versions"""
+    models: Dict[str, ModelVersionInfo]
+
+
 class SpeakerInfo(BaseModel):
     """Information about a speaker"""
     name: str = Field(..., description="Speaker identifier")
@@ -197,9 +328,42 @@ class HealthResponse(BaseModel):
     version: str
 
 
+class StartupReportResponse(BaseModel):
+    """Model preloading report"""
+    preload_enabled: bool
+    complete: bool = Field(description="Whether preloading has finished")
+    started_at: Optional[float] = None
+    concurrency: Optional[int] = Field(default=None, description="Models loaded at the same time")
+    total_seconds: Optional[float] = Field(default=None, description="Time until every model was ready")
+    sequential_seconds: Optional[float] = Field(
+        default=None,
+        description="Sum of all load and warmup times (startup time without concurrent loading)"
+    )
+    models: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Status, load, warmup and ready-after seconds per model type"
+    )
+
+
 class ModelsHealthResponse(BaseModel):
     """Models health check response"""
     custom_voice_loaded: bool
     voice_design_loaded: bool
     base_loaded: bool
     tokenizer_loaded: bool
+    inference: Optional[Dict[str, Dict[str, Any]]] = Field(
+        default=None,
+        description="Inference pool statistics per model type"
+    )
+    residency: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Memory budget, per-model residency, evictions and load times"
+    )
+    loading: Optional[Dict[str, Dict[str, Any]]] = Field(
+        default=None,
+        description="Background load state (unloaded/loading/warming/ready/failed) and load/warmup timings per model type"
+    )
+    lifecycle: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Idle timeouts, pre-warm schedule, idle unloads and cold starts avoided"
+    )
@@ -0,0 +1,71 @@
+"""
+Model warmup
+
+The first generation on a freshly loaded model is much slower than the ones
+after it (kernel compilation, allocator growth, lazy initialization), so a
+short test generation is run as part of each load, before the model serves
+requests.
+"""
+import logging
+import numpy as np
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_model(model_type: str, model):
+    """
+    Warm up a freshly loaded model with a test generation
+
+    Runs on the thread loading the model.
+
+    Args:
+        model_type: Model type to warm up (custom_voice, voice_design, base)
+        model: Loaded model instance
+    """
+    if model_type == "custom_voice":
+        logger.info("Warming up CustomVoice model...")
+        model.generate_custom_voice(
+            text=settings.warmup_text,
+            language="Auto",
+            speaker="Ryan",
+            instruct="",
+        )
+        logger.info("CustomVoice model warmed up")
+
+    elif model_type == "voice_design":
+        logger.info("Warming up VoiceDesign model...")
+        model.generate_voice_design(
+            text=settings.warmup_text,
+            language="Auto",
+            instruct="A clear professional voice",
+        )
+        logger.info("VoiceDesign model warmed up")
+
+    elif model_type == "base":
+        # Requires creating a dummy voice prompt
+        logger.info("Warming up Base model...")
+        # Create a simple sine wave as dummy reference audio
+        duration = 1.0  # 1 second
+        sample_rate = 24000
+        frequency = 440.0  # A4 note
+        t = np.linspace(0, duration, int(sample_rate * duration))
+        dummy_audio = np.sin(2 * np.pi * frequency * t).astype(np.float32)
+
+        # Create dummy voice prompt
+        dummy_prompt = model.create_voice_clone_prompt(
+            ref_audio=(dummy_audio, sample_rate),
+            ref_text=settings.warmup_text,
+            x_vector_only_mode=False,
+        )
+
+        # Generate with dummy prompt
+        model.generate_voice_clone(
+            text=settings.warmup_text,
+            language="Auto",
+            voice_clone_prompt=dummy_prompt,
+        )
+        logger.info("Base model warmed up")
+
+    else:
+        raise ValueError(f"Invalid model type: {model_type}")
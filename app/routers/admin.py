@@ -0,0 +1,55 @@
+"""
+Admin API endpoints
+"""
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+from app.auth import verify_admin_api_key
+from app.models.manager import model_manager
+from app.models.schemas import ModelReloadRequest, ModelReloadStatus, ModelVersionsResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+MODEL_TYPES = ("custom_voice", "voice_design", "base")
+
+
+@router.get("/models", response_model=ModelVersionsResponse)
+async def list_model_versions(api_key: str = Depends(verify_admin_api_key)):
+    """
+    List the model path and version of every model type
+
+    Includes the status of the latest hot reload of each
+    """
+    return ModelVersionsResponse(models=model_manager.get_model_versions())
+
+
+@router.post("/models/{model_type}/reload", response_model=ModelReloadStatus, status_code=202)
+async def reload_model(
+    model_type: str,
+    request: ModelReloadRequest,
+    api_key: str = Depends(verify_admin_api_key)
+):
+    """
+    Hot-reload a model, optionally switching to another path or HuggingFace ID
+
+    Returns at once. The new version is loaded and warmed up alongside the
+    current one, which keeps serving requests, and replaces it once the
+    warmup passes; the old model is freed after its in-flight requests
+    finish. Cached output is tagged with the model version, so entries
+    generated by the old version are not served. Poll GET /api/v1/admin/models
+    for progress
+    """
+    if model_type not in MODEL_TYPES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown model type: {model_type}. Expected one of: {', '.join(MODEL_TYPES)}"
+        )
+
+    try:
+        status = model_manager.reload_model(model_type, request.model_path)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    logger.info(f"Hot reload of {model_type} model started: {status['model_path']}")
+    return ModelReloadStatus(**status)
@@ -1,13 +1,15 @@
 """
 Base model API endpoints for voice cloning
 """
-import json
+import asyncio
+import hashlib
 import logging
 import uuid
 import time
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, Form
-from sse_starlette.sse import EventSourceResponse
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, WebSocket
 from app.auth import verify_api_key
 from app.config import settings
 from app.models.schemas import (
@@ -15,28 +17,457 @@ from app.models.schemas import (
     CreatePromptRequest,
     CreatePromptResponse,
     GenerateWithPromptRequest,
-    AudioResponse,
+    PromptInfo,
+    PromptListResponse,
 )
 from app.models.manager import (
     model_manager,
     store_voice_clone_prompt,
     get_voice_clone_prompt,
+    delete_voice_clone_prompt,
 )
+from app.models.prompt_store import get_prompt_store
+from app.models.jobs import Job, register_job_type, run_longform_job
+from app.models.batching import MicroBatcher
 from app.utils.audio import (
-    numpy_to_wav_bytes,
-    numpy_to_base64,
     prepare_ref_audio,
+    load_reference_audio,
     apply_speed,
 )
-from app.utils.streaming import stream_audio_base64_chunks, create_sse_message
-from app.utils.caching import get_voice_cache
+from app.utils.codecs import encode_audio, resolve_audio_format
+from app.utils.dsp_pool import run_dsp
+from app.utils.streaming import open_segment_stream, segment_stream_response
+from app.utils.duplex import parse_start_config, serve_tts_websocket
+from app.utils.longform import (
+    RenderBatch,
+    adjust_speed,
+    create_longform_render,
+    open_longform_render,
+    prepare_document,
+    segment_key_factory,
+)
+from app.utils.caching import (
+    OutputAudioCache,
+    audio_content_key,
+    get_output_cache,
+    get_reference_cache,
+    get_voice_cache,
+)
+from app.utils.coalescing import coalesce_request, get_request_coalescing_stats
 from app.utils.metrics import PerformanceTracker
+from app.utils.responses import build_audio_response, get_cached_audio_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/base", tags=["base"])
 
 
+def _is_batchable_prompt(params: Dict[str, Any]) -> bool:
+    """Check whether a request's voice prompt can be merged into a batch"""
+    prompt = params["voice_clone_prompt"]
+    return isinstance(prompt, (list, tuple)) and len(prompt) == 1
+
+
+def _merge_voice_clone_params(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build batched generate_voice_clone kwargs from per-request kwargs
+    
+    Each request carries a single-item prompt list (possibly a different
+    voice); the batched call takes one prompt item per text.
+    """
+    return {
+        "text": [item["text"] for item in items],
+        "language": [item["language"] for item in items],
+        "voice_clone_prompt": [item["voice_clone_prompt"][0] for item in items],
+    }
+
+
+# Micro-batcher for voice clone generation (created on first use)
+_batcher: Optional[MicroBatcher] = None
+
+
+def get_batcher() -> MicroBatcher:
+    """Get or create the Base model micro-batcher"""
+    global _batcher
+    
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            "base",
+            partial(model_manager.run_inference, "base", "generate_voice_clone"),
+            max_batch_size=settings.base_max_batch_size,
+            max_wait_ms=settings.base_batch_wait_ms,
+            max_concurrent_batches=settings.get_max_concurrency("base"),
+            build_kwargs=_merge_voice_clone_params,
+            batchable=_is_batchable_prompt,
+        )
+    
+    return _batcher
+
+
+async def _synthesize(
+    text: str,
+    language: str,
+    voice_prompt: Any,
+    tracker: Optional[PerformanceTracker] = None,
+) -> Tuple[np.ndarray, int]:
+    """
+    Generate cloned speech, batched with concurrent requests when enabled
+    
+    Args:
+        text: Text to synthesize
+        language: Language code
+        voice_prompt: Voice clone prompt items
+        tracker: Optional performance tracker for queue wait
+        
+    Returns:
+        Tuple of (audio_data, sample_rate)
+    """
+    params = {
+        "text": text,
+        "language": language,
+        "voice_clone_prompt": voice_prompt,
+    }
+    
+    if settings.base_batching_enabled:
+        return await get_batcher().submit(params, tracker=tracker)
+    
+    wavs, sr = await model_manager.run_inference(
+        "base",
+        "generate_voice_clone",
+        tracker=tracker,
+        **params
+    )
+    return wavs[0], sr
+
+
+async def _get_voice_prompt(
+    request: VoiceCloneRequest,
+    audio_data,
+    sample_rate: int,
+    tracker: PerformanceTracker,
+    audio_key: Optional[str] = None,
+):
+    """
+    Get the voice clone prompt for a request, using the prompt cache when enabled
+    
+    Args:
+        request: Voice clone request
+        audio_data: Preprocessed reference audio
+        sample_rate: Reference audio sample rate
+        tracker: Performance tracker for cache status and queue wait
+        audio_key: Precomputed content key of audio_data, if known
+        
+    Returns:
+        Voice clone prompt items
+    """
+    async def create():
+        return await model_manager.run_inference(
+            "base",
+            "create_voice_clone_prompt",
+            tracker=tracker,
+            ref_audio=(audio_data, sample_rate),
+            ref_text=request.ref_text if not request.x_vector_only_mode else None,
+            x_vector_only_mode=request.x_vector_only_mode,
+        )
+    
+    # Use the cache if enabled; concurrent misses on the same reference
+    # share a single extraction
+    if settings.voice_cache_enabled:
+        cache = get_voice_cache()
+        voice_prompt, cache_status = await cache.get_or_create(
+            audio_data,
+            sample_rate,
+            request.ref_text,
+            request.x_vector_only_mode,
+            create,
+            audio_key=audio_key,
+            model_version=model_manager.get_model_version("base"),
+        )
+        tracker.set_cache_status(cache_status)
+        logger.debug(f"Voice prompt cache status: {cache_status}")
+        return voice_prompt
+    
+    tracker.set_cache_status("miss")
+    return await create()
+
+
+def _validate_clone_request(request: VoiceCloneRequest):
+    """Validate reference inputs of a voice clone request"""
+    if not request.ref_audio_url and not request.ref_audio_base64:
+        raise HTTPException(
+            status_code=400,
+            detail="Either ref_audio_url or ref_audio_base64 must be provided"
+        )
+    
+    if not request.x_vector_only_mode and not request.ref_text:
+        raise HTTPException(
+            status_code=400,
+            detail="ref_text is required when x_vector_only_mode is False"
+        )
+
+
+async def _load_reference(
+    request: VoiceCloneRequest,
+    tracker: PerformanceTracker,
+) -> Tuple[np.ndarray, int, str]:
+    """
+    Load and preprocess the reference audio of a request
+    
+    Args:
+        request: Validated voice clone request
+        tracker: Performance tracker
+        
+    Returns:
+        Tuple of (audio_data, sample_rate, audio_key), where audio_key is the
+        content key of audio_data
+    """
+    # Prepare reference audio (repeated references skip decoding and preprocessing)
+    ref_audio = await load_reference_audio(
+        ref_audio_url=request.ref_audio_url,
+        ref_audio_base64=request.ref_audio_base64,
+        tracker=tracker,
+    )
+    
+    if ref_audio is None:
+        raise HTTPException(status_code=400, detail="Failed to load reference audio")
+    
+    ref_audio_data, ref_sample_rate, audio_key = ref_audio
+    if audio_key is None:
+        audio_key = audio_content_key(ref_audio_data)
+    return ref_audio_data, ref_sample_rate, audio_key
+
+
+async def _load_voice_prompt(
+    request: VoiceCloneRequest,
+    tracker: PerformanceTracker,
+    reference: Optional[Tuple[np.ndarray, int, str]] = None,
+) -> Any:
+    """
+    Load the reference audio and get its voice prompt
+    
+    Args:
+        request: Validated voice clone request
+        tracker: Performance tracker
+        reference: Reference already loaded with _load_reference(), if any
+        
+    Returns:
+        Voice clone prompt items (cached or freshly extracted)
+    """
+    if reference is None:
+        reference = await _load_reference(request, tracker)
+    
+    ref_audio_data, ref_sample_rate, audio_key = reference
+    
+    return await _get_voice_prompt(
+        request, ref_audio_data, ref_sample_rate, tracker, audio_key
+    )
+
+
+async def _clone_text(
+    text: str,
+    request: VoiceCloneRequest,
+    voice_prompt: Any,
+    tracker: PerformanceTracker,
+) -> Tuple[np.ndarray, int]:
+    """
+    Generate cloned speech for text with a voice prompt
+    
+    Args:
+        text: Text to synthesize (the whole request text or one segment of it)
+        request: Voice clone request (language and speed)
+        voice_prompt: Voice clone prompt items
+        tracker: Performance tracker
+        
+    Returns:
+        Tuple of (audio_data, sample_rate) with speed adjustment applied
+    """
+    audio_data, sr = await _synthesize(text, request.language, voice_prompt, tracker)
+    
+    # Apply speed adjustment if requested (off the event loop)
+    if request.speed != 1.0:
+        audio_data = await run_dsp("speed", apply_speed, audio_data, sr, request.speed, tracker=tracker)
+    
+    return audio_data, sr
+
+
+async def _run_clone(
+    request: VoiceCloneRequest,
+    tracker: PerformanceTracker,
+    reference: Optional[Tuple[np.ndarray, int, str]] = None,
+) -> Tuple[np.ndarray, int]:
+    """
+    Load the reference, get its voice prompt and generate cloned speech
+    
+    Args:
+        request: Validated voice clone request
+        tracker: Performance tracker
+        reference: Reference already loaded with _load_reference(), if any
+        
+    Returns:
+        Tuple of (audio_data, sample_rate)
+    """
+    voice_prompt = await _load_voice_prompt(request, tracker, reference)
+    return await _synthesize(request.text, request.language, voice_prompt, tracker)
+
+
+def _clone_params(request: VoiceCloneRequest, audio_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get the parameters that determine a voice clone's output
+    
+    Args:
+        request: Voice clone request
+        audio_key: Content key of the loaded reference (required for URL
+            references, which are identified by the audio behind the URL)
+        
+    Returns:
+        Request parameters with the reference audio replaced by its digest
+    """
+    params = request.model_dump(exclude={"ref_audio_base64"})
+    if request.ref_audio_base64:
+        # Identify the reference by digest rather than its full encoding
+        params["ref_audio_sha256"] = hashlib.sha256(
+            request.ref_audio_base64.encode("utf-8")
+        ).hexdigest()
+    else:
+        del params["ref_audio_url"]
+        params["ref_audio_key"] = audio_key
+    return params
+
+
+async def _prepare_clone(
+    request: VoiceCloneRequest,
+    tracker: PerformanceTracker,
+) -> Tuple[Optional[Tuple[np.ndarray, int, str]], Dict[str, Any]]:
+    """
+    Get the parameters identifying a voice clone's output
+    
+    The content behind a URL can change, so URL references are loaded first
+    (cached downloads are revalidated) and identified by their content.
+    Base64 references are identified by a digest of the payload without
+    decoding it.
+    
+    Args:
+        request: Validated voice clone request
+        tracker: Performance tracker
+        
+    Returns:
+        Tuple of (reference, params): the reference loaded with
+        _load_reference() (None for base64 references) and the parameters
+        from _clone_params()
+    """
+    if request.ref_audio_base64:
+        return None, _clone_params(request)
+    
+    reference = await _load_reference(request, tracker)
+    return reference, _clone_params(request, reference[2])
+
+
+async def _clone(
+    request: VoiceCloneRequest,
+    tracker: PerformanceTracker,
+    reference: Optional[Tuple[np.ndarray, int, str]],
+    params: Dict[str, Any],
+) -> Tuple[np.ndarray, int]:
+    """
+    Generate cloned speech, sharing the result with identical in-flight requests
+    
+    Args:
+        request: Validated voice clone request
+        tracker: Performance tracker
+        reference: Reference loaded by _prepare_clone() (None for base64 references)
+        params: Parameters identifying the output, from _prepare_clone()
+        
+    Returns:
+        Tuple of (audio_data, sample_rate)
+    """
+    if not settings.request_coalescing_enabled:
+        return await _run_clone(request, tracker, reference)
+    
+    return await coalesce_request(
+        "base",
+        params,
+        lambda: _run_clone(request, tracker, reference),
+        tracker=tracker,
+    )
+
+
+async def _load_saved_prompt(prompt_id: str) -> Dict[str, Any]:
+    """
+    Fetch a saved voice clone prompt made by the loaded Base model version
+    
+    Prompt items are model features, so a prompt created before a hot
+    reload (or a restart with other weights) is not used with the new model.
+    
+    Args:
+        prompt_id: Saved prompt identifier
+        
+    Returns:
+        Stored prompt dictionary
+        
+    Raises:
+        HTTPException: 404 if the prompt does not exist, 409 if another
+            version of the Base model created it
+    """
+    prompt_data = await asyncio.to_thread(get_voice_clone_prompt, prompt_id)
+    if prompt_data is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Prompt ID not found: {prompt_id}"
+        )
+    
+    if prompt_data.get("model_version") != model_manager.get_model_version("base"):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Prompt {prompt_id} was created by another version of the Base model; create it again"
+        )
+    return prompt_data
+
+
+def _longform_renderer(
+    request: VoiceCloneRequest,
+    voice_prompt: Any,
+    tracker: PerformanceTracker,
+) -> RenderBatch:
+    """
+    Build the long-form segment renderer for a request
+    
+    Args:
+        request: Voice clone request (language and speed; text is split into segments)
+        voice_prompt: Voice clone prompt items, loaded once for the document
+        tracker: Performance tracker
+        
+    Returns:
+        Coroutine function rendering a list of segment texts
+    """
+    async def render_batch(texts: List[str]):
+        if _is_batchable_prompt({"voice_clone_prompt": voice_prompt}):
+            wavs, sr = await model_manager.run_inference(
+                "base",
+                "generate_voice_clone",
+                tracker=tracker,
+                text=texts,
+                language=[request.language] * len(texts),
+                voice_clone_prompt=[voice_prompt[0]] * len(texts),
+            )
+        else:
+            # Prompts that cannot be merged are rendered one segment at a time
+            results = [await _synthesize(text, request.language, voice_prompt, tracker) for text in texts]
+            wavs, sr = [audio for audio, _ in results], results[0][1]
+        return await adjust_speed(wavs, sr, request.speed, tracker), sr
+    
+    return render_batch
+
+
+def _segment_key(request: VoiceCloneRequest, audio_key: str) -> Callable[[str], str]:
+    """Get the long-form segment cache key function for a request with a loaded reference"""
+    return segment_key_factory(
+        "base",
+        _clone_params(request, audio_key),
+        model_manager.get_model_version("base"),
+        settings.model_dtype,
+    )
+
+
 @router.post("/clone")
 async def clone_voice(
     request: VoiceCloneRequest,
@@ -45,7 +476,7 @@ async def clone_voice(
     """
     Generate speech using Base model with voice cloning from reference audio
     
-    Returns audio file (WAV) or base64 encoded audio based on response_format
+    Returns an audio file (WAV, FLAC, Ogg/Opus or MP3) or base64 encoded audio based on response_format
     """
     # Initialize performance tracker
     tracker = PerformanceTracker()
@@ -55,105 +486,50 @@ async def clone_voice(
         logger.info("Generating voice clone")
         
         # Validate inputs
-        if not request.ref_audio_url and not request.ref_audio_base64:
-            raise HTTPException(
-                status_code=400,
-                detail="Either ref_audio_url or ref_audio_base64 must be provided"
-            )
-        
-        if not request.x_vector_only_mode and not request.ref_text:
-            raise HTTPException(
-                status_code=400,
-                detail="ref_text is required when x_vector_only_mode is False"
-            )
-        
-        # Get model
-        model = model_manager.get_base_model()
-        
-        # Prepare reference audio (with preprocessing)
-        ref_audio = await prepare_ref_audio(
-            ref_audio_url=request.ref_audio_url,
-            ref_audio_base64=request.ref_audio_base64,
-            preprocess=True,
-            validate=False,  # URL/base64 already validated by client
-        )
-        
-        if ref_audio is None:
-            raise HTTPException(status_code=400, detail="Failed to load reference audio")
-        
-        audio_data, sample_rate = ref_audio
-        
-        # Try to use cache if enabled
-        voice_prompt = None
-        if settings.voice_cache_enabled:
-            cache = get_voice_cache()
-            voice_prompt = cache.get(
-                audio_data,
-                sample_rate,
-                request.ref_text,
-                request.x_vector_only_mode
+        _validate_clone_request(request)
+        
+        audio_format = resolve_audio_format(request.response_format, request.audio_format)
+        
+        # Identify the reference by its content (URLs are loaded and revalidated)
+        reference, params = await _prepare_clone(request, tracker)
+        
+        # Serve repeated requests from the output audio cache
+        cache_key = None
+        if settings.output_cache_enabled:
+            cache_key = OutputAudioCache.make_key(
+                "base",
+                params,
+                model_manager.get_model_version("base"),
+                settings.model_dtype,
+                audio_format,
             )
-            if voice_prompt is not None:
-                tracker.set_cache_status("hit")
-                logger.debug("Using cached voice prompt")
-        
-        # Create prompt if not cached
-        if voice_prompt is None:
-            tracker.set_cache_status("miss")
-            voice_prompt = model.create_voice_clone_prompt(
-                ref_audio=(audio_data, sample_rate),
-                ref_text=request.ref_text if not request.x_vector_only_mode else None,
-                x_vector_only_mode=request.x_vector_only_mode,
+            cached_response = get_cached_audio_response(
+                cache_key, request.response_format, "voice_clone", tracker, audio_format
             )
-            
-            # Cache the prompt if enabled
-            if settings.voice_cache_enabled:
-                cache = get_voice_cache()
-                cache.put(
-                    audio_data,
-                    sample_rate,
-                    request.ref_text,
-                    request.x_vector_only_mode,
-                    voice_prompt
-                )
-                logger.debug("Cached voice prompt")
+            if cached_response is not None:
+                return cached_response
         
-        # Generate audio with voice clone prompt
-        wavs, sr = model.generate_voice_clone(
-            text=request.text,
-            language=request.language,
-            voice_clone_prompt=voice_prompt,
-        )
+        # Load reference, get voice prompt and generate
+        audio_data, sr = await _clone(request, tracker, reference, params)
         
         # Track metrics
         tracker.mark_generation()
-        audio_duration = len(wavs[0]) / sr
+        audio_duration = len(audio_data) / sr
         tracker.set_audio_duration(audio_duration)
         
         # Log performance
         if settings.enable_performance_logging:
             tracker.log_metrics(logger)
         
+        # Encode once (off the event loop); cache and respond with the same bytes
+        audio_bytes = await run_dsp("encode", encode_audio, audio_data, sr, audio_format, tracker=tracker)
+        if cache_key is not None:
+            get_output_cache().put(cache_key, audio_bytes, sr, audio_duration)
+        
         # Return based on format
-        if request.response_format == "base64":
-            audio_base64 = numpy_to_base64(wavs[0], sr)
-            return AudioResponse(
-                audio=audio_base64,
-                sample_rate=sr,
-                format="wav"
-            )
-        else:
-            # Return WAV file with performance headers
-            wav_bytes = numpy_to_wav_bytes(wavs[0], sr)
-            response = Response(
-                content=wav_bytes,
-                media_type="audio/wav",
-                headers={
-                    "Content-Disposition": "attachment; filename=voice_clone.wav",
-                    **tracker.get_headers()
-                }
-            )
-            return response
+        return build_audio_response(
+            audio_bytes, sr, request.response_format, "voice_clone", tracker.get_headers(), audio_format
+        )
     
     except HTTPException:
         raise
@@ -165,12 +541,17 @@ async def clone_voice(
 @router.post("/clone-stream")
 async def clone_voice_stream(
     request: VoiceCloneRequest,
+    stream_format: str = Query(default="sse", pattern="^(sse|pcm|wav|flac|opus|mp3)$"),
     api_key: str = Depends(verify_api_key)
 ):
     """
     Generate speech using Base model with voice cloning and streaming output
     
-    Returns Server-Sent Events with audio chunks
+    Audio is generated sentence by sentence and sent as each segment is ready.
+    stream_format selects the body: "sse" (default) sends Server-Sent Events
+    (metadata with time to first audio, base64 WAV chunks, done); "pcm" sends
+    raw audio/L16, "wav" a single streamed WAV file and "flac", "opus" (Ogg)
+    or "mp3" a compressed file encoded incrementally as audio is generated
     """
     # Initialize performance tracker
     tracker = PerformanceTracker()
@@ -180,113 +561,119 @@ async def clone_voice_stream(
         logger.info("Generating voice clone stream")
         
         # Validate inputs
-        if not request.ref_audio_url and not request.ref_audio_base64:
-            raise HTTPException(
-                status_code=400,
-                detail="Either ref_audio_url or ref_audio_base64 must be provided"
-            )
+        _validate_clone_request(request)
         
-        if not request.x_vector_only_mode and not request.ref_text:
-            raise HTTPException(
-                status_code=400,
-                detail="ref_text is required when x_vector_only_mode is False"
-            )
-        
-        # Get model
-        model = model_manager.get_base_model()
+        # Load the reference and voice prompt once for all segments
+        voice_prompt = await _load_voice_prompt(request, tracker)
         
-        # Prepare reference audio (with preprocessing)
-        ref_audio = await prepare_ref_audio(
-            ref_audio_url=request.ref_audio_url,
-            ref_audio_base64=request.ref_audio_base64,
-            preprocess=True,
-            validate=False,
+        # Generate sentence by sentence; respond once the first segment is ready
+        stream, first = await open_segment_stream(
+            request.text,
+            lambda text: _clone_text(text, request, voice_prompt, tracker),
+            tracker,
         )
         
-        if ref_audio is None:
-            raise HTTPException(status_code=400, detail="Failed to load reference audio")
-        
-        audio_data, sample_rate = ref_audio
-        
-        # Try to use cache if enabled
-        voice_prompt = None
-        if settings.voice_cache_enabled:
-            cache = get_voice_cache()
-            voice_prompt = cache.get(
-                audio_data,
-                sample_rate,
-                request.ref_text,
-                request.x_vector_only_mode
-            )
-            if voice_prompt is not None:
-                tracker.set_cache_status("hit")
-                logger.debug("Using cached voice prompt")
-        
-        # Create prompt if not cached
-        if voice_prompt is None:
-            tracker.set_cache_status("miss")
-            voice_prompt = model.create_voice_clone_prompt(
-                ref_audio=(audio_data, sample_rate),
-                ref_text=request.ref_text if not request.x_vector_only_mode else None,
-                x_vector_only_mode=request.x_vector_only_mode,
-            )
-            
-            # Cache the prompt if enabled
-            if settings.voice_cache_enabled:
-                cache = get_voice_cache()
-                cache.put(
-                    audio_data,
-                    sample_rate,
-                    request.ref_text,
-                    request.x_vector_only_mode,
-                    voice_prompt
-                )
-                logger.debug("Cached voice prompt")
-        
-        # Generate audio with voice clone prompt
-        wavs, sr = model.generate_voice_clone(
-            text=request.text,
-            language=request.language,
-            voice_clone_prompt=voice_prompt,
+        return segment_stream_response(
+            stream, first, tracker, stream_format,
+            log=logger if settings.enable_performance_logging else None,
         )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating voice clone stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/clone-longform")
+async def clone_voice_longform(
+    request: VoiceCloneRequest,
+    stream_format: str = Query(default="sse", pattern="^(sse|pcm|wav|flac|opus|mp3)$"),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Generate a long document with a cloned voice and streaming output
+    
+    The reference is loaded and its voice prompt extracted once for the
+    whole document.
+    Long documents (articles, chapters) are split into paragraphs and
+    sentence segments, rendered in batched model calls and stitched with
+    short crossfades. Audio streams as soon as the next segment is ready;
+    SSE adds a progress event per segment. Rendered segments are cached, so
+    a re-submitted document only renders the paragraphs that changed.
+    stream_format works as for /clone-stream
+    """
+    tracker = PerformanceTracker()
+    tracker.start()
+    
+    try:
+        logger.info(f"Generating long-form voice clone ({len(request.text)} chars)")
         
-        # Apply speed adjustment if requested
-        audio_data = wavs[0]
-        if request.speed != 1.0:
-            audio_data = apply_speed(audio_data, sr, request.speed)
-        
-        # Track metrics
-        tracker.mark_generation()
-        audio_duration = len(audio_data) / sr
-        tracker.set_audio_duration(audio_duration)
-        
-        # Log performance
-        if settings.enable_performance_logging:
-            tracker.log_metrics(logger)
+        _validate_clone_request(request)
+        reference = await _load_reference(request, tracker)
+        voice_prompt = await _load_voice_prompt(request, tracker, reference)
         
-        # Stream audio chunks
-        async def generate():
-            # Send metadata with performance info
-            metadata = {
-                "sample_rate": sr,
-                **tracker.get_metrics()
-            }
-            yield create_sse_message(json.dumps(metadata), "metadata")
-            
-            async for chunk_base64 in stream_audio_base64_chunks(audio_data, sr):
-                yield create_sse_message(chunk_base64, "audio")
-            
-            yield create_sse_message("complete", "done")
+        render, first = await open_longform_render(
+            request.text,
+            _longform_renderer(request, voice_prompt, tracker),
+            tracker,
+            cache_key=_segment_key(request, reference[2]),
+        )
         
-        return EventSourceResponse(generate())
+        return segment_stream_response(
+            render, first, tracker, stream_format,
+            log=logger if settings.enable_performance_logging else None,
+            metadata=render.metadata(),
+            progress=render.progress,
+        )
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error generating voice clone stream: {e}")
+        logger.error(f"Error generating long-form voice clone: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.websocket("/ws")
+async def clone_voice_websocket(websocket: WebSocket):
+    """
+    Duplex voice clone session for incrementally produced text (e.g. LLM tokens)
+    
+    The start message carries either the /clone request fields (reference
+    audio, ref_text, language, speed) or a saved prompt_id (with language).
+    The voice prompt is prepared once; text pushed afterwards is generated
+    sentence by sentence and returned as binary PCM frames. See
+    app.utils.duplex for the protocol. API key via X-API-Key header or
+    api_key query parameter.
+    """
+    async def configure(config: Dict[str, Any], tracker: PerformanceTracker):
+        if config.get("prompt_id"):
+            request = parse_start_config(GenerateWithPromptRequest, config)
+            logger.info(f"Starting voice clone WebSocket session with prompt: {request.prompt_id}")
+            
+            prompt_data = await _load_saved_prompt(request.prompt_id)
+            
+            async def synthesize(text: str, segment_tracker: PerformanceTracker):
+                return await _synthesize(
+                    text, request.language, prompt_data["prompt_items"], segment_tracker
+                )
+            
+            return synthesize
+        
+        request = parse_start_config(VoiceCloneRequest, config)
+        logger.info("Starting voice clone WebSocket session")
+        _validate_clone_request(request)
+        voice_prompt = await _load_voice_prompt(request, tracker)
+        
+        async def synthesize(text: str, segment_tracker: PerformanceTracker):
+            return await _clone_text(text, request, voice_prompt, segment_tracker)
+        
+        return synthesize
+    
+    await serve_tts_websocket(
+        websocket, configure, log=logger if settings.enable_performance_logging else None
+    )
+
 @router.post("/create-prompt", response_model=CreatePromptResponse)
 async def create_voice_clone_prompt(
     request: CreatePromptRequest,
@@ -313,9 +700,6 @@ async def create_voice_clone_prompt(
                 detail="ref_text is required when x_vector_only_mode is False"
             )
         
-        # Get model
-        model = model_manager.get_base_model()
-        
         # Prepare reference audio
         ref_audio = await prepare_ref_audio(
             ref_audio_url=request.ref_audio_url,
@@ -325,8 +709,10 @@ async def create_voice_clone_prompt(
         if ref_audio is None:
             raise HTTPException(status_code=400, detail="Failed to load reference audio")
         
-        # Create voice clone prompt
-        prompt_items = model.create_voice_clone_prompt(
+        # Create voice clone prompt on the Base inference pool
+        prompt_items = await model_manager.run_inference(
+            "base",
+            "create_voice_clone_prompt",
             ref_audio=ref_audio,
             ref_text=request.ref_text if not request.x_vector_only_mode else None,
             x_vector_only_mode=request.x_vector_only_mode,
@@ -335,11 +721,16 @@ async def create_voice_clone_prompt(
         # Generate unique prompt ID
         prompt_id = str(uuid.uuid4())
         
-        # Store prompt
-        store_voice_clone_prompt(prompt_id, {
+        # Tagged with the version of the model that extracted it (tagged
+        # once it has loaded), so it is not used after a reload
+        model_version = model_manager.get_model_version("base")
+        
+        # Store prompt (durable backends write to disk)
+        await asyncio.to_thread(store_voice_clone_prompt, prompt_id, {
             "prompt_items": prompt_items,
             "ref_text": request.ref_text,
             "x_vector_only_mode": request.x_vector_only_mode,
+            "model_version": model_version,
         })
         
         logger.info(f"Created voice clone prompt with ID: {prompt_id}")
@@ -364,47 +755,57 @@ async def generate_with_voice_clone_prompt(
     """
     Generate speech using a saved voice clone prompt
     
-    Returns audio file (WAV) or base64 encoded audio based on response_format
+    Returns an audio file (WAV, FLAC, Ogg/Opus or MP3) or base64 encoded audio based on response_format
     """
+    tracker = PerformanceTracker()
+    tracker.start()
+    
     try:
         logger.info(f"Generating with voice clone prompt: {request.prompt_id}")
         
-        # Get stored prompt
-        prompt_data = get_voice_clone_prompt(request.prompt_id)
-        if prompt_data is None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Prompt ID not found: {request.prompt_id}"
+        # Get stored prompt (made by the loaded Base model version)
+        prompt_data = await _load_saved_prompt(request.prompt_id)
+        
+        audio_format = resolve_audio_format(request.response_format, request.audio_format)
+        
+        # Serve repeated requests from the output audio cache
+        cache_key = None
+        if settings.output_cache_enabled:
+            cache_key = OutputAudioCache.make_key(
+                "base",
+                request.model_dump(),
+                model_manager.get_model_version("base"),
+                settings.model_dtype,
+                audio_format,
+            )
+            cached_response = get_cached_audio_response(
+                cache_key, request.response_format, "voice_clone_prompt", tracker, audio_format
             )
+            if cached_response is not None:
+                return cached_response
         
-        # Get model
-        model = model_manager.get_base_model()
+        # Generate audio with saved prompt (identical in-flight requests share one generation)
+        async def generate():
+            return await _synthesize(request.text, request.language, prompt_data["prompt_items"], tracker)
         
-        # Generate audio with saved prompt
-        wavs, sr = model.generate_voice_clone(
-            text=request.text,
-            language=request.language,
-            voice_clone_prompt=prompt_data["prompt_items"],
-        )
+        if settings.request_coalescing_enabled:
+            audio_data, sr = await coalesce_request("base", request.model_dump(), generate, tracker=tracker)
+        else:
+            audio_data, sr = await generate()
+        
+        tracker.mark_generation()
+        audio_duration = len(audio_data) / sr
+        tracker.set_audio_duration(audio_duration)
+        
+        # Encode once (off the event loop); cache and respond with the same bytes
+        audio_bytes = await run_dsp("encode", encode_audio, audio_data, sr, audio_format, tracker=tracker)
+        if cache_key is not None:
+            get_output_cache().put(cache_key, audio_bytes, sr, audio_duration)
         
         # Return based on format
-        if request.response_format == "base64":
-            audio_base64 = numpy_to_base64(wavs[0], sr)
-            return AudioResponse(
-                audio=audio_base64,
-                sample_rate=sr,
-                format="wav"
-            )
-        else:
-            # Return WAV file
-            wav_bytes = numpy_to_wav_bytes(wavs[0], sr)
-            return Response(
-                content=wav_bytes,
-                media_type="audio/wav",
-                headers={
-                    "Content-Disposition": "attachment; filename=voice_clone_prompt.wav"
-                }
-            )
+        return build_audio_response(
+            audio_bytes, sr, request.response_format, "voice_clone_prompt", tracker.get_headers(), audio_format
+        )
     
     except HTTPException:
         raise
@@ -413,6 +814,64 @@ async def generate_with_voice_clone_prompt(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/prompts", response_model=PromptListResponse)
+async def list_voice_clone_prompts(
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    List stored voice clone prompts, most recently used first
+    """
+    try:
+        prompts, total = await asyncio.to_thread(get_prompt_store().list, limit, offset)
+        return PromptListResponse(prompts=prompts, total=total)
+    except Exception as e:
+        logger.error(f"Error listing voice clone prompts: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/prompts/stats")
+async def get_prompt_store_stats(api_key: str = Depends(verify_api_key)):
+    """
+    Get voice clone prompt store statistics
+    
+    Declared before /prompts/{prompt_id} so "stats" is not taken as an ID
+    """
+    return await asyncio.to_thread(get_prompt_store().get_stats)
+
+
+@router.get("/prompts/{prompt_id}", response_model=PromptInfo)
+async def get_voice_clone_prompt_info(
+    prompt_id: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Get metadata of a stored voice clone prompt
+    """
+    info = await asyncio.to_thread(get_prompt_store().info, prompt_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"Prompt ID not found: {prompt_id}")
+    return PromptInfo(**info)
+
+
+@router.delete("/prompts/{prompt_id}")
+async def delete_voice_clone_prompt_endpoint(
+    prompt_id: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Delete a stored voice clone prompt
+    """
+    deleted = await asyncio.to_thread(delete_voice_clone_prompt, prompt_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Prompt ID not found: {prompt_id}")
+    return {
+        "prompt_id": prompt_id,
+        "message": "Prompt deleted successfully"
+    }
+
+
 @router.post("/upload-ref-audio")
 async def upload_reference_audio(
     file: UploadFile = File(...),
@@ -461,6 +920,25 @@ async def upload_reference_audio(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/batching/stats")
+async def get_batching_stats(api_key: str = Depends(verify_api_key)):
+    """
+    Get micro-batching statistics
+    
+    Returns batch-size and wait-time histograms for tuning the batching window
+    """
+    if not settings.base_batching_enabled:
+        return {
+            "enabled": False,
+            "message": "Base model batching is disabled"
+        }
+    
+    return {
+        "enabled": True,
+        **get_batcher().get_stats()
+    }
+
+
 @router.get("/cache/stats")
 async def get_cache_stats(api_key: str = Depends(verify_api_key)):
     """
@@ -480,7 +958,11 @@ async def get_cache_stats(api_key: str = Depends(verify_api_key)):
         
         return {
             "enabled": True,
-            **stats
+            **stats,
+            "reference_audio": (
+                get_reference_cache().get_stats() if settings.ref_audio_cache_enabled else {"enabled": False}
+            ),
+            "request_coalescing": get_request_coalescing_stats(),
         }
     except Exception as e:
         logger.error(f"Error getting cache stats: {e}")
@@ -503,6 +985,7 @@ async def clear_cache(api_key: str = Depends(verify_api_key)):
     try:
         cache = get_voice_cache()
         cache.clear()
+        get_reference_cache().clear()
         
         return {
             "message": "Cache cleared successfully"
@@ -510,3 +993,24 @@ async def clear_cache(api_key: str = Depends(verify_api_key)):
     except Exception as e:
         logger.error(f"Error clearing cache: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _run_longform_job(request: VoiceCloneRequest, job: Job):
+    """Render a voice_clone_longform job"""
+    reference = await _load_reference(request, job.tracker)
+    voice_prompt = await _load_voice_prompt(request, job.tracker, reference)
+    render = create_longform_render(
+        request.text, _longform_renderer(request, voice_prompt, job.tracker), _segment_key(request, reference[2])
+    )
+    await run_longform_job(
+        job, render, "voice_clone", resolve_audio_format(request.response_format, request.audio_format)
+    )
+
+
+def _validate_longform_job(request: VoiceCloneRequest):
+    """Validate a voice_clone_longform job at submission"""
+    _validate_clone_request(request)
+    prepare_document(request.text)
+
+
+register_job_type("voice_clone_longform", VoiceCloneRequest, _run_longform_job, _validate_longform_job)
@@ -0,0 +1,59 @@
+"""
+Output audio cache API endpoints
+"""
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+from app.auth import verify_api_key
+from app.config import settings
+from app.utils.caching import get_output_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/cache", tags=["cache"])
+
+
+@router.get("/output/stats")
+async def get_output_cache_stats(api_key: str = Depends(verify_api_key)):
+    """
+    Get output audio cache statistics
+
+    Returns cache hit rate, size in bytes, evictions and other metrics
+    """
+    if not settings.output_cache_enabled:
+        return {
+            "enabled": False,
+            "message": "Output cache is disabled"
+        }
+
+    try:
+        return {
+            "enabled": True,
+            **get_output_cache().get_stats()
+        }
+    except Exception as e:
+        logger.error(f"Error getting output cache stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/output/clear")
+async def clear_output_cache(api_key: str = Depends(verify_api_key)):
+    """
+    Clear all cached output audio
+
+    Useful for freeing memory or forcing regeneration
+    """
+    if not settings.output_cache_enabled:
+        return {
+            "enabled": False,
+            "message": "Output cache is disabled"
+        }
+
+    try:
+        get_output_cache().clear()
+
+        return {
+            "message": "Output cache cleared successfully"
+        }
+    except Exception as e:
+        logger.error(f"Error clearing output cache: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,26 +1,45 @@
 """
 CustomVoice API endpoints
 """
-import json
 import logging
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Response
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
 from fastapi.responses import StreamingResponse
-from sse_starlette.sse import EventSourceResponse
 from app.auth import verify_api_key
 from app.config import settings
 from app.models.schemas import (
     CustomVoiceRequest,
     CustomVoiceBatchRequest,
-    AudioResponse,
     BatchAudioResponse,
     SpeakersResponse,
     SpeakerInfo,
     LanguagesResponse,
 )
 from app.models.manager import model_manager
-from app.utils.audio import numpy_to_wav_bytes, numpy_to_base64, apply_speed
-from app.utils.streaming import stream_audio_base64_chunks, create_sse_message
+from app.models.jobs import Job, register_job_type, run_batch_job, run_longform_job
+from app.models.batching import MicroBatcher
+from app.utils.coalescing import coalesce_request
+from app.utils.caching import OutputAudioCache, get_output_cache
+from app.utils.responses import (
+    build_audio_response,
+    build_batch_zip_response,
+    get_cached_audio_response,
+)
+from app.utils.audio import numpy_to_base64, apply_speed
+from app.utils.codecs import encode_audio, resolve_audio_format
+from app.utils.dsp_pool import run_dsp
+from app.utils.streaming import open_segment_stream, segment_stream_response
+from app.utils.duplex import parse_start_config, serve_tts_websocket
+from app.utils.longform import (
+    RenderBatch,
+    adjust_speed,
+    create_longform_render,
+    open_longform_render,
+    prepare_document,
+    segment_key_factory,
+)
 from app.utils.metrics import PerformanceTracker
 
 logger = logging.getLogger(__name__)
@@ -93,6 +112,127 @@ SUPPORTED_LANGUAGES = [
 ]
 
 
+# Micro-batcher for single generation requests (created on first use)
+_batcher: Optional[MicroBatcher] = None
+
+
+def get_batcher() -> MicroBatcher:
+    """Get or create the CustomVoice micro-batcher"""
+    global _batcher
+    
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            "custom_voice",
+            partial(model_manager.run_inference, "custom_voice", "generate_custom_voice"),
+            max_batch_size=settings.custom_voice_max_batch_size,
+            max_wait_ms=settings.custom_voice_batch_wait_ms,
+            max_concurrent_batches=settings.get_max_concurrency("custom_voice"),
+        )
+    
+    return _batcher
+
+
+async def _generate(
+    request: CustomVoiceRequest,
+    tracker: PerformanceTracker,
+) -> Tuple[np.ndarray, int]:
+    """
+    Generate audio for a single request, batched with concurrent requests when enabled
+    
+    Args:
+        request: CustomVoice request
+        tracker: Performance tracker for queue wait
+        
+    Returns:
+        Tuple of (audio_data, sample_rate) with speed adjustment applied
+    """
+    params = {
+        "text": request.text,
+        "language": request.language,
+        "speaker": request.speaker,
+        "instruct": request.instruct if request.instruct else "",
+    }
+    
+    if settings.custom_voice_batching_enabled:
+        audio_data, sr = await get_batcher().submit(params, tracker=tracker)
+    else:
+        wavs, sr = await model_manager.run_inference(
+            "custom_voice",
+            "generate_custom_voice",
+            tracker=tracker,
+            **params
+        )
+        audio_data = wavs[0]
+    
+    # Apply speed adjustment if requested (off the event loop)
+    if request.speed != 1.0:
+        audio_data = await run_dsp("speed", apply_speed, audio_data, sr, request.speed, tracker=tracker)
+    
+    return audio_data, sr
+
+
+async def _synthesize(
+    request: CustomVoiceRequest,
+    tracker: PerformanceTracker,
+) -> Tuple[np.ndarray, int]:
+    """
+    Generate audio for a request, sharing the result with identical in-flight requests
+    
+    Args:
+        request: CustomVoice request
+        tracker: Performance tracker
+        
+    Returns:
+        Tuple of (audio_data, sample_rate) with speed adjustment applied
+    """
+    if not settings.request_coalescing_enabled:
+        return await _generate(request, tracker)
+    
+    return await coalesce_request(
+        "custom_voice",
+        request.model_dump(),
+        lambda: _generate(request, tracker),
+        tracker=tracker,
+    )
+
+
+def _longform_renderer(request: CustomVoiceRequest, tracker: PerformanceTracker) -> RenderBatch:
+    """
+    Build the long-form segment renderer for a request
+    
+    Args:
+        request: CustomVoice request (voice and speed; text is split into segments)
+        tracker: Performance tracker
+        
+    Returns:
+        Coroutine function rendering a list of segment texts in one model call
+    """
+    async def render_batch(texts: List[str]):
+        count = len(texts)
+        wavs, sr = await model_manager.run_inference(
+            "custom_voice",
+            "generate_custom_voice",
+            tracker=tracker,
+            text=texts,
+            language=[request.language] * count,
+            speaker=[request.speaker] * count,
+            instruct=[request.instruct or ""] * count,
+        )
+        return await adjust_speed(wavs, sr, request.speed, tracker), sr
+    
+    return render_batch
+
+
+def _segment_key(request: CustomVoiceRequest) -> Callable[[str], str]:
+    """Get the long-form segment cache key function for a request"""
+    return segment_key_factory(
+        "custom_voice",
+        request.model_dump(),
+        model_manager.get_model_version("custom_voice"),
+        settings.model_dtype,
+    )
+
+
 @router.post("/generate")
 async def generate_custom_voice(
     request: CustomVoiceRequest,
@@ -101,7 +241,7 @@ async def generate_custom_voice(
     """
     Generate speech using CustomVoice model with preset speakers
     
-    Returns audio file (WAV) or base64 encoded audio based on response_format
+    Returns an audio file (WAV, FLAC, Ogg/Opus or MP3) or base64 encoded audio based on response_format
     """
     # Initialize performance tracker
     tracker = PerformanceTracker()
@@ -110,21 +250,26 @@ async def generate_custom_voice(
     try:
         logger.info(f"Generating custom voice for speaker: {request.speaker}")
         
-        # Get model
-        model = model_manager.get_custom_voice_model()
+        audio_format = resolve_audio_format(request.response_format, request.audio_format)
         
-        # Generate audio
-        wavs, sr = model.generate_custom_voice(
-            text=request.text,
-            language=request.language,
-            speaker=request.speaker,
-            instruct=request.instruct if request.instruct else "",
-        )
+        # Serve repeated requests from the output audio cache
+        cache_key = None
+        if settings.output_cache_enabled:
+            cache_key = OutputAudioCache.make_key(
+                "custom_voice",
+                request.model_dump(),
+                model_manager.get_model_version("custom_voice"),
+                settings.model_dtype,
+                audio_format,
+            )
+            cached_response = get_cached_audio_response(
+                cache_key, request.response_format, f"custom_voice_{request.speaker}", tracker, audio_format
+            )
+            if cached_response is not None:
+                return cached_response
         
-        # Apply speed adjustment if requested
-        audio_data = wavs[0]
-        if request.speed != 1.0:
-            audio_data = apply_speed(audio_data, sr, request.speed)
+        # Generate audio (speed adjustment included)
+        audio_data, sr = await _synthesize(request, tracker)
         
         # Track metrics
         tracker.mark_generation()
@@ -135,26 +280,18 @@ async def generate_custom_voice(
         if settings.enable_performance_logging:
             tracker.log_metrics(logger)
         
+        # Encode once (off the event loop); cache and respond with the same bytes
+        audio_bytes = await run_dsp("encode", encode_audio, audio_data, sr, audio_format, tracker=tracker)
+        if cache_key is not None:
+            get_output_cache().put(cache_key, audio_bytes, sr, audio_duration)
+        
         # Return based on format
-        if request.response_format == "base64":
-            audio_base64 = numpy_to_base64(audio_data, sr)
-            return AudioResponse(
-                audio=audio_base64,
-                sample_rate=sr,
-                format="wav"
-            )
-        else:
-            # Return WAV file with performance headers
-            wav_bytes = numpy_to_wav_bytes(audio_data, sr)
-            return Response(
-                content=wav_bytes,
-                media_type="audio/wav",
-                headers={
-                    "Content-Disposition": f"attachment; filename=custom_voice_{request.speaker}.wav",
-                    **tracker.get_headers()
-                }
-            )
+        return build_audio_response(
+            audio_bytes, sr, request.response_format, f"custom_voice_{request.speaker}", tracker.get_headers(), audio_format
+        )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating custom voice: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -163,12 +300,17 @@ async def generate_custom_voice(
 @router.post("/generate-stream")
 async def generate_custom_voice_stream(
     request: CustomVoiceRequest,
+    stream_format: str = Query(default="sse", pattern="^(sse|pcm|wav|flac|opus|mp3)$"),
     api_key: str = Depends(verify_api_key)
 ):
     """
     Generate speech using CustomVoice model with streaming output
     
-    Returns Server-Sent Events with audio chunks
+    Audio is generated sentence by sentence and sent as each segment is ready.
+    stream_format selects the body: "sse" (default) sends Server-Sent Events
+    (metadata with time to first audio, base64 WAV chunks, done); "pcm" sends
+    raw audio/L16, "wav" a single streamed WAV file and "flac", "opus" (Ogg)
+    or "mp3" a compressed file encoded incrementally as audio is generated
     """
     # Initialize performance tracker
     tracker = PerformanceTracker()
@@ -177,52 +319,106 @@ async def generate_custom_voice_stream(
     try:
         logger.info(f"Generating custom voice stream for speaker: {request.speaker}")
         
-        # Get model
-        model = model_manager.get_custom_voice_model()
-        
-        # Generate audio
-        wavs, sr = model.generate_custom_voice(
-            text=request.text,
-            language=request.language,
-            speaker=request.speaker,
-            instruct=request.instruct if request.instruct else "",
+        # Generate sentence by sentence; respond once the first segment is ready
+        stream, first = await open_segment_stream(
+            request.text,
+            lambda text: _synthesize(request.model_copy(update={"text": text}), tracker),
+            tracker,
         )
         
-        # Apply speed adjustment if requested
-        audio_data = wavs[0]
-        if hasattr(request, 'speed') and request.speed != 1.0:
-            audio_data = apply_speed(audio_data, sr, request.speed)
-        
-        # Track metrics
-        tracker.mark_generation()
-        audio_duration = len(audio_data) / sr
-        tracker.set_audio_duration(audio_duration)
-        
-        # Log performance
-        if settings.enable_performance_logging:
-            tracker.log_metrics(logger)
+        return segment_stream_response(
+            stream, first, tracker, stream_format,
+            log=logger if settings.enable_performance_logging else None,
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating custom voice stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/generate-longform")
+async def generate_custom_voice_longform(
+    request: CustomVoiceRequest,
+    stream_format: str = Query(default="sse", pattern="^(sse|pcm|wav|flac|opus|mp3)$"),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Generate a long document using CustomVoice model with streaming output
+    
+    Long documents (articles, chapters) are split into paragraphs and
+    sentence segments, rendered in batched model calls and stitched with
+    short crossfades. Audio streams as soon as the next segment is ready;
+    SSE adds a progress event per segment. Rendered segments are cached, so
+    a re-submitted document only renders the paragraphs that changed.
+    stream_format works as for /generate-stream
+    """
+    tracker = PerformanceTracker()
+    tracker.start()
+    
+    try:
+        logger.info(f"Generating long-form custom voice for speaker: {request.speaker} ({len(request.text)} chars)")
         
-        # Stream audio chunks
-        async def generate():
-            # Send metadata with performance info
-            metadata = {
-                "sample_rate": sr,
-                **tracker.get_metrics()
-            }
-            yield create_sse_message(json.dumps(metadata), "metadata")
-            
-            async for chunk_base64 in stream_audio_base64_chunks(audio_data, sr):
-                yield create_sse_message(chunk_base64, "audio")
-            
-            yield create_sse_message("complete", "done")
+        render, first = await open_longform_render(
+            request.text,
+            _longform_renderer(request, tracker),
+            tracker,
+            cache_key=_segment_key(request),
+        )
         
-        return EventSourceResponse(generate())
+        return segment_stream_response(
+            render, first, tracker, stream_format,
+            log=logger if settings.enable_performance_logging else None,
+            metadata=render.metadata(),
+            progress=render.progress,
+        )
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error generating custom voice stream: {e}")
+        logger.error(f"Error generating long-form custom voice: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.websocket("/ws")
+async def custom_voice_websocket(websocket: WebSocket):
+    """
+    Duplex CustomVoice session for incrementally produced text (e.g. LLM tokens)
+    
+    The start message carries the /generate request fields (speaker, language,
+    instruct, speed). Text pushed afterwards is generated sentence by sentence
+    and returned as binary PCM frames; see app.utils.duplex for the protocol.
+    API key via X-API-Key header or api_key query parameter.
+    """
+    async def configure(config: Dict[str, Any], tracker: PerformanceTracker):
+        request = parse_start_config(CustomVoiceRequest, config)
+        logger.info(f"Starting custom voice WebSocket session for speaker: {request.speaker}")
+        
+        async def synthesize(text: str, segment_tracker: PerformanceTracker):
+            return await _synthesize(request.model_copy(update={"text": text}), segment_tracker)
+        
+        return synthesize
+    
+    await serve_tts_websocket(
+        websocket, configure, log=logger if settings.enable_performance_logging else None
+    )
+
+def _validate_batch_request(request: CustomVoiceBatchRequest):
+    """Validate that the per-item lists of a batch request line up"""
+    if len(request.texts) != len(request.languages) or len(request.texts) != len(request.speakers):
+        raise HTTPException(
+            status_code=400,
+            detail="texts, languages, and speakers must have the same length"
+        )
+    
+    if request.instructs and len(request.instructs) != len(request.texts):
+        raise HTTPException(
+            status_code=400,
+            detail="instructs must have the same length as texts"
+        )
+
+
 @router.post("/batch")
 async def generate_custom_voice_batch(
     request: CustomVoiceBatchRequest,
@@ -231,45 +427,42 @@ async def generate_custom_voice_batch(
     """
     Generate multiple speech samples using CustomVoice model
     
-    Returns base64 encoded audio array
+    Returns a zip archive streamed as items are encoded (response_format
+    "zip" or "wav") or a base64 encoded audio array ("base64")
     """
     try:
         logger.info(f"Batch generating {len(request.texts)} custom voice samples")
         
-        # Validate input lengths
-        if len(request.texts) != len(request.languages) or len(request.texts) != len(request.speakers):
-            raise HTTPException(
-                status_code=400,
-                detail="texts, languages, and speakers must have the same length"
-            )
-        
-        if request.instructs and len(request.instructs) != len(request.texts):
-            raise HTTPException(
-                status_code=400,
-                detail="instructs must have the same length as texts"
-            )
-        
-        # Get model
-        model = model_manager.get_custom_voice_model()
+        _validate_batch_request(request)
         
         # Prepare instructs
         instructs = request.instructs if request.instructs else [""] * len(request.texts)
         
-        # Generate audio
-        wavs, sr = model.generate_custom_voice(
+        # Generate audio on the CustomVoice inference pool
+        wavs, sr = await model_manager.run_inference(
+            "custom_voice",
+            "generate_custom_voice",
             text=request.texts,
             language=request.languages,
             speaker=request.speakers,
             instruct=instructs,
         )
         
+        if request.response_format != "base64":
+            # Stream a stored zip, encoding each item only as it is written
+            return build_batch_zip_response(
+                list(wavs), sr, request.audio_format,
+                [f"custom_voice_{index:03d}_{speaker}" for index, speaker in enumerate(request.speakers)],
+                "custom_voice_batch",
+            )
+        
         # Convert to base64
-        audio_base64_list = [numpy_to_base64(wav, sr) for wav in wavs]
+        audio_base64_list = [numpy_to_base64(wav, sr, request.audio_format) for wav in wavs]
         
         return BatchAudioResponse(
             audios=audio_base64_list,
             sample_rate=sr,
-            format="wav"
+            format=request.audio_format
         )
     
     except HTTPException:
@@ -279,6 +472,25 @@ async def generate_custom_voice_batch(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/batching/stats")
+async def get_batching_stats(api_key: str = Depends(verify_api_key)):
+    """
+    Get micro-batching statistics
+    
+    Returns batch-size and wait-time histograms for tuning the batching window
+    """
+    if not settings.custom_voice_batching_enabled:
+        return {
+            "enabled": False,
+            "message": "CustomVoice batching is disabled"
+        }
+    
+    return {
+        "enabled": True,
+        **get_batcher().get_stats()
+    }
+
+
 @router.get("/speakers", response_model=SpeakersResponse)
 async def list_speakers(api_key: str = Depends(verify_api_key)):
     """
@@ -293,3 +505,40 @@ async def list_languages(api_key: str = Depends(verify_api_key)):
     List supported languages for CustomVoice model
     """
     return LanguagesResponse(languages=SUPPORTED_LANGUAGES)
+
+
+async def _run_batch_job(request: CustomVoiceBatchRequest, job: Job):
+    """Render a custom_voice_batch job"""
+    instructs = request.instructs if request.instructs else [""] * len(request.texts)
+    
+    async def render(start: int, end: int):
+        return await model_manager.run_inference(
+            "custom_voice",
+            "generate_custom_voice",
+            tracker=job.tracker,
+            text=request.texts[start:end],
+            language=request.languages[start:end],
+            speaker=request.speakers[start:end],
+            instruct=instructs[start:end],
+        )
+    
+    await run_batch_job(
+        job, len(request.texts), render,
+        [f"custom_voice_{index:03d}_{speaker}" for index, speaker in enumerate(request.speakers)],
+        request.audio_format,
+        settings.job_batch_size,
+    )
+
+
+async def _run_longform_job(request: CustomVoiceRequest, job: Job):
+    """Render a custom_voice_longform job"""
+    render = create_longform_render(request.text, _longform_renderer(request, job.tracker), _segment_key(request))
+    await run_longform_job(
+        job, render, f"custom_voice_{request.speaker}", resolve_audio_format(request.response_format, request.audio_format)
+    )
+
+
+register_job_type("custom_voice_batch", CustomVoiceBatchRequest, _run_batch_job, _validate_batch_request)
+register_job_type(
+    "custom_voice_longform", CustomVoiceRequest, _run_longform_job, lambda request: prepare_document(request.text)
+)
@@ -2,8 +2,10 @@
 Health check endpoints
 """
 from fastapi import APIRouter
-from app.models.schemas import HealthResponse, ModelsHealthResponse
+from app.config import settings
+from app.models.schemas import HealthResponse, ModelsHealthResponse, StartupReportResponse
 from app.models.manager import model_manager
+from app.models.lifecycle import get_model_lifecycle
 from app import __version__
 
 router = APIRouter(tags=["health"])
@@ -27,11 +29,30 @@ async def models_health_check():
     """
     Check which models are currently loaded
     
-    Returns status of all model types
+    Returns status of all model types, their background load state,
+    inference pool statistics, model residency (memory budget, evictions,
+    load times) and idle-unload and pre-warm statistics
     """
     return ModelsHealthResponse(
         custom_voice_loaded=model_manager.is_loaded("custom_voice"),
         voice_design_loaded=model_manager.is_loaded("voice_design"),
         base_loaded=model_manager.is_loaded("base"),
-        tokenizer_loaded=True  # Tokenizer is part of model loading
+        tokenizer_loaded=True,  # Tokenizer is part of model loading
+        loading=model_manager.get_load_states(),
+        inference=model_manager.get_executor_stats(),
+        residency=model_manager.get_residency_stats(),
+        lifecycle=get_model_lifecycle().get_stats(),
     )
+
+
+@router.get("/health/startup", response_model=StartupReportResponse)
+async def startup_report():
+    """
+    Report how long model preloading took at startup
+    
+    Returns the total preload time and each model's load and warmup time
+    """
+    report = model_manager.get_startup_report()
+    if report is None:
+        return StartupReportResponse(preload_enabled=settings.preload_models, complete=False)
+    return StartupReportResponse(preload_enabled=True, complete=True, **report)
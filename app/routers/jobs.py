@@ -0,0 +1,136 @@
+"""
+Asynchronous job API endpoints
+"""
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from app.auth import verify_api_key
+from app.models.jobs import Job, get_job_manager
+from app.models.schemas import JobInfo, JobListResponse, JobSubmitRequest
+from app.utils.codecs import get_codec
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+
+
+def _job_info(job: Job) -> JobInfo:
+    """Build the API description of a job"""
+    manager = get_job_manager()
+    info = job.info()
+    expires_at = None
+    if job.finished_at is not None and manager.retention_seconds > 0:
+        expires_at = job.finished_at + manager.retention_seconds
+    info["items"] = [{**item, "url": f"{router.prefix}/{job.id}/items/{item['index']}"} for item in info["items"]]
+    return JobInfo(**info, queue_position=manager.queue_position(job), expires_at=expires_at)
+
+
+@router.post("", response_model=JobInfo, status_code=202)
+async def submit_job(
+    request: JobSubmitRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Submit a batch or long-form render as a background job
+
+    Returns at once with the job ID. Poll GET /api/v1/jobs/{job_id} for
+    status and progress; each result file can be downloaded as soon as it is
+    listed in items. If callback_url is set, the finished job is POSTed to it
+    """
+    try:
+        job = await get_job_manager().submit(request.type, request.request, request.callback_url)
+        return _job_info(job)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error submitting job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("", response_model=JobListResponse)
+async def list_jobs(
+    status: Optional[str] = Query(default=None, pattern="^(queued|running|completed|failed|cancelled)$"),
+    limit: int = Query(default=50, ge=1, le=500),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    List jobs, newest first
+    """
+    manager = get_job_manager()
+    await manager.purge_expired()
+    jobs = manager.list(status)
+    return JobListResponse(jobs=[_job_info(job) for job in jobs[:limit]], total=len(jobs))
+
+
+@router.get("/stats")
+async def get_job_stats(api_key: str = Depends(verify_api_key)):
+    """
+    Get job queue statistics
+
+    Returns queue depth, job counts by state and callback delivery counts
+    """
+    return get_job_manager().get_stats()
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def get_job(
+    job_id: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Get the status, progress and result files of a job
+    """
+    return _job_info(get_job_manager().get(job_id))
+
+
+@router.get("/{job_id}/items/{index}")
+async def get_job_item(
+    job_id: str,
+    index: int,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Download a result file of a job
+    """
+    job = get_job_manager().get(job_id)
+    path = job.item_file(index)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail=f"Item {index} of job {job_id} is not available")
+
+    item = job.items[index]
+    return FileResponse(
+        path,
+        media_type=get_codec(item["format"]).media_type,
+        filename=item["filename"],
+        headers={"X-Sample-Rate": str(item["sample_rate"])},
+    )
+
+
+@router.post("/{job_id}/cancel", response_model=JobInfo)
+async def cancel_job(
+    job_id: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Cancel a queued or running job
+
+    Result files already written stay available until the job expires
+    """
+    return _job_info(await get_job_manager().cancel(job_id))
+
+
+@router.delete("/{job_id}")
+async def delete_job(
+    job_id: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Delete a job and its result files (cancelling it if it is still active)
+    """
+    await get_job_manager().delete(job_id)
+    return {
+        "job_id": job_id,
+        "message": "Job deleted successfully"
+    }
@@ -1,21 +1,41 @@
 """
 VoiceDesign API endpoints
 """
-import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sse_starlette.sse import EventSourceResponse
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
 from app.auth import verify_api_key
 from app.config import settings
 from app.models.schemas import (
     VoiceDesignRequest,
     VoiceDesignBatchRequest,
-    AudioResponse,
     BatchAudioResponse,
 )
 from app.models.manager import model_manager
-from app.utils.audio import numpy_to_wav_bytes, numpy_to_base64, apply_speed
-from app.utils.streaming import stream_audio_base64_chunks, create_sse_message
+from app.models.jobs import Job, register_job_type, run_batch_job, run_longform_job
+from app.models.batching import MicroBatcher
+from app.utils.coalescing import coalesce_request
+from app.utils.caching import OutputAudioCache, get_output_cache
+from app.utils.responses import (
+    build_audio_response,
+    build_batch_zip_response,
+    get_cached_audio_response,
+)
+from app.utils.audio import numpy_to_base64, apply_speed
+from app.utils.codecs import encode_audio, resolve_audio_format
+from app.utils.dsp_pool import run_dsp
+from app.utils.streaming import open_segment_stream, segment_stream_response
+from app.utils.duplex import parse_start_config, serve_tts_websocket
+from app.utils.longform import (
+    RenderBatch,
+    adjust_speed,
+    create_longform_render,
+    open_longform_render,
+    prepare_document,
+    segment_key_factory,
+)
 from app.utils.metrics import PerformanceTracker
 
 logger = logging.getLogger(__name__)
@@ -23,6 +43,128 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/voice-design", tags=["voice-design"])
 
 
+# Micro-batcher for single generation requests (created on first use)
+_batcher: Optional[MicroBatcher] = None
+
+
+def get_batcher() -> MicroBatcher:
+    """Get or create the VoiceDesign micro-batcher"""
+    global _batcher
+    
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            "voice_design",
+            partial(model_manager.run_inference, "voice_design", "generate_voice_design"),
+            max_batch_size=settings.voice_design_max_batch_size,
+            max_wait_ms=settings.voice_design_batch_wait_ms,
+            max_concurrent_batches=settings.get_max_concurrency("voice_design"),
+        )
+    
+    return _batcher
+
+
+async def _generate(
+    request: VoiceDesignRequest,
+    tracker: PerformanceTracker,
+) -> Tuple[np.ndarray, int]:
+    """
+    Generate audio for a single request, batched with concurrent requests when enabled
+    
+    Requests with different instructs share a batch, since the model takes
+    one instruct per text.
+    
+    Args:
+        request: VoiceDesign request
+        tracker: Performance tracker for queue wait
+        
+    Returns:
+        Tuple of (audio_data, sample_rate) with speed adjustment applied
+    """
+    params = {
+        "text": request.text,
+        "language": request.language,
+        "instruct": request.instruct,
+    }
+    
+    if settings.voice_design_batching_enabled:
+        audio_data, sr = await get_batcher().submit(params, tracker=tracker)
+    else:
+        wavs, sr = await model_manager.run_inference(
+            "voice_design",
+            "generate_voice_design",
+            tracker=tracker,
+            **params
+        )
+        audio_data = wavs[0]
+    
+    # Apply speed adjustment if requested (off the event loop)
+    if request.speed != 1.0:
+        audio_data = await run_dsp("speed", apply_speed, audio_data, sr, request.speed, tracker=tracker)
+    
+    return audio_data, sr
+
+
+async def _synthesize(
+    request: VoiceDesignRequest,
+    tracker: PerformanceTracker,
+) -> Tuple[np.ndarray, int]:
+    """
+    Generate audio for a request, sharing the result with identical in-flight requests
+    
+    Args:
+        request: VoiceDesign request
+        tracker: Performance tracker
+        
+    Returns:
+        Tuple of (audio_data, sample_rate) with speed adjustment applied
+    """
+    if not settings.request_coalescing_enabled:
+        return await _generate(request, tracker)
+    
+    return await coalesce_request(
+        "voice_design",
+        request.model_dump(),
+        lambda: _generate(request, tracker),
+        tracker=tracker,
+    )
+
+
+def _longform_renderer(request: VoiceDesignRequest, tracker: PerformanceTracker) -> RenderBatch:
+    """
+    Build the long-form segment renderer for a request
+    
+    Args:
+        request: VoiceDesign request (voice and speed; text is split into segments)
+        tracker: Performance tracker
+        
+    Returns:
+        Coroutine function rendering a list of segment texts in one model call
+    """
+    async def render_batch(texts: List[str]):
+        count = len(texts)
+        wavs, sr = await model_manager.run_inference(
+            "voice_design",
+            "generate_voice_design",
+            tracker=tracker,
+            text=texts,
+            language=[request.language] * count,
+            instruct=[request.instruct] * count,
+        )
+        return await adjust_speed(wavs, sr, request.speed, tracker), sr
+    
+    return render_batch
+
+
+def _segment_key(request: VoiceDesignRequest) -> Callable[[str], str]:
+    """Get the long-form segment cache key function for a request"""
+    return segment_key_factory(
+        "voice_design",
+        request.model_dump(),
+        model_manager.get_model_version("voice_design"),
+        settings.model_dtype,
+    )
+
+
 @router.post("/generate")
 async def generate_voice_design(
     request: VoiceDesignRequest,
@@ -31,7 +173,7 @@ async def generate_voice_design(
     """
     Generate speech using VoiceDesign model with natural language voice description
     
-    Returns audio file (WAV) or base64 encoded audio based on response_format
+    Returns an audio file (WAV, FLAC, Ogg/Opus or MP3) or base64 encoded audio based on response_format
     """
     # Initialize performance tracker
     tracker = PerformanceTracker()
@@ -40,20 +182,26 @@ async def generate_voice_design(
     try:
         logger.info(f"Generating voice design with instruct: {request.instruct[:50]}...")
         
-        # Get model
-        model = model_manager.get_voice_design_model()
+        audio_format = resolve_audio_format(request.response_format, request.audio_format)
         
-        # Generate audio
-        wavs, sr = model.generate_voice_design(
-            text=request.text,
-            language=request.language,
-            instruct=request.instruct,
-        )
+        # Serve repeated requests from the output audio cache
+        cache_key = None
+        if settings.output_cache_enabled:
+            cache_key = OutputAudioCache.make_key(
+                "voice_design",
+                request.model_dump(),
+                model_manager.get_model_version("voice_design"),
+                settings.model_dtype,
+                audio_format,
+            )
+            cached_response = get_cached_audio_response(
+                cache_key, request.response_format, "voice_design", tracker, audio_format
+            )
+            if cached_response is not None:
+                return cached_response
         
-        # Apply speed adjustment if requested
-        audio_data = wavs[0]
-        if request.speed != 1.0:
-            audio_data = apply_speed(audio_data, sr, request.speed)
+        # Generate audio (speed adjustment included)
+        audio_data, sr = await _synthesize(request, tracker)
         
         # Track metrics
         tracker.mark_generation()
@@ -64,26 +212,18 @@ async def generate_voice_design(
         if settings.enable_performance_logging:
             tracker.log_metrics(logger)
         
+        # Encode once (off the event loop); cache and respond with the same bytes
+        audio_bytes = await run_dsp("encode", encode_audio, audio_data, sr, audio_format, tracker=tracker)
+        if cache_key is not None:
+            get_output_cache().put(cache_key, audio_bytes, sr, audio_duration)
+        
         # Return based on format
-        if request.response_format == "base64":
-            audio_base64 = numpy_to_base64(audio_data, sr)
-            return AudioResponse(
-                audio=audio_base64,
-                sample_rate=sr,
-                format="wav"
-            )
-        else:
-            # Return WAV file with performance headers
-            wav_bytes = numpy_to_wav_bytes(audio_data, sr)
-            return Response(
-                content=wav_bytes,
-                media_type="audio/wav",
-                headers={
-                    "Content-Disposition": "attachment; filename=voice_design.wav",
-                    **tracker.get_headers()
-                }
-            )
+        return build_audio_response(
+            audio_bytes, sr, request.response_format, "voice_design", tracker.get_headers(), audio_format
+        )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating voice design: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,12 +232,17 @@ async def generate_voice_design(
 @router.post("/generate-stream")
 async def generate_voice_design_stream(
     request: VoiceDesignRequest,
+    stream_format: str = Query(default="sse", pattern="^(sse|pcm|wav|flac|opus|mp3)$"),
     api_key: str = Depends(verify_api_key)
 ):
     """
     Generate speech using VoiceDesign model with streaming output
     
-    Returns Server-Sent Events with audio chunks
+    Audio is generated sentence by sentence and sent as each segment is ready.
+    stream_format selects the body: "sse" (default) sends Server-Sent Events
+    (metadata with time to first audio, base64 WAV chunks, done); "pcm" sends
+    raw audio/L16, "wav" a single streamed WAV file and "flac", "opus" (Ogg)
+    or "mp3" a compressed file encoded incrementally as audio is generated
     """
     # Initialize performance tracker
     tracker = PerformanceTracker()
@@ -106,51 +251,100 @@ async def generate_voice_design_stream(
     try:
         logger.info(f"Generating voice design stream with instruct: {request.instruct[:50]}...")
         
-        # Get model
-        model = model_manager.get_voice_design_model()
-        
-        # Generate audio
-        wavs, sr = model.generate_voice_design(
-            text=request.text,
-            language=request.language,
-            instruct=request.instruct,
+        # Generate sentence by sentence; respond once the first segment is ready
+        stream, first = await open_segment_stream(
+            request.text,
+            lambda text: _synthesize(request.model_copy(update={"text": text}), tracker),
+            tracker,
         )
         
-        # Apply speed adjustment if requested
-        audio_data = wavs[0]
-        if hasattr(request, 'speed') and request.speed != 1.0:
-            audio_data = apply_speed(audio_data, sr, request.speed)
-        
-        # Track metrics
-        tracker.mark_generation()
-        audio_duration = len(audio_data) / sr
-        tracker.set_audio_duration(audio_duration)
+        return segment_stream_response(
+            stream, first, tracker, stream_format,
+            log=logger if settings.enable_performance_logging else None,
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating voice design stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/generate-longform")
+async def generate_voice_design_longform(
+    request: VoiceDesignRequest,
+    stream_format: str = Query(default="sse", pattern="^(sse|pcm|wav|flac|opus|mp3)$"),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Generate a long document using VoiceDesign model with streaming output
+    
+    Long documents (articles, chapters) are split into paragraphs and
+    sentence segments, rendered in batched model calls and stitched with
+    short crossfades. Audio streams as soon as the next segment is ready;
+    SSE adds a progress event per segment. Rendered segments are cached, so
+    a re-submitted document only renders the paragraphs that changed.
+    stream_format works as for /generate-stream
+    """
+    tracker = PerformanceTracker()
+    tracker.start()
+    
+    try:
+        logger.info(f"Generating long-form voice design ({len(request.text)} chars)")
         
-        # Log performance
-        if settings.enable_performance_logging:
-            tracker.log_metrics(logger)
+        render, first = await open_longform_render(
+            request.text,
+            _longform_renderer(request, tracker),
+            tracker,
+            cache_key=_segment_key(request),
+        )
         
-        # Stream audio chunks
-        async def generate():
-            # Send metadata with performance info
-            metadata = {
-                "sample_rate": sr,
-                **tracker.get_metrics()
-            }
-            yield create_sse_message(json.dumps(metadata), "metadata")
-            
-            async for chunk_base64 in stream_audio_base64_chunks(audio_data, sr):
-                yield create_sse_message(chunk_base64, "audio")
-            
-            yield create_sse_message("complete", "done")
-        
-        return EventSourceResponse(generate())
+        return segment_stream_response(
+            render, first, tracker, stream_format,
+            log=logger if settings.enable_performance_logging else None,
+            metadata=render.metadata(),
+            progress=render.progress,
+        )
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error generating voice design stream: {e}")
+        logger.error(f"Error generating long-form voice design: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.websocket("/ws")
+async def voice_design_websocket(websocket: WebSocket):
+    """
+    Duplex VoiceDesign session for incrementally produced text (e.g. LLM tokens)
+    
+    The start message carries the /generate request fields (instruct,
+    language, speed). Text pushed afterwards is generated sentence by sentence
+    and returned as binary PCM frames; see app.utils.duplex for the protocol.
+    API key via X-API-Key header or api_key query parameter.
+    """
+    async def configure(config: Dict[str, Any], tracker: PerformanceTracker):
+        request = parse_start_config(VoiceDesignRequest, config)
+        logger.info(f"Starting voice design WebSocket session with instruct: {request.instruct[:50]}...")
+        
+        async def synthesize(text: str, segment_tracker: PerformanceTracker):
+            return await _synthesize(request.model_copy(update={"text": text}), segment_tracker)
+        
+        return synthesize
+    
+    await serve_tts_websocket(
+        websocket, configure, log=logger if settings.enable_performance_logging else None
+    )
+
+def _validate_batch_request(request: VoiceDesignBatchRequest):
+    """Validate that the per-item lists of a batch request line up"""
+    if len(request.texts) != len(request.languages) or len(request.texts) != len(request.instructs):
+        raise HTTPException(
+            status_code=400,
+            detail="texts, languages, and instructs must have the same length"
+        )
+
+
 @router.post("/batch")
 async def generate_voice_design_batch(
     request: VoiceDesignBatchRequest,
@@ -159,35 +353,38 @@ async def generate_voice_design_batch(
     """
     Generate multiple speech samples using VoiceDesign model
     
-    Returns base64 encoded audio array
+    Returns a zip archive streamed as items are encoded (response_format
+    "zip" or "wav") or a base64 encoded audio array ("base64")
     """
     try:
         logger.info(f"Batch generating {len(request.texts)} voice design samples")
         
-        # Validate input lengths
-        if len(request.texts) != len(request.languages) or len(request.texts) != len(request.instructs):
-            raise HTTPException(
-                status_code=400,
-                detail="texts, languages, and instructs must have the same length"
-            )
-        
-        # Get model
-        model = model_manager.get_voice_design_model()
+        _validate_batch_request(request)
         
-        # Generate audio
-        wavs, sr = model.generate_voice_design(
+        # Generate audio on the VoiceDesign inference pool
+        wavs, sr = await model_manager.run_inference(
+            "voice_design",
+            "generate_voice_design",
             text=request.texts,
             language=request.languages,
             instruct=request.instructs,
         )
         
+        if request.response_format != "base64":
+            # Stream a stored zip, encoding each item only as it is written
+            return build_batch_zip_response(
+                list(wavs), sr, request.audio_format,
+                [f"voice_design_{index:03d}" for index in range(len(request.texts))],
+                "voice_design_batch",
+            )
+        
         # Convert to base64
-        audio_base64_list = [numpy_to_base64(wav, sr) for wav in wavs]
+        audio_base64_list = [numpy_to_base64(wav, sr, request.audio_format) for wav in wavs]
         
         return BatchAudioResponse(
             audios=audio_base64_list,
             sample_rate=sr,
-            format="wav"
+            format=request.audio_format
         )
     
     except HTTPException:
@@ -195,3 +392,56 @@ async def generate_voice_design_batch(
     except Exception as e:
         logger.error(f"Error generating voice design batch: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/batching/stats")
+async def get_batching_stats(api_key: str = Depends(verify_api_key)):
+    """
+    Get micro-batching statistics
+    
+    Returns batch-size and wait-time histograms for tuning the batching window
+    """
+    if not settings.voice_design_batching_enabled:
+        return {
+            "enabled": False,
+            "message": "VoiceDesign batching is disabled"
+        }
+    
+    return {
+        "enabled": True,
+        **get_batcher().get_stats()
+    }
+
+
+async def _run_batch_job(request: VoiceDesignBatchRequest, job: Job):
+    """Render a voice_design_batch job"""
+    async def render(start: int, end: int):
+        return await model_manager.run_inference(
+            "voice_design",
+            "generate_voice_design",
+            tracker=job.tracker,
+            text=request.texts[start:end],
+            language=request.languages[start:end],
+            instruct=request.instructs[start:end],
+        )
+    
+    await run_batch_job(
+        job, len(request.texts), render,
+        [f"voice_design_{index:03d}" for index in range(len(request.texts))],
+        request.audio_format,
+        settings.job_batch_size,
+    )
+
+
+async def _run_longform_job(request: VoiceDesignRequest, job: Job):
+    """Render a voice_design_longform job"""
+    render = create_longform_render(request.text, _longform_renderer(request, job.tracker), _segment_key(request))
+    await run_longform_job(
+        job, render, "voice_design", resolve_audio_format(request.response_format, request.audio_format)
+    )
+
+
+register_job_type("voice_design_batch", VoiceDesignBatchRequest, _run_batch_job, _validate_batch_request)
+register_job_type(
+    "voice_design_longform", VoiceDesignRequest, _run_longform_job, lambda request: prepare_document(request.text)
+)
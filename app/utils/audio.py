@@ -5,15 +5,35 @@ import io
 import base64
 import tempfile
 import logging
-from typing import Tuple, Union, Optional, Dict, Any
+import math
+from typing import Tuple, Union, Optional, Dict, Any, List
 import numpy as np
 import soundfile as sf
 import aiofiles
 import httpx
+from app.utils.codecs import encode_audio
 
 logger = logging.getLogger(__name__)
 
 
+async def fetch_url(url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """
+    Download a URL
+    
+    Args:
+        url: URL to fetch
+        headers: Optional request headers (e.g. conditional request validators)
+        
+    Returns:
+        Response (2xx or 304 Not Modified)
+    """
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.get(url, headers=headers)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+
 async def load_audio_from_url(url: str) -> Tuple[np.ndarray, int]:
     """
     Load audio from URL
@@ -24,14 +44,24 @@ async def load_audio_from_url(url: str) -> Tuple[np.ndarray, int]:
     Returns:
         Tuple of (audio_data, sample_rate)
     """
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        
-        # Read directly from memory to avoid temp file leaks
-        audio_data, sample_rate = sf.read(io.BytesIO(response.content))
+    response = await fetch_url(url)
+    
+    # Read directly from memory to avoid temp file leaks
+    return decode_audio_bytes(response.content)
+
+
+def decode_audio_bytes(audio_bytes: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Decode an in-memory audio file
+    
+    Args:
+        audio_bytes: Encoded audio (wav, flac, ogg, ...)
         
-        return audio_data, sample_rate
+    Returns:
+        Tuple of (audio_data, sample_rate)
+    """
+    audio_data, sample_rate = sf.read(io.BytesIO(audio_bytes))
+    return audio_data, sample_rate
 
 
 def load_audio_from_base64(base64_str: str) -> Tuple[np.ndarray, int]:
@@ -112,19 +142,20 @@ def numpy_to_wav_bytes(audio_data: np.ndarray, sample_rate: int) -> bytes:
     return buffer.read()
 
 
-def numpy_to_base64(audio_data: np.ndarray, sample_rate: int) -> str:
+def numpy_to_base64(audio_data: np.ndarray, sample_rate: int, audio_format: str = "wav") -> str:
     """
-    Convert numpy array to base64 encoded WAV
+    Convert numpy array to base64 encoded audio
     
     Args:
         audio_data: Audio data as numpy array
         sample_rate: Sample rate in Hz
+        audio_format: Codec ("wav", "flac", "opus" or "mp3")
         
     Returns:
-        Base64 encoded WAV data
+        Base64 encoded audio file
     """
-    wav_bytes = numpy_to_wav_bytes(audio_data, sample_rate)
-    return base64.b64encode(wav_bytes).decode("utf-8")
+    audio_bytes = encode_audio(audio_data, sample_rate, audio_format)
+    return base64.b64encode(audio_bytes).decode("utf-8")
 
 
 class AudioValidationError(Exception):
@@ -209,6 +240,201 @@ def validate_audio_file(
     return audio_data, sample_rate, metadata
 
 
+# Silence detection parameters shared by both preprocessing engines
+_LONG_SILENCE = {"min_silence_len": 1000, "silence_thresh": -50}
+_SHORT_SILENCE = {"min_silence_len": 100, "silence_thresh": -40}
+_KEEP_SILENCE_MS = 1000
+_SEEK_STEP_MS = 10
+_EDGE_SILENCE_THRESH = -42
+_EDGE_CHUNK_MS = 10
+_TAIL_MS = 50
+_PYDUB_SILENT_RATE = 11025
+_PCM16_SCALE = 32768
+
+
+def _loud_level(silence_thresh: float) -> int:
+    """Lowest integer RMS whose dBFS, computed as pydub does, is not below silence_thresh"""
+    level = max(1, int(10 ** (silence_thresh / 20) * _PCM16_SCALE) - 2)
+    while 20 * math.log(level / _PCM16_SCALE, 10) < silence_thresh:
+        level += 1
+    return level
+
+
+class _FramedAudio:
+    """
+    Mono audio addressed in milliseconds, with O(1) RMS over any range
+    
+    Millisecond positions map to frames and ranges are padded with silence
+    exactly as pydub slices them, so the array engine makes the same
+    decisions as the legacy pydub path. Levels are measured like pydub does
+    after its WAV round trip: on 16-bit PCM samples (libsndfile writes
+    floor(x * 32768)) with audioop's truncated integer RMS. RMS is taken
+    from a prefix sum of squared samples instead of re-reading each window.
+    """
+    
+    def __init__(self, audio_data: np.ndarray, sample_rate: int):
+        self.audio = audio_data
+        self.sample_rate = sample_rate
+        self.frames = len(audio_data)
+        self.length_ms = self.frames_to_ms(self.frames)
+        levels = np.clip(np.floor(audio_data * _PCM16_SCALE), -_PCM16_SCALE, _PCM16_SCALE - 1)
+        self._power = np.concatenate((
+            [0.0],
+            np.cumsum(np.square(levels)),
+        ))
+    
+    def frames_to_ms(self, frames: int) -> int:
+        """Length in ms of a frame count (pydub rounding)"""
+        return round(1000 * frames / self.sample_rate)
+    
+    def _bounds(self, start_ms, end_ms) -> Tuple[np.ndarray, np.ndarray]:
+        """Frame bounds of ms ranges, clamped to the length like pydub slicing"""
+        start_ms = np.minimum(start_ms, self.length_ms)
+        end_ms = np.minimum(end_ms, self.length_ms)
+        start = (start_ms * self.sample_rate / 1000).astype(np.int64)
+        end = (end_ms * self.sample_rate / 1000).astype(np.int64)
+        return start, np.maximum(end, start)
+    
+    def rms(self, start_ms: np.ndarray, end_ms: np.ndarray) -> np.ndarray:
+        """
+        RMS of many ms ranges at once (frames past the end count as silence)
+        
+        Args:
+            start_ms: Range starts in ms
+            end_ms: Range ends in ms
+            
+        Returns:
+            Integer 16-bit RMS per range, as audioop.rms (0 for empty ranges)
+        """
+        start, end = self._bounds(np.asarray(start_ms), np.asarray(end_ms))
+        count = end - start
+        energy = self._power[np.minimum(end, self.frames)] - self._power[np.minimum(start, self.frames)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rms = np.floor(np.sqrt(np.maximum(energy, 0.0) / count))
+        return np.where(count > 0, rms, 0.0)
+    
+    def slice(self, start_ms: int, end_ms: int) -> np.ndarray:
+        """
+        Samples of an ms range (a view unless padding is needed)
+        
+        Args:
+            start_ms: Range start in ms (negative counts from the end)
+            end_ms: Range end in ms (negative counts from the end)
+            
+        Returns:
+            Audio samples
+        """
+        if start_ms < 0:
+            start_ms = self.length_ms + start_ms
+        if end_ms < 0:
+            end_ms = self.length_ms + end_ms
+        start, end = self._bounds(np.array([start_ms]), np.array([end_ms]))
+        start, end = int(start[0]), int(end[0])
+        piece = self.audio[start:end]
+        if end - start > len(piece):
+            piece = np.concatenate((piece, np.zeros(end - start - len(piece), dtype=self.audio.dtype)))
+        return piece
+    
+    def detect_silence(self, min_silence_len: int, silence_thresh: float, seek_step: int) -> List[List[int]]:
+        """Silent ranges in ms (vectorized pydub.silence.detect_silence)"""
+        if self.length_ms < min_silence_len:
+            return []
+        
+        last_start = self.length_ms - min_silence_len
+        starts = np.arange(0, last_start + 1, seek_step)
+        if last_start % seek_step:
+            starts = np.append(starts, last_start)
+        
+        threshold = 10 ** (silence_thresh / 20) * _PCM16_SCALE
+        silent_starts = starts[self.rms(starts, starts + min_silence_len) <= threshold]
+        if len(silent_starts) == 0:
+            return []
+        
+        # Split wherever two silent windows neither follow each other nor overlap
+        steps = np.diff(silent_starts)
+        breaks = np.flatnonzero((steps != seek_step) & (steps > min_silence_len))
+        range_starts = np.concatenate(([silent_starts[0]], silent_starts[breaks + 1]))
+        range_ends = np.concatenate((silent_starts[breaks], [silent_starts[-1]])) + min_silence_len
+        return [[int(a), int(b)] for a, b in zip(range_starts, range_ends)]
+    
+    def split_on_silence(self, min_silence_len: int, silence_thresh: float) -> List[np.ndarray]:
+        """Non-silent chunks with surrounding silence kept (pydub.silence.split_on_silence)"""
+        silent_ranges = self.detect_silence(min_silence_len, silence_thresh, _SEEK_STEP_MS)
+        
+        if not silent_ranges:
+            nonsilent = [[0, self.length_ms]]
+        elif silent_ranges[0][0] == 0 and silent_ranges[0][1] == self.length_ms:
+            nonsilent = []
+        else:
+            nonsilent = []
+            prev_end = 0
+            for start, end in silent_ranges:
+                nonsilent.append([prev_end, start])
+                prev_end = end
+            if silent_ranges[-1][1] != self.length_ms:
+                nonsilent.append([prev_end, self.length_ms])
+            if nonsilent[0] == [0, 0]:
+                nonsilent.pop(0)
+        
+        ranges = [[start - _KEEP_SILENCE_MS, end + _KEEP_SILENCE_MS] for start, end in nonsilent]
+        for current, following in zip(ranges, ranges[1:]):
+            if following[0] < current[1]:
+                current[1] = (current[1] + following[0]) // 2
+                following[0] = current[1]
+        
+        return [self.slice(max(start, 0), min(end, self.length_ms)) for start, end in ranges]
+    
+    def leading_silence_ms(self, silence_thresh: float, chunk_size: int) -> int:
+        """Where leading silence ends in ms (the edge-trim loop, vectorized)"""
+        starts = np.arange(0, self.length_ms, chunk_size)
+        if len(starts) == 0:
+            return 0
+        loud = self.rms(starts, starts + chunk_size) >= _loud_level(silence_thresh)
+        if not loud.any():
+            return int(starts[-1] + chunk_size)
+        return int(starts[np.argmax(loud)])
+
+
+def _tail_frames(sample_rate: int) -> int:
+    """
+    Frames in the 50ms tail pydub appends
+    
+    pydub creates the silence at 11025 Hz and resamples it with
+    audioop.ratecv, which emits floor((n - 1) * out / in) + 1 frames for n
+    input frames, a few fewer than 50ms at the target rate.
+    """
+    frames = int(_PYDUB_SILENT_RATE * _TAIL_MS / 1000)
+    if sample_rate == _PYDUB_SILENT_RATE:
+        return frames
+    divisor = math.gcd(_PYDUB_SILENT_RATE, sample_rate)
+    return (frames - 1) * (sample_rate // divisor) // (_PYDUB_SILENT_RATE // divisor) + 1
+
+
+def _clip_at_silence(
+    framed: _FramedAudio,
+    max_duration: float,
+    target_duration_min: float,
+    min_silence_len: int,
+    silence_thresh: float,
+) -> Tuple[List[np.ndarray], int, bool]:
+    """
+    Keep leading non-silent chunks up to max_duration
+    
+    Returns:
+        Tuple of (chunks, length_ms, clipped) where clipped is True if
+        chunks were dropped at a silence boundary
+    """
+    chunks = []
+    frames = 0
+    for chunk in framed.split_on_silence(min_silence_len, silence_thresh):
+        if (framed.frames_to_ms(frames) > target_duration_min * 1000 and
+                framed.frames_to_ms(frames + len(chunk)) > max_duration * 1000):
+            return chunks, framed.frames_to_ms(frames), True
+        chunks.append(chunk)
+        frames += len(chunk)
+    return chunks, framed.frames_to_ms(frames), False
+
+
 def preprocess_reference_audio(
     audio_data: np.ndarray,
     sample_rate: int,
@@ -218,6 +444,12 @@ def preprocess_reference_audio(
     """
     Preprocess reference audio with smart clipping and silence removal
     
+    Works directly on the array: windowed RMS comes from prefix sums over
+    the same millisecond grid pydub uses, so clipping decisions, lengths and
+    metadata match preprocess_reference_audio_pydub() without any WAV
+    re-encoding (at sample rates from 11025 Hz; below that pydub resamples
+    its output to 11025 Hz).
+    
     Args:
         audio_data: Audio data as numpy array
         sample_rate: Sample rate in Hz
@@ -227,8 +459,92 @@ def preprocess_reference_audio(
     Returns:
         Tuple of (processed_audio, sample_rate, metadata)
     """
-    from app.config import settings
+    original_duration = len(audio_data) / sample_rate
+    metadata = {
+        "original_duration": original_duration,
+        "sample_rate": sample_rate,
+    }
+    
+    # Convert to mono if stereo
+    if audio_data.ndim > 1:
+        audio_data = np.mean(audio_data, axis=1)
+        metadata["converted_to_mono"] = True
+    
+    framed = _FramedAudio(audio_data, sample_rate)
+    
+    # Smart clipping if audio is too long
+    if framed.length_ms > max_duration * 1000:
+        logger.debug(f"Audio duration {framed.length_ms/1000:.2f}s exceeds max {max_duration}s, clipping...")
+        
+        # Try to find long silence for clipping, then short silence
+        chunks, length_ms, clipped = _clip_at_silence(
+            framed, max_duration, target_duration_min, **_LONG_SILENCE
+        )
+        if clipped:
+            logger.debug("Clipped at long silence boundary")
+            metadata["clip_method"] = "long_silence"
+        
+        if length_ms > max_duration * 1000:
+            chunks, length_ms, clipped = _clip_at_silence(
+                framed, max_duration, target_duration_min, **_SHORT_SILENCE
+            )
+            if clipped:
+                logger.debug("Clipped at short silence boundary")
+                metadata["clip_method"] = "short_silence"
+        
+        # Hard clip if still too long
+        if length_ms > max_duration * 1000:
+            chunks = [framed.slice(0, int(max_duration * 1000))]
+            logger.debug("Hard clipped to max duration")
+            metadata["clip_method"] = "hard_clip"
+        
+        clipped_audio = np.concatenate(chunks) if chunks else audio_data[:0]
+        framed = _FramedAudio(clipped_audio, sample_rate)
+    
+    # Remove leading/trailing silence
+    start_trim = framed.leading_silence_ms(_EDGE_SILENCE_THRESH, _EDGE_CHUNK_MS)
+    end_trim = _FramedAudio(framed.audio[::-1], sample_rate).leading_silence_ms(
+        _EDGE_SILENCE_THRESH, _EDGE_CHUNK_MS
+    )
+    
+    audio_data = framed.audio
+    if start_trim > 0 or end_trim > 0:
+        audio_data = framed.slice(min(start_trim, framed.length_ms), framed.length_ms - end_trim)
+        metadata["silence_removed_ms"] = start_trim + end_trim
+        logger.debug(f"Removed {start_trim}ms leading and {end_trim}ms trailing silence")
+    
+    # Add small tail for natural ending
+    tail = np.zeros(_tail_frames(sample_rate), dtype=audio_data.dtype)
+    audio_data = np.concatenate((audio_data, tail))
+    
+    metadata["processed_duration"] = len(audio_data) / sample_rate
+    logger.debug(f"Preprocessing complete: {original_duration:.2f}s -> {metadata['processed_duration']:.2f}s")
+    
+    return audio_data, sample_rate, metadata
+
+
+def preprocess_reference_audio_pydub(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    max_duration: float = 15.0,
+    target_duration_min: float = 5.0,
+) -> Tuple[np.ndarray, int, Dict[str, Any]]:
+    """
+    Preprocess reference audio through pydub (legacy engine)
+    
+    Round-trips the array through WAV and pydub. Kept as the reference
+    implementation for preprocess_reference_audio() equivalence tests and
+    benchmarks.
     
+    Args:
+        audio_data: Audio data as numpy array
+        sample_rate: Sample rate in Hz
+        max_duration: Maximum duration in seconds
+        target_duration_min: Minimum target duration in seconds
+        
+    Returns:
+        Tuple of (processed_audio, sample_rate, metadata)
+    """
     original_duration = len(audio_data) / sample_rate
     metadata = {
         "original_duration": original_duration,
@@ -373,49 +689,182 @@ async def prepare_ref_audio(
     ref_audio_file: Optional[bytes] = None,
     preprocess: bool = True,
     validate: bool = True,
+    tracker=None,
 ) -> Optional[Tuple[np.ndarray, int]]:
     """
     Prepare reference audio from various sources with optional preprocessing
     
+    Decoding and preprocessing run off the event loop (see app.utils.dsp_pool).
+    
     Args:
         ref_audio_url: URL to reference audio
         ref_audio_base64: Base64 encoded reference audio
         ref_audio_file: Raw file bytes
         preprocess: Whether to apply preprocessing
         validate: Whether to validate audio (only for file uploads)
+        tracker: Optional PerformanceTracker receiving per-stage timings
         
     Returns:
         Tuple of (audio_data, sample_rate) or None
     """
     from app.config import settings
+    from app.utils.dsp_pool import run_dsp
     
     # Load audio from source
     if ref_audio_url:
-        audio_data, sample_rate = await load_audio_from_url(ref_audio_url)
+        response = await fetch_url(ref_audio_url)
+        audio_data, sample_rate = await run_dsp(
+            "decode", decode_audio_bytes, response.content, tracker=tracker
+        )
     elif ref_audio_base64:
-        audio_data, sample_rate = load_audio_from_base64(ref_audio_base64)
+        audio_data, sample_rate = await run_dsp(
+            "decode", load_audio_from_base64, ref_audio_base64, tracker=tracker
+        )
     elif ref_audio_file:
         # Validate if enabled
         if validate and settings.audio_upload_max_size_mb > 0:
-            audio_data, sample_rate, _ = validate_audio_file(
+            audio_data, sample_rate, _ = await run_dsp(
+                "decode",
+                validate_audio_file,
                 ref_audio_file,
                 "uploaded_audio",
                 max_size_mb=settings.audio_upload_max_size_mb,
-                max_duration=settings.audio_upload_max_duration
+                max_duration=settings.audio_upload_max_duration,
+                tracker=tracker,
             )
         else:
-            audio_data, sample_rate = await load_audio_from_file(ref_audio_file)
+            audio_data, sample_rate = await run_dsp(
+                "decode", decode_audio_bytes, ref_audio_file, tracker=tracker
+            )
     else:
         return None
     
     # Apply preprocessing if enabled
     if preprocess and settings.audio_preprocessing_enabled:
-        audio_data, sample_rate, metadata = preprocess_reference_audio(
-            audio_data,
-            sample_rate,
-            max_duration=settings.ref_audio_max_duration,
-            target_duration_min=settings.ref_audio_target_duration_min
-        )
-        logger.debug(f"Reference audio preprocessed: {metadata}")
+        audio_data, sample_rate = await _run_preprocessing(audio_data, sample_rate, tracker)
     
     return audio_data, sample_rate
+
+
+async def _run_preprocessing(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    tracker=None,
+) -> Tuple[np.ndarray, int]:
+    """Run preprocess_reference_audio() off the event loop with the configured limits"""
+    from app.config import settings
+    from app.utils.dsp_pool import run_dsp
+    
+    audio_data, sample_rate, metadata = await run_dsp(
+        "preprocessing",
+        preprocess_reference_audio,
+        audio_data,
+        sample_rate,
+        max_duration=settings.ref_audio_max_duration,
+        target_duration_min=settings.ref_audio_target_duration_min,
+        tracker=tracker,
+    )
+    logger.debug(f"Reference audio preprocessed: {metadata}")
+    return audio_data, sample_rate
+
+
+def _preprocessing_tag() -> str:
+    """Describe the preprocessing settings that shape a prepared reference"""
+    from app.config import settings
+    
+    if not settings.audio_preprocessing_enabled:
+        return "raw"
+    return f"pre|{settings.ref_audio_max_duration}|{settings.ref_audio_target_duration_min}"
+
+
+async def load_reference_audio(
+    ref_audio_url: Optional[str] = None,
+    ref_audio_base64: Optional[str] = None,
+    tracker=None,
+) -> Optional[Tuple[np.ndarray, int, Optional[str]]]:
+    """
+    Prepare reference audio, reusing earlier work for repeated references
+    
+    The raw encoded reference (base64 payload, or the downloaded bytes of a
+    URL) is fingerprinted together with the preprocessing settings; on a
+    hit the preprocessed array is returned without decoding or DSP. URLs
+    whose last response carried an ETag or Last-Modified header are
+    revalidated with a conditional request, so unchanged references are not
+    downloaded again either.
+    
+    Args:
+        ref_audio_url: URL to reference audio
+        ref_audio_base64: Base64 encoded reference audio
+        tracker: Optional PerformanceTracker receiving per-stage timings
+        
+    Returns:
+        Tuple of (audio_data, sample_rate, audio_key) or None, where audio_key
+        is the content key for the voice prompt cache (None if not cached)
+    """
+    from app.config import settings
+    from app.utils.caching import audio_content_key, get_reference_cache
+    from app.utils.dsp_pool import run_dsp
+    
+    if not settings.ref_audio_cache_enabled:
+        ref_audio = await prepare_ref_audio(
+            ref_audio_url=ref_audio_url,
+            ref_audio_base64=ref_audio_base64,
+            preprocess=True,
+            validate=False,
+            tracker=tracker,
+        )
+        return None if ref_audio is None else (*ref_audio, None)
+    
+    cache = get_reference_cache()
+    tag = _preprocessing_tag()
+    
+    if ref_audio_base64:
+        fingerprint = cache.fingerprint(ref_audio_base64.encode("utf-8"), tag)
+        cached = cache.get(fingerprint)
+        if cached is not None:
+            return cached
+        audio_data, sample_rate = await run_dsp(
+            "decode", load_audio_from_base64, ref_audio_base64, tracker=tracker
+        )
+    
+    elif ref_audio_url:
+        validator = cache.get_url_validator(ref_audio_url)
+        headers = {}
+        if validator is not None:
+            if validator["etag"]:
+                headers["If-None-Match"] = validator["etag"]
+            if validator["last_modified"]:
+                headers["If-Modified-Since"] = validator["last_modified"]
+        
+        response = await fetch_url(ref_audio_url, headers=headers or None)
+        if response.status_code == 304:
+            cache.record_not_modified()
+            cached = cache.get(validator["fingerprint"])
+            if cached is not None:
+                return cached
+            # Validators outlived the audio; download unconditionally
+            response = await fetch_url(ref_audio_url)
+        
+        fingerprint = cache.fingerprint(response.content, tag)
+        cache.set_url_validator(
+            ref_audio_url,
+            response.headers.get("etag"),
+            response.headers.get("last-modified"),
+            fingerprint,
+        )
+        cached = cache.get(fingerprint)
+        if cached is not None:
+            return cached
+        audio_data, sample_rate = await run_dsp(
+            "decode", decode_audio_bytes, response.content, tracker=tracker
+        )
+    
+    else:
+        return None
+    
+    if settings.audio_preprocessing_enabled:
+        audio_data, sample_rate = await _run_preprocessing(audio_data, sample_rate, tracker)
+    
+    audio_key = audio_content_key(audio_data)
+    cache.put(fingerprint, audio_data, sample_rate, audio_key)
+    return audio_data, sample_rate, audio_key
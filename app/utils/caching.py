@@ -1,44 +1,282 @@
 """
 Voice prompt caching utilities
 """
+import asyncio
 import hashlib
+import json
 import logging
+import os
 import threading
 import time
 from collections import OrderedDict
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, Callable, Awaitable
 import numpy as np
+from app.utils.coalescing import SingleFlight
+from app.utils.serialization import serialize_prompt, deserialize_prompt
 
 logger = logging.getLogger(__name__)
 
 
+def audio_content_key(audio_data: np.ndarray) -> str:
+    """
+    Hash the full content of an audio array
+    
+    Every sample is fed to SHA-256 in a single streaming pass (the buffer is
+    hashed in place, without a copy), so arrays that differ anywhere get
+    different keys. SHA-256 is used over BLAKE2b because OpenSSL runs it on
+    the CPU's SHA extensions, which is several times faster on long buffers.
+    
+    Args:
+        audio_data: Audio samples
+        
+    Returns:
+        Hex digest of dtype, shape and samples
+    """
+    audio = np.ascontiguousarray(audio_data)
+    hasher = hashlib.sha256(f"{audio.dtype.str}|{audio.shape}|".encode())
+    hasher.update(memoryview(audio).cast("B"))
+    return hasher.hexdigest()[:32]
+
+
+class DiskPromptCache:
+    """
+    On-disk second tier for voice clone prompts with a byte budget
+    
+    Each prompt is one file named after its cache key, written atomically in
+    the compact format from ``app.utils.serialization``. The index is rebuilt
+    from the directory on startup, so prompts survive restarts; file mtimes
+    track recency and the least recently used files are removed when the
+    budget is exceeded.
+    """
+    
+    FILE_SUFFIX = ".qvpc"
+    
+    def __init__(self, directory: str, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Initialize cache
+        
+        Args:
+            directory: Directory holding cached prompt files (created if missing)
+            max_bytes: Maximum total size of cached files in bytes
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._errors = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+    
+    def _path(self, cache_key: str) -> str:
+        """Get the file path for a cache key"""
+        return os.path.join(self.directory, cache_key + self.FILE_SUFFIX)
+    
+    def _load_index(self):
+        """Rebuild the index from files on disk, oldest first"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.FILE_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-len(self.FILE_SUFFIX)], stat.st_size))
+        
+        for _, cache_key, size in sorted(entries):
+            self._index[cache_key] = size
+            self._bytes += size
+        
+        if self._index:
+            logger.info(
+                f"Loaded {len(self._index)} voice prompts ({self._bytes} bytes) from {self.directory}"
+            )
+        self._evict()
+    
+    def _evict(self):
+        """Remove least recently used files until within budget (called under lock)"""
+        while self._index and self._bytes > self.max_bytes:
+            oldest_key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+            try:
+                os.remove(self._path(oldest_key))
+            except OSError:
+                pass
+            logger.debug(f"Evicted disk cache entry: {oldest_key}")
+    
+    def _discard(self, cache_key: str):
+        """Drop an unreadable entry (called under lock)"""
+        size = self._index.pop(cache_key, None)
+        if size is not None:
+            self._bytes -= size
+        try:
+            os.remove(self._path(cache_key))
+        except OSError:
+            pass
+    
+    def get(self, cache_key: str) -> Optional[Any]:
+        """
+        Load a cached voice prompt from disk
+        
+        Args:
+            cache_key: Voice prompt cache key
+            
+        Returns:
+            Prompt items or None if not found or unreadable
+        """
+        with self._lock:
+            if cache_key not in self._index:
+                self._misses += 1
+                return None
+        
+        path = self._path(cache_key)
+        try:
+            with open(path, "rb") as f:
+                prompt_items, _ = deserialize_prompt(f.read())
+            os.utime(path)
+        except Exception as e:
+            logger.warning(f"Dropping unreadable disk cache entry {cache_key}: {e}")
+            with self._lock:
+                self._discard(cache_key)
+                self._errors += 1
+                self._misses += 1
+            return None
+        
+        with self._lock:
+            if cache_key in self._index:
+                self._index.move_to_end(cache_key)
+            self._hits += 1
+        logger.debug(f"Disk cache hit: {cache_key}")
+        return prompt_items
+    
+    def put(self, cache_key: str, prompt_items: Any):
+        """
+        Write a voice prompt to disk
+        
+        Args:
+            cache_key: Voice prompt cache key
+            prompt_items: Voice clone prompt to persist
+        """
+        try:
+            blob = serialize_prompt(prompt_items, {"cache_key": cache_key})
+        except Exception as e:
+            with self._lock:
+                self._errors += 1
+            logger.warning(f"Cannot persist voice prompt {cache_key}: {e}")
+            return
+        
+        if len(blob) > self.max_bytes:
+            return
+        
+        # Write to a temporary file first so readers never see a partial entry
+        path = self._path(cache_key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            with self._lock:
+                self._errors += 1
+            logger.warning(f"Failed to write disk cache entry {cache_key}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        
+        with self._lock:
+            self._bytes += len(blob) - self._index.pop(cache_key, 0)
+            self._index[cache_key] = len(blob)
+            self._evict()
+            logger.debug(f"Persisted voice prompt: {cache_key}")
+    
+    def clear(self):
+        """Remove all cached prompt files"""
+        with self._lock:
+            for cache_key in list(self._index):
+                self._discard(cache_key)
+            self._bytes = 0
+            logger.info("Disk voice prompt cache cleared")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with cache stats
+        """
+        with self._lock:
+            total_requests = self._hits + self._misses
+            hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0
+            
+            return {
+                "enabled": True,
+                "directory": self.directory,
+                "size": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "errors": self._errors,
+                "hit_rate_percent": round(hit_rate, 2),
+                "total_requests": total_requests,
+            }
+    
+    def reset_stats(self):
+        """Reset cache statistics"""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._errors = 0
+
+
 class VoicePromptCache:
     """
     Thread-safe LRU cache for voice clone prompts
     """
     
-    def __init__(self, max_size: int = 100, ttl_seconds: int = 3600):
+    def __init__(
+        self,
+        max_size: int = 100,
+        ttl_seconds: int = 3600,
+        disk_cache: Optional[DiskPromptCache] = None,
+    ):
         """
         Initialize cache
         
         Args:
             max_size: Maximum number of prompts to cache
             ttl_seconds: Time-to-live for cached prompts in seconds
+            disk_cache: Optional on-disk second tier consulted on misses
         """
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
+        self.disk_cache = disk_cache
         self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
         self._lock = threading.Lock()
         self._hits = 0
         self._misses = 0
         self._evictions = 0
+        self._coalesced = 0
+        self._inflight = SingleFlight()
     
     def _generate_cache_key(
         self,
         audio_data: np.ndarray,
         sample_rate: int,
         ref_text: Optional[str],
-        x_vector_only_mode: bool
+        x_vector_only_mode: bool,
+        audio_key: Optional[str] = None,
+        model_version: str = "",
     ) -> str:
         """
         Generate a unique cache key based on audio content and parameters
@@ -48,36 +286,28 @@ class VoicePromptCache:
             sample_rate: Sample rate
             ref_text: Reference text transcript
             x_vector_only_mode: Whether using x-vector only mode
+            audio_key: Precomputed audio_content_key() of audio_data
+            model_version: Version tag of the Base model extracting the prompt
             
         Returns:
             Hash-based cache key
         """
-        # Create hash from audio data (sample from start, middle, end + total length)
-        n = len(audio_data)
-        chunk_size = min(500, n)
-        mid = n // 2
-        audio_sample = b"".join([
-            audio_data[:chunk_size].tobytes(),
-            audio_data[mid:mid + chunk_size].tobytes(),
-            audio_data[-chunk_size:].tobytes(),
-            n.to_bytes(8, "little"),
-        ])
-        audio_hash = hashlib.sha256(audio_sample).hexdigest()[:16]
-        
-        # Include ref_text and mode in the key
-        text_part = ref_text if ref_text else "no_text"
+        if audio_key is None:
+            audio_key = audio_content_key(audio_data)
+        text = (ref_text or "").encode("utf-8")
         mode_part = "xvec" if x_vector_only_mode else "full"
         
-        # Combine into cache key
-        cache_key = f"{audio_hash}_{text_part[:32]}_{mode_part}_{sample_rate}"
-        return hashlib.md5(cache_key.encode()).hexdigest()
+        hasher = hashlib.sha256(f"{model_version}|{audio_key}|{sample_rate}|{mode_part}|".encode())
+        hasher.update(text)
+        return hasher.hexdigest()[:32]
     
     def get(
         self,
         audio_data: np.ndarray,
         sample_rate: int,
         ref_text: Optional[str],
-        x_vector_only_mode: bool
+        x_vector_only_mode: bool,
+        cache_key: Optional[str] = None,
     ) -> Optional[Any]:
         """
         Get cached voice prompt if available
@@ -87,13 +317,15 @@ class VoicePromptCache:
             sample_rate: Sample rate
             ref_text: Reference text transcript
             x_vector_only_mode: Whether using x-vector only mode
+            cache_key: Precomputed key (skips hashing the audio again)
             
         Returns:
             Cached prompt items or None if not found/expired
         """
-        cache_key = self._generate_cache_key(
-            audio_data, sample_rate, ref_text, x_vector_only_mode
-        )
+        if cache_key is None:
+            cache_key = self._generate_cache_key(
+                audio_data, sample_rate, ref_text, x_vector_only_mode
+            )
         
         with self._lock:
             if cache_key in self._cache:
@@ -123,7 +355,8 @@ class VoicePromptCache:
         sample_rate: int,
         ref_text: Optional[str],
         x_vector_only_mode: bool,
-        prompt_items: Any
+        prompt_items: Any,
+        cache_key: Optional[str] = None,
     ) -> str:
         """
         Store voice prompt in cache
@@ -134,13 +367,15 @@ class VoicePromptCache:
             ref_text: Reference text transcript
             x_vector_only_mode: Whether using x-vector only mode
             prompt_items: Voice clone prompt to cache
+            cache_key: Precomputed key (skips hashing the audio again)
             
         Returns:
             Cache key used for storage
         """
-        cache_key = self._generate_cache_key(
-            audio_data, sample_rate, ref_text, x_vector_only_mode
-        )
+        if cache_key is None:
+            cache_key = self._generate_cache_key(
+                audio_data, sample_rate, ref_text, x_vector_only_mode
+            )
         
         with self._lock:
             # Evict oldest if at capacity
@@ -164,11 +399,75 @@ class VoicePromptCache:
             logger.debug(f"Cached voice prompt: {cache_key}")
             return cache_key
     
+    async def get_or_create(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        ref_text: Optional[str],
+        x_vector_only_mode: bool,
+        create: Callable[[], Awaitable[Any]],
+        audio_key: Optional[str] = None,
+        model_version: str = "",
+    ) -> Tuple[Any, str]:
+        """
+        Get cached voice prompt, or extract it once for all concurrent callers
+        
+        On a miss, the first caller checks the disk tier (promoting a hit to
+        memory) and otherwise runs ``create`` and stores the result in both
+        tiers; callers with the same cache key arriving while the lookup is in
+        flight await it instead of running their own.
+        
+        Args:
+            audio_data: Reference audio data
+            sample_rate: Sample rate
+            ref_text: Reference text transcript
+            x_vector_only_mode: Whether using x-vector only mode
+            create: Coroutine function that extracts the prompt
+            audio_key: Precomputed audio_content_key() of audio_data
+            model_version: Version tag of the Base model (prompts of other
+                versions are never returned)
+            
+        Returns:
+            Tuple of (prompt_items, status) where status is "hit", "miss" or "coalesced"
+        """
+        # Hash once; the same key addresses memory, disk and in-flight lookups
+        cache_key = self._generate_cache_key(
+            audio_data, sample_rate, ref_text, x_vector_only_mode, audio_key, model_version
+        )
+        
+        prompt_items = self.get(audio_data, sample_rate, ref_text, x_vector_only_mode, cache_key)
+        if prompt_items is not None:
+            return prompt_items, "hit"
+        
+        async def extract():
+            if self.disk_cache is not None:
+                stored = await asyncio.to_thread(self.disk_cache.get, cache_key)
+                if stored is not None:
+                    self.put(audio_data, sample_rate, ref_text, x_vector_only_mode, stored, cache_key)
+                    return stored, "hit"
+            
+            extracted = await create()
+            self.put(audio_data, sample_rate, ref_text, x_vector_only_mode, extracted, cache_key)
+            if self.disk_cache is not None:
+                await asyncio.to_thread(self.disk_cache.put, cache_key, extracted)
+            return extracted, "miss"
+        
+        (prompt_items, status), shared = await self._inflight.do(cache_key, extract)
+        if shared:
+            with self._lock:
+                self._coalesced += 1
+            logger.debug(f"Coalesced voice prompt extraction: {cache_key}")
+            return prompt_items, "coalesced"
+        
+        return prompt_items, status
+    
     def clear(self):
-        """Clear all cached prompts"""
+        """Clear all cached prompts (both tiers)"""
         with self._lock:
             self._cache.clear()
             logger.info("Voice prompt cache cleared")
+        if self.disk_cache is not None:
+            self.disk_cache.clear()
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -189,6 +488,9 @@ class VoicePromptCache:
                 "evictions": self._evictions,
                 "hit_rate_percent": round(hit_rate, 2),
                 "total_requests": total_requests,
+                "coalesced": self._coalesced,
+                "inflight_extractions": self._inflight.get_stats()["inflight"],
+                "l2": self.disk_cache.get_stats() if self.disk_cache is not None else {"enabled": False},
             }
     
     def reset_stats(self):
@@ -197,11 +499,371 @@ class VoicePromptCache:
             self._hits = 0
             self._misses = 0
             self._evictions = 0
+            self._coalesced = 0
+            self._inflight.reset_stats()
             logger.info("Cache statistics reset")
+        if self.disk_cache is not None:
+            self.disk_cache.reset_stats()
+
+
+class OutputAudioCache:
+    """
+    Thread-safe LRU cache of encoded output audio with a byte budget
+    
+    Entries are keyed on the full request parameters plus the model path and
+    dtype, so a hit can be served without touching the model.
+    """
+    
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: int = 86400):
+        """
+        Initialize cache
+        
+        Args:
+            max_bytes: Maximum total size of cached audio in bytes
+            ttl_seconds: Time-to-live for cached audio in seconds
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    @staticmethod
+    def make_key(
+        model_type: str,
+        params: Dict[str, Any],
+        model_version: str,
+        model_dtype: str,
+        audio_format: str = "wav",
+    ) -> str:
+        """
+        Generate a cache key from request parameters and model identity
+        
+        Args:
+            model_type: Model type serving the request
+            params: Request parameters that determine the output
+            model_version: Version tag of the loaded model (see ModelManager.get_model_version)
+            model_dtype: Model dtype
+            audio_format: Codec the cached audio is encoded with
+            
+        Returns:
+            Hash-based cache key
+        """
+        # Cached audio is keyed on its codec; base64 vs file is applied per response
+        params = {
+            key: value for key, value in params.items()
+            if key not in ("response_format", "audio_format")
+        }
+        payload = json.dumps(
+            {
+                "model_type": model_type,
+                "model_version": model_version,
+                "model_dtype": model_dtype,
+                "audio_format": audio_format,
+                "params": params,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _remove(self, cache_key: str):
+        """Remove an entry (called under lock)"""
+        entry = self._cache.pop(cache_key)
+        self._bytes -= len(entry["audio"])
+    
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get cached audio if available
+        
+        Args:
+            cache_key: Key from make_key()
+            
+        Returns:
+            Dictionary with audio bytes, sample_rate and duration, or None
+        """
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is None:
+                self._misses += 1
+                return None
+            
+            if time.time() - entry["timestamp"] > self.ttl_seconds:
+                self._remove(cache_key)
+                self._misses += 1
+                return None
+            
+            self._cache.move_to_end(cache_key)
+            self._hits += 1
+            return entry
+    
+    def put(self, cache_key: str, audio: bytes, sample_rate: int, duration: float):
+        """
+        Store encoded audio
+        
+        Args:
+            cache_key: Key from make_key()
+            audio: Encoded audio bytes
+            sample_rate: Sample rate in Hz
+            duration: Audio duration in seconds
+        """
+        size = len(audio)
+        if size > self.max_bytes:
+            logger.debug(f"Output audio too large to cache: {size} bytes")
+            return
+        
+        with self._lock:
+            if cache_key in self._cache:
+                self._remove(cache_key)
+            
+            # Evict least recently used entries until the new one fits
+            while self._cache and self._bytes + size > self.max_bytes:
+                oldest_key = next(iter(self._cache))
+                self._remove(oldest_key)
+                self._evictions += 1
+                logger.debug(f"Evicted output cache entry: {oldest_key}")
+            
+            self._cache[cache_key] = {
+                "audio": audio,
+                "sample_rate": sample_rate,
+                "duration": duration,
+                "timestamp": time.time(),
+            }
+            self._bytes += size
+    
+    def clear(self):
+        """Clear all cached audio"""
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+            logger.info("Output audio cache cleared")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with cache stats
+        """
+        with self._lock:
+            total_requests = self._hits + self._misses
+            hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0
+            
+            return {
+                "size": len(self._cache),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate_percent": round(hit_rate, 2),
+                "total_requests": total_requests,
+            }
+    
+    def reset_stats(self):
+        """Reset cache statistics"""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+class ReferenceAudioCache:
+    """
+    Thread-safe LRU cache of preprocessed reference audio with a byte budget
+    
+    Entries are keyed on a fingerprint of the raw encoded reference (base64
+    payload or downloaded bytes) plus the preprocessing settings, so a
+    repeated reference skips decoding and preprocessing entirely. Each entry
+    also carries the audio content key used by the voice prompt cache, so
+    the prompt lookup does not rehash the samples. For URLs, the last
+    ETag/Last-Modified seen is kept to allow conditional requests.
+    """
+    
+    MAX_URLS = 1024
+    
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize cache
+        
+        Args:
+            max_bytes: Maximum total size of cached audio arrays in bytes
+        """
+        self.max_bytes = max_bytes
+        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._urls: OrderedDict[str, Dict[str, Optional[str]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._not_modified = 0
+    
+    @staticmethod
+    def fingerprint(raw: bytes, settings_tag: str) -> str:
+        """
+        Fingerprint an encoded reference
+        
+        Args:
+            raw: Encoded reference bytes (base64 payload or file content)
+            settings_tag: Preprocessing settings the cached audio depends on
+            
+        Returns:
+            Hash-based cache key
+        """
+        hasher = hashlib.sha256(settings_tag.encode("utf-8") + b"|")
+        hasher.update(raw)
+        return hasher.hexdigest()
+    
+    def get(self, fingerprint: str) -> Optional[Tuple[np.ndarray, int, str]]:
+        """
+        Get preprocessed reference audio
+        
+        Args:
+            fingerprint: Key from fingerprint()
+            
+        Returns:
+            Tuple of (audio_data, sample_rate, audio_key) or None
+        """
+        with self._lock:
+            entry = self._cache.get(fingerprint)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._cache.move_to_end(fingerprint)
+            self._hits += 1
+            return entry["audio_data"], entry["sample_rate"], entry["audio_key"]
+    
+    def put(self, fingerprint: str, audio_data: np.ndarray, sample_rate: int, audio_key: str):
+        """
+        Store preprocessed reference audio
+        
+        Args:
+            fingerprint: Key from fingerprint()
+            audio_data: Preprocessed audio
+            sample_rate: Sample rate in Hz
+            audio_key: audio_content_key() of audio_data
+        """
+        size = audio_data.nbytes
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            previous = self._cache.pop(fingerprint, None)
+            if previous is not None:
+                self._bytes -= previous["audio_data"].nbytes
+            
+            while self._cache and self._bytes + size > self.max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._bytes -= evicted["audio_data"].nbytes
+                self._evictions += 1
+            
+            self._cache[fingerprint] = {
+                "audio_data": audio_data,
+                "sample_rate": sample_rate,
+                "audio_key": audio_key,
+            }
+            self._bytes += size
+    
+    def get_url_validator(self, url: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Get the validators last seen for a URL
+        
+        Args:
+            url: Reference audio URL
+            
+        Returns:
+            Dictionary with etag, last_modified and fingerprint, or None
+        """
+        with self._lock:
+            validator = self._urls.get(url)
+            if validator is not None:
+                self._urls.move_to_end(url)
+            return validator
+    
+    def set_url_validator(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        fingerprint: str,
+    ):
+        """
+        Remember the validators of a downloaded URL
+        
+        Args:
+            url: Reference audio URL
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            fingerprint: Fingerprint of the downloaded content
+        """
+        with self._lock:
+            if not etag and not last_modified:
+                self._urls.pop(url, None)
+                return
+            self._urls[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "fingerprint": fingerprint,
+            }
+            self._urls.move_to_end(url)
+            while len(self._urls) > self.MAX_URLS:
+                self._urls.popitem(last=False)
+    
+    def record_not_modified(self):
+        """Count a conditional request answered with 304 Not Modified"""
+        with self._lock:
+            self._not_modified += 1
+    
+    def clear(self):
+        """Clear all cached references"""
+        with self._lock:
+            self._cache.clear()
+            self._urls.clear()
+            self._bytes = 0
+            logger.info("Reference audio cache cleared")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with cache stats
+        """
+        with self._lock:
+            total_requests = self._hits + self._misses
+            hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0
+            
+            return {
+                "size": len(self._cache),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "urls": len(self._urls),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "not_modified": self._not_modified,
+                "hit_rate_percent": round(hit_rate, 2),
+                "total_requests": total_requests,
+            }
+    
+    def reset_stats(self):
+        """Reset cache statistics"""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._not_modified = 0
 
 
 # Global cache instance
 _voice_cache: Optional[VoicePromptCache] = None
+_output_cache: Optional[OutputAudioCache] = None
+_segment_cache: Optional[OutputAudioCache] = None
+_reference_cache: Optional[ReferenceAudioCache] = None
 _cache_lock = threading.Lock()
 
 
@@ -213,9 +875,20 @@ def get_voice_cache() -> VoicePromptCache:
         with _cache_lock:
             if _voice_cache is None:
                 from app.config import settings
+                disk_cache = None
+                if settings.voice_cache_disk_dir:
+                    # Prompts are model-specific; keep one directory per Base model
+                    model_tag = hashlib.sha256(
+                        f"{settings.qwen_tts_base_model}|{settings.model_dtype}".encode()
+                    ).hexdigest()[:16]
+                    disk_cache = DiskPromptCache(
+                        directory=os.path.join(settings.voice_cache_disk_dir, model_tag),
+                        max_bytes=int(settings.voice_cache_disk_max_mb * 1024 * 1024),
+                    )
                 _voice_cache = VoicePromptCache(
                     max_size=settings.voice_cache_max_size,
-                    ttl_seconds=settings.voice_cache_ttl_seconds
+                    ttl_seconds=settings.voice_cache_ttl_seconds,
+                    disk_cache=disk_cache,
                 )
                 logger.info(
                     f"Initialized voice cache: max_size={settings.voice_cache_max_size}, "
@@ -223,3 +896,61 @@ def get_voice_cache() -> VoicePromptCache:
                 )
     
     return _voice_cache
+
+
+def get_output_cache() -> OutputAudioCache:
+    """Get or create global output audio cache instance"""
+    global _output_cache
+    
+    if _output_cache is None:
+        with _cache_lock:
+            if _output_cache is None:
+                from app.config import settings
+                _output_cache = OutputAudioCache(
+                    max_bytes=int(settings.output_cache_max_mb * 1024 * 1024),
+                    ttl_seconds=settings.output_cache_ttl_seconds
+                )
+                logger.info(
+                    f"Initialized output cache: max_mb={settings.output_cache_max_mb}, "
+                    f"ttl={settings.output_cache_ttl_seconds}s"
+                )
+    
+    return _output_cache
+
+
+def get_segment_cache() -> OutputAudioCache:
+    """Get or create global long-form segment audio cache instance"""
+    global _segment_cache
+    
+    if _segment_cache is None:
+        with _cache_lock:
+            if _segment_cache is None:
+                from app.config import settings
+                _segment_cache = OutputAudioCache(
+                    max_bytes=int(settings.longform_segment_cache_max_mb * 1024 * 1024),
+                    ttl_seconds=settings.output_cache_ttl_seconds
+                )
+                logger.info(
+                    f"Initialized long-form segment cache: "
+                    f"max_mb={settings.longform_segment_cache_max_mb}"
+                )
+    
+    return _segment_cache
+
+
+def get_reference_cache() -> ReferenceAudioCache:
+    """Get or create global reference audio cache instance"""
+    global _reference_cache
+    
+    if _reference_cache is None:
+        with _cache_lock:
+            if _reference_cache is None:
+                from app.config import settings
+                _reference_cache = ReferenceAudioCache(
+                    max_bytes=int(settings.ref_audio_cache_max_mb * 1024 * 1024)
+                )
+                logger.info(
+                    f"Initialized reference audio cache: max_mb={settings.ref_audio_cache_max_mb}"
+                )
+    
+    return _reference_cache
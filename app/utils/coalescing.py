@@ -0,0 +1,160 @@
+"""
+In-flight request coalescing utilities
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Registry of in-flight async operations keyed by a string
+
+    The first caller for a key starts the operation; callers arriving while it
+    is running await the same result instead of starting their own. The
+    operation runs as its own task, so a leader that disconnects does not
+    cancel the work for everyone else.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key: Key identifying identical work
+            fn: Zero-argument coroutine function performing the work
+
+        Returns:
+            Tuple of (result, shared) where shared is True if this caller
+            joined an operation started by another caller
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            task = self._inflight.get(key)
+            shared = task is not None and task.get_loop() is loop and not task.done()
+            if shared:
+                self._coalesced += 1
+            else:
+                task = loop.create_task(fn())
+                self._inflight[key] = task
+                self._leaders += 1
+                task.add_done_callback(lambda t: self._finish(key, t))
+
+        if shared:
+            logger.debug(f"Joined in-flight operation: {key}")
+        return await asyncio.shield(task), shared
+
+    def _finish(self, key: str, task: asyncio.Task):
+        """Remove a finished operation from the registry"""
+        with self._lock:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing statistics
+
+        Returns:
+            Dictionary with in-flight count, leaders and coalesced callers
+        """
+        with self._lock:
+            return {
+                "inflight": len(self._inflight),
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+            }
+
+    def reset_stats(self):
+        """Reset coalescing counters"""
+        with self._lock:
+            self._leaders = 0
+            self._coalesced = 0
+
+
+def _normalize_param(value: Any) -> Any:
+    """Normalize a request parameter so equivalent values compare equal"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if value is None:
+        return ""
+    return value
+
+
+def make_request_key(model_type: str, params: Dict[str, Any]) -> str:
+    """
+    Build a key identifying identical generation requests
+
+    Args:
+        model_type: Model type serving the request
+        params: Request parameters that determine the output
+
+    Returns:
+        Hex digest of the normalized parameter set
+    """
+    normalized = {key: _normalize_param(value) for key, value in params.items()}
+    payload = json.dumps(
+        {"model_type": model_type, "params": normalized},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Per-model registries of in-flight generation requests
+_request_coalescers: Dict[str, SingleFlight] = {}
+_coalescers_lock = threading.Lock()
+
+
+def get_request_coalescer(model_type: str) -> SingleFlight:
+    """Get or create the in-flight generation registry for a model type"""
+    with _coalescers_lock:
+        if model_type not in _request_coalescers:
+            _request_coalescers[model_type] = SingleFlight()
+        return _request_coalescers[model_type]
+
+
+def get_request_coalescing_stats() -> Dict[str, Dict[str, Any]]:
+    """Get generation coalescing statistics for every model type"""
+    with _coalescers_lock:
+        coalescers = dict(_request_coalescers)
+    return {model_type: flight.get_stats() for model_type, flight in coalescers.items()}
+
+
+async def coalesce_request(
+    model_type: str,
+    params: Dict[str, Any],
+    fn: Callable[[], Awaitable[Any]],
+    tracker=None,
+) -> Any:
+    """
+    Run a generation once for all identical requests in flight
+
+    Args:
+        model_type: Model type serving the request
+        params: Request parameters that determine the output
+        fn: Coroutine function performing the generation
+        tracker: Optional PerformanceTracker; marked "coalesced" when the result is shared
+
+    Returns:
+        Result of the (possibly shared) generation
+    """
+    flight = get_request_coalescer(model_type)
+    result, shared = await flight.do(make_request_key(model_type, params), fn)
+    if shared and tracker is not None:
+        tracker.set_cache_status("coalesced")
+    return result
@@ -0,0 +1,269 @@
+"""
+Output audio codecs
+
+Generated audio is 24 kHz mono. As 16-bit WAV that is 48 KB per second of
+speech (~2.9 MB a minute, a third more again as base64). FLAC halves that
+losslessly; Ogg/Opus and MP3 are lossy but an order of magnitude smaller.
+All codecs are encoded by libsndfile through soundfile.
+
+StreamEncoder encodes incrementally: each chunk written returns the bytes
+the encoder has produced so far, so a streamed response never holds more
+than the encoder's internal buffer. AudioFileWriter does the same into a
+file on disk.
+"""
+import io
+import logging
+from dataclasses import dataclass
+from typing import Dict
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AudioCodec:
+    """libsndfile format and HTTP metadata of an output codec"""
+    name: str
+    container: str
+    subtype: str
+    media_type: str
+    extension: str
+
+
+AUDIO_CODECS: Dict[str, AudioCodec] = {
+    "wav": AudioCodec("wav", "WAV", "PCM_16", "audio/wav", "wav"),
+    "flac": AudioCodec("flac", "FLAC", "PCM_16", "audio/flac", "flac"),
+    "opus": AudioCodec("opus", "OGG", "OPUS", "audio/ogg", "opus"),
+    "mp3": AudioCodec("mp3", "MP3", "MPEG_LAYER_III", "audio/mpeg", "mp3"),
+}
+
+# Sample rates the Opus encoder accepts; anything else is resampled to 48 kHz
+_OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def get_codec(audio_format: str) -> AudioCodec:
+    """
+    Look up an output codec
+
+    Args:
+        audio_format: Codec name ("wav", "flac", "opus" or "mp3")
+
+    Returns:
+        AudioCodec
+
+    Raises:
+        ValueError: If the codec is not supported
+    """
+    try:
+        return AUDIO_CODECS[audio_format]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported audio format: {audio_format}. Supported: {', '.join(AUDIO_CODECS)}"
+        ) from None
+
+
+def resolve_audio_format(response_format: str, audio_format: str = "wav") -> str:
+    """
+    Get the codec for a request
+
+    File downloads name the codec in response_format; base64 and zip
+    responses carry it in audio_format.
+
+    Args:
+        response_format: Request response_format
+        audio_format: Request audio_format
+
+    Returns:
+        Codec name
+    """
+    return response_format if response_format in AUDIO_CODECS else audio_format
+
+
+def encoded_sample_rate(audio_format: str, sample_rate: int) -> int:
+    """
+    Get the sample rate audio is encoded at
+
+    Args:
+        audio_format: Codec name
+        sample_rate: Sample rate of the generated audio
+
+    Returns:
+        Sample rate of the encoded audio
+    """
+    if audio_format == "opus" and sample_rate not in _OPUS_SAMPLE_RATES:
+        return 48000
+    return sample_rate
+
+
+def _resample(audio_data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Resample audio if the codec needs a different sample rate"""
+    if orig_sr == target_sr:
+        return audio_data
+    import librosa
+    return librosa.resample(np.asarray(audio_data, dtype=np.float32), orig_sr=orig_sr, target_sr=target_sr)
+
+
+def encode_audio(audio_data: np.ndarray, sample_rate: int, audio_format: str = "wav") -> bytes:
+    """
+    Encode audio as a complete file
+
+    Args:
+        audio_data: Audio data as numpy array
+        sample_rate: Sample rate in Hz
+        audio_format: Codec name
+
+    Returns:
+        Encoded file bytes
+    """
+    codec = get_codec(audio_format)
+    target_sr = encoded_sample_rate(audio_format, sample_rate)
+    audio_data = _resample(audio_data, sample_rate, target_sr)
+
+    buffer = io.BytesIO()
+    sf.write(buffer, audio_data, target_sr, format=codec.container, subtype=codec.subtype)
+    return buffer.getvalue()
+
+
+class _StreamSink:
+    """
+    Write-only file object that hands out bytes as they are written
+
+    Encoders seek back on close to patch headers (FLAC STREAMINFO, the MP3
+    Xing frame). Bytes that were already drained cannot change, so writes
+    into them are dropped; the placeholders left in their place are valid
+    ("unknown length") for both formats.
+    """
+
+    def __init__(self):
+        self._pending = bytearray()
+        self._drained = 0
+        self._position = 0
+
+    def write(self, data) -> int:
+        view = memoryview(data).cast("B")
+        size = len(view)
+        offset = self._position - self._drained
+        if offset < 0:
+            view = view[-offset:]
+            offset = 0
+        if len(view):
+            end = offset + len(view)
+            if end > len(self._pending):
+                self._pending.extend(bytes(end - len(self._pending)))
+            self._pending[offset:end] = view
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._drained + len(self._pending)
+        self._position = offset
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        return b""
+
+    def drain(self) -> bytes:
+        """Take the bytes written since the last drain"""
+        data = bytes(self._pending)
+        self._drained += len(data)
+        self._pending.clear()
+        return data
+
+
+class StreamEncoder:
+    """Incremental encoder for streamed responses"""
+
+    def __init__(self, audio_format: str, sample_rate: int, channels: int = 1):
+        """
+        Initialize the encoder
+
+        Args:
+            audio_format: Codec name ("flac", "opus" or "mp3"; "wav" works
+                but its header reports the length written at that point)
+            sample_rate: Sample rate of the audio that will be written
+            channels: Number of channels
+        """
+        self.codec = get_codec(audio_format)
+        self.input_sample_rate = sample_rate
+        self.sample_rate = encoded_sample_rate(audio_format, sample_rate)
+        self._sink = _StreamSink()
+        self._file = sf.SoundFile(
+            self._sink,
+            mode="w",
+            samplerate=self.sample_rate,
+            channels=channels,
+            format=self.codec.container,
+            subtype=self.codec.subtype,
+        )
+
+    def encode(self, audio_data: np.ndarray) -> bytes:
+        """
+        Encode a chunk of audio
+
+        Args:
+            audio_data: Audio chunk at the encoder's input sample rate
+
+        Returns:
+            Encoded bytes produced so far (may be empty while the encoder buffers)
+        """
+        self._file.write(_resample(audio_data, self.input_sample_rate, self.sample_rate))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """
+        Flush the encoder
+
+        Returns:
+            Remaining encoded bytes
+        """
+        if not self._file.closed:
+            self._file.close()
+        return self._sink.drain()
+
+
+class AudioFileWriter:
+    """Encoder writing audio to a file chunk by chunk"""
+
+    def __init__(self, path: str, audio_format: str, sample_rate: int, channels: int = 1):
+        """
+        Initialize the writer
+
+        Args:
+            path: Output file path
+            audio_format: Codec name
+            sample_rate: Sample rate of the audio that will be written
+            channels: Number of channels
+        """
+        self.codec = get_codec(audio_format)
+        self.input_sample_rate = sample_rate
+        self.sample_rate = encoded_sample_rate(audio_format, sample_rate)
+        # A seekable file gets complete headers (lengths, FLAC STREAMINFO) on close
+        self._file = sf.SoundFile(
+            str(path),
+            mode="w",
+            samplerate=self.sample_rate,
+            channels=channels,
+            format=self.codec.container,
+            subtype=self.codec.subtype,
+        )
+
+    def write(self, audio_data: np.ndarray):
+        """
+        Encode a chunk of audio into the file
+
+        Args:
+            audio_data: Audio chunk at the writer's input sample rate
+        """
+        self._file.write(_resample(audio_data, self.input_sample_rate, self.sample_rate))
+
+    def close(self):
+        """Flush the encoder and close the file"""
+        if not self._file.closed:
+            self._file.close()
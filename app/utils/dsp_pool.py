@@ -0,0 +1,281 @@
+"""
+Off-loop execution of CPU-bound audio DSP
+
+Decoding reference audio, preprocessing it and time-stretching generated
+audio are pure CPU work. Running them on the event loop stalls every other
+request, and running them on threads still competes with the inference
+threads for the GIL. With DSP_POOL_WORKERS > 0 these stages run in a pool of
+worker processes instead; otherwise they run on the default thread pool.
+
+Arrays cross the process boundary through shared memory: the sender copies
+the samples into a named segment and only a small (name, shape, dtype)
+reference is pickled. Segments are freed when the work item finishes, even
+if the request that submitted it was cancelled in the meantime.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Arrays smaller than this are cheaper to pickle than to map
+_SHM_MIN_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class SharedArrayRef:
+    """Picklable reference to an array held in a shared memory segment"""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def _share(value: Any, segments: List[shared_memory.SharedMemory]) -> Any:
+    """Move a large array into a new shared memory segment"""
+    if not isinstance(value, np.ndarray) or value.nbytes < _SHM_MIN_BYTES:
+        return value
+
+    segment = shared_memory.SharedMemory(create=True, size=value.nbytes)
+    segments.append(segment)
+    np.ndarray(value.shape, dtype=value.dtype, buffer=segment.buf)[...] = value
+    return SharedArrayRef(segment.name, tuple(value.shape), value.dtype.str)
+
+
+def _attach(value: Any, segments: List[shared_memory.SharedMemory]) -> Any:
+    """Map a shared array reference; other values pass through"""
+    if not isinstance(value, SharedArrayRef):
+        return value
+
+    segment = shared_memory.SharedMemory(name=value.name)
+    segments.append(segment)
+    return np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=segment.buf)
+
+
+def _release(segments: List[shared_memory.SharedMemory], unlink: bool = False):
+    """Close (and optionally unlink) shared memory segments"""
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            # A view is still alive; the mapping goes when it is collected
+            pass
+        if unlink:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _map_result(result: Any, fn: Callable[[Any], Any]) -> Any:
+    """Apply fn to a result or to each item of a tuple result"""
+    if isinstance(result, tuple):
+        return tuple(fn(item) for item in result)
+    return fn(result)
+
+
+def _invoke(func: Callable, args: tuple, kwargs: dict) -> Any:
+    """
+    Worker entry point: attach shared inputs, run func, share the outputs
+
+    Output segments are created here and unlinked by the parent once it has
+    copied them out.
+    """
+    inputs: List[shared_memory.SharedMemory] = []
+    outputs: List[shared_memory.SharedMemory] = []
+    try:
+        args = tuple(_attach(arg, inputs) for arg in args)
+        kwargs = {key: _attach(value, inputs) for key, value in kwargs.items()}
+        result = func(*args, **kwargs)
+        # Results may be views of the inputs, so share them before unmapping
+        return _map_result(result, lambda item: _share(item, outputs))
+    except BaseException:
+        _release(outputs, unlink=True)
+        raise
+    finally:
+        args = kwargs = result = None
+        _release(inputs)
+        _release(outputs)
+
+
+class DSPPool:
+    """Process pool running DSP functions with shared memory array hand-off"""
+
+    def __init__(self, max_workers: int):
+        """
+        Initialize the pool
+
+        Args:
+            max_workers: Number of worker processes
+        """
+        self.max_workers = max_workers
+        # Spawn rather than fork: the server process holds CUDA state and threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._active = 0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a module-level function in a worker process
+
+        Array arguments and array items of the (tuple) result are passed
+        through shared memory.
+
+        Args:
+            func: Picklable (module-level) function
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's result
+        """
+        inputs: List[shared_memory.SharedMemory] = []
+        try:
+            shared_args = tuple(_share(arg, inputs) for arg in args)
+            shared_kwargs = {key: _share(value, inputs) for key, value in kwargs.items()}
+            future = self._executor.submit(_invoke, func, shared_args, shared_kwargs)
+        except BaseException:
+            _release(inputs, unlink=True)
+            raise
+
+        with self._lock:
+            self._submitted += 1
+            self._active += 1
+
+        # A work item already handed to a worker cannot be stopped, so its
+        # segments are freed once it finishes rather than when the caller
+        # stops waiting (e.g. on a client disconnect)
+        collected: concurrent.futures.Future = concurrent.futures.Future()
+        future.add_done_callback(functools.partial(self._finish, inputs, collected))
+        try:
+            return await asyncio.shield(asyncio.wrap_future(collected))
+        except asyncio.CancelledError:
+            # Drop the work item if no worker has picked it up yet
+            future.cancel()
+            raise
+
+    def _finish(
+        self,
+        inputs: List[shared_memory.SharedMemory],
+        collected: concurrent.futures.Future,
+        future: concurrent.futures.Future,
+    ):
+        """Free the segments of a finished work item and pass on its result"""
+        result = error = None
+        try:
+            if not future.cancelled():
+                error = future.exception()
+                if error is None:
+                    result = _map_result(future.result(), self._collect)
+        except BaseException as e:
+            error = e
+        finally:
+            _release(inputs, unlink=True)
+            with self._lock:
+                self._active -= 1
+
+        if future.cancelled():
+            collected.cancel()
+        elif error is not None:
+            collected.set_exception(error)
+        else:
+            collected.set_result(result)
+
+    @staticmethod
+    def _collect(value: Any) -> Any:
+        """Copy a shared result array into process memory and free its segment"""
+        if not isinstance(value, SharedArrayRef):
+            return value
+        segments: List[shared_memory.SharedMemory] = []
+        array = _attach(value, segments).copy()
+        _release(segments, unlink=True)
+        return array
+
+    def get_stats(self) -> dict:
+        """
+        Get pool statistics
+
+        Returns:
+            Dictionary with worker count, submitted and active task counts
+        """
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "submitted": self._submitted,
+                "active": self._active,
+            }
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Global DSP pool, created on first use
+_dsp_pool: Optional[DSPPool] = None
+_dsp_pool_lock = threading.Lock()
+
+
+def get_dsp_pool() -> Optional[DSPPool]:
+    """
+    Get the global DSP process pool
+
+    Returns:
+        The pool, or None when DSP_POOL_WORKERS is 0 (run on threads)
+    """
+    from app import config
+
+    global _dsp_pool
+    if config.settings.dsp_pool_workers <= 0:
+        return None
+    with _dsp_pool_lock:
+        if _dsp_pool is None:
+            _dsp_pool = DSPPool(config.settings.dsp_pool_workers)
+            logger.info(f"Started DSP process pool with {_dsp_pool.max_workers} workers")
+        return _dsp_pool
+
+
+def shutdown_dsp_pool():
+    """Stop the global DSP pool if it was started"""
+    global _dsp_pool
+    with _dsp_pool_lock:
+        pool, _dsp_pool = _dsp_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+async def run_dsp(stage: str, func: Callable, *args, tracker=None, **kwargs) -> Any:
+    """
+    Run a CPU-bound DSP stage off the event loop and time it
+
+    Args:
+        stage: Stage name for timing ("decode", "preprocessing", "speed", "encode")
+        func: Module-level function to run
+        *args: Positional arguments for func
+        tracker: Optional PerformanceTracker receiving the stage time
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The function's result
+    """
+    start = time.perf_counter()
+    pool = get_dsp_pool()
+    if pool is not None:
+        result = await pool.run(func, *args, **kwargs)
+    else:
+        result = await asyncio.to_thread(functools.partial(func, *args, **kwargs))
+
+    if tracker is not None:
+        tracker.mark_stage(stage, time.perf_counter() - start)
+    return result
@@ -0,0 +1,316 @@
+"""
+Duplex WebSocket sessions for incremental text-to-speech
+
+Protocol (client messages are JSON text frames):
+
+- ``{"type": "start", ...}`` must come first. It carries the same fields as
+  the model's HTTP request body; ``text`` is optional and, if present, is
+  treated as the first piece of streamed text. The server answers
+  ``{"type": "ready", ...}``.
+- ``{"type": "text", "text": "..."}`` appends text. Complete sentences are
+  generated in order as soon as they are cut from the buffer.
+- ``{"type": "flush"}`` generates whatever text is still buffered and then
+  answers ``{"type": "flushed", ...metrics}`` for the turn.
+- ``{"type": "cancel"}`` drops buffered and queued text, abandons the
+  segment being generated and answers ``{"type": "cancelled"}``.
+- ``{"type": "close"}`` flushes, answers ``{"type": "done"}`` and closes.
+
+For every generated segment the server sends ``{"type": "segment", ...}``
+(index, text, sample_rate, samples) followed by binary frames of 16-bit
+little-endian mono PCM. Failures are reported as ``{"type": "error"}``
+without closing the session.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+import numpy as np
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import BaseModel, ValidationError
+from app.auth import verify_api_key
+from app.utils.metrics import PerformanceTracker
+from app.utils.streaming import SentenceBuffer, pcm16
+
+logger = logging.getLogger(__name__)
+
+Synthesize = Callable[[str, PerformanceTracker], Awaitable[Tuple[np.ndarray, int]]]
+
+# Queue markers
+_FLUSH = object()
+_CLOSE = object()
+
+
+def parse_start_config(model_cls: Type[BaseModel], config: Dict[str, Any]) -> BaseModel:
+    """
+    Validate a start message against an HTTP request schema
+
+    Text is streamed separately, so a placeholder is used when the start
+    message has none; handlers replace it per segment.
+
+    Args:
+        model_cls: Request schema (e.g. CustomVoiceRequest)
+        config: Start message fields
+
+    Returns:
+        Validated request
+    """
+    fields = {key: value for key, value in config.items() if key != "type"}
+    fields["text"] = fields.get("text") or "-"
+    return model_cls.model_validate(fields)
+
+
+async def authenticate_websocket(websocket: WebSocket) -> bool:
+    """
+    Check the API key of a WebSocket handshake with verify_api_key()
+
+    Browsers cannot set headers on WebSocket requests, so the key may also
+    be passed as the ``api_key`` query parameter.
+
+    Args:
+        websocket: Incoming (not yet accepted) WebSocket
+
+    Returns:
+        True if authenticated; otherwise the handshake is rejected
+    """
+    api_key = websocket.headers.get("x-api-key") or websocket.query_params.get("api_key")
+    try:
+        await verify_api_key(api_key)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return False
+    return True
+
+
+class TTSWebSocketSession:
+    """One duplex session: receives text, generates segments, sends audio"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        synthesize: Synthesize,
+        max_chars: int = 150,
+        min_chars: int = 20,
+        chunk_duration: float = 0.5,
+        log: Optional[logging.Logger] = None,
+    ):
+        """
+        Initialize the session
+
+        Args:
+            websocket: Accepted WebSocket
+            synthesize: Coroutine function (text, tracker) -> (audio_data, sample_rate)
+            max_chars: Preferred maximum segment length
+            min_chars: Minimum segment length before flush
+            chunk_duration: Duration of each binary audio frame in seconds
+            log: Logger to write per-turn performance metrics to (None to skip)
+        """
+        self.websocket = websocket
+        self._synthesize = synthesize
+        self._buffer = SentenceBuffer(max_chars, min_chars)
+        self._chunk_duration = chunk_duration
+        self._log = log
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._tracker: Optional[PerformanceTracker] = None
+        self._turn_samples = 0
+        self._turn_sample_rate = 0
+        self._index = 0
+
+    async def _send_json(self, message: Dict[str, Any]):
+        """Send a control message"""
+        await self.websocket.send_text(json.dumps(message))
+
+    def _enqueue(self, segments):
+        """Queue segments, starting the turn's tracker on the first one"""
+        for segment in segments:
+            if self._tracker is None:
+                self._tracker = PerformanceTracker()
+                self._tracker.start()
+                self._turn_samples = 0
+            self._queue.put_nowait(segment)
+
+    async def _send_segment(self, text: str, audio_data: np.ndarray, sample_rate: int):
+        """Send a segment header followed by its PCM frames"""
+        await self._send_json({
+            "type": "segment",
+            "index": self._index,
+            "text": text,
+            "sample_rate": sample_rate,
+            "samples": len(audio_data),
+        })
+        self._index += 1
+
+        view = memoryview(pcm16(audio_data)).cast("B")
+        chunk_bytes = max(2, int(sample_rate * self._chunk_duration) * 2)
+        for start in range(0, len(view), chunk_bytes):
+            await self.websocket.send_bytes(bytes(view[start:start + chunk_bytes]))
+
+    async def _finish_turn(self):
+        """Report metrics for the text generated since the last flush"""
+        tracker, self._tracker = self._tracker, None
+        message: Dict[str, Any] = {"type": "flushed"}
+        if tracker is not None and self._turn_sample_rate:
+            tracker.mark_generation()
+            tracker.set_audio_duration(self._turn_samples / self._turn_sample_rate)
+            if self._log is not None:
+                tracker.log_metrics(self._log)
+            message.update(tracker.get_metrics())
+        await self._send_json(message)
+
+    async def _work(self):
+        """Generate queued segments in order"""
+        while True:
+            item = await self._queue.get()
+
+            if item is _CLOSE:
+                await self._finish_turn()
+                return
+
+            if item is _FLUSH:
+                await self._finish_turn()
+                continue
+
+            tracker = self._tracker or PerformanceTracker()
+            try:
+                audio_data, sample_rate = await self._synthesize(item, tracker)
+            except Exception as e:
+                logger.error(f"WebSocket segment generation failed: {e}")
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                await self._send_json({"type": "error", "detail": detail})
+                continue
+
+            if tracker.time_to_first_audio is None:
+                tracker.mark_first_audio()
+            self._turn_samples += len(audio_data)
+            self._turn_sample_rate = sample_rate
+            await self._send_segment(item, audio_data, sample_rate)
+
+    def _start_worker(self):
+        """Start generating queued segments"""
+        self._worker = asyncio.create_task(self._work())
+
+    async def _stop_worker(self):
+        """Cancel the worker and drop everything queued"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, WebSocketDisconnect):
+                pass
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    async def run(self, initial_text: Optional[str] = None):
+        """
+        Serve the session until the client closes or disconnects
+
+        Args:
+            initial_text: Text from the start message, if any
+        """
+        self._start_worker()
+        if initial_text:
+            self._enqueue(self._buffer.push(initial_text))
+
+        try:
+            while True:
+                try:
+                    message = json.loads(await self.websocket.receive_text())
+                    message_type = message.get("type")
+                except (ValueError, AttributeError):
+                    await self._send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                    continue
+
+                if message_type == "text":
+                    self._enqueue(self._buffer.push(str(message.get("text", ""))))
+
+                elif message_type == "flush":
+                    self._enqueue(self._buffer.flush())
+                    self._queue.put_nowait(_FLUSH)
+
+                elif message_type == "cancel":
+                    self._buffer.clear()
+                    await self._stop_worker()
+                    self._tracker = None
+                    self._start_worker()
+                    await self._send_json({"type": "cancelled"})
+
+                elif message_type == "close":
+                    self._enqueue(self._buffer.flush())
+                    self._queue.put_nowait(_CLOSE)
+                    await self._worker
+                    await self._send_json({"type": "done"})
+                    await self.websocket.close()
+                    return
+
+                else:
+                    await self._send_json({"type": "error", "detail": f"Unknown message type: {message_type}"})
+
+        except WebSocketDisconnect:
+            logger.debug("WebSocket client disconnected")
+        finally:
+            await self._stop_worker()
+
+
+async def serve_tts_websocket(
+    websocket: WebSocket,
+    configure: Callable[[Dict[str, Any], PerformanceTracker], Awaitable[Synthesize]],
+    log: Optional[logging.Logger] = None,
+):
+    """
+    Authenticate, configure and run a duplex TTS session
+
+    Args:
+        websocket: Incoming WebSocket
+        configure: Coroutine function validating the start message and
+            returning the per-segment synthesize function; raises
+            ValidationError or HTTPException for bad configuration
+        log: Logger to write per-turn performance metrics to (None to skip)
+    """
+    from app.config import settings
+
+    if not await authenticate_websocket(websocket):
+        return
+    await websocket.accept()
+
+    try:
+        start = json.loads(await websocket.receive_text())
+        if not isinstance(start, dict) or start.get("type") != "start":
+            raise ValueError("First message must be {\"type\": \"start\", ...}")
+
+        tracker = PerformanceTracker()
+        tracker.start()
+        synthesize = await configure(start, tracker)
+    except WebSocketDisconnect:
+        return
+    except (ValidationError, ValueError, HTTPException) as e:
+        if isinstance(e, HTTPException):
+            detail = e.detail
+        elif isinstance(e, ValidationError):
+            detail = json.loads(e.json(include_url=False))
+        else:
+            detail = str(e)
+        await websocket.send_text(json.dumps({"type": "error", "detail": detail}))
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    except Exception as e:
+        logger.error(f"Error starting WebSocket session: {e}")
+        await websocket.send_text(json.dumps({"type": "error", "detail": str(e)}))
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    await websocket.send_text(json.dumps({
+        "type": "ready",
+        "setup_time": time.time() - tracker.start_time,
+        "cache_status": tracker.cache_status,
+        "preprocessing_time": tracker.preprocessing_time,
+    }))
+
+    session = TTSWebSocketSession(
+        websocket,
+        synthesize,
+        max_chars=settings.stream_segment_max_chars,
+        min_chars=settings.stream_segment_min_chars,
+        log=log,
+    )
+    await session.run(initial_text=start.get("text"))
@@ -0,0 +1,434 @@
+"""
+Long-form document synthesis
+
+Articles of thousands of characters are not generated in one call: the text
+is split into paragraphs and then sentence segments, segments are rendered in
+batched model calls (a few batches at a time), and the results are stitched
+with short crossfades and streamed in order as soon as the next segment is
+available.
+
+Rendered segments are cached individually, keyed on their text and the voice
+parameters. Segments never span a paragraph boundary, so editing one
+paragraph only re-renders the segments of that paragraph.
+"""
+import asyncio
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import HTTPException
+from app.utils.audio import apply_speed
+from app.utils.caching import OutputAudioCache, get_segment_cache
+from app.utils.dsp_pool import run_dsp
+from app.utils.streaming import split_text_segments
+
+logger = logging.getLogger(__name__)
+
+RenderBatch = Callable[[List[str]], Awaitable[Tuple[List[np.ndarray], int]]]
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+# Output container fields; segments are cached as PCM whatever the response codec
+_OUTPUT_ENCODING_FIELDS = ("response_format", "audio_format")
+
+
+def split_document(text: str, max_chars: int = 300, min_chars: int = 20) -> List[Tuple[int, str]]:
+    """
+    Split a document into paragraphs and then sentence segments
+
+    Args:
+        text: Document text (paragraphs separated by blank lines)
+        max_chars: Preferred maximum characters per segment
+        min_chars: Segments shorter than this are merged into a neighbour
+
+    Returns:
+        List of (paragraph_index, segment_text)
+    """
+    segments = []
+    paragraphs = [p for p in (p.strip() for p in _PARAGRAPH_BREAK.split(text)) if p]
+    for index, paragraph in enumerate(paragraphs):
+        paragraph = " ".join(paragraph.split())
+        for segment in split_text_segments(paragraph, max_chars, min_chars) or [paragraph]:
+            segments.append((index, segment))
+    return segments
+
+
+def segment_key_factory(
+    model_type: str,
+    params: Dict[str, Any],
+    model_version: str,
+    model_dtype: str,
+) -> Callable[[str], str]:
+    """
+    Build the segment cache key function for a request
+
+    Args:
+        model_type: Model type rendering the segments
+        params: Request parameters that determine the voice (text is replaced
+            per segment; response_format and audio_format are ignored)
+        model_version: Version tag of the loaded model
+        model_dtype: Model dtype
+
+    Returns:
+        Function mapping segment text to its cache key
+    """
+    params = {name: value for name, value in params.items() if name not in _OUTPUT_ENCODING_FIELDS}
+
+    def key(text: str) -> str:
+        return OutputAudioCache.make_key(
+            model_type, {**params, "text": text}, model_version, model_dtype, audio_format="float32"
+        )
+    return key
+
+
+class Crossfader:
+    """Join consecutive audio segments with a short linear crossfade"""
+
+    def __init__(self, crossfade_samples: int):
+        """
+        Initialize the crossfader
+
+        Args:
+            crossfade_samples: Length of each crossfade in samples (0 = butt joins)
+        """
+        self.crossfade_samples = max(0, crossfade_samples)
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def push(self, audio_data: np.ndarray) -> np.ndarray:
+        """
+        Add the next segment
+
+        The end of each segment is held back to be blended with the start of
+        the next one.
+
+        Args:
+            audio_data: Segment audio
+
+        Returns:
+            Audio that is final and can be sent
+        """
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        overlap = min(self.crossfade_samples, len(self._tail), len(audio_data))
+        if overlap:
+            fade_in = np.linspace(0.0, 1.0, overlap, endpoint=False, dtype=np.float32)
+            blended = self._tail[len(self._tail) - overlap:] * (1.0 - fade_in) + audio_data[:overlap] * fade_in
+            head = np.concatenate([self._tail[:len(self._tail) - overlap], blended, audio_data[overlap:]])
+        else:
+            head = np.concatenate([self._tail, audio_data])
+
+        split = max(0, len(head) - self.crossfade_samples)
+        self._tail = head[split:]
+        return head[:split]
+
+    def flush(self) -> np.ndarray:
+        """
+        Release the held-back end of the last segment
+
+        Returns:
+            Remaining audio
+        """
+        tail, self._tail = self._tail, np.zeros(0, dtype=np.float32)
+        return tail
+
+
+class LongFormRender:
+    """
+    Render document segments in concurrent batches and return them in order
+
+    Exposes the same next()/aclose() interface as SegmentStream, so long-form
+    audio can be sent with any stream format. Each returned piece is one
+    segment joined to the previous one by a crossfade; the last piece also
+    carries the end of the document.
+    """
+
+    def __init__(
+        self,
+        segments: List[Tuple[int, str]],
+        render_batch: RenderBatch,
+        cache_key: Optional[Callable[[str], str]] = None,
+        batch_size: int = 4,
+        max_concurrent_batches: int = 2,
+        crossfade_ms: float = 30.0,
+    ):
+        """
+        Initialize the render
+
+        Args:
+            segments: (paragraph_index, text) from split_document()
+            render_batch: Coroutine function rendering a list of texts to
+                (audio_list, sample_rate), speed adjustment included
+            cache_key: Segment cache key function (None disables the cache)
+            batch_size: Segments per render_batch call
+            max_concurrent_batches: Batches rendered at the same time
+            crossfade_ms: Crossfade between segments in milliseconds
+        """
+        self.segments = segments
+        self._render_batch = render_batch
+        self._cache_key = cache_key
+        self._batch_size = max(1, batch_size)
+        self._max_concurrent = max(1, max_concurrent_batches)
+        self._crossfade_ms = crossfade_ms
+        self._crossfader: Optional[Crossfader] = None
+        self._results: List[asyncio.Future] = []
+        self._cached: List[bool] = [False] * len(segments)
+        self._scheduler: Optional[asyncio.Task] = None
+        self._tasks: List[asyncio.Task] = []
+        self._next_index = 0
+        self._rendered = 0
+
+    @property
+    def cached_segments(self) -> int:
+        """Number of segments served from the segment cache"""
+        return sum(self._cached)
+
+    def _lookup(self, index: int) -> Optional[Tuple[np.ndarray, int]]:
+        """Get a segment from the segment cache"""
+        if self._cache_key is None:
+            return None
+        entry = get_segment_cache().get(self._cache_key(self.segments[index][1]))
+        if entry is None:
+            return None
+        return np.frombuffer(entry["audio"], dtype=np.float32), entry["sample_rate"]
+
+    def _store(self, index: int, audio_data: np.ndarray, sample_rate: int):
+        """Put a rendered segment into the segment cache"""
+        if self._cache_key is None:
+            return
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        get_segment_cache().put(
+            self._cache_key(self.segments[index][1]),
+            audio_data.tobytes(),
+            sample_rate,
+            len(audio_data) / sample_rate,
+        )
+
+    async def _render(self, indices: List[int]):
+        """Render one batch and resolve its segments"""
+        try:
+            wavs, sample_rate = await self._render_batch([self.segments[i][1] for i in indices])
+            if len(wavs) != len(indices):
+                raise RuntimeError(f"Model returned {len(wavs)} audio segments for {len(indices)} texts")
+        except Exception as e:
+            for index in indices:
+                if not self._results[index].done():
+                    self._results[index].set_exception(e)
+            return
+
+        for index, audio_data in zip(indices, wavs):
+            self._store(index, audio_data, sample_rate)
+            self._rendered += 1
+            self._results[index].set_result((audio_data, sample_rate))
+
+    async def _schedule(self):
+        """Render uncached segments in order, a bounded number of batches at a time"""
+        pending = [i for i, future in enumerate(self._results) if not future.done()]
+        slots = asyncio.Semaphore(self._max_concurrent)
+
+        async def run(indices: List[int]):
+            try:
+                await self._render(indices)
+            finally:
+                slots.release()
+
+        for start in range(0, len(pending), self._batch_size):
+            await slots.acquire()
+            self._tasks.append(asyncio.create_task(run(pending[start:start + self._batch_size])))
+
+    def start(self):
+        """Look up cached segments and start rendering the rest"""
+        if self._scheduler is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._results = [loop.create_future() for _ in self.segments]
+        for index in range(len(self.segments)):
+            cached = self._lookup(index)
+            if cached is not None:
+                self._cached[index] = True
+                self._rendered += 1
+                self._results[index].set_result(cached)
+        self._scheduler = asyncio.create_task(self._schedule())
+
+    def metadata(self) -> Dict[str, Any]:
+        """
+        Get document-level fields for the stream metadata
+
+        Returns:
+            Dictionary with paragraph and cached segment counts
+        """
+        return {
+            "paragraphs": self.segments[-1][0] + 1 if self.segments else 0,
+            "cached_segments": self.cached_segments,
+        }
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Get progress of the render
+
+        Returns:
+            Dictionary describing the segment last returned by next() and
+            how many segments are rendered so far
+        """
+        index = self._next_index - 1
+        return {
+            "segment": index,
+            "segments": len(self.segments),
+            "paragraph": self.segments[index][0] if index >= 0 else None,
+            "cached": self._cached[index] if index >= 0 else None,
+            "rendered": self._rendered,
+        }
+
+    async def next(self) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Wait for the next segment, joined to the previous one
+
+        Returns:
+            Tuple of (audio_data, sample_rate), or None when the document is done
+
+        Raises:
+            Exception: Whatever rendering the segment's batch raised
+        """
+        self.start()
+        if self._next_index >= len(self.segments):
+            return None
+
+        audio_data, sample_rate = await self._results[self._next_index]
+        self._next_index += 1
+
+        if self._crossfader is None:
+            self._crossfader = Crossfader(int(sample_rate * self._crossfade_ms / 1000))
+        piece = self._crossfader.push(audio_data)
+        if self._next_index == len(self.segments):
+            piece = np.concatenate([piece, self._crossfader.flush()])
+        return piece, sample_rate
+
+    async def aclose(self):
+        """Stop rendering (e.g. when the client disconnects)"""
+        tasks = [task for task in [self._scheduler, *self._tasks] if task is not None and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for future in self._results:
+            if future.done() and not future.cancelled():
+                # Retrieve unread errors so they are not logged as unhandled
+                future.exception()
+
+
+async def adjust_speed(
+    wavs: List[np.ndarray],
+    sample_rate: int,
+    speed: float,
+    tracker=None,
+) -> List[np.ndarray]:
+    """
+    Apply a speed adjustment to every segment of a rendered batch
+
+    Args:
+        wavs: Rendered segments
+        sample_rate: Sample rate in Hz
+        speed: Speed multiplier (1.0 leaves the audio unchanged)
+        tracker: Optional PerformanceTracker receiving the stage time
+
+    Returns:
+        Adjusted segments
+    """
+    if speed == 1.0:
+        return list(wavs)
+    return [
+        await run_dsp("speed", apply_speed, audio_data, sample_rate, speed, tracker=tracker)
+        for audio_data in wavs
+    ]
+
+
+def prepare_document(text: str) -> List[Tuple[int, str]]:
+    """
+    Check a document against the configured limits and split it
+
+    Args:
+        text: Document text
+
+    Returns:
+        (paragraph_index, segment_text) from split_document()
+
+    Raises:
+        HTTPException: If the document is too long or has no text
+    """
+    from app.config import settings
+
+    if len(text) > settings.longform_max_chars:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Text is too long: {len(text)} characters (max {settings.longform_max_chars})"
+        )
+
+    segments = split_document(text, settings.longform_segment_max_chars, settings.stream_segment_min_chars)
+    if not segments:
+        raise HTTPException(status_code=400, detail="Text has nothing to synthesize")
+    return segments
+
+
+def create_longform_render(
+    text: str,
+    render_batch: RenderBatch,
+    cache_key: Optional[Callable[[str], str]] = None,
+) -> LongFormRender:
+    """
+    Split a document and set up its render with the configured batching
+
+    Args:
+        text: Document text
+        render_batch: Coroutine function rendering a list of texts
+        cache_key: Segment cache key function (None disables the cache)
+
+    Returns:
+        LongFormRender (rendering starts on the first next())
+
+    Raises:
+        HTTPException: If the document is too long or has no text
+    """
+    from app.config import settings
+
+    return LongFormRender(
+        prepare_document(text),
+        render_batch,
+        cache_key=cache_key if settings.longform_segment_cache_enabled else None,
+        batch_size=settings.longform_batch_size,
+        max_concurrent_batches=settings.longform_max_concurrent_batches,
+        crossfade_ms=settings.longform_crossfade_ms,
+    )
+
+
+async def open_longform_render(
+    text: str,
+    render_batch: RenderBatch,
+    tracker,
+    cache_key: Optional[Callable[[str], str]] = None,
+) -> Tuple[LongFormRender, Tuple[np.ndarray, int]]:
+    """
+    Split a document, start rendering and wait for the first segment
+
+    Args:
+        text: Document text
+        render_batch: Coroutine function rendering a list of texts
+        tracker: PerformanceTracker; its time to first audio is marked
+        cache_key: Segment cache key function (None disables the cache)
+
+    Returns:
+        Tuple of (render, first_piece)
+
+    Raises:
+        HTTPException: If the document is too long or has no text
+    """
+    render = create_longform_render(text, render_batch, cache_key)
+
+    try:
+        first = await render.next()
+    except BaseException:
+        await render.aclose()
+        raise
+
+    tracker.mark_first_audio()
+    logger.info(
+        f"Long-form render started: {len(render.segments)} segments, "
+        f"{render.cached_segments} cached"
+    )
+    return render, first
@@ -1,9 +1,11 @@
 """
 Performance metrics utilities
 """
+import bisect
+import threading
 import time
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
@@ -16,6 +18,9 @@ class PerformanceTracker:
         self.start_time: Optional[float] = None
         self.generation_time: Optional[float] = None
         self.preprocessing_time: Optional[float] = None
+        self.queue_wait_time: Optional[float] = None
+        self.stage_times: Dict[str, float] = {}
+        self.time_to_first_audio: Optional[float] = None
         self.cache_status: str = "miss"
         self.audio_duration: Optional[float] = None
     
@@ -27,6 +32,21 @@ class PerformanceTracker:
         """Mark preprocessing time"""
         self.preprocessing_time = duration
     
+    def mark_stage(self, stage: str, duration: float):
+        """Add time spent in a DSP stage (decode, preprocessing, speed, encode)"""
+        self.stage_times[stage] = self.stage_times.get(stage, 0.0) + duration
+        if stage == "preprocessing":
+            self.preprocessing_time = self.stage_times[stage]
+    
+    def mark_queue_wait(self, duration: float):
+        """Add time spent waiting for an inference worker"""
+        self.queue_wait_time = (self.queue_wait_time or 0.0) + duration
+    
+    def mark_first_audio(self):
+        """Mark the first audio of a streamed response as ready"""
+        if self.start_time is not None:
+            self.time_to_first_audio = time.time() - self.start_time
+    
     def mark_generation(self):
         """Mark generation complete"""
         if self.start_time is not None:
@@ -70,6 +90,12 @@ class PerformanceTracker:
         if self.preprocessing_time is not None:
             log_msg += f" [preprocessing: {self.preprocessing_time:.2f}s]"
         
+        if self.queue_wait_time is not None:
+            log_msg += f" [queue wait: {self.queue_wait_time:.2f}s]"
+        
+        if self.time_to_first_audio is not None:
+            log_msg += f" [first audio: {self.time_to_first_audio:.2f}s]"
+        
         logger_instance.info(log_msg)
     
     def get_headers(self) -> Dict[str, str]:
@@ -96,6 +122,16 @@ class PerformanceTracker:
         if self.preprocessing_time is not None:
             headers["X-Preprocessing-Time"] = f"{self.preprocessing_time:.3f}"
         
+        for stage, duration in self.stage_times.items():
+            if stage != "preprocessing":
+                headers[f"X-{stage.title()}-Time"] = f"{duration:.3f}"
+        
+        if self.queue_wait_time is not None:
+            headers["X-Queue-Wait-Time"] = f"{self.queue_wait_time:.3f}"
+        
+        if self.time_to_first_audio is not None:
+            headers["X-Time-To-First-Audio"] = f"{self.time_to_first_audio:.3f}"
+        
         return headers
     
     def get_metrics(self) -> Dict[str, Any]:
@@ -111,9 +147,63 @@ class PerformanceTracker:
             "rtf": self.get_rtf(),
             "cache_status": self.cache_status,
             "preprocessing_time": self.preprocessing_time,
+            "queue_wait_time": self.queue_wait_time,
+            "stage_times": dict(self.stage_times),
+            "time_to_first_audio": self.time_to_first_audio,
         }
 
 
+class Histogram:
+    """Thread-safe fixed-bucket histogram for tuning metrics"""
+    
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Initialize histogram
+        
+        Args:
+            buckets: Sorted upper bounds of the buckets (an overflow bucket is added)
+        """
+        self.buckets = list(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        """Record a value"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+            self._max = max(self._max, value)
+    
+    def reset(self):
+        """Clear all recorded values"""
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
+            self._count = 0
+            self._max = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get histogram as dictionary
+        
+        Returns:
+            Dictionary with per-bucket counts (keyed by upper bound), count, mean and max
+        """
+        with self._lock:
+            labels = [f"le_{bound:g}" for bound in self.buckets] + ["inf"]
+            return {
+                "buckets": dict(zip(labels, self._counts)),
+                "count": self._count,
+                "mean": round(self._sum / self._count, 4) if self._count else 0.0,
+                "max": round(self._max, 4),
+            }
+
+
 @contextmanager
 def track_time(name: str = "operation"):
     """
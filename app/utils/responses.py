@@ -0,0 +1,188 @@
+"""
+Audio response helpers shared by the generation routers
+"""
+import base64
+import time
+import zipfile
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from app.models.schemas import AudioResponse
+from app.utils.caching import get_output_cache
+from app.utils.codecs import encode_audio, get_codec
+from app.utils.dsp_pool import run_dsp
+from app.utils.metrics import PerformanceTracker
+
+
+def build_audio_response(
+    audio_bytes: bytes,
+    sample_rate: int,
+    response_format: str,
+    filename: str,
+    headers: Optional[Dict[str, str]] = None,
+    audio_format: str = "wav",
+) -> Union[AudioResponse, Response]:
+    """
+    Build the HTTP response for encoded audio
+    
+    Args:
+        audio_bytes: Encoded audio bytes
+        sample_rate: Sample rate in Hz
+        response_format: 'base64' for JSON, anything else for a file download
+        filename: Download filename without extension
+        headers: Extra response headers (file downloads only)
+        audio_format: Codec of audio_bytes
+        
+    Returns:
+        AudioResponse for base64 format, otherwise a Response of the codec's media type
+    """
+    if response_format == "base64":
+        return AudioResponse(
+            audio=base64.b64encode(audio_bytes).decode("utf-8"),
+            sample_rate=sample_rate,
+            format=audio_format
+        )
+    
+    codec = get_codec(audio_format)
+    return Response(
+        content=audio_bytes,
+        media_type=codec.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}.{codec.extension}",
+            **(headers or {})
+        }
+    )
+
+
+def get_cached_audio_response(
+    cache_key: str,
+    response_format: str,
+    filename: str,
+    tracker: PerformanceTracker,
+    audio_format: str = "wav",
+) -> Optional[Union[AudioResponse, Response]]:
+    """
+    Serve a request from the output audio cache
+    
+    Args:
+        cache_key: Output cache key for the request
+        response_format: Requested response format
+        filename: Download filename without extension
+        tracker: Performance tracker (marked as a cache hit)
+        audio_format: Codec the cache key was made for
+        
+    Returns:
+        Response built from cached audio, or None on a miss
+    """
+    cached = get_output_cache().get(cache_key)
+    if cached is None:
+        return None
+    
+    tracker.set_cache_status("hit")
+    tracker.mark_generation()
+    tracker.set_audio_duration(cached["duration"])
+    
+    return build_audio_response(
+        cached["audio"],
+        cached["sample_rate"],
+        response_format,
+        filename,
+        tracker.get_headers(),
+        audio_format,
+    )
+
+
+class _ArchiveSink:
+    """
+    Unseekable file object collecting zip output until it is drained
+    
+    Without seek(), ZipFile writes sizes in data descriptors after each
+    entry instead of patching local headers, so output can be sent as soon
+    as each entry is complete.
+    """
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+    
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        """Take the bytes written since the last drain"""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+async def stream_zip(entries: AsyncIterator[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """
+    Write entries into a stored (uncompressed) zip archive as they arrive
+    
+    Args:
+        entries: Async iterator of (filename, data)
+        
+    Yields:
+        Archive bytes: each entry once written, then the central directory
+    """
+    sink = _ArchiveSink()
+    date_time = time.localtime()[:6]
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        async for name, data in entries:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = zipfile.ZIP_STORED
+            archive.writestr(info, data)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def build_batch_zip_response(
+    wavs: List[np.ndarray],
+    sample_rate: int,
+    audio_format: str,
+    names: Sequence[str],
+    filename: str,
+) -> StreamingResponse:
+    """
+    Stream batch audio as a zip archive, encoding one item at a time
+    
+    Each item is encoded (off the event loop) only when the archive reaches
+    it and is dropped from wavs once written, so at most one encoded item is
+    held in memory.
+    
+    Args:
+        wavs: Generated audio per item (consumed)
+        sample_rate: Sample rate in Hz
+        audio_format: Codec of each archive entry
+        names: Entry filename per item, without extension
+        filename: Archive download filename without extension
+        
+    Returns:
+        StreamingResponse of an application/zip body
+    """
+    extension = get_codec(audio_format).extension
+    
+    async def entries() -> AsyncIterator[Tuple[str, bytes]]:
+        for index, name in enumerate(names):
+            audio_data, wavs[index] = wavs[index], None
+            yield f"{name}.{extension}", await run_dsp(
+                "encode", encode_audio, audio_data, sample_rate, audio_format
+            )
+    
+    return StreamingResponse(
+        stream_zip(entries()),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}.zip",
+            "X-Sample-Rate": str(sample_rate),
+        },
+    )
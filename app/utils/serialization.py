@@ -0,0 +1,206 @@
+"""
+Compact binary serialization for voice clone prompts
+
+Prompt items are dataclasses holding tensors plus a few scalars. They are
+written as a small JSON header describing the structure followed by the raw
+tensor buffers, so loading needs neither pickle nor torch.load and a file
+can be validated before any of it is trusted.
+
+Layout::
+
+    MAGIC (4 bytes) | VERSION (1 byte) | header length (uint32 LE) | header JSON | buffers
+"""
+import dataclasses
+import importlib
+import json
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+MAGIC = b"QVPC"
+VERSION = 1
+
+_PREFIX = struct.Struct("<4sBI")
+
+
+class PromptSerializationError(ValueError):
+    """Raised when a prompt cannot be encoded or a blob cannot be decoded"""
+
+
+def _is_tensor(value: Any) -> bool:
+    """Check for a torch tensor without importing torch"""
+    return type(value).__module__.startswith("torch") and hasattr(value, "detach")
+
+
+def _encode(value: Any, buffers: List[bytes]) -> Any:
+    """Convert a value into a JSON-safe node, collecting raw buffers"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        buffers.append(array.tobytes())
+        return {
+            "__ndarray__": len(buffers) - 1,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+
+    if _is_tensor(value):
+        import torch
+
+        tensor = value.detach().cpu().contiguous()
+        dtype = str(tensor.dtype).replace("torch.", "")
+        # numpy has no bfloat16; keep the raw 16-bit pattern instead
+        raw = tensor.view(torch.int16) if tensor.dtype == torch.bfloat16 else tensor
+        buffers.append(raw.numpy().tobytes())
+        return {
+            "__tensor__": len(buffers) - 1,
+            "dtype": dtype,
+            "shape": list(tensor.shape),
+            "device": str(value.device),
+        }
+
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        cls = type(value)
+        return {
+            "__dataclass__": f"{cls.__module__}:{cls.__qualname__}",
+            "fields": {
+                field.name: _encode(getattr(value, field.name), buffers)
+                for field in dataclasses.fields(value)
+            },
+        }
+
+    if isinstance(value, (list, tuple)):
+        items = [_encode(item, buffers) for item in value]
+        return {"__tuple__": items} if isinstance(value, tuple) else items
+
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise PromptSerializationError("Only dictionaries with string keys are supported")
+        return {"__dict__": {key: _encode(item, buffers) for key, item in value.items()}}
+
+    raise PromptSerializationError(f"Unsupported type: {type(value).__name__}")
+
+
+def _decode_tensor(node: Dict[str, Any], data: bytes) -> Any:
+    """Rebuild a torch tensor, restoring its device when available"""
+    import torch
+
+    dtype = node["dtype"]
+    if dtype == "bfloat16":
+        array = np.frombuffer(data, dtype=np.int16).reshape(node["shape"])
+        tensor = torch.from_numpy(array.copy()).view(torch.bfloat16)
+    else:
+        np_dtype = torch.empty(0, dtype=getattr(torch, dtype)).numpy().dtype
+        array = np.frombuffer(data, dtype=np_dtype).reshape(node["shape"])
+        tensor = torch.from_numpy(array.copy())
+
+    device = node.get("device", "cpu")
+    if device.startswith("cuda") and torch.cuda.is_available():
+        tensor = tensor.to(device)
+    return tensor
+
+
+def _decode(node: Any, buffers: List[bytes]) -> Any:
+    """Convert a JSON node back into a value"""
+    if isinstance(node, list):
+        return [_decode(item, buffers) for item in node]
+
+    if not isinstance(node, dict):
+        return node
+
+    if "__ndarray__" in node:
+        data = buffers[node["__ndarray__"]]
+        return np.frombuffer(data, dtype=np.dtype(node["dtype"])).reshape(node["shape"]).copy()
+
+    if "__tensor__" in node:
+        return _decode_tensor(node, buffers[node["__tensor__"]])
+
+    if "__tuple__" in node:
+        return tuple(_decode(item, buffers) for item in node["__tuple__"])
+
+    if "__dict__" in node:
+        return {key: _decode(item, buffers) for key, item in node["__dict__"].items()}
+
+    if "__dataclass__" in node:
+        module_name, _, qualname = node["__dataclass__"].partition(":")
+        cls: Any = importlib.import_module(module_name)
+        for attr in qualname.split("."):
+            cls = getattr(cls, attr)
+        if not (isinstance(cls, type) and dataclasses.is_dataclass(cls)):
+            raise PromptSerializationError(f"Not a dataclass: {node['__dataclass__']}")
+        fields = {key: _decode(item, buffers) for key, item in node["fields"].items()}
+        return cls(**fields)
+
+    raise PromptSerializationError("Unknown node in prompt header")
+
+
+def serialize_prompt(value: Any, metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Serialize voice clone prompt items to bytes
+
+    Args:
+        value: Prompt items (dataclasses, tensors, arrays, lists, dicts, scalars)
+        metadata: Optional JSON-safe metadata stored in the header
+
+    Returns:
+        Serialized blob
+    """
+    buffers: List[bytes] = []
+    root = _encode(value, buffers)
+
+    offsets = []
+    offset = 0
+    for buffer in buffers:
+        offsets.append([offset, len(buffer)])
+        offset += len(buffer)
+
+    header = json.dumps(
+        {"root": root, "buffers": offsets, "metadata": metadata or {}},
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    return b"".join([_PREFIX.pack(MAGIC, VERSION, len(header)), header, *buffers])
+
+
+def deserialize_prompt(blob: bytes) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Deserialize voice clone prompt items
+
+    Args:
+        blob: Bytes produced by serialize_prompt()
+
+    Returns:
+        Tuple of (prompt_items, metadata)
+
+    Raises:
+        PromptSerializationError: If the blob is malformed or truncated
+    """
+    if len(blob) < _PREFIX.size:
+        raise PromptSerializationError("Blob is too short")
+
+    magic, version, header_len = _PREFIX.unpack_from(blob)
+    if magic != MAGIC:
+        raise PromptSerializationError("Bad magic")
+    if version != VERSION:
+        raise PromptSerializationError(f"Unsupported version: {version}")
+
+    data_start = _PREFIX.size + header_len
+    if len(blob) < data_start:
+        raise PromptSerializationError("Truncated header")
+
+    try:
+        header = json.loads(blob[_PREFIX.size:data_start].decode("utf-8"))
+    except ValueError as e:
+        raise PromptSerializationError(f"Invalid header: {e}") from e
+
+    view = memoryview(blob)
+    buffers = []
+    for offset, length in header["buffers"]:
+        start = data_start + offset
+        if start + length > len(blob):
+            raise PromptSerializationError("Truncated buffer")
+        buffers.append(view[start:start + length].tobytes())
+
+    return _decode(header["root"], buffers), header.get("metadata", {})
@@ -4,9 +4,24 @@ Streaming utilities for audio generation
 import asyncio
 import io
 import base64
-from typing import AsyncIterator, Tuple
+import json
+import logging
+import re
+import struct
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import numpy as np
 import soundfile as sf
+from fastapi.responses import StreamingResponse
+from sse_starlette.sse import EventSourceResponse
+from app.utils.codecs import AUDIO_CODECS, StreamEncoder, encoded_sample_rate, get_codec
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends: Latin terminators followed by whitespace, or CJK terminators
+_SENTENCE_END = re.compile(r"(?<=[.!?;…])\s+|(?<=[。！？；])")
+# Clause boundaries used to split sentences that are still too long
+_CLAUSE_END = re.compile(r"(?<=[,:，、：])\s*")
 
 
 async def stream_audio_chunks(
@@ -38,9 +53,6 @@ async def stream_audio_chunks(
         buffer.seek(0)
         
         yield buffer.read()
-        
-        # Small delay to simulate streaming
-        await asyncio.sleep(0.01)
 
 
 async def stream_audio_base64_chunks(
@@ -75,3 +87,559 @@ def create_sse_message(data: str, event: str = "audio") -> str:
         Formatted SSE message
     """
     return f"event: {event}\ndata: {data}\n\n"
+
+
+def _pack(pieces: List[str], max_chars: int, separator: str) -> List[str]:
+    """Greedily join pieces into runs of at most max_chars"""
+    packed: List[str] = []
+    for piece in pieces:
+        if packed and len(packed[-1]) + len(separator) + len(piece) <= max_chars:
+            packed[-1] = f"{packed[-1]}{separator}{piece}"
+        else:
+            packed.append(piece)
+    return packed
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    """Split an over-long sentence at clause boundaries, then at spaces"""
+    if len(sentence) <= max_chars:
+        return [sentence]
+    
+    pieces = []
+    for clause in (c.strip() for c in _CLAUSE_END.split(sentence)):
+        if not clause:
+            continue
+        if len(clause) <= max_chars:
+            pieces.append(clause)
+        elif " " in clause:
+            pieces.extend(_pack(clause.split(), max_chars, " "))
+        else:
+            # Unspaced text (e.g. CJK) without punctuation: cut at max_chars
+            pieces.extend(clause[i:i + max_chars] for i in range(0, len(clause), max_chars))
+    return _pack(pieces, max_chars, " ")
+
+
+def split_text_segments(text: str, max_chars: int = 150, min_chars: int = 20) -> List[str]:
+    """
+    Split text into sentence-sized segments for incremental generation
+    
+    Sentences are kept whole where possible; sentences longer than max_chars
+    are split at clause boundaries. Segments shorter than min_chars are
+    merged into their neighbour so the model is not called for a single word.
+    
+    Args:
+        text: Text to split
+        max_chars: Preferred maximum segment length (0 disables splitting)
+        min_chars: Minimum segment length before merging
+        
+    Returns:
+        List of non-empty segments, in order
+    """
+    text = text.strip()
+    if not text:
+        return []
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+    
+    segments: List[str] = []
+    for sentence in (s.strip() for s in _SENTENCE_END.split(text)):
+        if sentence:
+            segments.extend(_split_long(sentence, max_chars))
+    
+    merged: List[str] = []
+    for segment in segments:
+        if merged and (len(merged[-1]) < min_chars or len(segment) < min_chars):
+            merged[-1] = f"{merged[-1]} {segment}"
+        else:
+            merged.append(segment)
+    return merged
+
+
+class SentenceBuffer:
+    """
+    Cut incrementally arriving text (e.g. LLM tokens) into segments
+    
+    Text is held until a sentence end is seen; a Latin terminator only
+    counts once whitespace follows it, so "3." in "3.14" is not a boundary.
+    Runs with no boundary are cut at clauses once they exceed max_chars.
+    """
+    
+    def __init__(self, max_chars: int = 150, min_chars: int = 20):
+        """
+        Initialize the buffer
+        
+        Args:
+            max_chars: Preferred maximum segment length
+            min_chars: Minimum text to release as a segment before flush()
+        """
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self._text = ""
+    
+    def push(self, text: str) -> List[str]:
+        """
+        Add text and return the segments that are complete
+        
+        Args:
+            text: Next piece of text
+            
+        Returns:
+            Complete segments, possibly empty
+        """
+        self._text += text
+        
+        cut = 0
+        for match in _SENTENCE_END.finditer(self._text):
+            if len(self._text[:match.end()].strip()) >= self.min_chars:
+                cut = match.end()
+        
+        ready, self._text = self._text[:cut], self._text[cut:]
+        segments = split_text_segments(ready, self.max_chars, self.min_chars)
+        
+        if self.max_chars > 0 and len(self._text) > self.max_chars:
+            pieces = _split_long(self._text.strip(), self.max_chars)
+            trailing = " " if self._text[-1:].isspace() else ""
+            segments.extend(pieces[:-1])
+            self._text = pieces[-1] + trailing
+        
+        return segments
+    
+    def flush(self) -> List[str]:
+        """
+        Return the remaining text as segments and empty the buffer
+        
+        Returns:
+            Remaining segments, possibly empty
+        """
+        text, self._text = self._text, ""
+        return split_text_segments(text, self.max_chars, self.min_chars)
+    
+    def clear(self):
+        """Discard buffered text"""
+        self._text = ""
+
+
+class SegmentStream:
+    """
+    Generate text segments in order while earlier segments are being sent
+    
+    A producer task synthesizes segment after segment into a bounded queue,
+    so generation continues while the client receives audio but never runs
+    more than max_buffered segments ahead of it. The first segment can be
+    taken with first() before the producer exists; the producer then starts
+    with start() or next(), i.e. only once the response body is iterated.
+    """
+    
+    def __init__(
+        self,
+        segments: List[str],
+        synthesize: Callable[[str], Awaitable[Tuple[np.ndarray, int]]],
+        max_buffered: int = 2,
+    ):
+        """
+        Initialize the stream
+        
+        Args:
+            segments: Text segments to synthesize
+            synthesize: Coroutine function returning (audio_data, sample_rate) for a segment
+            max_buffered: Maximum finished segments waiting to be sent
+        """
+        self.segments = segments
+        self._synthesize = synthesize
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_buffered))
+        self._producer: Optional[asyncio.Task] = None
+        self._taken = 0
+    
+    async def _produce(self):
+        """Synthesize the remaining segments into the queue, ending with None"""
+        try:
+            for segment in self.segments[self._taken:]:
+                result = await self._synthesize(segment)
+                await self._queue.put(result)
+        except Exception as e:
+            await self._queue.put(e)
+            return
+        await self._queue.put(None)
+    
+    def start(self):
+        """Start generating segments"""
+        if self._producer is None:
+            self._producer = asyncio.create_task(self._produce())
+    
+    async def first(self) -> Tuple[np.ndarray, int]:
+        """
+        Synthesize the first segment without starting the producer
+        
+        Nothing keeps running in the background afterwards, so a stream that
+        is dropped before start() or next() (e.g. the client disconnected
+        before the response body was sent) needs no aclose().
+        
+        Returns:
+            Tuple of (audio_data, sample_rate)
+        """
+        if self._producer is not None or self._taken:
+            raise RuntimeError("The first segment has already been generated")
+        self._taken = 1
+        return await self._synthesize(self.segments[0])
+    
+    async def next(self) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Wait for the next segment
+        
+        Returns:
+            Tuple of (audio_data, sample_rate), or None when all segments are done
+            
+        Raises:
+            Exception: Whatever the synthesis of the segment raised
+        """
+        self.start()
+        item = await self._queue.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+    
+    async def aclose(self):
+        """Stop generating (e.g. when the client disconnects)"""
+        if self._producer is not None and not self._producer.done():
+            self._producer.cancel()
+            try:
+                await self._producer
+            except asyncio.CancelledError:
+                pass
+
+
+def _finish(tracker, total_samples: int, sample_rate: int, log: Optional[logging.Logger]):
+    """Record totals for a completed segment stream"""
+    tracker.mark_generation()
+    tracker.set_audio_duration(total_samples / sample_rate)
+    if log is not None:
+        tracker.log_metrics(log)
+
+
+async def segment_sse_events(
+    stream: SegmentStream,
+    first: Tuple[np.ndarray, int],
+    tracker,
+    chunk_duration: float = 0.5,
+    log: Optional[logging.Logger] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    progress: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> AsyncIterator[Dict[str, str]]:
+    """
+    Emit SSE events for a segment stream whose first segment is ready
+    
+    Sends a metadata event (with time to first audio), audio events for each
+    segment as soon as it is generated, then a done event. A failure after
+    the first segment is reported as an error event.
+    
+    Args:
+        stream: Segment stream whose first segment was taken (the rest is
+            generated once the body is iterated)
+        first: (audio_data, sample_rate) of the first segment
+        tracker: PerformanceTracker with mark_first_audio() already called
+        chunk_duration: Duration of each audio event in seconds
+        log: Logger to write final performance metrics to (None to skip)
+        metadata: Extra fields for the metadata event
+        progress: Called after each segment is received; its result is sent
+            as a progress event ahead of the segment's audio
+        
+    Yields:
+        Event dictionaries for EventSourceResponse
+    """
+    audio_data, sample_rate = first
+    total_samples = 0
+    
+    metadata = {
+        "sample_rate": sample_rate,
+        "segments": len(stream.segments),
+        "time_to_first_audio": tracker.time_to_first_audio,
+        "cache_status": tracker.cache_status,
+        "preprocessing_time": tracker.preprocessing_time,
+        "queue_wait_time": tracker.queue_wait_time,
+        **(metadata or {}),
+    }
+    
+    try:
+        stream.start()
+        yield {"event": "metadata", "data": json.dumps(metadata)}
+        
+        while True:
+            if progress is not None:
+                yield {"event": "progress", "data": json.dumps(progress())}
+            total_samples += len(audio_data)
+            async for chunk_base64 in stream_audio_base64_chunks(audio_data, sample_rate, chunk_duration):
+                yield {"event": "audio", "data": chunk_base64}
+            
+            try:
+                segment = await stream.next()
+            except Exception as e:
+                logger.error(f"Segment generation failed mid-stream: {e}")
+                yield {"event": "error", "data": json.dumps({"detail": str(e)})}
+                return
+            if segment is None:
+                break
+            audio_data, sample_rate = segment
+        
+        _finish(tracker, total_samples, sample_rate, log)
+        yield {"event": "done", "data": "complete"}
+    finally:
+        await stream.aclose()
+
+
+async def open_segment_stream(
+    text: str,
+    synthesize: Callable[[str], Awaitable[Tuple[np.ndarray, int]]],
+    tracker,
+) -> Tuple[SegmentStream, Tuple[np.ndarray, int]]:
+    """
+    Split text and generate the first segment
+    
+    Waiting here means errors in the first segment still fail the request
+    with a normal error response instead of an SSE error event. The
+    remaining segments are generated once the response body is iterated, so
+    a client that disconnects before the body starts leaves nothing running.
+    
+    Args:
+        text: Full text to synthesize
+        synthesize: Coroutine function returning (audio_data, sample_rate) for a segment
+        tracker: PerformanceTracker; its time to first audio is marked
+        
+    Returns:
+        Tuple of (stream, first_segment)
+    """
+    from app.config import settings
+    
+    segments = split_text_segments(
+        text,
+        max_chars=settings.stream_segment_max_chars,
+        min_chars=settings.stream_segment_min_chars,
+    ) or [text]
+    stream = SegmentStream(segments, synthesize, settings.stream_max_buffered_segments)
+    first = await stream.first()
+    
+    tracker.mark_first_audio()
+    return stream, first
+
+
+def pcm16(audio_data: np.ndarray, big_endian: bool = False) -> np.ndarray:
+    """
+    Convert audio to 16-bit PCM samples
+    
+    Args:
+        audio_data: Float audio in [-1, 1] (or already int16)
+        big_endian: Network byte order (audio/L16) instead of little-endian (WAV)
+        
+    Returns:
+        Contiguous int16 array in the requested byte order
+    """
+    dtype = np.dtype(">i2" if big_endian else "<i2")
+    if audio_data.dtype.kind in "iu":
+        return np.ascontiguousarray(audio_data, dtype=dtype)
+    scaled = np.clip(audio_data, -1.0, 1.0) * 32767.0
+    return np.ascontiguousarray(scaled, dtype=dtype)
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1) -> bytes:
+    """
+    Build a 16-bit PCM WAV header for a stream of unknown length
+    
+    The RIFF and data sizes are set to 0xFFFFFFFF, which players treat as
+    "read until end of stream".
+    
+    Args:
+        sample_rate: Sample rate in Hz
+        channels: Number of channels
+        
+    Returns:
+        44-byte WAV header
+    """
+    block_align = channels * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, 16,
+        b"data", 0xFFFFFFFF,
+    )
+
+
+async def segment_pcm_chunks(
+    stream: SegmentStream,
+    first: Tuple[np.ndarray, int],
+    tracker,
+    chunk_duration: float = 0.5,
+    wav_header: bool = False,
+    log: Optional[logging.Logger] = None,
+) -> AsyncIterator[Union[bytes, memoryview]]:
+    """
+    Emit a segment stream as raw 16-bit PCM
+    
+    Each segment is converted once; chunks are memoryview slices of that
+    buffer, so nothing is copied or re-encoded per chunk. A failure after the
+    first segment aborts the response, leaving the body truncated.
+    
+    Args:
+        stream: Segment stream whose first segment was taken (the rest is
+            generated once the body is iterated)
+        first: (audio_data, sample_rate) of the first segment
+        tracker: PerformanceTracker for final metrics
+        chunk_duration: Duration of each written chunk in seconds
+        wav_header: Little-endian PCM behind a streaming WAV header instead
+            of big-endian audio/L16
+        log: Logger to write final performance metrics to (None to skip)
+        
+    Yields:
+        Header bytes, then PCM chunks
+    """
+    audio_data, sample_rate = first
+    total_samples = 0
+    
+    try:
+        stream.start()
+        if wav_header:
+            yield wav_stream_header(sample_rate)
+        
+        while True:
+            total_samples += len(audio_data)
+            view = memoryview(pcm16(audio_data, big_endian=not wav_header)).cast("B")
+            chunk_bytes = max(2, int(sample_rate * chunk_duration) * 2)
+            for start in range(0, len(view), chunk_bytes):
+                yield view[start:start + chunk_bytes]
+            
+            try:
+                segment = await stream.next()
+            except Exception as e:
+                logger.error(f"Segment generation failed mid-stream: {e}")
+                raise
+            if segment is None:
+                break
+            audio_data, sample_rate = segment
+        
+        _finish(tracker, total_samples, sample_rate, log)
+    finally:
+        await stream.aclose()
+
+
+async def segment_encoded_chunks(
+    stream: SegmentStream,
+    first: Tuple[np.ndarray, int],
+    tracker,
+    audio_format: str,
+    chunk_duration: float = 0.5,
+    log: Optional[logging.Logger] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Emit a segment stream as one incrementally encoded file
+    
+    Each chunk is fed to a single StreamEncoder on a worker thread and
+    whatever the encoder has produced is sent straight away, so compressed
+    audio leaves as it is encoded. Encoding time is recorded as the "encode"
+    stage in the final metrics.
+    
+    Args:
+        stream: Segment stream whose first segment was taken (the rest is
+            generated once the body is iterated)
+        first: (audio_data, sample_rate) of the first segment
+        tracker: PerformanceTracker for final metrics
+        audio_format: Codec name ("flac", "opus" or "mp3")
+        chunk_duration: Duration of each encoded chunk in seconds
+        log: Logger to write final performance metrics to (None to skip)
+        
+    Yields:
+        Encoded bytes
+    """
+    audio_data, sample_rate = first
+    encoder = StreamEncoder(audio_format, sample_rate)
+    total_samples = 0
+    
+    async def encode(step: Callable[..., bytes], *args) -> bytes:
+        start = time.perf_counter()
+        data = await asyncio.to_thread(step, *args)
+        tracker.mark_stage("encode", time.perf_counter() - start)
+        return data
+    
+    try:
+        stream.start()
+        while True:
+            total_samples += len(audio_data)
+            chunk_samples = max(1, int(sample_rate * chunk_duration))
+            for start in range(0, len(audio_data), chunk_samples):
+                data = await encode(encoder.encode, audio_data[start:start + chunk_samples])
+                if data:
+                    yield data
+            
+            try:
+                segment = await stream.next()
+            except Exception as e:
+                logger.error(f"Segment generation failed mid-stream: {e}")
+                raise
+            if segment is None:
+                break
+            audio_data, sample_rate = segment
+        
+        data = await encode(encoder.close)
+        if data:
+            yield data
+        _finish(tracker, total_samples, sample_rate, log)
+    finally:
+        # An abandoned encoder is not closed here: a worker thread may still
+        # be writing to it; it is released once that thread lets go
+        await stream.aclose()
+
+
+def segment_stream_response(
+    stream: SegmentStream,
+    first: Tuple[np.ndarray, int],
+    tracker,
+    stream_format: str = "sse",
+    log: Optional[logging.Logger] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    progress: Optional[Callable[[], Dict[str, Any]]] = None,
+):
+    """
+    Build the HTTP response for a segment stream
+    
+    Args:
+        stream: Segment stream whose first segment was taken (the rest is
+            generated once the body is iterated)
+        first: (audio_data, sample_rate) of the first segment
+        tracker: PerformanceTracker (time to first audio already marked)
+        stream_format: "sse" (base64 WAV chunks in Server-Sent Events),
+            "pcm" (audio/L16 chunked body), "wav" (one streamed WAV file) or
+            a compressed codec ("flac", "opus", "mp3") encoded incrementally
+        log: Logger to write final performance metrics to (None to skip)
+        metadata: Extra fields for the SSE metadata event
+        progress: Progress callback for SSE progress events (binary
+            formats have no side channel and ignore it)
+        
+    Returns:
+        EventSourceResponse or StreamingResponse
+    """
+    sample_rate = first[1]
+    headers = {**tracker.get_headers(), "X-Sample-Rate": str(sample_rate)}
+    
+    if stream_format == "pcm":
+        return StreamingResponse(
+            segment_pcm_chunks(stream, first, tracker, log=log),
+            media_type=f"audio/L16; rate={sample_rate}; channels=1",
+            headers=headers,
+        )
+    
+    if stream_format == "wav":
+        return StreamingResponse(
+            segment_pcm_chunks(stream, first, tracker, wav_header=True, log=log),
+            media_type="audio/wav",
+            headers=headers,
+        )
+    
+    if stream_format in AUDIO_CODECS:
+        headers["X-Sample-Rate"] = str(encoded_sample_rate(stream_format, sample_rate))
+        return StreamingResponse(
+            segment_encoded_chunks(stream, first, tracker, stream_format, log=log),
+            media_type=get_codec(stream_format).media_type,
+            headers=headers,
+        )
+    
+    return EventSourceResponse(
+        segment_sse_events(stream, first, tracker, log=log, metadata=metadata, progress=progress),
+        headers=headers,
+    )
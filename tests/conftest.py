@@ -210,6 +210,37 @@ def mock_tts_model():
     return model
 
 
+@pytest.fixture
+def batching_model():
+    """
+    Mock TTS model whose generate methods accept list-valued (batched) inputs
+    
+    Returns:
+        Mock model object
+    """
+    import time
+    
+    model = MagicMock()
+    sample_rate = 24000
+    
+    def as_list(value):
+        return value if isinstance(value, list) else [value]
+    
+    def generate(text, language=None, **kwargs):
+        time.sleep(0.05)  # Give concurrent requests time to queue up
+        return [
+            generate_test_audio(duration=0.1 + 0.01 * len(t), sample_rate=sample_rate)
+            for t in as_list(text)
+        ], sample_rate
+    
+    model.generate_custom_voice = Mock(side_effect=generate)
+    model.generate_voice_design = Mock(side_effect=generate)
+    model.generate_voice_clone = Mock(side_effect=generate)
+    model.create_voice_clone_prompt = Mock(side_effect=lambda **kwargs: [{"prompt": "mock_prompt"}])
+    
+    return model
+
+
 @pytest.fixture
 def sample_ref_audio():
     """
@@ -228,14 +259,14 @@ def sample_ref_audio():
 @pytest.fixture(autouse=True)
 def reset_cache():
     """
-    Reset voice cache before each test
+    Reset voice, output and reference caches before each test
     """
-    from app.utils.caching import get_voice_cache
+    from app.utils.caching import get_voice_cache, get_output_cache, get_reference_cache
     
     try:
-        cache = get_voice_cache()
-        cache.clear()
-        cache.reset_stats()
+        for cache in (get_voice_cache(), get_output_cache(), get_reference_cache()):
+            cache.clear()
+            cache.reset_stats()
     except:
         pass  # Cache might not be initialized yet
     
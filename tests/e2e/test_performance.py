@@ -103,6 +103,39 @@ class TestCachePerformance:
             assert final_stats["hits"] >= 2, f"Expected ≥2 hits, got {final_stats['hits']}"
 
 
+@pytest.mark.e2e
+@pytest.mark.slow
+class TestCacheKeyPerformance:
+    """Microbenchmark for voice prompt cache keys"""
+    
+    def test_key_cost_per_second_of_audio(self):
+        """Measure full-content key cost per second of reference audio"""
+        from app.utils.caching import VoicePromptCache
+        
+        cache = VoicePromptCache(max_size=10)
+        sample_rate = 24000
+        ref_text = "Reference transcript for the key benchmark. " * 4
+        iterations = 50
+        
+        costs = {}
+        for duration in (1.0, 10.0, 60.0):
+            audio = generate_test_audio(duration=duration, sample_rate=sample_rate)
+            cache._generate_cache_key(audio, sample_rate, ref_text, False)
+            
+            start = time.perf_counter()
+            for _ in range(iterations):
+                cache._generate_cache_key(audio, sample_rate, ref_text, False)
+            elapsed = (time.perf_counter() - start) / iterations
+            
+            costs[duration] = elapsed / duration
+            print(f"\nCache key ({duration:.0f}s audio): {elapsed * 1000:.3f}ms, "
+                  f"{costs[duration] * 1e6:.1f}us per second of audio")
+        
+        # Hashing is linear in audio length and negligible next to prompt
+        # extraction (hundreds of ms); keep it well under 1ms per second of audio
+        assert costs[60.0] < 0.001
+
+
 @pytest.mark.e2e
 @pytest.mark.slow
 class TestPreprocessingOverhead:
@@ -141,6 +174,138 @@ class TestPreprocessingOverhead:
                 assert prep_time < 1.0, f"Preprocessing took {prep_time}s, expected <1s"
 
 
+@pytest.mark.e2e
+@pytest.mark.slow
+class TestPreprocessingEngineBenchmark:
+    """Benchmark the array preprocessing engine against the pydub engine"""
+    
+    def test_array_engine_faster_than_pydub(self):
+        """Compare engines on a 60s upload with pauses"""
+        import numpy as np
+        from app.utils.audio import preprocess_reference_audio, preprocess_reference_audio_pydub
+        
+        sample_rate = 24000
+        pause = np.zeros(sample_rate, dtype=np.float32)
+        segments = []
+        for i in range(10):
+            segments.append(generate_test_audio(duration=5.0, frequency=300.0 + i * 40))
+            segments.append(pause)
+        audio = np.concatenate(segments)
+        
+        def best_of(fn, runs=3):
+            times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                fn(audio, sample_rate, max_duration=15.0)
+                times.append(time.perf_counter() - start)
+            return min(times)
+        
+        legacy_time = best_of(preprocess_reference_audio_pydub)
+        array_time = best_of(preprocess_reference_audio)
+        
+        print(f"\nPreprocessing 60s: pydub {legacy_time * 1000:.1f}ms, "
+              f"array {array_time * 1000:.1f}ms ({legacy_time / array_time:.1f}x)")
+        
+        assert array_time < legacy_time
+
+
+@pytest.mark.e2e
+@pytest.mark.slow
+class TestStreamingWireBenchmark:
+    """Benchmark binary PCM streaming against base64 WAV chunks in SSE"""
+    
+    @pytest.mark.asyncio
+    async def test_pcm_smaller_and_cheaper_than_sse(self):
+        """Compare bytes on the wire and CPU per second of audio"""
+        from sse_starlette.sse import ServerSentEvent
+        from app.utils.metrics import PerformanceTracker
+        from app.utils.streaming import SegmentStream, segment_pcm_chunks, segment_sse_events
+        
+        sample_rate = 24000
+        segments = [generate_test_audio(duration=5.0) for _ in range(6)]
+        audio_seconds = sum(len(segment) for segment in segments) / sample_rate
+        
+        async def run(stream_format):
+            results = iter(segments)
+            
+            async def synthesize(_):
+                return next(results), sample_rate
+            
+            stream = SegmentStream([str(i) for i in range(len(segments))], synthesize)
+            first = await stream.next()
+            tracker = PerformanceTracker()
+            tracker.start()
+            
+            wire_bytes = 0
+            cpu_start = time.process_time()
+            if stream_format == "sse":
+                async for event in segment_sse_events(stream, first, tracker):
+                    wire_bytes += len(ServerSentEvent(**event).encode())
+            else:
+                async for chunk in segment_pcm_chunks(stream, first, tracker):
+                    wire_bytes += len(chunk)
+            return wire_bytes, time.process_time() - cpu_start
+        
+        sse_bytes, sse_cpu = await run("sse")
+        pcm_bytes, pcm_cpu = await run("pcm")
+        
+        print(f"\nStreaming {audio_seconds:.0f}s: "
+              f"SSE {sse_bytes / audio_seconds / 1024:.1f} KiB/s audio, {sse_cpu / audio_seconds * 1e3:.2f}ms CPU/s audio; "
+              f"PCM {pcm_bytes / audio_seconds / 1024:.1f} KiB/s audio, {pcm_cpu / audio_seconds * 1e3:.2f}ms CPU/s audio")
+        
+        # 16-bit mono PCM is exactly 2 bytes per sample
+        assert pcm_bytes == 2 * sample_rate * audio_seconds
+        # base64 alone adds a third; WAV headers and SSE framing add more
+        assert sse_bytes > 1.3 * pcm_bytes
+        assert pcm_cpu < sse_cpu
+
+
+@pytest.mark.e2e
+@pytest.mark.slow
+class TestCodecBenchmark:
+    """Benchmark compressed output codecs against WAV"""
+    
+    def test_encode_cost_vs_bytes_saved(self):
+        """Compare encode CPU and output size per second of audio"""
+        from app.utils.codecs import StreamEncoder, encode_audio
+        
+        sample_rate = 24000
+        audio = generate_test_audio(duration=30.0, add_noise=True)
+        audio_seconds = len(audio) / sample_rate
+        chunk = int(sample_rate * 0.5)
+        
+        results = {}
+        for audio_format in ("wav", "flac", "opus", "mp3"):
+            cpu_start = time.process_time()
+            size = len(encode_audio(audio, sample_rate, audio_format))
+            file_cpu = time.process_time() - cpu_start
+            
+            cpu_start = time.process_time()
+            encoder = StreamEncoder(audio_format, sample_rate)
+            streamed = sum(
+                len(encoder.encode(audio[start:start + chunk])) for start in range(0, len(audio), chunk)
+            ) + len(encoder.close())
+            stream_cpu = time.process_time() - cpu_start
+            
+            results[audio_format] = (size, file_cpu, streamed, stream_cpu)
+        
+        wav_size = results["wav"][0]
+        print(f"\nEncoding {audio_seconds:.0f}s of 24 kHz mono:")
+        for audio_format, (size, file_cpu, streamed, stream_cpu) in results.items():
+            print(f"  {audio_format:>4}: {size / audio_seconds / 1024:6.1f} KiB/s audio "
+                  f"({100 * (1 - size / wav_size):4.1f}% saved), "
+                  f"{file_cpu / audio_seconds * 1e3:.2f}ms CPU/s audio; "
+                  f"streamed {streamed / audio_seconds / 1024:6.1f} KiB/s, "
+                  f"{stream_cpu / audio_seconds * 1e3:.2f}ms CPU/s audio")
+        
+        # Compressed codecs must save bytes, and encoding must stay far below real time
+        assert results["flac"][0] < wav_size
+        assert results["opus"][0] < wav_size / 4
+        assert results["mp3"][0] < wav_size / 4
+        for size, file_cpu, streamed, stream_cpu in results.values():
+            assert stream_cpu < 0.1 * audio_seconds
+
+
 @pytest.mark.e2e
 @pytest.mark.slow
 class TestSpeedControlPerformance:
@@ -0,0 +1,75 @@
+"""
+Integration tests for the admin API
+"""
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+@pytest.fixture
+def reloadable_manager():
+    """Global model manager whose loads and warmups are instant"""
+    from app.models.manager import ModelManager, model_manager
+
+    with patch.object(model_manager, '_load_model', side_effect=lambda model_type, model_path=None: MagicMock()), \
+         patch.object(ModelManager, '_free_memory'), \
+         patch('app.models.manager.warmup_model'):
+        versions = {model_type: dict(version) for model_type, version in model_manager._versions.items()}
+        configs = {model_type: dict(config) for model_type, config in model_manager._model_configs.items()}
+        try:
+            yield model_manager
+        finally:
+            model_manager.unload_model("voice_design")
+            model_manager._versions.update(versions)
+            model_manager._model_configs.update(configs)
+            model_manager._reloads["voice_design"] = None
+
+
+@pytest.mark.integration
+class TestModelReload:
+    """Test the model hot-reload endpoints"""
+
+    def test_reload_switches_version(self, api_client, reloadable_manager):
+        """Test a reload is accepted and the new version shows up once it completes"""
+        reloadable_manager.get_model("voice_design")
+
+        response = api_client.post("/api/v1/admin/models/voice_design/reload",
+                                   json={"model_path": "org/voice-design-v2"})
+        assert response.status_code == 202
+        assert response.json()["model_path"] == "org/voice-design-v2"
+
+        for _ in range(100):
+            models = api_client.get("/api/v1/admin/models").json()["models"]
+            if models["voice_design"]["reload"]["state"] in ("completed", "failed"):
+                break
+            time.sleep(0.02)
+
+        assert models["voice_design"]["reload"]["state"] == "completed"
+        assert models["voice_design"]["version"] == models["voice_design"]["reload"]["version"]
+        assert models["voice_design"]["model_path"] == "org/voice-design-v2"
+        assert reloadable_manager.get_model_version("voice_design").startswith("org/voice-design-v2")
+
+    def test_unknown_model_type(self, api_client):
+        """Test reloading an unknown model type returns 404"""
+        response = api_client.post("/api/v1/admin/models/podcast/reload", json={})
+        assert response.status_code == 404
+
+    def test_concurrent_reload_conflict(self, api_client, reloadable_manager):
+        """Test a second reload while one is running returns 409"""
+        with patch.object(reloadable_manager, 'reload_model',
+                          side_effect=RuntimeError("A reload of the voice_design model is already running")):
+            response = api_client.post("/api/v1/admin/models/voice_design/reload", json={})
+        assert response.status_code == 409
+        assert "already running" in response.json()["detail"]
+
+    def test_admin_keys(self, api_client):
+        """Test only admin keys may call admin endpoints once configured"""
+        with patch('app.auth.settings.admin_api_keys', "admin-key"):
+            denied = api_client.get("/api/v1/admin/models")
+            allowed = api_client.get("/api/v1/admin/models", headers={"X-API-Key": "admin-key"})
+        with patch('app.auth.settings.env', "production"):
+            disabled = api_client.get("/api/v1/admin/models")
+
+        assert denied.status_code == 403
+        assert allowed.status_code == 200
+        assert disabled.status_code == 403
@@ -1,6 +1,7 @@
 """
 Integration tests for Base model API endpoints
 """
+import numpy as np
 import pytest
 from unittest.mock import patch
 
@@ -44,6 +45,61 @@ class TestBaseAPIEndpoints:
             
             assert response.status_code == 200
     
+    def test_clone_longform(self, api_client, base64_test_audio, batching_model):
+        """Test long-form cloning extracts the voice prompt once and batches segments"""
+        from app import config
+        from app.utils import caching
+        
+        with patch('app.models.manager.model_manager.get_base_model', return_value=batching_model), \
+             patch.object(caching, '_segment_cache', None), \
+             patch.object(config.settings, 'longform_segment_max_chars', 40):
+            response = api_client.post(
+                "/api/v1/base/clone-longform?stream_format=wav",
+                json={
+                    "text": "A first paragraph for the clone.\n\nA second paragraph for the clone.",
+                    "ref_audio_base64": base64_test_audio,
+                    "ref_text": "Reference text"
+                }
+            )
+        
+        assert response.status_code == 200
+        assert response.content[:4] == b"RIFF"
+        assert batching_model.create_voice_clone_prompt.call_count == 1
+        call = batching_model.generate_voice_clone.call_args
+        assert len(call.kwargs["text"]) == 2
+        assert len(call.kwargs["voice_clone_prompt"]) == 2
+    
+    def test_clone_stream_segments_share_voice_prompt(self, api_client, base64_test_audio, mock_tts_model):
+        """Test a segmented clone stream extracts the voice prompt once and reports late failures"""
+        from app import config
+        
+        calls = []
+        
+        def generate_voice_clone(text, language, voice_clone_prompt=None, **kwargs):
+            calls.append(text)
+            if len(calls) == 2:
+                raise RuntimeError("segment failed")
+            return [np.zeros(2400, dtype=np.float32)], 24000
+        
+        mock_tts_model.generate_voice_clone.side_effect = generate_voice_clone
+        with patch('app.models.manager.model_manager.get_base_model', return_value=mock_tts_model), \
+             patch.object(config.settings, 'stream_segment_max_chars', 40):
+            response = api_client.post(
+                "/api/v1/base/clone-stream",
+                json={
+                    "text": "The first sentence is streamed. The second one fails.",
+                    "ref_audio_base64": base64_test_audio,
+                    "ref_text": "Reference text"
+                }
+            )
+        
+        assert response.status_code == 200
+        assert mock_tts_model.create_voice_clone_prompt.call_count == 1
+        assert len(calls) == 2
+        assert "event: audio" in response.text
+        assert "event: error" in response.text
+        assert "event: done" not in response.text
+    
     def test_create_prompt_endpoint(self, api_client, base64_test_audio, mock_tts_model):
         """Test /api/v1/base/create-prompt endpoint"""
         with patch('app.models.manager.model_manager.get_base_model', return_value=mock_tts_model):
@@ -82,11 +138,67 @@ class TestBaseAPIEndpoints:
                     "text": "New text",
                     "language": "English",
                     "prompt_id": prompt_id,
-                    "response_format": "base64"
+                    "response_format": "wav"
                 }
             )
             
             assert gen_response.status_code == 200
+            assert float(gen_response.headers["X-Queue-Wait-Time"]) >= 0
+    
+    def test_prompt_management_endpoints(self, api_client, base64_test_audio, mock_tts_model):
+        """Test listing, inspecting and deleting stored prompts"""
+        with patch('app.models.manager.model_manager.get_base_model', return_value=mock_tts_model):
+            prompt_id = api_client.post(
+                "/api/v1/base/create-prompt",
+                json={
+                    "ref_audio_base64": base64_test_audio,
+                    "ref_text": "Reference text"
+                }
+            ).json()["prompt_id"]
+        
+        listed = api_client.get("/api/v1/base/prompts").json()
+        assert prompt_id in [prompt["prompt_id"] for prompt in listed["prompts"]]
+        assert listed["total"] >= 1
+        
+        info = api_client.get(f"/api/v1/base/prompts/{prompt_id}")
+        assert info.status_code == 200
+        assert info.json()["ref_text"] == "Reference text"
+        assert info.json()["in_memory"] is True
+        
+        assert api_client.get("/api/v1/base/prompts/stats").json()["backend"] == "memory"
+        
+        assert api_client.delete(f"/api/v1/base/prompts/{prompt_id}").status_code == 200
+        assert api_client.get(f"/api/v1/base/prompts/{prompt_id}").status_code == 404
+        assert api_client.delete(f"/api/v1/base/prompts/{prompt_id}").status_code == 404
+        
+        gen_response = api_client.post(
+            "/api/v1/base/generate-with-prompt",
+            json={"text": "New text", "prompt_id": prompt_id}
+        )
+        assert gen_response.status_code == 404
+    
+    def test_prompt_from_other_model_version_rejected(self, api_client, base64_test_audio, mock_tts_model):
+        """Test a prompt created before a Base model reload is not used with the new model"""
+        from app.models.manager import model_manager
+        
+        with patch('app.models.manager.model_manager.get_base_model', return_value=mock_tts_model):
+            prompt_id = api_client.post(
+                "/api/v1/base/create-prompt",
+                json={
+                    "ref_audio_base64": base64_test_audio,
+                    "ref_text": "Reference text"
+                }
+            ).json()["prompt_id"]
+            request = {"text": "New text", "prompt_id": prompt_id}
+            
+            same_version = api_client.post("/api/v1/base/generate-with-prompt", json=request)
+            with patch.object(model_manager, 'get_model_version', return_value="org/base-v2@0123456789ab"):
+                other_version = api_client.post("/api/v1/base/generate-with-prompt", json=request)
+        
+        assert same_version.status_code == 200
+        assert other_version.status_code == 409
+        assert "create it again" in other_version.json()["detail"]
+        assert mock_tts_model.generate_voice_clone.call_count == 1
 
 
 @pytest.mark.integration
@@ -130,3 +242,182 @@ class TestCacheIntegration:
             
             # Second request should be cache hit
             assert cache_status2 == "hit", "Second request should hit cache"
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestBaseBatching:
+    """Test batched voice clone generation across different prompts"""
+    
+    async def test_different_prompts_share_batch(self, base64_test_audio, batching_model):
+        """Test saved prompts from different voices are merged into one call"""
+        import asyncio
+        import httpx
+        from app.main import app
+        from app.routers import base
+        
+        base.get_batcher().reset_stats()
+        prompts = [[{"voice": "tenant-a"}], [{"voice": "tenant-b"}], [{"voice": "tenant-c"}]]
+        batching_model.create_voice_clone_prompt.side_effect = prompts
+        transport = httpx.ASGITransport(app=app)
+        
+        with patch('app.models.manager.model_manager.get_base_model', return_value=batching_model):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                         headers={"X-API-Key": "test-api-key"}) as client:
+                prompt_ids = []
+                for i in range(3):
+                    created = await client.post("/api/v1/base/create-prompt", json={
+                        "ref_audio_base64": base64_test_audio,
+                        "ref_text": f"Reference {i}",
+                    })
+                    prompt_ids.append(created.json()["prompt_id"])
+                
+                responses = await asyncio.gather(*[
+                    client.post("/api/v1/base/generate-with-prompt", json={
+                        "text": f"Tenant text {i}",
+                        "prompt_id": prompt_id,
+                        "response_format": "base64",
+                    })
+                    for i, prompt_id in enumerate(prompt_ids)
+                ])
+        
+        assert all(r.status_code == 200 for r in responses)
+        assert batching_model.generate_voice_clone.call_count == 1
+        call = batching_model.generate_voice_clone.call_args
+        assert call.kwargs["voice_clone_prompt"] == [p[0] for p in prompts]
+        assert len(call.kwargs["text"]) == 3
+    
+    async def test_concurrent_clones_coalesce_extraction(self, base64_test_audio, batching_model):
+        """Test concurrent clones with the same reference extract the prompt once"""
+        import asyncio
+        import httpx
+        from app.main import app
+        
+        def slow_extract(**kwargs):
+            import time
+            time.sleep(0.2)
+            return [{"prompt": "shared"}]
+        
+        batching_model.create_voice_clone_prompt.side_effect = slow_extract
+        transport = httpx.ASGITransport(app=app)
+        
+        with patch('app.models.manager.model_manager.get_base_model', return_value=batching_model):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                         headers={"X-API-Key": "test-api-key"}) as client:
+                responses = await asyncio.gather(*[
+                    client.post("/api/v1/base/clone", json={
+                        "text": f"Request {i}",
+                        "ref_audio_base64": base64_test_audio,
+                        "ref_text": "Shared reference",
+                    })
+                    for i in range(3)
+                ])
+                stats = (await client.get("/api/v1/base/cache/stats")).json()
+        
+        assert all(r.status_code == 200 for r in responses)
+        assert batching_model.create_voice_clone_prompt.call_count == 1
+        statuses = sorted(r.headers["X-Cache-Status"] for r in responses)
+        assert statuses == ["coalesced", "coalesced", "miss"]
+        assert stats["coalesced"] == 2
+
+
+class ChangingURLReference:
+    """Reference audio URL whose content can be replaced between requests"""
+    
+    url = "http://example.com/voice.wav"
+    
+    def __init__(self):
+        self.set_tone(440.0)
+    
+    def set_tone(self, frequency: float):
+        """Serve a different recording (with a new ETag) from the same URL"""
+        import io
+        import soundfile as sf
+        from tests.utils import generate_test_audio
+        
+        buffer = io.BytesIO()
+        sf.write(buffer, generate_test_audio(duration=3.0, frequency=frequency), 24000, format='WAV')
+        self.content = buffer.getvalue()
+        self.etag = f'"{frequency}"'
+    
+    async def fetch(self, url, headers=None):
+        import httpx
+        
+        request = httpx.Request("GET", url)
+        if headers and headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, request=request)
+        return httpx.Response(200, content=self.content, headers={"ETag": self.etag}, request=request)
+
+
+@pytest.fixture
+def url_reference():
+    """Fake download of a reference URL whose content the test can change"""
+    from app.utils import audio
+    
+    reference = ChangingURLReference()
+    with patch.object(audio, 'fetch_url', side_effect=reference.fetch):
+        yield reference
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestURLReferences:
+    """Test URL references are identified by their content, not the URL"""
+    
+    async def test_changed_content_not_coalesced(self, url_reference, batching_model):
+        """Test a request made after the URL's content changed does not join a render of the old content"""
+        import asyncio
+        import threading
+        import httpx
+        from app import config
+        from app.main import app
+        
+        started = threading.Event()
+        release = threading.Event()
+        generate = batching_model.generate_voice_clone.side_effect
+        
+        def blocking_generate(*args, **kwargs):
+            started.set()
+            release.wait(5.0)
+            return generate(*args, **kwargs)
+        
+        batching_model.generate_voice_clone.side_effect = blocking_generate
+        payload = {"text": "Same text", "ref_audio_url": url_reference.url, "ref_text": "Reference"}
+        transport = httpx.ASGITransport(app=app)
+        
+        with patch('app.models.manager.model_manager.get_base_model', return_value=batching_model), \
+             patch.object(config.settings, 'output_cache_enabled', False):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                         headers={"X-API-Key": "test-api-key"}) as client:
+                first = asyncio.create_task(client.post("/api/v1/base/clone", json=payload))
+                await asyncio.to_thread(started.wait, 5.0)
+                
+                url_reference.set_tone(550.0)
+                second = asyncio.create_task(client.post("/api/v1/base/clone", json=payload))
+                await asyncio.sleep(0.2)
+                release.set()
+                responses = await asyncio.gather(first, second)
+        
+        assert all(r.status_code == 200 for r in responses)
+        assert responses[1].headers["X-Cache-Status"] != "coalesced"
+        assert batching_model.generate_voice_clone.call_count == 2
+    
+    def test_changed_content_misses_output_cache(self, api_client, url_reference, batching_model):
+        """Test new content behind the same URL is rendered again instead of served from the output cache"""
+        from app import config
+        
+        payload = {"text": "Same text", "ref_audio_url": url_reference.url, "ref_text": "Reference"}
+        
+        with patch.object(config.settings, 'output_cache_enabled', True), \
+             patch('app.models.manager.model_manager.get_base_model', return_value=batching_model):
+            first = api_client.post("/api/v1/base/clone", json=payload)
+            unchanged = api_client.post("/api/v1/base/clone", json=payload)
+            url_reference.set_tone(550.0)
+            changed = api_client.post("/api/v1/base/clone", json=payload)
+            stats = api_client.get("/api/v1/cache/output/stats").json()
+        
+        assert first.status_code == changed.status_code == 200
+        assert unchanged.content == first.content
+        assert changed.headers["X-Cache-Status"] == "miss"
+        assert batching_model.generate_voice_clone.call_count == 2
+        assert (stats["hits"], stats["misses"]) == (1, 2)
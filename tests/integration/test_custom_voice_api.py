@@ -1,8 +1,15 @@
 """
 Integration tests for CustomVoice API
 """
+import base64
+import io
+import json
+import numpy as np
 import pytest
+import soundfile as sf
+import zipfile
 from unittest.mock import patch
+from app import config
 
 
 @pytest.mark.integration
@@ -58,6 +65,201 @@ class TestCustomVoiceAPI:
             
             assert response.status_code == 200
     
+    def test_generate_stream_segments_text(self, api_client, mock_tts_model):
+        """Test streaming generates each sentence separately and reports time to first audio"""
+        text = (
+            "This is the first sentence of the stream. "
+            "Here comes a second sentence right after it. "
+            "And finally a third sentence to finish."
+        )
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=mock_tts_model), \
+             patch.object(config.settings, 'stream_segment_max_chars', 50):
+            response = api_client.post(
+                "/api/v1/custom-voice/generate-stream",
+                json={"text": text, "language": "English", "speaker": "Aiden"}
+            )
+        
+        assert response.status_code == 200
+        events = [
+            tuple(line.split(": ", 1)[1] for line in block.split("\n")[:2])
+            for block in response.text.replace("\r\n", "\n").strip().split("\n\n")
+        ]
+        assert events[0][0] == "metadata"
+        assert events[-1] == ("done", "complete")
+        
+        metadata = json.loads(events[0][1])
+        assert metadata["segments"] == 3
+        assert metadata["time_to_first_audio"] > 0
+        assert "generation_time" not in metadata
+        
+        assert mock_tts_model.generate_custom_voice.call_count == 3
+        assert sum(1 for event, _ in events if event == "audio") >= 3
+    
+    def test_generate_stream_binary_formats(self, api_client, mock_tts_model):
+        """Test pcm and wav stream formats carry the same samples"""
+        text = "First streamed sentence here. Second streamed sentence here."
+        bodies = {}
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=mock_tts_model), \
+             patch.object(config.settings, 'stream_segment_max_chars', 40):
+            for stream_format in ("pcm", "wav"):
+                response = api_client.post(
+                    f"/api/v1/custom-voice/generate-stream?stream_format={stream_format}",
+                    json={"text": text, "language": "English", "speaker": "Aiden"}
+                )
+                assert response.status_code == 200
+                assert response.headers["X-Sample-Rate"] == "24000"
+                assert float(response.headers["X-Time-To-First-Audio"]) > 0
+                bodies[stream_format] = response
+        
+        assert bodies["pcm"].headers["content-type"].startswith("audio/L16; rate=24000")
+        assert bodies["wav"].headers["content-type"] == "audio/wav"
+        
+        pcm = np.frombuffer(bodies["pcm"].content, dtype=">i2")
+        wav = np.frombuffer(bodies["wav"].content[44:], dtype="<i2")
+        assert bodies["wav"].content[:4] == b"RIFF"
+        np.testing.assert_array_equal(pcm, wav)
+        # ~0.05s of mock audio per character, generated per sentence
+        assert len(pcm) == pytest.approx(len(text) * 0.05 * 24000, rel=0.05)
+    
+    def test_generate_compressed_formats(self, api_client, mock_tts_model):
+        """Test codec downloads and base64 audio in a chosen codec"""
+        request = {"text": "Compressed output test", "language": "English", "speaker": "Ryan"}
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=mock_tts_model):
+            flac = api_client.post(
+                "/api/v1/custom-voice/generate", json={**request, "response_format": "flac"}
+            )
+            encoded = api_client.post(
+                "/api/v1/custom-voice/generate",
+                json={**request, "response_format": "base64", "audio_format": "mp3"}
+            )
+        
+        assert flac.status_code == 200
+        assert flac.headers["content-type"] == "audio/flac"
+        assert flac.headers["content-disposition"].endswith("custom_voice_Ryan.flac")
+        assert "X-Encode-Time" in flac.headers
+        audio, sr = sf.read(io.BytesIO(flac.content))
+        assert sr == 24000
+        assert len(audio) == pytest.approx(len(request["text"]) * 0.05 * 24000, rel=0.01)
+        
+        data = encoded.json()
+        assert data["format"] == "mp3"
+        mp3, sr = sf.read(io.BytesIO(base64.b64decode(data["audio"])))
+        assert sr == 24000
+        assert len(mp3) > 0
+    
+    def test_generate_stream_compressed(self, api_client, mock_tts_model):
+        """Test an Ogg/Opus stream is encoded across all segments"""
+        text = "First streamed sentence here. Second streamed sentence here."
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=mock_tts_model), \
+             patch.object(config.settings, 'stream_segment_max_chars', 40):
+            response = api_client.post(
+                "/api/v1/custom-voice/generate-stream?stream_format=opus",
+                json={"text": text, "language": "English", "speaker": "Aiden"}
+            )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/ogg"
+        assert mock_tts_model.generate_custom_voice.call_count == 2
+        audio, sr = sf.read(io.BytesIO(response.content))
+        assert sr == 24000
+        assert len(audio) == pytest.approx(len(text) * 0.05 * 24000, rel=0.05)
+    
+    def test_batch_zip_default(self, api_client, batching_model):
+        """Test batch requests stream a stored zip of WAV files by default"""
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=batching_model):
+            response = api_client.post(
+                "/api/v1/custom-voice/batch",
+                json={
+                    "texts": ["First batch item", "Second batch item"],
+                    "languages": ["English", "English"],
+                    "speakers": ["Ryan", "Aiden"],
+                }
+            )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert archive.namelist() == ["custom_voice_000_Ryan.wav", "custom_voice_001_Aiden.wav"]
+            assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+            audio, sr = sf.read(io.BytesIO(archive.read("custom_voice_001_Aiden.wav")))
+        assert sr == 24000
+        assert len(audio) > 0
+    
+    def test_batch_audio_format(self, api_client, mock_tts_model):
+        """Test batch audio is encoded with the requested codec"""
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=mock_tts_model):
+            response = api_client.post(
+                "/api/v1/custom-voice/batch",
+                json={
+                    "texts": ["Batch item"],
+                    "languages": ["English"],
+                    "speakers": ["Ryan"],
+                    "response_format": "base64",
+                    "audio_format": "flac",
+                }
+            )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["format"] == "flac"
+        assert base64.b64decode(data["audios"][0])[:4] == b"fLaC"
+    
+    def test_generate_longform(self, api_client, batching_model):
+        """Test long-form rendering batches segments, reports progress and caches segments"""
+        from app.utils import caching
+        
+        document = "\n\n".join(
+            f"Paragraph {i} opens with a sentence. It closes with another sentence." for i in range(3)
+        )
+        request = {"text": document, "language": "English", "speaker": "Ryan"}
+        
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=batching_model), \
+             patch.object(caching, '_segment_cache', None), \
+             patch.object(config.settings, 'longform_segment_max_chars', 40), \
+             patch.object(config.settings, 'longform_batch_size', 4):
+            response = api_client.post("/api/v1/custom-voice/generate-longform", json=request)
+            
+            edited = {**request, "text": document.replace("Paragraph 1 opens", "Paragraph 1 now opens")}
+            pcm = api_client.post("/api/v1/custom-voice/generate-longform?stream_format=pcm", json=edited)
+        
+        assert response.status_code == 200
+        events = [
+            tuple(line.split(": ", 1)[1] for line in block.split("\n")[:2])
+            for block in response.text.replace("\r\n", "\n").strip().split("\n\n")
+        ]
+        metadata = json.loads(events[0][1])
+        assert metadata["segments"] == 6
+        assert metadata["paragraphs"] == 3
+        assert metadata["cached_segments"] == 0
+        
+        progress = [json.loads(data) for event, data in events if event == "progress"]
+        assert [p["segment"] for p in progress] == list(range(6))
+        assert [p["paragraph"] for p in progress] == [0, 0, 1, 1, 2, 2]
+        assert events[-1] == ("done", "complete")
+        
+        # Six segments in batches of four; the edit re-renders one segment
+        batch_sizes = [len(call.kwargs["text"]) for call in batching_model.generate_custom_voice.call_args_list]
+        assert batch_sizes == [4, 2, 1]
+        assert pcm.status_code == 200
+        assert len(pcm.content) > 0
+    
+    def test_generate_longform_too_long(self, api_client):
+        """Test documents over the configured limit are rejected"""
+        with patch.object(config.settings, 'longform_max_chars', 10):
+            response = api_client.post(
+                "/api/v1/custom-voice/generate-longform",
+                json={"text": "This document is too long.", "speaker": "Ryan"}
+            )
+        assert response.status_code == 400
+    
+    def test_generate_stream_rejects_unknown_format(self, api_client):
+        """Test an unknown stream_format is a validation error"""
+        response = api_client.post(
+            "/api/v1/custom-voice/generate-stream?stream_format=mp4",
+            json={"text": "Hello", "language": "English", "speaker": "Aiden"}
+        )
+        assert response.status_code == 422
+    
     def test_speakers_endpoint(self, api_client):
         """Test /api/v1/custom-voice/speakers"""
         response = api_client.get("/api/v1/custom-voice/speakers")
@@ -76,3 +278,98 @@ class TestCustomVoiceAPI:
         assert "languages" in data
         assert "English" in data["languages"]
         assert "Auto" in data["languages"]
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestCustomVoiceBatching:
+    """Test micro-batching of concurrent single requests"""
+    
+    async def test_concurrent_requests_share_batch(self, batching_model):
+        """Test concurrent /generate calls are issued as one list-valued call"""
+        import asyncio
+        import httpx
+        from app.main import app
+        from app.routers import custom_voice
+        
+        custom_voice.get_batcher().reset_stats()
+        transport = httpx.ASGITransport(app=app)
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=batching_model):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                         headers={"X-API-Key": "test-api-key"}) as client:
+                responses = await asyncio.gather(*[
+                    client.post("/api/v1/custom-voice/generate", json={
+                        "text": f"Request {i}",
+                        "speaker": "Ryan",
+                        "response_format": "base64",
+                    })
+                    for i in range(4)
+                ])
+                stats = (await client.get("/api/v1/custom-voice/batching/stats")).json()
+        
+        assert all(r.status_code == 200 for r in responses)
+        assert batching_model.generate_custom_voice.call_count < 4
+        assert stats["enabled"] is True
+        assert stats["requests"] == 4
+        assert stats["batch_size_histogram"]["max"] > 1
+    
+    async def test_identical_requests_coalesced(self, batching_model):
+        """Test identical in-flight requests share one generation"""
+        import asyncio
+        import httpx
+        from app.main import app
+        
+        transport = httpx.ASGITransport(app=app)
+        payload = {"text": "Your order is ready", "speaker": "Vivian", "response_format": "wav"}
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=batching_model):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                         headers={"X-API-Key": "test-api-key"}) as client:
+                responses = await asyncio.gather(*[
+                    client.post("/api/v1/custom-voice/generate", json=payload) for _ in range(3)
+                ])
+                stats = (await client.get("/api/v1/base/cache/stats")).json()
+        
+        assert all(r.status_code == 200 for r in responses)
+        assert batching_model.generate_custom_voice.call_count == 1
+        assert responses[0].content == responses[1].content == responses[2].content
+        assert sorted(r.headers["X-Cache-Status"] for r in responses).count("coalesced") == 2
+        assert stats["request_coalescing"]["custom_voice"]["coalesced"] >= 2
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestCustomVoiceOutputCache:
+    """Test serving repeated requests from the output audio cache"""
+    
+    def test_repeated_request_served_from_cache(self, api_client, mock_tts_model):
+        """Test a repeated request skips the model and reports a cache hit"""
+        from app.config import settings
+        
+        payload = {"text": "Please hold the line", "speaker": "Ryan", "response_format": "wav"}
+        with patch.object(settings, 'output_cache_enabled', True), \
+             patch('app.models.manager.model_manager.get_custom_voice_model', return_value=mock_tts_model):
+            first = api_client.post("/api/v1/custom-voice/generate", json=payload)
+            second = api_client.post("/api/v1/custom-voice/generate", json=payload)
+            base64_response = api_client.post(
+                "/api/v1/custom-voice/generate", json={**payload, "response_format": "base64"}
+            )
+            stats = api_client.get("/api/v1/cache/output/stats").json()
+        
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert mock_tts_model.generate_custom_voice.call_count == 1
+        assert second.headers["X-Cache-Status"] == "hit"
+        assert second.content == first.content
+        assert base64_response.json()["sample_rate"] == 24000
+        assert stats["enabled"] is True
+        assert stats["hits"] == 2
+    
+    def test_output_cache_clear(self, api_client):
+        """Test clearing the output cache"""
+        from app.config import settings
+        
+        with patch.object(settings, 'output_cache_enabled', True):
+            response = api_client.post("/api/v1/cache/output/clear")
+        
+        assert response.status_code == 200
+        assert api_client.get("/api/v1/cache/output/stats").json()["enabled"] is False
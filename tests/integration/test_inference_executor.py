@@ -0,0 +1,183 @@
+"""
+Integration tests for running inference off the event loop
+"""
+import asyncio
+import threading
+import time
+import pytest
+import httpx
+from unittest.mock import patch
+from tests.utils import generate_test_audio
+
+
+def _make_slow_model(delay: float):
+    """Build a mock model whose generate calls block like real inference"""
+    class SlowModel:
+        def generate_custom_voice(self, text, language, speaker, instruct=""):
+            time.sleep(delay)
+            return [generate_test_audio(duration=0.5)], 24000
+        
+        def generate_voice_design(self, text, language, instruct):
+            time.sleep(delay)
+            return [generate_test_audio(duration=0.5)], 24000
+    
+    return SlowModel()
+
+
+@pytest.fixture
+async def async_client():
+    """Async client sharing the test's event loop with the app"""
+    from app.main import app
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://test",
+        headers={"X-API-Key": "test-api-key"},
+    ) as client:
+        yield client
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestEventLoopResponsiveness:
+    """Test /health stays responsive while generations are running"""
+    
+    async def test_health_responsive_during_generation(self, async_client):
+        """Test health check completes while a slow generation is in flight"""
+        model = _make_slow_model(delay=1.0)
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=model):
+            generation = asyncio.create_task(async_client.post(
+                "/api/v1/custom-voice/generate",
+                json={"text": "Slow generation", "speaker": "Ryan", "response_format": "base64"},
+            ))
+            await asyncio.sleep(0.1)
+            
+            start = time.perf_counter()
+            health = await async_client.get("/health")
+            health_latency = time.perf_counter() - start
+            
+            assert health.status_code == 200
+            assert health_latency < 0.5, f"/health took {health_latency:.2f}s during generation"
+            assert not generation.done(), "Generation should still be running"
+            
+            response = await generation
+            assert response.status_code == 200
+    
+    async def test_queue_wait_header(self, async_client):
+        """Test queued requests report their wait for an inference worker"""
+        from app.config import settings
+        
+        model = _make_slow_model(delay=0.3)
+        with patch('app.models.manager.model_manager.get_voice_design_model', return_value=model), \
+                patch.object(settings, 'voice_design_batching_enabled', False):
+            responses = await asyncio.gather(*[
+                async_client.post("/api/v1/voice-design/generate", json={
+                    "text": f"Queued {i}", "instruct": "A calm voice",
+                })
+                for i in range(2)
+            ])
+            
+            assert all(r.status_code == 200 for r in responses)
+            waits = sorted(float(r.headers["X-Queue-Wait-Time"]) for r in responses)
+            assert waits[1] >= 0.2, "Second request should wait behind the first"
+    
+    async def test_inference_stats_in_models_health(self, async_client):
+        """Test /health/models exposes inference pool stats"""
+        response = await async_client.get("/health/models")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data["inference"]) == {"custom_voice", "voice_design", "base"}
+        assert "max_workers" in data["inference"]["custom_voice"]
+        assert set(data["residency"]["models"]) == {"custom_voice", "voice_design", "base"}
+        assert "evictions" in data["residency"]
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestColdStart:
+    """Test requests for a model loading in the background"""
+    
+    async def test_loading_model_returns_503(self, async_client):
+        """Test a cold model answers 503 with Retry-After until its background load finishes"""
+        from app.models.manager import ModelManager, model_manager
+        
+        release = threading.Event()
+        
+        def load(model_type):
+            release.wait(5.0)
+            return _make_slow_model(0.0)
+        
+        payload = {"text": "Hello", "language": "English", "speaker": "Ryan"}
+        with patch.object(model_manager, '_load_model', side_effect=load), \
+             patch.object(ModelManager, '_free_memory'), \
+             patch('app.models.manager.settings.enable_warmup', False), \
+             patch('app.models.manager.settings.model_load_wait_seconds', 0.0):
+            try:
+                cold = await async_client.post("/api/v1/custom-voice/generate", json=payload)
+                health = (await async_client.get("/health/models")).json()
+                
+                release.set()
+                for _ in range(50):
+                    if model_manager.is_loaded("custom_voice"):
+                        break
+                    await asyncio.sleep(0.05)
+                warm = await async_client.post("/api/v1/custom-voice/generate", json=payload)
+            finally:
+                release.set()
+                await asyncio.to_thread(model_manager.get_model, "custom_voice", 5.0)
+                model_manager.unload_model("custom_voice")
+        
+        assert cold.status_code == 503
+        assert int(cold.headers["retry-after"]) >= 1
+        assert "loading" in cold.json()["detail"]
+        assert health["loading"]["custom_voice"]["state"] == "loading"
+        assert warm.status_code == 200
+    
+    async def test_first_request_waits_for_load(self, async_client):
+        """Test by default the first request for a cold model is answered once it has loaded"""
+        from app.models.manager import ModelManager, model_manager
+        
+        def load(model_type):
+            time.sleep(0.3)
+            return _make_slow_model(0.0)
+        
+        payload = {"text": "Hello", "language": "English", "speaker": "Ryan"}
+        with patch.object(model_manager, '_load_model', side_effect=load), \
+             patch.object(ModelManager, '_free_memory'), \
+             patch('app.models.manager.settings.enable_warmup', False):
+            try:
+                response = await async_client.post("/api/v1/custom-voice/generate", json=payload)
+            finally:
+                await asyncio.to_thread(model_manager.get_model, "custom_voice", 5.0)
+                model_manager.unload_model("custom_voice")
+        
+        assert response.status_code == 200
+
+
+@pytest.mark.integration
+class TestStartupReport:
+    """Test the model preloading report"""
+    
+    async def test_startup_report(self, async_client):
+        """Test /health/startup reports preloading timings"""
+        from app.models.manager import model_manager
+        
+        report = {
+            "started_at": time.time(),
+            "concurrency": 3,
+            "total_seconds": 61.0,
+            "sequential_seconds": 170.5,
+            "models": {"base": {"status": "ready", "load_seconds": 45.0, "warmup_seconds": 16.0,
+                                "ready_after_seconds": 61.0, "error": None}},
+        }
+        not_preloaded = (await async_client.get("/health/startup")).json()
+        with patch.object(model_manager, '_startup_report', report):
+            preloaded = (await async_client.get("/health/startup")).json()
+        
+        assert not_preloaded["complete"] is False
+        assert not_preloaded["models"] == {}
+        assert preloaded["complete"] is True
+        assert preloaded["total_seconds"] == 61.0
+        assert preloaded["models"]["base"]["warmup_seconds"] == 16.0
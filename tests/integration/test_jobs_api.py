@@ -0,0 +1,169 @@
+"""
+Integration tests for the asynchronous job API
+"""
+import io
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+import soundfile as sf
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from app import config
+from app.models import jobs
+
+
+@pytest.fixture
+def callback_server():
+    """Local stand-in for a webhook receiver; yields (url, received payloads)"""
+    received = queue.Queue()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.put(json.loads(body))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/hook", received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def jobs_client(tmp_path):
+    """Test client whose lifespan (and job workers) spans the whole test"""
+    from app.main import app
+
+    with patch.object(config.settings, 'job_results_dir', str(tmp_path)), \
+         patch.object(jobs, '_job_manager', None):
+        with TestClient(app) as client:
+            client.headers = {"X-API-Key": "test-api-key"}
+            yield client
+
+
+def wait_for_job(client, job_id, timeout=10.0):
+    """Poll a job until it has finished"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = client.get(f"/api/v1/jobs/{job_id}").json()
+        if info["status"] in ("completed", "failed", "cancelled"):
+            return info
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestJobsAPI:
+    """Test job submission, polling, downloads and callbacks"""
+
+    def test_batch_job_with_callback(self, jobs_client, batching_model, callback_server):
+        """Test a batch job renders per-item files and notifies the callback URL"""
+        callback_url, received = callback_server
+
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=batching_model), \
+             patch.object(config.settings, 'job_batch_size', 2):
+            response = jobs_client.post("/api/v1/jobs", json={
+                "type": "custom_voice_batch",
+                "request": {
+                    "texts": ["One", "Two", "Three"],
+                    "languages": ["English"] * 3,
+                    "speakers": ["Ryan", "Vivian", "Ryan"],
+                    "audio_format": "flac",
+                },
+                "callback_url": callback_url,
+            })
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+
+            info = wait_for_job(jobs_client, job_id)
+
+        assert info["status"] == "completed"
+        assert (info["completed"], info["total"], info["progress"]) == (3, 3, 1.0)
+        assert [item["filename"] for item in info["items"]] == [
+            "custom_voice_000_Ryan.flac", "custom_voice_001_Vivian.flac", "custom_voice_002_Ryan.flac"
+        ]
+        # Items are rendered two per model call
+        assert [len(call.kwargs["text"]) for call in batching_model.generate_custom_voice.call_args_list] == [2, 1]
+
+        download = jobs_client.get(info["items"][1]["url"])
+        assert download.status_code == 200
+        assert download.headers["content-type"] == "audio/flac"
+        audio, sr = sf.read(io.BytesIO(download.content))
+        assert sr == 24000
+        assert len(audio) / sr == pytest.approx(info["items"][1]["duration"], abs=0.01)
+
+        payload = received.get(timeout=5)
+        assert payload["job_id"] == job_id
+        assert payload["status"] == "completed"
+        assert len(payload["items"]) == 3
+
+    def test_longform_job(self, jobs_client, batching_model):
+        """Test a long-form job renders the document into a single file"""
+        document = "\n\n".join(
+            f"Paragraph {i} opens with a sentence. It closes with another sentence." for i in range(3)
+        )
+
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=batching_model), \
+             patch.object(config.settings, 'longform_segment_max_chars', 40), \
+             patch.object(config.settings, 'longform_segment_cache_enabled', False):
+            response = jobs_client.post("/api/v1/jobs", json={
+                "type": "custom_voice_longform",
+                "request": {"text": document, "speaker": "Ryan"},
+            })
+            info = wait_for_job(jobs_client, response.json()["job_id"])
+
+        assert info["status"] == "completed"
+        assert info["total"] == 6
+        assert [item["filename"] for item in info["items"]] == ["custom_voice_Ryan.wav"]
+
+        audio, sr = sf.read(io.BytesIO(jobs_client.get(info["items"][0]["url"]).content))
+        # The WAV header was completed on close
+        assert len(audio) / sr == pytest.approx(info["items"][0]["duration"], abs=0.01)
+
+    def test_cancel_and_delete(self, jobs_client, batching_model):
+        """Test a cancelled job reports its state and a deleted job is gone"""
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=batching_model), \
+             patch.object(config.settings, 'job_batch_size', 1):
+            job_id = jobs_client.post("/api/v1/jobs", json={
+                "type": "custom_voice_batch",
+                "request": {"texts": ["a"] * 20, "languages": ["English"] * 20, "speakers": ["Ryan"] * 20},
+            }).json()["job_id"]
+
+            cancelled = jobs_client.post(f"/api/v1/jobs/{job_id}/cancel")
+
+        assert cancelled.status_code == 200
+        assert cancelled.json()["status"] == "cancelled"
+        assert cancelled.json()["completed"] < 20
+        assert jobs_client.post(f"/api/v1/jobs/{job_id}/cancel").status_code == 409
+
+        assert jobs_client.delete(f"/api/v1/jobs/{job_id}").status_code == 200
+        assert jobs_client.get(f"/api/v1/jobs/{job_id}").status_code == 404
+
+    def test_invalid_submissions(self, jobs_client):
+        """Test submissions are validated before they are queued"""
+        mismatched = jobs_client.post("/api/v1/jobs", json={
+            "type": "voice_design_batch",
+            "request": {"texts": ["a", "b"], "languages": ["English"], "instructs": ["Calm"]},
+        })
+        unknown = jobs_client.post("/api/v1/jobs", json={"type": "podcast", "request": {}})
+        with patch.object(config.settings, 'longform_max_chars', 10):
+            too_long = jobs_client.post("/api/v1/jobs", json={
+                "type": "voice_design_longform",
+                "request": {"text": "This document is too long.", "instruct": "Calm"},
+            })
+
+        assert mismatched.status_code == 400
+        assert unknown.status_code == 400
+        assert too_long.status_code == 400
+        assert jobs_client.get("/api/v1/jobs").json()["total"] == 0
+        assert jobs_client.get("/api/v1/jobs/stats").json()["submitted"] == 0
@@ -72,6 +72,68 @@ class TestPreprocessingWithBaseAPI:
             assert response.status_code == 200
 
 
+@pytest.mark.integration
+@pytest.mark.preprocessing
+@pytest.mark.slow
+class TestReferenceAudioCache:
+    """Test repeated references skip decoding and preprocessing"""
+    
+    def test_repeated_base64_reference_skips_preprocessing(self, api_client, base64_test_audio, mock_tts_model):
+        """Test a repeated base64 reference is decoded and preprocessed once"""
+        from app import config
+        from app.utils import audio
+        
+        with patch.object(config.settings, 'audio_preprocessing_enabled', True), \
+             patch('app.models.manager.model_manager.get_base_model', return_value=mock_tts_model), \
+             patch.object(audio, 'preprocess_reference_audio', wraps=audio.preprocess_reference_audio) as preprocess, \
+             patch.object(audio, 'load_audio_from_base64', wraps=audio.load_audio_from_base64) as decode:
+            for text in ("First sentence", "Second sentence"):
+                response = api_client.post(
+                    "/api/v1/base/clone",
+                    json={
+                        "text": text,
+                        "ref_audio_base64": base64_test_audio,
+                        "ref_text": "Reference text",
+                    }
+                )
+                assert response.status_code == 200
+        
+        assert decode.call_count == 1
+        assert preprocess.call_count == 1
+        assert response.headers["X-Cache-Status"] == "hit"
+        
+        stats = api_client.get("/api/v1/base/cache/stats").json()
+        assert stats["reference_audio"]["hits"] == 1
+    
+    async def test_url_reference_revalidated_with_etag(self, base64_test_audio):
+        """Test an unchanged URL reference is revalidated instead of re-downloaded"""
+        import base64
+        import httpx
+        from app import config
+        from app.utils import audio
+        
+        content = base64.b64decode(base64_test_audio)
+        requests = []
+        
+        async def fake_fetch(url, headers=None):
+            requests.append(headers or {})
+            request = httpx.Request("GET", url)
+            if headers and headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, request=request)
+            return httpx.Response(200, content=content, headers={"ETag": '"v1"'}, request=request)
+        
+        with patch.object(config.settings, 'audio_preprocessing_enabled', True), \
+             patch.object(audio, 'fetch_url', side_effect=fake_fetch), \
+             patch.object(audio, 'preprocess_reference_audio', wraps=audio.preprocess_reference_audio) as preprocess:
+            first = await audio.load_reference_audio(ref_audio_url="http://example.com/ref.wav")
+            second = await audio.load_reference_audio(ref_audio_url="http://example.com/ref.wav")
+        
+        assert requests[1] == {"If-None-Match": '"v1"'}
+        assert preprocess.call_count == 1
+        assert second[2] == first[2]
+        assert second[0] is first[0]
+
+
 @pytest.mark.integration
 @pytest.mark.slow
 class TestCacheStatisticsEndpoint:
@@ -204,3 +266,69 @@ class TestPerformanceHeaders:
             if "X-RTF" in response.headers:
                 rtf = float(response.headers["X-RTF"])
                 assert rtf > 0, "RTF should be positive"
+    
+    def test_dsp_stage_headers_on_clone(self, api_client, base64_test_audio, mock_tts_model):
+        """Test decode and preprocessing stage times are reported"""
+        from app import config
+        
+        with patch.object(config.settings, 'audio_preprocessing_enabled', True), \
+             patch('app.models.manager.model_manager.get_base_model', return_value=mock_tts_model):
+            response = api_client.post(
+                "/api/v1/base/clone",
+                json={
+                    "text": "Stage timing test",
+                    "ref_audio_base64": base64_test_audio,
+                    "ref_text": "Reference text",
+                }
+            )
+        
+        assert response.status_code == 200
+        for header in ("X-Decode-Time", "X-Preprocessing-Time"):
+            assert float(response.headers[header]) >= 0
+    
+    def test_speed_stage_header(self, api_client, mock_tts_model):
+        """Test the speed adjustment stage time is reported"""
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=mock_tts_model):
+            response = api_client.post(
+                "/api/v1/custom-voice/generate",
+                json={
+                    "text": "Stage timing test",
+                    "language": "English",
+                    "speaker": "Vivian",
+                    "speed": 1.5,
+                }
+            )
+        
+        assert response.status_code == 200
+        assert float(response.headers["X-Speed-Time"]) >= 0
+    
+    def test_clone_with_dsp_process_pool(self, api_client, base64_test_audio, mock_tts_model):
+        """Test voice cloning with decode, preprocessing and encoding in worker processes"""
+        from app import config
+        from app.utils.dsp_pool import get_dsp_pool, shutdown_dsp_pool
+        
+        try:
+            with patch.object(config.settings, 'audio_preprocessing_enabled', True), \
+                 patch.object(config.settings, 'dsp_pool_workers', 1), \
+                 patch('app.models.manager.model_manager.get_base_model', return_value=mock_tts_model):
+                response = api_client.post(
+                    "/api/v1/base/clone",
+                    json={
+                        "text": "Process pool test",
+                        "ref_audio_base64": base64_test_audio,
+                        "ref_text": "Reference text",
+                    }
+                )
+                stats = get_dsp_pool().get_stats()
+        finally:
+            shutdown_dsp_pool()
+        
+        assert response.status_code == 200
+        assert "X-Decode-Time" in response.headers
+        assert "X-Encode-Time" in response.headers
+        assert stats["submitted"] == 3
+        
+        # Reference is passed through to the model preprocessed
+        ref_audio, sr = mock_tts_model.create_voice_clone_prompt.call_args.kwargs["ref_audio"]
+        assert sr == 24000
+        assert len(ref_audio) > 0
@@ -57,3 +57,48 @@ class TestVoiceDesignAPI:
             
             assert response.status_code == 200
             assert "X-Generation-Time" in response.headers
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestVoiceDesignBatching:
+    """Test micro-batching of concurrent VoiceDesign requests"""
+    
+    async def test_different_instructs_share_batch(self, batching_model):
+        """Test requests with different instructs and formats fan out correctly"""
+        import asyncio
+        import io
+        import base64
+        import httpx
+        import soundfile as sf
+        from app.main import app
+        from app.routers import voice_design
+        
+        voice_design.get_batcher().reset_stats()
+        transport = httpx.ASGITransport(app=app)
+        requests = [
+            {"text": "Short", "instruct": "A deep male voice", "response_format": "base64"},
+            {"text": "A much longer sentence", "instruct": "A bright female voice", "response_format": "wav"},
+            {"text": "Slow one", "instruct": "A calm narrator", "speed": 0.5, "response_format": "base64"},
+        ]
+        with patch('app.models.manager.model_manager.get_voice_design_model', return_value=batching_model):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                         headers={"X-API-Key": "test-api-key"}) as client:
+                responses = await asyncio.gather(
+                    *[client.post("/api/v1/voice-design/generate", json=body) for body in requests],
+                    client.post("/api/v1/voice-design/generate-stream", json={
+                        "text": "Streamed", "instruct": "A whispering voice",
+                    }),
+                )
+        
+        assert all(r.status_code == 200 for r in responses)
+        call = batching_model.generate_voice_design.call_args_list[0]
+        assert call.kwargs["instruct"] == [r["instruct"] for r in requests] + ["A whispering voice"]
+        assert "event: audio" in responses[3].text
+        
+        # Each response carries its own wav with its own post-processing
+        short = sf.read(io.BytesIO(base64.b64decode(responses[0].json()["audio"])))[0]
+        long_ = sf.read(io.BytesIO(responses[1].content))[0]
+        assert responses[1].headers["content-type"] == "audio/wav"
+        assert len(long_) > len(short)
+        assert voice_design.get_batcher().get_stats()["batches"] == 1
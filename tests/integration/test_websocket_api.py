@@ -0,0 +1,148 @@
+"""
+Integration tests for the duplex WebSocket endpoints
+"""
+import numpy as np
+import pytest
+from unittest.mock import patch
+from starlette.websockets import WebSocketDisconnect
+
+
+def receive_segment(ws):
+    """Receive a segment header and its PCM frames"""
+    header = ws.receive_json()
+    assert header["type"] == "segment", header
+
+    pcm = b""
+    while len(pcm) < header["samples"] * 2:
+        pcm += ws.receive_bytes()
+    return header, np.frombuffer(pcm, dtype="<i2")
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestCustomVoiceWebSocket:
+    """Test incremental text in, audio frames out"""
+
+    def test_tokens_generated_per_sentence(self, api_client, mock_tts_model):
+        """Test sentences are generated as soon as they are complete"""
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=mock_tts_model):
+            with api_client.websocket_connect("/api/v1/custom-voice/ws") as ws:
+                ws.send_json({"type": "start", "speaker": "Aiden", "language": "English"})
+                assert ws.receive_json()["type"] == "ready"
+
+                for token in ["The first ", "sentence is ", "complete now. ", "The second "]:
+                    ws.send_json({"type": "text", "text": token})
+
+                header, pcm = receive_segment(ws)
+                assert header["index"] == 0
+                assert header["text"] == "The first sentence is complete now."
+                assert header["sample_rate"] == 24000
+                assert len(pcm) == header["samples"]
+
+                ws.send_json({"type": "text", "text": "one waits for a flush"})
+                ws.send_json({"type": "flush"})
+
+                header, _ = receive_segment(ws)
+                assert header["text"] == "The second one waits for a flush"
+
+                flushed = ws.receive_json()
+                assert flushed["type"] == "flushed"
+                assert flushed["time_to_first_audio"] > 0
+                assert flushed["audio_duration"] > 0
+
+                ws.send_json({"type": "close"})
+                assert ws.receive_json() == {"type": "flushed"}
+                assert ws.receive_json() == {"type": "done"}
+
+        texts = [call.kwargs["text"] for call in mock_tts_model.generate_custom_voice.call_args_list]
+        assert len(texts) == 2
+
+    def test_cancel_drops_buffered_text(self, api_client, mock_tts_model):
+        """Test cancel discards text that was not generated yet"""
+        with patch('app.models.manager.model_manager.get_custom_voice_model', return_value=mock_tts_model):
+            with api_client.websocket_connect("/api/v1/custom-voice/ws") as ws:
+                ws.send_json({"type": "start", "speaker": "Aiden"})
+                ws.receive_json()
+
+                ws.send_json({"type": "text", "text": "This half sentence is never"})
+                ws.send_json({"type": "cancel"})
+                assert ws.receive_json() == {"type": "cancelled"}
+
+                ws.send_json({"type": "flush"})
+                assert ws.receive_json() == {"type": "flushed"}
+
+        mock_tts_model.generate_custom_voice.assert_not_called()
+
+    def test_invalid_start_rejected(self, api_client):
+        """Test the start message is validated like the HTTP request"""
+        with api_client.websocket_connect("/api/v1/custom-voice/ws") as ws:
+            ws.send_json({"type": "start", "speed": 5.0})
+            error = ws.receive_json()
+            assert error["type"] == "error"
+            with pytest.raises(WebSocketDisconnect):
+                ws.receive_json()
+
+    def test_requires_api_key(self, api_client):
+        """Test the handshake is rejected without a valid API key"""
+        api_client.headers = {}
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with api_client.websocket_connect("/api/v1/custom-voice/ws"):
+                pass
+        assert exc_info.value.code == 1008
+
+        with api_client.websocket_connect("/api/v1/custom-voice/ws?api_key=test-api-key") as ws:
+            ws.send_json({"type": "close"})
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestBaseWebSocket:
+    """Test voice clone sessions"""
+
+    def test_reference_prepared_once(self, api_client, base64_test_audio, mock_tts_model):
+        """Test the voice prompt is extracted once for all segments"""
+        with patch('app.models.manager.model_manager.get_base_model', return_value=mock_tts_model):
+            with api_client.websocket_connect("/api/v1/base/ws") as ws:
+                ws.send_json({
+                    "type": "start",
+                    "ref_audio_base64": base64_test_audio,
+                    "ref_text": "Reference text",
+                    "text": "Hello from the cloned voice. ",
+                })
+                assert ws.receive_json()["type"] == "ready"
+
+                ws.send_json({"type": "text", "text": "And a second sentence follows."})
+                ws.send_json({"type": "close"})
+
+                assert receive_segment(ws)[0]["text"] == "Hello from the cloned voice."
+                assert receive_segment(ws)[0]["text"] == "And a second sentence follows."
+                assert ws.receive_json()["type"] == "flushed"
+                assert ws.receive_json() == {"type": "done"}
+
+        assert mock_tts_model.create_voice_clone_prompt.call_count == 1
+
+    def test_prompt_from_other_model_version(self, api_client, base64_test_audio, mock_tts_model):
+        """Test a saved prompt made by another Base model version is refused"""
+        from app.models.manager import model_manager
+
+        with patch('app.models.manager.model_manager.get_base_model', return_value=mock_tts_model):
+            prompt_id = api_client.post(
+                "/api/v1/base/create-prompt",
+                json={"ref_audio_base64": base64_test_audio, "ref_text": "Reference text"},
+            ).json()["prompt_id"]
+
+        with patch.object(model_manager, 'get_model_version', return_value="org/base-v2@0123456789ab"), \
+             api_client.websocket_connect("/api/v1/base/ws") as ws:
+            ws.send_json({"type": "start", "prompt_id": prompt_id})
+            error = ws.receive_json()
+
+        assert error["type"] == "error"
+        assert "another version" in error["detail"]
+
+    def test_unknown_prompt_id(self, api_client):
+        """Test an unknown saved prompt is reported before closing"""
+        with api_client.websocket_connect("/api/v1/base/ws") as ws:
+            ws.send_json({"type": "start", "prompt_id": "missing"})
+            error = ws.receive_json()
+            assert error["type"] == "error"
+            assert "missing" in error["detail"]
@@ -5,7 +5,7 @@ PRIMARY FOCUS: Testing silence detection, smart clipping, and audio quality pres
 """
 import pytest
 import numpy as np
-from app.utils.audio import preprocess_reference_audio
+from app.utils.audio import preprocess_reference_audio, preprocess_reference_audio_pydub
 from tests.utils import (
     generate_test_audio,
     add_silence,
@@ -447,3 +447,86 @@ class TestPreprocessingWithoutPydub:
         if "clip_method" in metadata:
             # Any method is fine, as long as it works
             pass
+
+
+def random_mix(rng: np.random.Generator, sample_rate: int) -> np.ndarray:
+    """3-25s of random tone, low-level noise and digital silence sections"""
+    sections = []
+    duration = 0.0
+    target = rng.uniform(3.0, 25.0)
+    while duration < target:
+        length = rng.uniform(0.05, 2.5)
+        frames = int(length * sample_rate)
+        kind = rng.integers(3)
+        if kind == 0:
+            sections.append(np.zeros(frames))
+        elif kind == 1:
+            sections.append(rng.normal(0, rng.uniform(0.0005, 0.02), frames))
+        else:
+            t = np.arange(frames) / sample_rate
+            tone = rng.uniform(0.05, 0.8) * np.sin(2 * np.pi * rng.uniform(100, 1000) * t)
+            sections.append(tone + rng.normal(0, 0.003, frames))
+        duration += length
+    return np.concatenate(sections)
+
+
+def assert_same_result(new, old):
+    """Assert both engines made the same decisions and returned the same audio"""
+    new_audio, new_sr, new_meta = new
+    old_audio, old_sr, old_meta = old
+    
+    assert new_sr == old_sr
+    assert new_meta.get("clip_method") == old_meta.get("clip_method")
+    assert new_meta.get("silence_removed_ms") == old_meta.get("silence_removed_ms")
+    assert new_meta["processed_duration"] == old_meta["processed_duration"]
+    assert len(new_audio) == len(old_audio)
+    # pydub quantizes to 16-bit PCM
+    np.testing.assert_allclose(new_audio, old_audio, atol=1e-4)
+
+
+@pytest.mark.unit
+@pytest.mark.preprocessing
+class TestEngineEquivalence:
+    """Test the array engine reproduces the legacy pydub engine"""
+    
+    @pytest.mark.parametrize("sample_name", [
+        "short_clean", "long", "silent_edges", "with_pauses",
+        "stereo", "noisy", "silent", "continuous",
+    ])
+    def test_matches_pydub_engine(self, test_audio_samples, sample_name):
+        """Test metadata and output match for every fixture"""
+        audio, sample_rate = test_audio_samples[sample_name]
+        
+        new_audio, new_sr, new_meta = preprocess_reference_audio(audio, sample_rate, max_duration=15.0)
+        old_audio, old_sr, old_meta = preprocess_reference_audio_pydub(audio, sample_rate, max_duration=15.0)
+        
+        assert_same_result(
+            (new_audio, new_sr, new_meta), (old_audio, old_sr, old_meta)
+        )
+    
+    @pytest.mark.parametrize("sample_rate", [16000, 22050, 24000, 44100, 48000])
+    def test_matches_pydub_engine_on_random_mixes(self, sample_rate):
+        """Test random tone, noise and silence mixes match at common sample rates"""
+        rng = np.random.default_rng(sample_rate)
+        
+        for _ in range(6):
+            audio = random_mix(rng, sample_rate)
+            assert_same_result(
+                preprocess_reference_audio(audio, sample_rate, max_duration=15.0),
+                preprocess_reference_audio_pydub(audio, sample_rate, max_duration=15.0),
+            )
+    
+    def test_no_reencoding(self, test_audio_samples, monkeypatch):
+        """Test the array engine never writes or reads WAV"""
+        import soundfile as sf
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("preprocessing should not re-encode audio")
+        
+        monkeypatch.setattr(sf, "write", fail)
+        monkeypatch.setattr(sf, "read", fail)
+        audio, sample_rate = test_audio_samples["long"]
+        
+        _, _, metadata = preprocess_reference_audio(audio, sample_rate, max_duration=15.0)
+        
+        assert "clip_method" in metadata
@@ -0,0 +1,186 @@
+"""
+Tests for dynamic micro-batching
+"""
+import asyncio
+import pytest
+import numpy as np
+from app.models.batching import MicroBatcher, stack_params
+from app.utils.metrics import PerformanceTracker
+
+
+class RecordingModel:
+    """Fake run callable that records every call it receives"""
+    
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.calls = []
+        self.delay = delay
+        self.fail = fail
+    
+    async def __call__(self, tracker=None, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        texts = kwargs["text"] if isinstance(kwargs["text"], list) else [kwargs["text"]]
+        if self.fail or "bad" in texts:
+            raise RuntimeError("generation failed")
+        if tracker is not None:
+            tracker.mark_queue_wait(0.0)
+        return [np.full(len(t), i, dtype=np.float32) for i, t in enumerate(texts)], 24000
+
+
+@pytest.mark.unit
+class TestStackParams:
+    """Test list-valued kwargs construction"""
+    
+    def test_stack_params(self):
+        """Test per-request kwargs are stacked into lists"""
+        kwargs = stack_params([
+            {"text": "a", "speaker": "Ryan"},
+            {"text": "b", "speaker": "Vivian"},
+        ])
+        
+        assert kwargs == {"text": ["a", "b"], "speaker": ["Ryan", "Vivian"]}
+
+
+@pytest.mark.unit
+class TestMicroBatcher:
+    """Test request coalescing and fan-out"""
+    
+    async def test_single_request_uses_scalar_call(self):
+        """Test a lone request is issued without list wrapping"""
+        model = RecordingModel()
+        batcher = MicroBatcher("test", model, max_batch_size=4, max_wait_ms=1)
+        
+        audio, sr = await batcher.submit({"text": "hello"})
+        
+        assert model.calls == [{"text": "hello"}]
+        assert len(audio) == 5
+        assert sr == 24000
+    
+    async def test_concurrent_requests_batched(self):
+        """Test concurrent requests share one list-valued call"""
+        model = RecordingModel()
+        batcher = MicroBatcher("test", model, max_batch_size=8, max_wait_ms=50)
+        
+        results = await asyncio.gather(*[
+            batcher.submit({"text": "x" * (i + 1)}) for i in range(4)
+        ])
+        
+        assert len(model.calls) == 1
+        assert model.calls[0]["text"] == ["x", "xx", "xxx", "xxxx"]
+        # Each request receives its own wav
+        assert [len(audio) for audio, _ in results] == [1, 2, 3, 4]
+    
+    async def test_max_batch_size_respected(self):
+        """Test batches are split at max_batch_size"""
+        model = RecordingModel()
+        batcher = MicroBatcher("test", model, max_batch_size=3, max_wait_ms=50)
+        
+        await asyncio.gather(*[batcher.submit({"text": "t"}) for _ in range(7)])
+        
+        sizes = [len(c["text"]) if isinstance(c["text"], list) else 1 for c in model.calls]
+        assert sorted(sizes, reverse=True) == [3, 3, 1]
+    
+    async def test_requests_accumulate_while_busy(self):
+        """Test requests arriving during a running batch form the next batch"""
+        model = RecordingModel(delay=0.1)
+        batcher = MicroBatcher("test", model, max_batch_size=8, max_wait_ms=1)
+        
+        first = asyncio.ensure_future(batcher.submit({"text": "first"}))
+        await asyncio.sleep(0.02)
+        rest = [asyncio.ensure_future(batcher.submit({"text": "next"})) for _ in range(3)]
+        await asyncio.gather(first, *rest)
+        
+        assert len(model.calls) == 2
+        assert model.calls[1]["text"] == ["next", "next", "next"]
+    
+    async def test_bad_request_fails_alone(self):
+        """Test a request that fails its batch fails alone while its batch-mates succeed"""
+        model = RecordingModel()
+        batcher = MicroBatcher("test", model, max_batch_size=4, max_wait_ms=20)
+        
+        results = await asyncio.gather(
+            *[batcher.submit({"text": text}) for text in ("one", "bad", "three")],
+            return_exceptions=True,
+        )
+        
+        assert isinstance(results[1], RuntimeError)
+        assert len(results[0][0]) == 3
+        assert len(results[2][0]) == 5
+        assert model.calls[0]["text"] == ["one", "bad", "three"]
+        assert [call["text"] for call in model.calls[1:]] == ["one", "bad", "three"]
+        stats = batcher.get_stats()
+        assert stats["split_batches"] == 1
+        assert stats["errors"] == 2
+    
+    async def test_failing_model_fails_every_request(self):
+        """Test every request gets an error when the model fails for each of them"""
+        model = RecordingModel(fail=True)
+        batcher = MicroBatcher("test", model, max_batch_size=4, max_wait_ms=20)
+        
+        results = await asyncio.gather(
+            *[batcher.submit({"text": "t"}) for _ in range(3)],
+            return_exceptions=True,
+        )
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+    
+    async def test_queue_wait_recorded(self):
+        """Test batching wait is added to the request tracker"""
+        model = RecordingModel()
+        batcher = MicroBatcher("test", model, max_batch_size=4, max_wait_ms=30)
+        tracker = PerformanceTracker()
+        
+        await batcher.submit({"text": "t"}, tracker=tracker)
+        
+        assert tracker.queue_wait_time is not None
+        assert tracker.queue_wait_time >= 0.02
+    
+    async def test_stats_histograms(self):
+        """Test batch-size and wait-time histograms"""
+        model = RecordingModel()
+        batcher = MicroBatcher("test", model, max_batch_size=8, max_wait_ms=20)
+        
+        await asyncio.gather(*[batcher.submit({"text": "t"}) for _ in range(4)])
+        
+        stats = batcher.get_stats()
+        assert stats["requests"] == 4
+        assert stats["batches"] == 1
+        assert stats["batch_size_histogram"]["buckets"]["le_4"] == 1
+        assert stats["wait_time_ms_histogram"]["count"] == 4
+        
+        batcher.reset_stats()
+        assert batcher.get_stats()["batches"] == 0
+    
+    async def test_unbatchable_requests_bypass_batching(self):
+        """Test requests rejected by the batchable predicate run on their own"""
+        model = RecordingModel()
+        batcher = MicroBatcher(
+            "test", model, max_batch_size=8, max_wait_ms=20,
+            batchable=lambda params: params["text"] != "solo",
+        )
+        
+        await asyncio.gather(
+            batcher.submit({"text": "solo"}),
+            batcher.submit({"text": "a"}),
+            batcher.submit({"text": "b"}),
+        )
+        
+        assert {"text": "solo"} in model.calls
+        assert {"text": ["a", "b"]} in model.calls
+        assert batcher.get_stats()["unbatched"] == 1
+    
+    async def test_custom_build_kwargs(self):
+        """Test custom kwargs builder is used for multi-request batches"""
+        model = RecordingModel()
+        
+        def build(items):
+            return {"text": [item["text"] for item in items], "voice": [item["voice"][0] for item in items]}
+        
+        batcher = MicroBatcher("test", model, max_batch_size=8, max_wait_ms=20, build_kwargs=build)
+        
+        await asyncio.gather(
+            batcher.submit({"text": "a", "voice": ["v1"]}),
+            batcher.submit({"text": "b", "voice": ["v2"]}),
+        )
+        
+        assert model.calls == [{"text": ["a", "b"], "voice": ["v1", "v2"]}]
@@ -5,7 +5,13 @@ import pytest
 import time
 import threading
 import numpy as np
-from app.utils.caching import VoicePromptCache
+from app.utils.caching import (
+    VoicePromptCache,
+    OutputAudioCache,
+    DiskPromptCache,
+    ReferenceAudioCache,
+    audio_content_key,
+)
 from tests.utils import generate_test_audio
 
 
@@ -65,6 +71,54 @@ class TestCacheKeyGeneration:
         key2 = cache._generate_cache_key(audio, sample_rate, ref_text, True)
         
         assert key1 != key2, "Different mode should generate different keys"
+    
+    def test_interior_difference_different_key(self):
+        """Test audio differing only away from the edges and middle gets a different key"""
+        cache = VoicePromptCache(max_size=10)
+        
+        audio1 = generate_test_audio(duration=3.0)
+        audio2 = audio1.copy()
+        audio2[len(audio2) // 4] += 0.01
+        
+        key1 = cache._generate_cache_key(audio1, 24000, "Test text", False)
+        key2 = cache._generate_cache_key(audio2, 24000, "Test text", False)
+        
+        assert key1 != key2, "Any sample difference should change the key"
+    
+    def test_long_text_shared_prefix_different_key(self):
+        """Test transcripts sharing a long prefix get different keys"""
+        cache = VoicePromptCache(max_size=10)
+        
+        audio = generate_test_audio(duration=3.0)
+        prefix = "This reference transcript is longer than thirty-two characters"
+        
+        key1 = cache._generate_cache_key(audio, 24000, prefix + " ending one", False)
+        key2 = cache._generate_cache_key(audio, 24000, prefix + " ending two", False)
+        
+        assert key1 != key2, "The full transcript should be part of the key"
+    
+    def test_non_contiguous_audio(self):
+        """Test strided views hash the same as their contiguous copy"""
+        cache = VoicePromptCache(max_size=10)
+        
+        audio = generate_test_audio(duration=3.0)
+        view = audio[::2]
+        
+        key1 = cache._generate_cache_key(view, 24000, "Test text", False)
+        key2 = cache._generate_cache_key(view.copy(), 24000, "Test text", False)
+        
+        assert key1 == key2
+    
+    def test_different_model_version_different_key(self):
+        """Test prompts extracted by another model version are not reused"""
+        cache = VoicePromptCache(max_size=10)
+        
+        audio = generate_test_audio(duration=3.0)
+        
+        key1 = cache._generate_cache_key(audio, 24000, "Test text", False, model_version="base@0")
+        key2 = cache._generate_cache_key(audio, 24000, "Test text", False, model_version="base@1")
+        
+        assert key1 != key2
 
 
 @pytest.mark.unit
@@ -357,3 +411,309 @@ class TestCacheClear:
             audio = generate_test_audio(duration=3.0, frequency=440.0 + i * 100)
             result = cache.get(audio, 24000, f"Text {i}", False)
             assert result is None, "No entries should remain after clear"
+
+
+@pytest.mark.unit
+class TestSingleFlightExtraction:
+    """Test coalesced prompt extraction on concurrent misses"""
+    
+    async def test_concurrent_misses_extract_once(self):
+        """Test N concurrent misses run one extraction"""
+        import asyncio
+        
+        cache = VoicePromptCache(max_size=10)
+        audio = generate_test_audio(duration=3.0)
+        extractions = []
+        
+        async def create():
+            extractions.append(1)
+            await asyncio.sleep(0.05)
+            return {"prompt": "extracted"}
+        
+        results = await asyncio.gather(*[
+            cache.get_or_create(audio, 24000, "Test text", False, create)
+            for _ in range(4)
+        ])
+        
+        assert len(extractions) == 1
+        statuses = sorted(status for _, status in results)
+        assert statuses == ["coalesced", "coalesced", "coalesced", "miss"]
+        assert all(prompt == {"prompt": "extracted"} for prompt, _ in results)
+        
+        stats = cache.get_stats()
+        assert stats["coalesced"] == 3
+        assert stats["inflight_extractions"] == 0
+        assert stats["size"] == 1
+    
+    async def test_hit_after_extraction(self):
+        """Test later requests hit the stored prompt"""
+        cache = VoicePromptCache(max_size=10)
+        audio = generate_test_audio(duration=3.0)
+        
+        async def create():
+            return {"prompt": "extracted"}
+        
+        await cache.get_or_create(audio, 24000, "Test text", False, create)
+        prompt, status = await cache.get_or_create(audio, 24000, "Test text", False, create)
+        
+        assert status == "hit"
+        assert prompt == {"prompt": "extracted"}
+    
+    async def test_reset_stats_clears_coalesced(self):
+        """Test reset_stats clears the coalesced counter"""
+        cache = VoicePromptCache(max_size=10)
+        cache._coalesced = 5
+        cache.reset_stats()
+        
+        assert cache.get_stats()["coalesced"] == 0
+
+
+@pytest.mark.unit
+class TestOutputAudioCache:
+    """Test the content-addressed output audio cache"""
+    
+    def test_key_includes_model_identity(self):
+        """Test same params with a different model or dtype give different keys"""
+        params = {"text": "Hello", "speaker": "Vivian", "speed": 1.0}
+        
+        key = OutputAudioCache.make_key("custom_voice", params, "model-a", "bfloat16")
+        
+        assert key == OutputAudioCache.make_key("custom_voice", dict(params), "model-a", "bfloat16")
+        assert key != OutputAudioCache.make_key("custom_voice", params, "model-b", "bfloat16")
+        assert key != OutputAudioCache.make_key("custom_voice", params, "model-a", "float32")
+        assert key != OutputAudioCache.make_key("voice_design", params, "model-a", "bfloat16")
+        assert key != OutputAudioCache.make_key(
+            "custom_voice", {**params, "speed": 1.5}, "model-a", "bfloat16"
+        )
+        assert key == OutputAudioCache.make_key(
+            "custom_voice", {**params, "response_format": "base64"}, "model-a", "bfloat16"
+        )
+        assert key != OutputAudioCache.make_key("custom_voice", params, "model-a", "bfloat16", "mp3")
+        assert OutputAudioCache.make_key(
+            "custom_voice", {**params, "response_format": "mp3"}, "model-a", "bfloat16", "mp3"
+        ) == OutputAudioCache.make_key(
+            "custom_voice", {**params, "audio_format": "mp3"}, "model-a", "bfloat16", "mp3"
+        )
+    
+    def test_put_and_get(self):
+        """Test stored audio is returned on a hit"""
+        cache = OutputAudioCache(max_bytes=1024)
+        cache.put("key", b"audio", 24000, 1.5)
+        
+        entry = cache.get("key")
+        
+        assert entry["audio"] == b"audio"
+        assert entry["sample_rate"] == 24000
+        assert entry["duration"] == 1.5
+        assert cache.get("missing") is None
+    
+    def test_byte_budget_eviction(self):
+        """Test least recently used entries are evicted to fit the byte budget"""
+        cache = OutputAudioCache(max_bytes=100)
+        cache.put("a", b"x" * 40, 24000, 1.0)
+        cache.put("b", b"x" * 40, 24000, 1.0)
+        cache.get("a")  # a becomes most recently used
+        cache.put("c", b"x" * 40, 24000, 1.0)
+        
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] == 80
+    
+    def test_oversized_entry_not_cached(self):
+        """Test audio larger than the budget is not stored"""
+        cache = OutputAudioCache(max_bytes=10)
+        cache.put("key", b"x" * 20, 24000, 1.0)
+        
+        assert cache.get("key") is None
+        assert cache.get_stats()["bytes"] == 0
+    
+    def test_ttl_expiration(self):
+        """Test expired entries are dropped"""
+        cache = OutputAudioCache(max_bytes=1024, ttl_seconds=1)
+        cache.put("key", b"audio", 24000, 1.0)
+        
+        time.sleep(1.1)
+        
+        assert cache.get("key") is None
+        assert cache.get_stats()["bytes"] == 0
+    
+    def test_stats_and_clear(self):
+        """Test statistics tracking and clearing"""
+        cache = OutputAudioCache(max_bytes=1024)
+        cache.put("key", b"audio", 24000, 1.0)
+        cache.get("key")
+        cache.get("missing")
+        
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate_percent"] == 50.0
+        
+        cache.clear()
+        assert cache.get_stats()["size"] == 0
+        
+        cache.reset_stats()
+        assert cache.get_stats()["total_requests"] == 0
+
+
+@pytest.mark.unit
+class TestDiskPromptCache:
+    """Test the on-disk second tier for voice prompts"""
+    
+    def test_put_and_get(self, tmp_path):
+        """Test prompts are persisted and loaded back"""
+        cache = DiskPromptCache(str(tmp_path))
+        cache.put("key", [{"embedding": np.ones(4, dtype=np.float32)}])
+        
+        restored = cache.get("key")
+        
+        np.testing.assert_array_equal(restored[0]["embedding"], np.ones(4, dtype=np.float32))
+        assert cache.get("missing") is None
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+    
+    def test_survives_restart(self, tmp_path):
+        """Test a new instance picks up prompts written by a previous one"""
+        DiskPromptCache(str(tmp_path)).put("key", [{"prompt": "persisted"}])
+        
+        cache = DiskPromptCache(str(tmp_path))
+        
+        assert cache.get_stats()["size"] == 1
+        assert cache.get("key") == [{"prompt": "persisted"}]
+    
+    def test_byte_budget_eviction(self, tmp_path):
+        """Test least recently used files are removed to fit the budget"""
+        payload = np.zeros(1000, dtype=np.float32)
+        cache = DiskPromptCache(str(tmp_path), max_bytes=10000)
+        cache.put("a", [payload])
+        cache.put("b", [payload])
+        cache.get("a")  # a becomes most recently used
+        cache.put("c", [payload])
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.get_stats()["evictions"] == 1
+        assert len(list(tmp_path.glob("*.qvpc"))) == 2
+    
+    def test_corrupt_file_dropped(self, tmp_path):
+        """Test unreadable files count as misses and are removed"""
+        cache = DiskPromptCache(str(tmp_path))
+        cache.put("key", [{"prompt": "value"}])
+        (tmp_path / "key.qvpc").write_bytes(b"garbage")
+        
+        assert cache.get("key") is None
+        assert cache.get_stats()["errors"] == 1
+        assert not (tmp_path / "key.qvpc").exists()
+    
+    async def test_l2_hit_promoted_to_l1(self, tmp_path):
+        """Test an L1 miss is served from disk and promoted"""
+        audio = generate_test_audio(duration=3.0)
+        extractions = []
+        
+        async def create():
+            extractions.append(1)
+            return [{"prompt": "extracted"}]
+        
+        first = VoicePromptCache(max_size=10, disk_cache=DiskPromptCache(str(tmp_path)))
+        _, status = await first.get_or_create(audio, 24000, "Test text", False, create)
+        assert status == "miss"
+        
+        # Simulate a restart: empty memory tier, same directory
+        cache = VoicePromptCache(max_size=10, disk_cache=DiskPromptCache(str(tmp_path)))
+        prompt, status = await cache.get_or_create(audio, 24000, "Test text", False, create)
+        
+        assert status == "hit"
+        assert prompt == [{"prompt": "extracted"}]
+        assert len(extractions) == 1
+        assert cache.get(audio, 24000, "Test text", False) == [{"prompt": "extracted"}]
+        
+        stats = cache.get_stats()
+        assert stats["l2"]["hits"] == 1
+        assert stats["l2"]["hit_rate_percent"] == 100.0
+        assert stats["hits"] == 1  # the promoted lookup
+        assert stats["misses"] == 1
+    
+    def test_clear_removes_both_tiers(self, tmp_path):
+        """Test clearing the cache also removes disk entries"""
+        disk_cache = DiskPromptCache(str(tmp_path))
+        cache = VoicePromptCache(max_size=10, disk_cache=disk_cache)
+        disk_cache.put("key", [{"prompt": "value"}])
+        
+        cache.clear()
+        
+        assert disk_cache.get_stats()["size"] == 0
+        assert not list(tmp_path.glob("*.qvpc"))
+    
+    def test_stats_without_disk_tier(self):
+        """Test stats report the disk tier as disabled when not configured"""
+        assert VoicePromptCache(max_size=10).get_stats()["l2"] == {"enabled": False}
+
+
+@pytest.mark.unit
+class TestReferenceAudioCache:
+    """Test the raw-bytes reference audio cache"""
+    
+    def test_fingerprint_includes_settings(self):
+        """Test the same bytes under different preprocessing settings differ"""
+        key1 = ReferenceAudioCache.fingerprint(b"audio bytes", "pre|15.0|5.0")
+        key2 = ReferenceAudioCache.fingerprint(b"audio bytes", "raw")
+        
+        assert key1 != key2
+        assert key1 == ReferenceAudioCache.fingerprint(b"audio bytes", "pre|15.0|5.0")
+    
+    def test_put_and_get(self):
+        """Test stored audio is returned with its content key"""
+        cache = ReferenceAudioCache(max_bytes=1024 * 1024)
+        audio = generate_test_audio(duration=1.0)
+        cache.put("fp", audio, 24000, audio_content_key(audio))
+        
+        audio_data, sample_rate, audio_key = cache.get("fp")
+        
+        assert audio_data is audio
+        assert sample_rate == 24000
+        assert audio_key == audio_content_key(audio)
+        assert cache.get("missing") is None
+    
+    def test_byte_budget_eviction(self):
+        """Test least recently used references are evicted to fit the budget"""
+        audio = np.zeros(100, dtype=np.float32)  # 400 bytes
+        cache = ReferenceAudioCache(max_bytes=1000)
+        cache.put("a", audio, 24000, "ka")
+        cache.put("b", audio, 24000, "kb")
+        cache.get("a")
+        cache.put("c", audio, 24000, "kc")
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get_stats()["evictions"] == 1
+    
+    def test_url_validators(self):
+        """Test URL validators are kept only when the server sent some"""
+        cache = ReferenceAudioCache()
+        cache.set_url_validator("http://a", '"v1"', None, "fp")
+        cache.set_url_validator("http://b", None, None, "fp")
+        
+        assert cache.get_url_validator("http://a")["etag"] == '"v1"'
+        assert cache.get_url_validator("http://b") is None
+    
+    async def test_audio_key_reused_by_prompt_cache(self):
+        """Test a precomputed audio key addresses the same prompt entry"""
+        cache = VoicePromptCache(max_size=10)
+        audio = generate_test_audio(duration=1.0)
+        
+        async def create():
+            return [{"prompt": "extracted"}]
+        
+        await cache.get_or_create(audio, 24000, "Text", False, create)
+        _, status = await cache.get_or_create(
+            audio, 24000, "Text", False, create, audio_key=audio_content_key(audio)
+        )
+        
+        assert status == "hit"
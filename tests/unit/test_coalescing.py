@@ -0,0 +1,148 @@
+"""
+Tests for in-flight request coalescing
+"""
+import asyncio
+import pytest
+from app.utils.coalescing import (
+    SingleFlight,
+    coalesce_request,
+    get_request_coalescing_stats,
+    make_request_key,
+)
+from app.utils.metrics import PerformanceTracker
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    """Test single-flight execution per key"""
+    
+    async def test_concurrent_callers_share_result(self):
+        """Test only one operation runs for concurrent identical keys"""
+        flight = SingleFlight()
+        calls = []
+        
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        results = await asyncio.gather(*[flight.do("key", work) for _ in range(5)])
+        
+        assert len(calls) == 1
+        assert [r for r, _ in results] == ["result"] * 5
+        assert sum(shared for _, shared in results) == 4
+        assert flight.get_stats() == {"inflight": 0, "leaders": 1, "coalesced": 4}
+    
+    async def test_different_keys_run_separately(self):
+        """Test different keys do not share work"""
+        flight = SingleFlight()
+        
+        async def work(value):
+            await asyncio.sleep(0.01)
+            return value
+        
+        results = await asyncio.gather(
+            flight.do("a", lambda: work("a")),
+            flight.do("b", lambda: work("b")),
+        )
+        
+        assert results == [("a", False), ("b", False)]
+    
+    async def test_sequential_calls_not_coalesced(self):
+        """Test a finished operation is not reused by later callers"""
+        flight = SingleFlight()
+        calls = []
+        
+        async def work():
+            calls.append(1)
+            return len(calls)
+        
+        assert await flight.do("key", work) == (1, False)
+        assert await flight.do("key", work) == (2, False)
+    
+    async def test_errors_shared(self):
+        """Test followers receive the leader's exception"""
+        flight = SingleFlight()
+        
+        async def fail():
+            await asyncio.sleep(0.02)
+            raise ValueError("extraction failed")
+        
+        results = await asyncio.gather(
+            flight.do("key", fail),
+            flight.do("key", fail),
+            return_exceptions=True,
+        )
+        
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.get_stats()["inflight"] == 0
+    
+    async def test_leader_cancellation_does_not_cancel_followers(self):
+        """Test the operation survives its first caller going away"""
+        flight = SingleFlight()
+        
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+        
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        
+        assert await follower == ("done", True)
+
+
+@pytest.mark.unit
+class TestRequestKey:
+    """Test normalized request keys"""
+    
+    def test_whitespace_normalized(self):
+        """Test equivalent texts produce the same key"""
+        key1 = make_request_key("custom_voice", {"text": "Your order  is ready ", "speaker": "Ryan"})
+        key2 = make_request_key("custom_voice", {"text": "Your order is ready", "speaker": "Ryan"})
+        
+        assert key1 == key2
+    
+    def test_none_equals_empty(self):
+        """Test a missing instruct matches an empty one"""
+        key1 = make_request_key("custom_voice", {"text": "Hi", "instruct": None})
+        key2 = make_request_key("custom_voice", {"text": "Hi", "instruct": ""})
+        
+        assert key1 == key2
+    
+    def test_parameters_distinguish(self):
+        """Test speed, format and model type change the key"""
+        base = {"text": "Hi", "speed": 1.0, "response_format": "wav"}
+        key = make_request_key("custom_voice", base)
+        
+        assert key != make_request_key("custom_voice", {**base, "speed": 1.5})
+        assert key != make_request_key("custom_voice", {**base, "response_format": "base64"})
+        assert key != make_request_key("voice_design", base)
+
+
+@pytest.mark.unit
+class TestCoalesceRequest:
+    """Test generation request coalescing"""
+    
+    async def test_identical_requests_share_generation(self):
+        """Test identical concurrent requests run one generation"""
+        calls = []
+        
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "audio"
+        
+        trackers = [PerformanceTracker() for _ in range(3)]
+        params = {"text": "Please hold", "speaker": "Ryan"}
+        results = await asyncio.gather(*[
+            coalesce_request("unit_test", params, generate, tracker=tracker)
+            for tracker in trackers
+        ])
+        
+        assert results == ["audio"] * 3
+        assert len(calls) == 1
+        assert sorted(t.cache_status for t in trackers) == ["coalesced", "coalesced", "miss"]
+        assert get_request_coalescing_stats()["unit_test"]["coalesced"] >= 2
@@ -0,0 +1,113 @@
+"""
+Unit tests for output audio codecs
+"""
+import io
+import numpy as np
+import pytest
+import soundfile as sf
+from app.utils.codecs import (
+    StreamEncoder,
+    encode_audio,
+    encoded_sample_rate,
+    get_codec,
+    resolve_audio_format,
+)
+from tests.utils import generate_test_audio
+
+
+@pytest.mark.unit
+class TestEncodeAudio:
+    """Test whole-file encoding"""
+
+    @pytest.mark.parametrize("audio_format", ["wav", "flac", "opus", "mp3"])
+    def test_round_trip(self, audio_format):
+        """Test every codec decodes back to audio of the same length"""
+        audio = generate_test_audio(duration=2.0)
+
+        decoded, sr = sf.read(io.BytesIO(encode_audio(audio, 24000, audio_format)))
+
+        assert sr == 24000
+        assert len(decoded) == pytest.approx(len(audio), abs=1200)
+
+    def test_flac_is_lossless_and_smaller(self):
+        """Test FLAC keeps the 16-bit samples of the WAV encoding (to one rounding step)"""
+        audio = generate_test_audio(duration=2.0, add_noise=True)
+
+        wav = encode_audio(audio, 24000, "wav")
+        flac = encode_audio(audio, 24000, "flac")
+
+        assert len(flac) < len(wav)
+        flac_samples = sf.read(io.BytesIO(flac), dtype="int16")[0].astype(np.int32)
+        wav_samples = sf.read(io.BytesIO(wav), dtype="int16")[0].astype(np.int32)
+        assert np.abs(flac_samples - wav_samples).max() <= 1
+
+    def test_opus_resamples_unsupported_rates(self):
+        """Test Opus audio at a rate the encoder rejects is encoded at 48 kHz"""
+        pytest.importorskip("librosa")
+        audio = generate_test_audio(duration=1.0, sample_rate=22050)
+
+        decoded, sr = sf.read(io.BytesIO(encode_audio(audio, 22050, "opus")))
+
+        assert encoded_sample_rate("opus", 22050) == sr == 48000
+        assert encoded_sample_rate("opus", 24000) == 24000
+        assert len(decoded) == pytest.approx(48000, abs=1200)
+
+    def test_unknown_format(self):
+        """Test unknown codecs are rejected"""
+        with pytest.raises(ValueError, match="Unsupported audio format"):
+            get_codec("aac")
+
+    def test_resolve_audio_format(self):
+        """Test file downloads name the codec; base64 uses audio_format"""
+        assert resolve_audio_format("mp3", "wav") == "mp3"
+        assert resolve_audio_format("base64", "opus") == "opus"
+        assert resolve_audio_format("zip") == "wav"
+
+
+@pytest.mark.unit
+class TestStreamEncoder:
+    """Test incremental encoding"""
+
+    @pytest.mark.parametrize("audio_format,magic", [
+        ("flac", b"fLaC"),
+        ("opus", b"OggS"),
+        ("mp3", b"\xff"),
+    ])
+    def test_bytes_produced_per_chunk(self, audio_format, magic):
+        """Test encoded bytes are available before the stream is closed"""
+        audio = generate_test_audio(duration=3.0)
+        encoder = StreamEncoder(audio_format, 24000)
+
+        chunks = [encoder.encode(audio[start:start + 12000]) for start in range(0, len(audio), 12000)]
+        chunks.append(encoder.close())
+        stream = b"".join(chunks)
+
+        assert stream.startswith(magic)
+        assert sum(1 for chunk in chunks[:-1] if chunk) >= 2
+        assert len(stream) < len(encode_audio(audio, 24000, "wav"))
+
+    def test_opus_stream_decodes(self):
+        """Test an incrementally encoded Ogg/Opus stream holds all the audio"""
+        audio = generate_test_audio(duration=3.0)
+        encoder = StreamEncoder("opus", 24000)
+
+        stream = b"".join(
+            [encoder.encode(audio[start:start + 6000]) for start in range(0, len(audio), 6000)]
+            + [encoder.close()]
+        )
+        decoded, sr = sf.read(io.BytesIO(stream))
+
+        assert sr == 24000
+        assert len(decoded) == len(audio)
+
+    def test_header_rewrites_after_drain_are_dropped(self):
+        """Test bytes already handed out are never changed by a closing seek"""
+        audio = generate_test_audio(duration=2.0)
+        encoder = StreamEncoder("flac", 24000)
+
+        head = encoder.encode(audio)
+        tail = encoder.close()
+
+        # The closing STREAMINFO update targets the start of the stream
+        assert head.startswith(b"fLaC")
+        assert not tail.startswith(b"fLaC")
@@ -0,0 +1,166 @@
+"""
+Unit tests for the DSP process pool
+"""
+import asyncio
+import os
+import time
+import numpy as np
+import pytest
+from unittest.mock import patch
+from app.utils import dsp_pool
+from app.utils.audio import apply_speed, preprocess_reference_audio
+from app.utils.dsp_pool import DSPPool, SharedArrayRef, _attach, _release, _share, run_dsp
+from app.utils.metrics import PerformanceTracker
+from tests.utils import generate_test_audio, add_silence
+
+
+def slow_scale(audio, seconds):
+    """Module-level (picklable) DSP stand-in that takes a while"""
+    time.sleep(seconds)
+    return audio * 0.5
+
+
+def shared_segments():
+    """Names of the shared memory segments that currently exist"""
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """Single-worker process pool shared by the module"""
+    pool = DSPPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.unit
+class TestSharedArrays:
+    """Test shared memory hand-off helpers"""
+
+    def test_large_array_round_trip(self):
+        """Test large arrays are replaced by a reference and restored intact"""
+        array = np.random.rand(48000).astype(np.float32)
+        segments = []
+        ref = _share(array, segments)
+        assert isinstance(ref, SharedArrayRef)
+
+        attached = []
+        restored = _attach(ref, attached).copy()
+        _release(attached)
+        _release(segments, unlink=True)
+
+        np.testing.assert_array_equal(restored, array)
+
+    def test_small_values_pass_through(self):
+        """Test small arrays and scalars are pickled as they are"""
+        segments = []
+        small = np.zeros(16)
+        assert _share(small, segments) is small
+        assert _share(24000, segments) == 24000
+        assert segments == []
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+class TestDSPPool:
+    """Test running DSP functions in worker processes"""
+
+    @pytest.mark.asyncio
+    async def test_preprocessing_matches_inline(self, pool):
+        """Test preprocessing in a worker gives the same result as inline"""
+        audio = add_silence(generate_test_audio(duration=20.0), 24000, 1.0, position="both")
+
+        expected, _, expected_meta = preprocess_reference_audio(audio, 24000, max_duration=15.0)
+        result, sr, metadata = await pool.run(preprocess_reference_audio, audio, 24000, max_duration=15.0)
+
+        assert sr == 24000
+        np.testing.assert_array_equal(result, expected)
+        assert metadata == expected_meta
+
+    @pytest.mark.asyncio
+    async def test_single_array_result(self, pool):
+        """Test a function returning a bare array"""
+        audio = generate_test_audio(duration=2.0)
+        result = await pool.run(apply_speed, audio, 24000, 1.0)
+        np.testing.assert_array_equal(result, audio)
+
+    @pytest.mark.asyncio
+    async def test_worker_errors_propagate(self, pool):
+        """Test exceptions raised in a worker reach the caller"""
+        with pytest.raises(ZeroDivisionError):
+            await pool.run(preprocess_reference_audio, np.zeros(48000), 0)
+
+    @pytest.mark.asyncio
+    async def test_stats(self, pool):
+        """Test pool statistics count submitted tasks"""
+        before = pool.get_stats()["submitted"]
+        await pool.run(apply_speed, np.zeros(10), 24000, 1.0)
+
+        stats = pool.get_stats()
+        assert stats["workers"] == 1
+        assert stats["submitted"] == before + 1
+        assert stats["active"] == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="Shared memory segments are not listed in /dev/shm")
+    async def test_cancelled_calls_free_segments(self, pool):
+        """Test cancelling callers mid-call leaves no shared memory segments behind"""
+        audio = generate_test_audio(duration=2.0)
+        await pool.run(slow_scale, audio, 0.0)  # the worker process is up
+        before = shared_segments()
+
+        # The first call is running in the worker, the second is queued behind it
+        tasks = [asyncio.create_task(pool.run(slow_scale, audio, 0.5)) for _ in range(2)]
+        await asyncio.sleep(0.2)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        # The single worker only gets to this call once the cancelled ones are done
+        result = await pool.run(slow_scale, audio, 0.0)
+        np.testing.assert_allclose(result, audio * 0.5)
+
+        assert pool.get_stats()["active"] == 0
+        assert shared_segments() - before == set()
+
+
+@pytest.mark.unit
+class TestRunDSP:
+    """Test stage execution and timing"""
+
+    @pytest.mark.asyncio
+    async def test_thread_mode_records_stage_time(self):
+        """Test stages run on threads when the pool is disabled and are timed"""
+        tracker = PerformanceTracker()
+        audio = generate_test_audio(duration=1.0)
+
+        with patch.object(dsp_pool, "get_dsp_pool", return_value=None):
+            result = await run_dsp("speed", apply_speed, audio, 24000, 1.0, tracker=tracker)
+
+        np.testing.assert_array_equal(result, audio)
+        assert tracker.stage_times["speed"] >= 0
+        assert "X-Speed-Time" in tracker.get_headers()
+
+    @pytest.mark.asyncio
+    async def test_preprocessing_stage_sets_preprocessing_time(self):
+        """Test the preprocessing stage feeds the existing preprocessing metric"""
+        tracker = PerformanceTracker()
+
+        with patch.object(dsp_pool, "get_dsp_pool", return_value=None):
+            await run_dsp(
+                "preprocessing", preprocess_reference_audio,
+                generate_test_audio(duration=1.0), 24000, tracker=tracker,
+            )
+
+        headers = tracker.get_headers()
+        assert tracker.preprocessing_time is not None
+        assert "X-Preprocessing-Time" in headers
+
+    def test_pool_disabled_by_default(self):
+        """Test no worker processes are started with DSP_POOL_WORKERS=0"""
+        from app import config
+
+        with patch.object(config.settings, "dsp_pool_workers", 0):
+            assert dsp_pool.get_dsp_pool() is None
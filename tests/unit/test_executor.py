@@ -0,0 +1,101 @@
+"""
+Tests for the inference execution layer
+"""
+import asyncio
+import threading
+import time
+import pytest
+from app.models.executor import InferenceExecutor
+
+
+@pytest.mark.unit
+class TestInferenceExecutor:
+    """Test bounded inference worker pool"""
+    
+    async def test_runs_off_event_loop(self):
+        """Test callable runs on a worker thread, not the loop thread"""
+        executor = InferenceExecutor("custom_voice", max_workers=1)
+        loop_thread = threading.get_ident()
+        
+        thread_id, queue_wait = await executor.run(threading.get_ident)
+        
+        assert thread_id != loop_thread
+        assert queue_wait >= 0
+        executor.shutdown()
+    
+    async def test_loop_stays_responsive(self):
+        """Test event loop keeps running while a slow call is in progress"""
+        executor = InferenceExecutor("custom_voice", max_workers=1)
+        ticks = []
+        
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+        
+        await asyncio.gather(executor.run(time.sleep, 0.3), ticker())
+        
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.25, "Ticker should not wait for the slow call"
+        executor.shutdown()
+    
+    async def test_concurrency_limit(self):
+        """Test no more than max_workers calls run at once"""
+        executor = InferenceExecutor("voice_design", max_workers=2)
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+        
+        def work():
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+        
+        await asyncio.gather(*[executor.run(work) for _ in range(6)])
+        
+        assert state["peak"] == 2
+        executor.shutdown()
+    
+    async def test_queue_wait_measured(self):
+        """Test queued calls report time spent waiting for a worker"""
+        executor = InferenceExecutor("base", max_workers=1)
+        
+        results = await asyncio.gather(
+            executor.run(time.sleep, 0.1),
+            executor.run(time.sleep, 0.0),
+        )
+        
+        waits = sorted(wait for _, wait in results)
+        assert waits[0] < 0.05
+        assert waits[1] >= 0.08, "Second call should wait for the first"
+        executor.shutdown()
+    
+    async def test_exceptions_propagate(self):
+        """Test errors raised by the callable reach the caller"""
+        executor = InferenceExecutor("base", max_workers=1)
+        
+        def fail():
+            raise RuntimeError("boom")
+        
+        with pytest.raises(RuntimeError, match="boom"):
+            await executor.run(fail)
+        
+        stats = executor.get_stats()
+        assert stats["failed"] == 1
+        assert stats["running"] == 0
+        executor.shutdown()
+    
+    async def test_stats(self):
+        """Test executor statistics"""
+        executor = InferenceExecutor("custom_voice", max_workers=3)
+        
+        await asyncio.gather(*[executor.run(time.sleep, 0.01) for _ in range(4)])
+        
+        stats = executor.get_stats()
+        assert stats["max_workers"] == 3
+        assert stats["completed"] == 4
+        assert stats["queued"] == 0
+        assert stats["running"] == 0
+        executor.shutdown()
@@ -0,0 +1,223 @@
+"""
+Unit tests for zero-downtime model hot reloads
+"""
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+class Warmup:
+    """warmup_model stand-in that can be made to fail"""
+
+    def __init__(self):
+        self.error = None
+        self.models = []
+
+    def __call__(self, model_type, model):
+        self.models.append(model)
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture
+def warmup():
+    return Warmup()
+
+
+@pytest.fixture
+def manager(warmup):
+    """Model manager whose loads return a fresh mock model per call"""
+    from app.models.manager import ModelManager
+
+    manager = ModelManager()
+    with patch.object(manager, '_load_model', side_effect=lambda model_type, model_path=None: MagicMock()), \
+         patch.object(ModelManager, '_free_memory'), \
+         patch('app.models.manager.warmup_model', side_effect=warmup):
+        yield manager
+
+
+def write_checkpoint(directory, weights=b"weights"):
+    """Write a minimal checkpoint directory and return its path"""
+    directory.mkdir(exist_ok=True)
+    (directory / "config.json").write_text("{}")
+    (directory / "model.safetensors").write_bytes(weights)
+    return str(directory)
+
+
+def wait_for_reload(manager, model_type, states, timeout=5.0):
+    """Poll the latest reload of a model type until it reaches one of states"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        reload = manager.get_model_versions()[model_type]["reload"]
+        if reload is not None and reload["state"] in states:
+            return reload
+        time.sleep(0.01)
+    raise AssertionError(f"Reload of {model_type} did not reach {states}")
+
+
+@pytest.mark.unit
+class TestHotReload:
+    """Test loading a new model version alongside the old one"""
+
+    async def test_swap_after_warmup_and_drain(self, manager, warmup, tmp_path):
+        """Test calls after the swap use the new version while an old call finishes on the old one"""
+        from app.models.manager import model_version_tag
+
+        new_path = write_checkpoint(tmp_path / "custom-voice-v2")
+        old = manager.get_model("custom_voice")
+        version = manager.get_model_version("custom_voice")
+        old_bytes = manager.residency.get_stats()["models"]["custom_voice"]["size_bytes"]
+        release = threading.Event()
+        old.generate_custom_voice.side_effect = lambda **kwargs: release.wait(5.0) and "old audio"
+        in_flight = asyncio.create_task(manager.run_inference("custom_voice", "generate_custom_voice", text="a"))
+        while not old.generate_custom_voice.called:
+            await asyncio.sleep(0.01)
+
+        status = manager.reload_model("custom_voice", new_path)
+        assert status["state"] == "loading"
+        assert status["previous_version"] == version
+
+        draining = await asyncio.to_thread(wait_for_reload, manager, "custom_voice", ("draining", "completed"))
+        assert draining["state"] == "draining"  # the old call is still running
+        assert manager.residency.get_stats()["models"]["custom_voice"]["retired_bytes"] == old_bytes
+        new = manager.get_model("custom_voice")
+        assert new is not old
+        assert warmup.models[-1] is new
+        queued = asyncio.create_task(manager.run_inference("custom_voice", "generate_custom_voice", text="b"))
+
+        release.set()
+        assert await in_flight == "old audio"
+        assert await queued is new.generate_custom_voice.return_value
+        completed = await asyncio.to_thread(wait_for_reload, manager, "custom_voice", ("completed",))
+
+        assert completed["version"] == model_version_tag(new_path)
+        assert completed["version"].startswith(f"{new_path}@")
+        assert manager.get_model_path("custom_voice") == new_path
+        assert manager.get_model_version("custom_voice") == completed["version"]
+        assert manager.residency.get_stats()["models"]["custom_voice"]["loading"] is False
+        assert manager.residency.get_stats()["models"]["custom_voice"]["retired_bytes"] == 0
+
+    def test_failed_warmup_keeps_old_version(self, manager, warmup):
+        """Test the old model stays in place if the new version fails its warmup"""
+        old = manager.get_model("voice_design")
+        version = manager.get_model_version("voice_design")
+        warmup.error = RuntimeError("CUDA error")
+
+        manager.reload_model("voice_design", "org/broken")
+        failed = wait_for_reload(manager, "voice_design", ("completed", "failed"))
+
+        assert failed["state"] == "failed"
+        assert "CUDA error" in failed["error"]
+        assert manager.get_model("voice_design") is old
+        assert manager.get_model_version("voice_design") == version
+        assert manager.residency.get_stats()["models"]["voice_design"]["loading"] is False
+
+    def test_reload_of_unloaded_model(self, manager):
+        """Test reloading a model that is not loaded switches its version and loads it"""
+        manager.reload_model("base", "org/base-v2")
+        completed = wait_for_reload(manager, "base", ("completed", "failed"))
+
+        assert completed["state"] == "completed"
+        assert manager.is_loaded("base")
+        assert manager._load_model.call_args.args == ("base", "org/base-v2")
+        assert manager.get_model_path("base") == "org/base-v2"
+
+    def test_failed_reload_of_unloaded_model(self, manager):
+        """Test an unloaded model keeps its path and version if the new version fails to load"""
+        path = manager.get_model_path("base")
+        version = manager.get_model_version("base")
+        manager._load_model.side_effect = OSError("org/missing not found")
+
+        manager.reload_model("base", "org/missing")
+        failed = wait_for_reload(manager, "base", ("completed", "failed"))
+
+        assert failed["state"] == "failed"
+        assert "not found" in failed["error"]
+        assert not manager.is_loaded("base")
+        assert manager.get_model_path("base") == path
+        assert manager.get_model_version("base") == version
+        assert manager.get_model_versions()["base"]["reloads"] == 0
+
+        # The next request loads the configured version again
+        manager._load_model.side_effect = lambda model_type, model_path=None: MagicMock()
+        manager.get_model("base")
+        assert manager._load_model.call_args.args == ("base",)
+
+    def test_one_reload_at_a_time(self, manager, warmup):
+        """Test a second reload of the same model type is rejected while one runs"""
+        manager.get_model("custom_voice")
+        version = manager.get_model_version("custom_voice")
+        blocker = threading.Event()
+        warmup.error = None
+        with patch('app.models.manager.warmup_model', side_effect=lambda model_type, model: blocker.wait(5.0)):
+            manager.reload_model("custom_voice")
+            with pytest.raises(RuntimeError, match="already running"):
+                manager.reload_model("custom_voice")
+            blocker.set()
+            wait_for_reload(manager, "custom_voice", ("completed",))
+
+        # Reloading the same checkpoint keeps its version tag (and cache entries)
+        assert manager.get_model_versions()["custom_voice"]["reloads"] == 1
+        assert manager.get_model_version("custom_voice") == version
+
+    def test_reload_picks_up_changed_weights(self, manager, tmp_path):
+        """Test reloading a path whose weights changed on disk switches the version tag"""
+        path = write_checkpoint(tmp_path / "base")
+        manager.reload_model("base", path)
+        first = wait_for_reload(manager, "base", ("completed", "failed"))
+
+        write_checkpoint(tmp_path / "base", weights=b"fine-tuned weights")
+        manager.reload_model("base", path)
+        second = wait_for_reload(manager, "base", ("completed", "failed"))
+
+        assert first["state"] == second["state"] == "completed"
+        assert second["previous_version"] == first["version"]
+        assert second["version"] != first["version"]
+
+
+@pytest.mark.unit
+class TestModelVersionTag:
+    """Test version tags derived from checkpoint files"""
+
+    def test_stable_across_restarts(self, tmp_path):
+        """Test the same checkpoint is tagged the same by a new manager"""
+        from app.models.manager import ModelManager, model_version_tag
+
+        path = write_checkpoint(tmp_path / "base")
+        with patch('app.models.manager.settings.qwen_tts_base_model', path):
+            before = ModelManager().get_model_version("base")
+            after = ModelManager().get_model_version("base")
+
+        assert before == after == model_version_tag(path)
+
+    def test_tagged_lazily(self, tmp_path):
+        """Test checkpoints are not scanned when the manager is created, only when a tag is needed"""
+        from app.models.manager import ModelManager
+
+        with patch('app.models.manager.model_version_tag', side_effect=lambda path: f"{path}@tag") as tag:
+            manager = ModelManager()
+            assert tag.call_count == 0
+
+            assert manager.get_model_version("base").endswith("@tag")
+            manager.get_model_version("base")
+            assert tag.call_count == 1
+
+    def test_changes_with_weights(self, tmp_path):
+        """Test rewriting or adding checkpoint files changes the tag"""
+        from app.models.manager import model_version_tag
+
+        path = write_checkpoint(tmp_path / "base")
+        original = model_version_tag(path)
+        write_checkpoint(tmp_path / "base", weights=b"other weights")
+        rewritten = model_version_tag(path)
+        (tmp_path / "base" / "generation_config.json").write_text("{}")
+
+        assert len({original, rewritten, model_version_tag(path)}) == 3
+
+    def test_unavailable_checkpoint(self):
+        """Test a checkpoint that is not available locally is tagged by its path"""
+        from app.models.manager import model_version_tag
+
+        assert model_version_tag("org/not-downloaded") == "org/not-downloaded"
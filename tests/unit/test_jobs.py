@@ -0,0 +1,161 @@
+"""
+Unit tests for asynchronous render jobs
+"""
+import asyncio
+import json
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from unittest.mock import patch
+from app.models import jobs
+from app.models.jobs import JobManager, register_job_type, run_batch_job
+
+
+class ToneRequest(BaseModel):
+    """Request of the test job type"""
+    count: int = 3
+
+
+async def wait_for(job, *states):
+    """Wait until a job reaches one of the given states"""
+    for _ in range(500):
+        if job.status in states:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job stayed {job.status}")
+
+
+@pytest.fixture
+def gate():
+    """Event the test job type waits on before rendering each item"""
+    event = asyncio.Event()
+    event.set()
+    return event
+
+
+@pytest.fixture(autouse=True)
+def tone_job_type(gate):
+    """Register a job type rendering short tones"""
+    async def run(request: ToneRequest, job):
+        async def render(start, end):
+            await gate.wait()
+            return [np.full(2400, 0.1, dtype=np.float32) for _ in range(start, end)], 24000
+
+        await run_batch_job(job, request.count, render, [f"tone_{i}" for i in range(request.count)], "wav", 1)
+
+    with patch.dict(jobs._job_types):
+        register_job_type("tone", ToneRequest, run)
+        yield
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Job manager storing results in a temporary directory"""
+    return JobManager(str(tmp_path), max_queue_size=2, workers=1, retention_seconds=3600)
+
+
+@pytest.mark.unit
+class TestJobManager:
+    """Test the job queue, workers and result store"""
+
+    @pytest.mark.asyncio
+    async def test_job_renders_items_to_disk(self, manager):
+        """Test a job runs in the background and records each item file"""
+        job = await manager.submit("tone", {"count": 3})
+        assert job.status == "queued"
+
+        await wait_for(job, "completed")
+
+        info = job.info()
+        assert info["progress"] == 1.0
+        assert [item["filename"] for item in info["items"]] == ["tone_0.wav", "tone_1.wav", "tone_2.wav"]
+        assert all(job.item_file(i).exists() for i in range(3))
+        record = json.loads((job.directory / "job.json").read_text())
+        assert record["status"] == "completed"
+        assert record["request"] == {"count": 3}
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_queue_is_bounded(self, manager, gate):
+        """Test submissions beyond the queue size are rejected while the worker is busy"""
+        gate.clear()
+        running = await manager.submit("tone", {})
+        await wait_for(running, "running")
+        await manager.submit("tone", {})
+        await manager.submit("tone", {})
+
+        with pytest.raises(HTTPException) as exc_info:
+            await manager.submit("tone", {})
+
+        assert exc_info.value.status_code == 429
+        assert manager.get_stats()["rejected"] == 1
+        gate.set()
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_and_queued_jobs(self, manager, gate):
+        """Test cancelled jobs stop rendering and queued ones never start"""
+        gate.clear()
+        running = await manager.submit("tone", {})
+        queued = await manager.submit("tone", {})
+        await wait_for(running, "running")
+
+        await manager.cancel(queued.id)
+        await manager.cancel(running.id)
+        gate.set()
+        await asyncio.sleep(0.05)
+
+        assert running.status == "cancelled"
+        assert queued.status == "cancelled"
+        assert queued.started_at is None
+        with pytest.raises(HTTPException) as exc_info:
+            await manager.cancel(running.id)
+        assert exc_info.value.status_code == 409
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_invalid_submissions(self, manager):
+        """Test unknown types, invalid requests and disallowed callbacks are rejected"""
+        for job_type, request, callback_url, status_code in [
+            ("missing", {}, None, 400),
+            ("tone", {"count": "many"}, None, 422),
+            ("tone", {}, "http://example.com/hook", 400),
+            ("tone", {}, "file:///etc/passwd", 400),
+        ]:
+            with pytest.raises(HTTPException) as exc_info:
+                await manager.submit(job_type, request, callback_url)
+            assert exc_info.value.status_code == status_code
+
+    @pytest.mark.asyncio
+    async def test_expired_jobs_removed(self, manager):
+        """Test finished jobs past the retention period are deleted with their files"""
+        job = await manager.submit("tone", {"count": 1})
+        await wait_for(job, "completed")
+        job.finished_at -= 7200
+
+        assert await manager.purge_expired() == 1
+        assert not job.directory.exists()
+        with pytest.raises(HTTPException):
+            manager.get(job.id)
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_records_restored_after_restart(self, manager, gate, tmp_path):
+        """Test finished jobs survive a restart and interrupted ones are marked failed"""
+        finished = await manager.submit("tone", {"count": 1})
+        await wait_for(finished, "completed")
+        gate.clear()
+        interrupted = await manager.submit("tone", {})
+        await wait_for(interrupted, "running")
+        # Simulate a crash: the record still says running
+        manager._save(interrupted)
+
+        restored = JobManager(str(tmp_path))
+
+        assert restored.get(finished.id).status == "completed"
+        assert restored.get(finished.id).item_file(0).exists()
+        assert restored.get(interrupted.id).status == "failed"
+        assert "restart" in restored.get(interrupted.id).error
+        gate.set()
+        await manager.shutdown()
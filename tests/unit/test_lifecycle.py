@@ -0,0 +1,133 @@
+"""
+Unit tests for idle unloading and scheduled pre-warming
+"""
+import time
+from datetime import datetime
+import pytest
+from unittest.mock import patch
+from app.models.lifecycle import CronSchedule, ModelLifecycle, parse_prewarm_schedule
+
+
+class FakeModel:
+    """Loaded model stand-in"""
+
+
+@pytest.fixture
+def manager():
+    """Model manager whose loads return fake models (and fail for "base")"""
+    from app.models.manager import ModelManager
+
+    def load(model_type):
+        if model_type == "base":
+            raise RuntimeError("out of memory")
+        return FakeModel()
+
+    manager = ModelManager()
+    with patch.object(manager, '_load_model', side_effect=load), \
+         patch.object(ModelManager, '_free_memory'), \
+         patch('app.models.manager.warmup_model') as warmup:
+        manager.warmup = warmup
+        yield manager
+
+
+@pytest.mark.unit
+class TestCronSchedule:
+    """Test cron expression parsing and matching"""
+
+    def test_weekday_mornings(self):
+        """Test ranges, lists and weekday matching"""
+        schedule = CronSchedule("45 7 * * 1-5")
+        assert schedule.matches(datetime(2026, 10, 16, 7, 45))  # Friday
+        assert not schedule.matches(datetime(2026, 10, 17, 7, 45))  # Saturday
+        assert not schedule.matches(datetime(2026, 10, 16, 7, 46))
+        assert schedule.next_after(datetime(2026, 10, 16, 8, 0)) == datetime(2026, 10, 19, 7, 45)
+
+    def test_steps_and_sunday(self):
+        """Test step values and weekday 7 as Sunday"""
+        schedule = CronSchedule("*/15 9-17/4 * * 7")
+        assert schedule.minutes == {0, 15, 30, 45}
+        assert schedule.hours == {9, 13, 17}
+        assert schedule.matches(datetime(2026, 10, 18, 13, 30))  # Sunday
+
+    def test_day_of_month_or_weekday(self):
+        """Test a restricted day of month and weekday match either one"""
+        schedule = CronSchedule("0 6 1 * 1")
+        assert schedule.matches(datetime(2026, 11, 1, 6, 0))  # Sunday, 1st
+        assert schedule.matches(datetime(2026, 11, 2, 6, 0))  # Monday
+        assert not schedule.matches(datetime(2026, 11, 3, 6, 0))
+
+    def test_invalid_expressions(self):
+        """Test malformed schedules are rejected"""
+        for spec in ("0 7 * *", "60 7 * * *", "0 7 * * 1-9", "0 */0 * * *", "custom_voice 0 7 * * *",
+                     "podcast=0 7 * * *"):
+            with pytest.raises(ValueError):
+                parse_prewarm_schedule(spec)
+
+    def test_parse_prewarm_schedule(self):
+        """Test several entries are parsed from the setting"""
+        entries = parse_prewarm_schedule("custom_voice=45 7 * * 1-5; base=0 12 * * *;")
+        assert [(model_type, schedule.expression) for model_type, schedule in entries] == [
+            ("custom_voice", "45 7 * * 1-5"), ("base", "0 12 * * *"),
+        ]
+
+
+@pytest.mark.unit
+class TestModelLifecycle:
+    """Test idle unloading and pre-warming against the model manager"""
+
+    async def test_idle_model_unloaded(self, manager):
+        """Test only models idle past their timeout are unloaded"""
+        lifecycle = ModelLifecycle(manager, {"custom_voice": 60.0, "voice_design": 0.0}, [])
+        manager.get_model("custom_voice")
+        manager.get_model("voice_design")
+
+        await lifecycle.check(datetime.fromtimestamp(time.time() + 30))
+        assert manager.is_loaded("custom_voice")
+
+        manager.residency.begin_use("custom_voice")
+        await lifecycle.check(datetime.fromtimestamp(time.time() + 120))
+        assert manager.is_loaded("custom_voice")  # a request is in flight
+        manager.residency.end_use("custom_voice")
+
+        await lifecycle.check(datetime.fromtimestamp(time.time() + 120))
+        assert not manager.is_loaded("custom_voice")
+        assert manager.is_loaded("voice_design")  # no timeout configured
+        assert lifecycle.get_stats()["idle_unloads"]["custom_voice"] == 1
+        assert manager.get_residency_stats()["models"]["custom_voice"]["unloads"] == 1
+
+    async def test_scheduled_prewarm_avoids_cold_start(self, manager):
+        """Test a due schedule loads and warms the model and the next request counts as warm"""
+        lifecycle = ModelLifecycle(manager, {}, parse_prewarm_schedule("voice_design=30 7 * * *"))
+
+        await lifecycle.check(datetime(2026, 10, 16, 7, 28))
+        assert not manager.is_loaded("voice_design")
+
+        # The check interval skipped past 07:30; the minute is still caught up
+        await lifecycle.check(datetime(2026, 10, 16, 7, 31, 10))
+        assert manager.is_loaded("voice_design")
+        assert [call.args[0] for call in manager.warmup.call_args_list] == ["voice_design"]
+
+        manager.residency.begin_use("voice_design")
+        manager.residency.end_use("voice_design")
+        manager.residency.begin_use("voice_design")
+        manager.residency.end_use("voice_design")
+        manager.residency.begin_use("base")
+        manager.residency.end_use("base")
+
+        stats = lifecycle.get_stats()
+        assert stats["prewarms"]["voice_design"] == 1
+        assert stats["cold_starts_avoided"] == {"custom_voice": 0, "voice_design": 1, "base": 0}
+        assert stats["cold_starts_avoided_total"] == 1
+        assert stats["prewarm_schedule"][0]["cron"] == "30 7 * * *"
+        assert manager.get_residency_stats()["models"]["base"]["cold_start_requests"] == 1
+
+    async def test_failed_prewarm_counted(self, manager):
+        """Test a failing load is counted and does not mark the model pre-warmed"""
+        lifecycle = ModelLifecycle(manager, {}, parse_prewarm_schedule("base=* * * * *"))
+
+        await lifecycle.prewarm("base")
+
+        assert lifecycle.get_stats()["prewarm_failures"]["base"] == 1
+        assert lifecycle.get_stats()["prewarms"]["base"] == 0
+        manager.residency.begin_use("base")
+        assert manager.get_residency_stats()["models"]["base"]["cold_starts_avoided"] == 0
@@ -0,0 +1,184 @@
+"""
+Unit tests for long-form document synthesis
+"""
+import asyncio
+import numpy as np
+import pytest
+from unittest.mock import patch
+from app.utils import longform
+from app.utils.caching import OutputAudioCache
+from app.utils.longform import Crossfader, LongFormRender, segment_key_factory, split_document
+
+
+DOCUMENT = (
+    "The first paragraph has one sentence. And then a second one.\n\n"
+    "The second paragraph is short.\n"
+    "It continues on the next line.\n\n\n"
+    "A third paragraph closes the document."
+)
+
+
+def make_renderer(calls, delays=None):
+    """Render each text as a constant signal whose value encodes the text length"""
+    async def render_batch(texts):
+        calls.append(list(texts))
+        await asyncio.sleep((delays or {}).get(texts[0], 0))
+        return [np.full(100, len(text) / 1000, dtype=np.float32) for text in texts], 24000
+    return render_batch
+
+
+async def collect(render):
+    """Read every piece of a render"""
+    pieces = []
+    while (piece := await render.next()) is not None:
+        pieces.append(piece[0])
+    return pieces
+
+
+@pytest.mark.unit
+class TestSplitDocument:
+    """Test paragraph-aware segmentation"""
+
+    def test_segments_do_not_span_paragraphs(self):
+        """Test each segment belongs to exactly one paragraph"""
+        segments = split_document(DOCUMENT, max_chars=40, min_chars=5)
+
+        assert [paragraph for paragraph, _ in segments] == [0, 0, 1, 1, 2]
+        assert segments[2][1] == "The second paragraph is short."
+        assert segments[3][1] == "It continues on the next line."
+
+    def test_blank_document(self):
+        """Test whitespace has no segments"""
+        assert split_document(" \n\n  ") == []
+
+
+@pytest.mark.unit
+class TestCrossfader:
+    """Test stitching segments"""
+
+    def test_crossfade_overlaps_segments(self):
+        """Test each join overlaps the segments by the crossfade length"""
+        crossfader = Crossfader(crossfade_samples=10)
+        pieces = [crossfader.push(np.ones(100)), crossfader.push(np.ones(100)), crossfader.flush()]
+        audio = np.concatenate(pieces)
+
+        assert len(audio) == 190
+        # A linear crossfade of equal signals is seamless
+        np.testing.assert_allclose(audio, 1.0, atol=1e-6)
+
+    def test_crossfade_blends_levels(self):
+        """Test the join ramps from the old segment into the new one"""
+        crossfader = Crossfader(crossfade_samples=4)
+        audio = np.concatenate([crossfader.push(np.zeros(8)), crossfader.push(np.ones(8)), crossfader.flush()])
+
+        np.testing.assert_allclose(audio[4:8], [0.0, 0.25, 0.5, 0.75])
+        assert audio[8:].tolist() == [1.0] * 4
+
+    def test_no_crossfade(self):
+        """Test a zero crossfade concatenates segments unchanged"""
+        crossfader = Crossfader(crossfade_samples=0)
+        audio = np.concatenate([crossfader.push(np.zeros(5)), crossfader.push(np.ones(5)), crossfader.flush()])
+        assert audio.tolist() == [0.0] * 5 + [1.0] * 5
+
+
+@pytest.mark.unit
+class TestLongFormRender:
+    """Test batched, concurrent, cached rendering"""
+
+    @pytest.mark.asyncio
+    async def test_batches_rendered_concurrently_in_order(self):
+        """Test segments are batched, rendered in parallel and returned in document order"""
+        calls = []
+        segments = [(0, f"segment {i}" + "x" * i) for i in range(6)]
+        # The first batch finishes last
+        render = LongFormRender(
+            segments, make_renderer(calls, {"segment 0": 0.05}),
+            batch_size=2, max_concurrent_batches=3, crossfade_ms=0,
+        )
+
+        pieces = await collect(render)
+
+        assert [len(call) for call in calls] == [2, 2, 2]
+        assert [round(piece[0] * 1000) for piece in pieces] == [len(text) for _, text in segments]
+        await render.aclose()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self):
+        """Test no more than max_concurrent_batches batches run at once"""
+        active = peak = 0
+
+        async def render_batch(texts):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return [np.zeros(10) for _ in texts], 24000
+
+        render = LongFormRender([(0, str(i)) for i in range(10)], render_batch, batch_size=1, max_concurrent_batches=2)
+        await collect(render)
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_edited_paragraph_only_re_rendered(self):
+        """Test the segment cache serves unchanged paragraphs of an edited document"""
+        cache = OutputAudioCache(max_bytes=1024 * 1024)
+        key = segment_key_factory("custom_voice", {"speaker": "Ryan"}, "model", "bfloat16")
+        calls = []
+
+        with patch.object(longform, "get_segment_cache", return_value=cache):
+            first = LongFormRender(split_document(DOCUMENT, 40, 5), make_renderer(calls), cache_key=key)
+            original = await collect(first)
+
+            edited_text = DOCUMENT.replace("The second paragraph is short.", "The second paragraph changed.")
+            edited = LongFormRender(split_document(edited_text, 40, 5), make_renderer(calls), cache_key=key)
+            await collect(edited)
+
+        rendered = [text for call in calls for text in call]
+        assert len(rendered) == 6
+        assert rendered[-1] == "The second paragraph changed."
+        assert edited.cached_segments == 4
+        assert edited.metadata() == {"paragraphs": 3, "cached_segments": 4}
+        assert len(original) == 5
+
+    def test_segment_key_ignores_output_encoding(self):
+        """Test segments are shared between requests that only differ in output codec"""
+        params = {"speaker": "Ryan", "response_format": "wav", "audio_format": "wav"}
+        key = segment_key_factory("custom_voice", params, "model", "bfloat16")
+        mp3 = segment_key_factory(
+            "custom_voice", {**params, "response_format": "mp3", "audio_format": "mp3"}, "model", "bfloat16"
+        )
+        other_voice = segment_key_factory("custom_voice", {**params, "speaker": "Vivian"}, "model", "bfloat16")
+
+        assert key("Hello there.") == mp3("Hello there.")
+        assert key("Hello there.") != other_voice("Hello there.")
+
+    @pytest.mark.asyncio
+    async def test_error_raised_at_failing_segment(self):
+        """Test a failed batch surfaces when its first segment is reached"""
+        async def render_batch(texts):
+            if "bad" in texts:
+                raise RuntimeError("boom")
+            return [np.zeros(10) for _ in texts], 24000
+
+        render = LongFormRender([(0, "good"), (0, "bad")], render_batch, batch_size=1)
+        assert await render.next() is not None
+        with pytest.raises(RuntimeError, match="boom"):
+            await render.next()
+        await render.aclose()
+
+    @pytest.mark.asyncio
+    async def test_progress(self):
+        """Test progress describes the last returned segment"""
+        render = LongFormRender(split_document(DOCUMENT, 40, 5), make_renderer([]), batch_size=5)
+        await render.next()
+        await render.next()
+        await render.next()
+
+        progress = render.progress()
+        assert progress["segment"] == 2
+        assert progress["segments"] == 5
+        assert progress["paragraph"] == 1
+        assert progress["cached"] is False
+        assert progress["rendered"] == 5
@@ -3,7 +3,7 @@ Tests for performance metrics functionality
 """
 import pytest
 import time
-from app.utils.metrics import PerformanceTracker, track_time
+from app.utils.metrics import Histogram, PerformanceTracker, track_time
 
 
 @pytest.mark.unit
@@ -217,6 +217,17 @@ class TestPerformanceTracker:
         tracker.mark_preprocessing(0.25)
         
         assert tracker.preprocessing_time == 0.25
+    
+    def test_mark_first_audio(self):
+        """Test time to first audio is measured from start"""
+        tracker = PerformanceTracker()
+        tracker.start()
+        
+        time.sleep(0.02)
+        tracker.mark_first_audio()
+        
+        assert tracker.time_to_first_audio >= 0.02
+        assert tracker.get_metrics()["time_to_first_audio"] == tracker.time_to_first_audio
 
 
 @pytest.mark.unit
@@ -292,3 +303,28 @@ class TestTrackTime:
         
         assert "duration" in timer
         assert timer["duration"] >= 0, "Duration should be non-negative"
+
+
+@pytest.mark.unit
+class TestHistogram:
+    """Test fixed-bucket histogram"""
+    
+    def test_bucket_assignment(self):
+        """Test values land in the first bucket whose bound they do not exceed"""
+        hist = Histogram([1, 5, 10])
+        for value in [0.5, 1, 3, 10, 50]:
+            hist.observe(value)
+        
+        data = hist.to_dict()
+        assert data["buckets"] == {"le_1": 2, "le_5": 1, "le_10": 1, "inf": 1}
+        assert data["count"] == 5
+        assert data["max"] == 50
+    
+    def test_reset(self):
+        """Test reset clears all counts"""
+        hist = Histogram([1, 2])
+        hist.observe(1)
+        hist.reset()
+        
+        assert hist.to_dict()["count"] == 0
+        assert hist.to_dict()["mean"] == 0.0
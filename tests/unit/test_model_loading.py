@@ -0,0 +1,234 @@
+"""
+Unit tests for background model loading
+"""
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from app.models.loading import ModelLoadTracker, ModelNotReadyError
+
+
+class GatedLoader:
+    """_load_model stand-in that blocks until released (or fails)"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.error = None
+        self.calls = 0
+
+    def __call__(self, model_type):
+        self.calls += 1
+        assert self.release.wait(5.0)
+        if self.error is not None:
+            raise self.error
+        return MagicMock()
+
+
+@pytest.fixture
+def loader():
+    return GatedLoader()
+
+
+@pytest.fixture
+def manager(loader):
+    """Model manager whose loads wait for the test to release them"""
+    from app.models.manager import ModelManager
+
+    manager = ModelManager()
+    with patch.object(manager, '_load_model', side_effect=loader), \
+         patch.object(ModelManager, '_free_memory'), \
+         patch('app.models.manager.settings.enable_warmup', False):
+        yield manager
+
+
+@pytest.mark.unit
+class TestModelLoadTracker:
+    """Test load state bookkeeping"""
+
+    def test_state_machine(self):
+        """Test a load moves through loading, warming and ready, and is started once"""
+        tracker = ModelLoadTracker(["a"])
+        finished, started = tracker.begin("a")
+        assert started and tracker.state("a") == "loading"
+        assert tracker.begin("a") == (finished, False)
+
+        tracker.set_warming("a")
+        assert tracker.in_progress("a")
+        tracker.finish("a", 2.0, 1.0)
+        assert finished.is_set() and tracker.state("a") == "ready"
+
+        tracker.reset("a")
+        assert tracker.state("a") == "unloaded"
+        assert tracker.begin("a")[1] is True
+
+    def test_retry_after_estimate(self):
+        """Test Retry-After uses the average past load time minus the time already spent"""
+        tracker = ModelLoadTracker(["a"], default_retry_after=45)
+        assert tracker.retry_after("a") == 45
+
+        for load_seconds in (20.0, 40.0):
+            tracker.begin("a")
+            tracker.finish("a", load_seconds, 0.0)
+            tracker.reset("a")
+        tracker.begin("a")
+        tracker._models["a"]["started_at"] -= 10.0
+
+        assert tracker.retry_after("a") == 20
+        assert tracker.get_stats()["a"]["avg_ready_seconds"] == 30.0
+
+    def test_not_ready_error(self):
+        """Test the error is a 503 with a Retry-After header"""
+        error = ModelNotReadyError("base", "warming", 12)
+        assert error.status_code == 503
+        assert error.headers == {"Retry-After": "12"}
+
+
+@pytest.mark.unit
+class TestBackgroundLoading:
+    """Test the model manager loads models in the background"""
+
+    def test_requests_fail_fast_during_load(self, manager, loader):
+        """Test a request for a loading model gets a 503 instead of blocking"""
+        start = time.perf_counter()
+        with pytest.raises(ModelNotReadyError) as excinfo:
+            manager.get_model("custom_voice", timeout=0)
+        assert time.perf_counter() - start < 1.0
+        assert excinfo.value.state == "loading"
+        with pytest.raises(ModelNotReadyError):
+            manager.get_model("custom_voice", timeout=0)
+        assert manager.get_load_states()["custom_voice"]["state"] == "loading"
+
+        loader.release.set()
+        model = manager.get_model("custom_voice", timeout=2.0)
+
+        assert manager.get_model("custom_voice", timeout=0) is model
+        assert loader.calls == 1
+        states = manager.get_load_states()["custom_voice"]
+        assert (states["state"], states["loads"]) == ("ready", 1)
+
+    def test_warmup_runs_before_ready(self, manager, loader):
+        """Test the model is only handed out after its warmup"""
+        warming = threading.Event()
+        finish_warmup = threading.Event()
+
+        def warmup(model_type, model):
+            warming.set()
+            assert finish_warmup.wait(5.0)
+
+        loader.release.set()
+        with patch('app.models.manager.settings.enable_warmup', True), \
+             patch('app.models.manager.warmup_model', side_effect=warmup):
+            manager.start_loading("voice_design")
+            assert warming.wait(2.0)
+            with pytest.raises(ModelNotReadyError) as excinfo:
+                manager.get_model("voice_design", timeout=0)
+            assert excinfo.value.state == "warming"
+
+            finish_warmup.set()
+            assert manager.get_model("voice_design", timeout=2.0) is not None
+
+    def test_failed_load_is_retried(self, manager, loader):
+        """Test a failed load is reported and the next request starts a new load"""
+        loader.error = OSError("checkpoint not found")
+        loader.release.set()
+
+        with pytest.raises(RuntimeError, match="checkpoint not found"):
+            manager.get_model("base")
+        states = manager.get_load_states()["base"]
+        assert (states["state"], states["failures"]) == ("failed", 1)
+        assert manager.get_residency_stats()["models"]["base"]["loading"] is False
+
+        loader.error = None
+        assert manager.get_model("base") is not None
+        assert loader.calls == 2
+
+    async def test_run_inference_waits_bounded(self, manager, loader):
+        """Test inference calls during a load get a 503, or wait for it when configured"""
+        manager.start_loading("custom_voice")
+
+        with patch('app.models.manager.settings.model_load_wait_seconds', 0.0), \
+             pytest.raises(ModelNotReadyError):
+            await manager.run_inference("custom_voice", "generate_custom_voice", text="Hi")
+
+        threading.Timer(0.2, loader.release.set).start()
+        with patch('app.models.manager.settings.model_load_wait_seconds', 5.0):
+            result = await manager.run_inference("custom_voice", "generate_custom_voice", text="Hi")
+
+        assert result is manager.get_model("custom_voice").generate_custom_voice.return_value
+
+    async def test_cold_load_waits_off_the_workers(self, manager, loader):
+        """Test a call to a cold model starts its load and waits for it without taking an inference worker"""
+        with patch('app.models.manager.settings.model_load_wait_seconds', 5.0):
+            calls = [
+                asyncio.create_task(manager.run_inference("custom_voice", "generate_custom_voice", text="Hi"))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0.2)
+
+            assert manager.loads.state("custom_voice") == "loading"
+            stats = manager.get_executor_stats()["custom_voice"]
+            assert stats["queued"] == stats["running"] == 0
+
+            loader.release.set()
+            results = await asyncio.gather(*calls)
+
+        assert loader.calls == 1
+        assert all(result is manager.get_model("custom_voice").generate_custom_voice.return_value for result in results)
+
+    async def test_cold_load_failure(self, manager, loader):
+        """Test a call waiting for a load that fails gets the load error"""
+        loader.error = OSError("checkpoint not found")
+        loader.release.set()
+
+        with patch('app.models.manager.settings.model_load_wait_seconds', 5.0), \
+             pytest.raises(RuntimeError, match="checkpoint not found"):
+            await manager.run_inference("custom_voice", "generate_custom_voice", text="Hi")
+
+        assert manager.get_executor_stats()["custom_voice"]["completed"] == 0
+
+
+@pytest.mark.unit
+class TestPreload:
+    """Test concurrent preloading at startup"""
+
+    @pytest.fixture
+    def slow_manager(self):
+        """Model manager whose loads and warmups each take 0.2 seconds"""
+        from app.models.manager import ModelManager
+
+        def load(model_type):
+            if model_type == "base":
+                raise OSError("checkpoint not found")
+            time.sleep(0.2)
+            return MagicMock()
+
+        manager = ModelManager()
+        with patch.object(manager, '_load_model', side_effect=load), \
+             patch('app.models.manager.settings.enable_warmup', True), \
+             patch('app.models.manager.warmup_model', side_effect=lambda model_type, model: time.sleep(0.2)):
+            yield manager
+
+    def test_models_load_concurrently(self, slow_manager):
+        """Test preloading takes about as long as the slowest model and is reported"""
+        report = slow_manager.preload_all_models(concurrency=3)
+
+        assert report["total_seconds"] < 0.7
+        assert report["sequential_seconds"] >= 0.8
+        assert slow_manager.get_startup_report() is report
+        custom_voice = report["models"]["custom_voice"]
+        assert custom_voice["status"] == "ready"
+        assert custom_voice["load_seconds"] >= 0.2
+        assert custom_voice["warmup_seconds"] >= 0.2
+        assert report["models"]["base"]["status"] == "failed"
+        assert "checkpoint not found" in report["models"]["base"]["error"]
+        assert slow_manager.is_loaded("voice_design")
+
+    def test_concurrency_bound(self, slow_manager):
+        """Test at most the configured number of models load at once"""
+        report = slow_manager.preload_all_models(concurrency=1)
+
+        assert report["concurrency"] == 1
+        assert report["total_seconds"] >= 0.8
+        ready_after = [report["models"][name]["ready_after_seconds"] for name in ("custom_voice", "voice_design")]
+        assert ready_after[1] >= ready_after[0] + 0.4
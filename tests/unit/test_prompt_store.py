@@ -0,0 +1,185 @@
+"""
+Unit tests for the voice clone prompt store
+"""
+import pytest
+import time
+import numpy as np
+from unittest.mock import patch
+from app.models.prompt_store import PromptStore, PromptStoreBackend, SQLitePromptBackend
+
+
+def make_prompt(ref_text="Reference text"):
+    """Build prompt data shaped like /create-prompt output"""
+    return {
+        "prompt_items": [{"ref_spk_embedding": np.ones(8, dtype=np.float32)}],
+        "ref_text": ref_text,
+        "x_vector_only_mode": False,
+    }
+
+
+@pytest.mark.unit
+class TestMemoryPromptStore:
+    """Test the store without a durable backend"""
+    
+    def test_put_get_delete(self):
+        """Test basic storage operations"""
+        store = PromptStore(memory_size=10)
+        store.put("p1", make_prompt())
+        
+        assert store.get("p1")["ref_text"] == "Reference text"
+        assert store.delete("p1") is True
+        assert store.get("p1") is None
+        assert store.delete("p1") is False
+    
+    def test_lru_eviction(self):
+        """Test recently used prompts survive eviction (not FIFO)"""
+        store = PromptStore(memory_size=2)
+        store.put("p1", make_prompt())
+        store.put("p2", make_prompt())
+        store.get("p1")  # p1 becomes most recently used
+        store.put("p3", make_prompt())
+        
+        assert store.get("p1") is not None
+        assert store.get("p2") is None
+        assert store.get("p3") is not None
+        assert store.get_stats()["evictions"] == 1
+    
+    def test_idle_ttl(self):
+        """Test prompts expire after going unused for the TTL"""
+        store = PromptStore(memory_size=10, ttl_seconds=1)
+        store.put("p1", make_prompt())
+        
+        time.sleep(1.1)
+        
+        assert store.get("p1") is None
+        assert store.info("p1") is None
+    
+    def test_list_and_info(self):
+        """Test listing is most recently used first and excludes tensors"""
+        store = PromptStore(memory_size=10)
+        store.put("p1", make_prompt("first"))
+        store.put("p2", make_prompt("second"))
+        store.get("p1")
+        
+        prompts, total = store.list()
+        
+        assert total == 2
+        assert [prompt["prompt_id"] for prompt in prompts] == ["p1", "p2"]
+        assert "prompt_items" not in prompts[0]
+        assert store.info("p2")["ref_text"] == "second"
+
+
+@pytest.mark.unit
+class TestSQLitePromptStore:
+    """Test the store with the SQLite backend"""
+    
+    def test_prompts_survive_restart(self, tmp_path):
+        """Test prompt IDs stay valid with a fresh store on the same database"""
+        path = str(tmp_path / "prompts.db")
+        PromptStore(backend=SQLitePromptBackend(path)).put("p1", make_prompt())
+        
+        store = PromptStore(backend=SQLitePromptBackend(path))
+        data = store.get("p1")
+        
+        assert data["ref_text"] == "Reference text"
+        np.testing.assert_array_equal(
+            data["prompt_items"][0]["ref_spk_embedding"], np.ones(8, dtype=np.float32)
+        )
+        assert store.get_stats()["backend_hits"] == 1
+    
+    def test_memory_eviction_keeps_durable_copy(self, tmp_path):
+        """Test prompts evicted from memory are reloaded from the backend"""
+        store = PromptStore(memory_size=1, backend=SQLitePromptBackend(str(tmp_path / "prompts.db")))
+        store.put("p1", make_prompt())
+        store.put("p2", make_prompt())
+        
+        assert store.get("p1") is not None
+        assert store.info("p1")["in_memory"] is True
+        assert store.info("p2")["in_memory"] is False
+        assert store.list()[1] == 2
+    
+    def test_max_size_trims_least_recently_used(self, tmp_path):
+        """Test the backend keeps at most max_size prompts"""
+        store = PromptStore(
+            memory_size=1,
+            backend=SQLitePromptBackend(str(tmp_path / "prompts.db")),
+            max_size=2,
+        )
+        store.put("p1", make_prompt())
+        time.sleep(0.01)
+        store.put("p2", make_prompt())
+        time.sleep(0.01)
+        store.put("p3", make_prompt())
+        
+        assert store.get("p1") is None
+        assert store.list()[1] == 2
+    
+    def test_delete_and_expiry(self, tmp_path):
+        """Test deletion and idle expiry reach the backend"""
+        store = PromptStore(ttl_seconds=1, backend=SQLitePromptBackend(str(tmp_path / "prompts.db")))
+        store.put("p1", make_prompt())
+        store.put("p2", make_prompt())
+        
+        assert store.delete("p1") is True
+        time.sleep(1.1)
+        
+        assert store.remove_expired() == 1
+        assert store.list()[1] == 0
+        assert store.info("p1") is None
+        
+        # Info for a durable prompt reports its stored size
+        store.put("p3", make_prompt())
+        assert store.info("p3")["size_bytes"] > 0
+    
+    def test_uses_written_in_batches(self, tmp_path):
+        """Test prompt uses do not write to the backend until a flush is due"""
+        store = PromptStore(backend=SQLitePromptBackend(str(tmp_path / "prompts.db")))
+        store.put("p1", make_prompt())
+        time.sleep(0.01)
+        store.put("p2", make_prompt())
+        
+        with patch.object(store.backend, 'touch', wraps=store.backend.touch) as touch:
+            for _ in range(5):
+                store.get("p1")
+            assert touch.call_count == 0
+            assert store.get_stats()["pending_touches"] == 1
+            
+            # Listing orders by last use, so pending uses are written first (in one batch)
+            prompts, _ = store.list()
+            assert touch.call_count == 1
+            assert list(touch.call_args.args[0]) == ["p1"]
+        
+        assert [prompt["prompt_id"] for prompt in prompts] == ["p1", "p2"]
+        assert store.get_stats()["pending_touches"] == 0
+    
+    def test_flush_interval_and_close(self, tmp_path):
+        """Test pending uses are written once the flush interval passes and on close"""
+        path = str(tmp_path / "prompts.db")
+        store = PromptStore(backend=SQLitePromptBackend(path), touch_flush_seconds=0.05)
+        store.put("p1", make_prompt())
+        created = store.info("p1")["last_used_at"]
+        
+        time.sleep(0.06)
+        store.get("p1")
+        assert store.get_stats()["pending_touches"] == 0
+        
+        store.get("p1")
+        store.close()
+        
+        last_used = SQLitePromptBackend(path).info("p1")["last_used_at"]
+        assert last_used > created
+        assert last_used == store._cache["p1"]["last_used_at"]
+
+
+@pytest.mark.unit
+class TestPromptStoreBackend:
+    """Test the backend interface"""
+    
+    def test_incomplete_backend_rejected(self):
+        """Test a backend missing methods fails when created, not on first use"""
+        class PartialBackend(PromptStoreBackend):
+            def put(self, prompt_id, data, created_at):
+                pass
+        
+        with pytest.raises(TypeError):
+            PartialBackend()
@@ -0,0 +1,172 @@
+"""
+Unit tests for memory-budgeted model residency
+"""
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app.models.residency import ModelResidency, parameter_bytes
+
+GIB = 2**30
+
+
+class FakeParameter:
+    """Parameter tensor stand-in with a fixed size"""
+
+    def __init__(self, size_bytes):
+        self.size_bytes = size_bytes
+
+    def numel(self):
+        return self.size_bytes // 2
+
+    def element_size(self):
+        return 2
+
+
+class FakeModel:
+    """Loaded model whose parameters take size_bytes"""
+
+    def __init__(self, size_bytes):
+        self.model = self
+        self._parameters = [FakeParameter(size_bytes // 2), FakeParameter(size_bytes // 2)]
+
+    def parameters(self):
+        return iter(self._parameters)
+
+
+@pytest.fixture
+def manager():
+    """Model manager with a 5 GiB budget whose loads return 2 GiB fake models"""
+    from app.models.manager import ModelManager
+
+    manager = ModelManager()
+    manager.residency.budget_bytes = 5 * GIB
+    with patch.object(manager, '_load_model', side_effect=lambda model_type: FakeModel(2 * GIB)), \
+         patch.object(ModelManager, '_free_memory'):
+        yield manager
+
+
+@pytest.mark.unit
+class TestModelResidency:
+    """Test residency bookkeeping"""
+
+    def test_parameter_bytes(self):
+        """Test parameter memory is summed from the model's parameters"""
+        assert parameter_bytes(FakeModel(4096)) == 4096
+        assert parameter_bytes(object()) is None
+
+    def test_idle_least_recently_used_evicted_first(self):
+        """Test eviction picks idle models before busy ones, oldest use first"""
+        residency = ModelResidency(["a", "b", "c", "d"], budget_bytes=6 * GIB)
+        for name in ("a", "b", "c"):
+            residency.record_load(name, 2 * GIB, 1.0)
+            time.sleep(0.01)
+        residency.begin_use("a")
+
+        assert residency.eviction_candidates("d", 2 * GIB) == ["b"]
+        assert residency.eviction_candidates("d", 4 * GIB) == ["b", "c"]
+        assert residency.eviction_candidates("d", 6 * GIB) == ["b", "c", "a"]
+
+    def test_unlimited_budget(self):
+        """Test nothing is evicted without a budget"""
+        residency = ModelResidency(["a", "b"])
+        residency.record_load("a", 100 * GIB, 1.0)
+        assert residency.eviction_candidates("b", 100 * GIB) == []
+
+    def test_drain_waits_for_in_flight_requests(self):
+        """Test draining blocks new requests and returns once in-flight ones finish"""
+        residency = ModelResidency(["a"])
+        residency.begin_use("a")
+
+        assert residency.drain("a", timeout=0.05) is False
+
+        threading.Timer(0.05, residency.end_use, args=("a",)).start()
+        assert residency.drain("a", timeout=2.0) is True
+        residency.end_drain("a")
+
+    def test_load_stats(self):
+        """Test load times and reservations are reported"""
+        residency = ModelResidency(["a"], budget_bytes=8 * GIB, default_size_bytes=3 * GIB)
+        assert residency.expected_bytes("a") == 3 * GIB
+        residency.reserve("a", 3 * GIB)
+        assert residency.get_stats()["models"]["a"]["loading"] is True
+
+        residency.record_load("a", 2 * GIB, 4.0)
+        residency.record_unload("a")
+        residency.record_load("a", 2 * GIB, 2.0)
+
+        stats = residency.get_stats()
+        assert stats["used_bytes"] == 2 * GIB
+        assert stats["models"]["a"]["loads"] == 2
+        assert stats["models"]["a"]["avg_load_seconds"] == 3.0
+        assert stats["models"]["a"]["unloads"] == 1
+
+    def test_replaced_model_charged_until_released(self):
+        """Test a model replaced by a new version counts against the budget until it is freed"""
+        residency = ModelResidency(["a", "b"], budget_bytes=6 * GIB)
+        residency.record_load("b", 2 * GIB, 1.0)
+        residency.record_load("a", 2 * GIB, 1.0)
+        residency.reserve("a", 2 * GIB)
+
+        residency.retire("a")
+        residency.record_load("a", 2 * GIB, 1.0)
+        assert residency.used_bytes() == 6 * GIB
+        assert residency.get_stats()["models"]["a"]["retired_bytes"] == 2 * GIB
+        assert residency.eviction_candidates("c", 2 * GIB) == ["b"]
+
+        residency.release_retired("a")
+        assert residency.used_bytes() == 4 * GIB
+        assert residency.eviction_candidates("c", 2 * GIB) == []
+
+
+@pytest.mark.unit
+class TestModelManagerResidency:
+    """Test the model manager stays within its memory budget"""
+
+    def test_lru_model_evicted_to_fit_budget(self, manager):
+        """Test loading a third model evicts the least recently used one"""
+        manager.get_model("custom_voice")
+        manager.get_model("voice_design")
+        manager.residency.begin_use("custom_voice")
+        manager.residency.end_use("custom_voice")
+
+        manager.get_model("base")
+
+        assert manager.is_loaded("custom_voice")
+        assert not manager.is_loaded("voice_design")
+        assert manager.is_loaded("base")
+        stats = manager.get_residency_stats()
+        assert stats["evictions"] == 1
+        assert stats["used_bytes"] == 4 * GIB
+        assert stats["models"]["voice_design"]["evictions"] == 1
+        assert stats["models"]["base"]["size_bytes"] == 2 * GIB
+
+    def test_eviction_waits_for_in_flight_requests(self, manager):
+        """Test a busy model is only freed after its in-flight request finishes"""
+        manager.get_model("custom_voice")
+        manager.get_model("voice_design")
+        manager.residency.begin_use("custom_voice")
+        manager.residency.begin_use("voice_design")
+
+        loader = threading.Thread(target=manager.get_model, args=("base",))
+        loader.start()
+        time.sleep(0.1)
+        # custom_voice was used first, so it is the victim and is draining
+        assert manager.is_loaded("custom_voice")
+        assert manager.get_residency_stats()["models"]["custom_voice"]["draining"] is True
+
+        manager.residency.end_use("custom_voice")
+        loader.join(timeout=2.0)
+
+        assert not manager.is_loaded("custom_voice")
+        assert manager.is_loaded("base")
+        manager.residency.end_use("voice_design")
+
+    def test_unload_model_records_unload(self, manager):
+        """Test manual unloads are counted separately from evictions"""
+        manager.get_model("custom_voice")
+        manager.unload_model("custom_voice")
+
+        stats = manager.get_residency_stats()["models"]["custom_voice"]
+        assert stats["resident"] is False
+        assert (stats["unloads"], stats["evictions"]) == (1, 0)
@@ -0,0 +1,58 @@
+"""
+Unit tests for shared audio response helpers
+"""
+import io
+import zipfile
+import pytest
+import soundfile as sf
+from app.utils.responses import build_batch_zip_response, stream_zip
+from tests.utils import generate_test_audio
+
+
+@pytest.mark.unit
+class TestStreamZip:
+    """Test incrementally written zip archives"""
+
+    @pytest.mark.asyncio
+    async def test_entries_written_as_they_arrive(self):
+        """Test each entry is sent before the next one is produced"""
+        produced = []
+
+        async def entries():
+            for name in ("a.wav", "b.wav"):
+                produced.append(name)
+                yield name, name.encode() * 100
+
+        chunks = []
+        async for chunk in stream_zip(entries()):
+            chunks.append((len(produced), chunk))
+
+        # The first entry is complete on the wire while only it was produced
+        assert chunks[0][0] == 1 and b"a.wav" in chunks[0][1]
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunk for _, chunk in chunks))) as archive:
+            assert archive.namelist() == ["a.wav", "b.wav"]
+            assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+            assert archive.read("b.wav") == b"b.wav" * 100
+            assert archive.testzip() is None
+
+    @pytest.mark.asyncio
+    async def test_batch_items_consumed_one_at_a_time(self):
+        """Test batch audio is released from the list as each entry is written"""
+        wavs = [generate_test_audio(duration=0.5) for _ in range(3)]
+        response = build_batch_zip_response(wavs, 24000, "flac", ["x", "y", "z"], "batch")
+
+        body = b""
+        async for chunk in response.body_iterator:
+            body += chunk
+            written = body.count(b"PK\x07\x08")
+            # Entries not yet written are still held; written ones are dropped
+            assert sum(wav is None for wav in wavs) in (written, written + 1)
+
+        assert response.headers["content-disposition"] == "attachment; filename=batch.zip"
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            assert archive.namelist() == ["x.flac", "y.flac", "z.flac"]
+            audio, sr = sf.read(io.BytesIO(archive.read("y.flac")))
+        assert sr == 24000
+        assert len(audio) == 12000
+        assert all(wav is None for wav in wavs)
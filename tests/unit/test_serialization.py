@@ -0,0 +1,76 @@
+"""
+Unit tests for voice clone prompt serialization
+"""
+import pytest
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from app.utils.serialization import (
+    serialize_prompt,
+    deserialize_prompt,
+    PromptSerializationError,
+)
+
+
+@dataclass
+class FakePromptItem:
+    """Stand-in for qwen_tts VoiceClonePromptItem"""
+    ref_code: Optional[np.ndarray]
+    ref_spk_embedding: np.ndarray
+    x_vector_only_mode: bool
+    icl_mode: bool
+    ref_text: Optional[str] = None
+
+
+@pytest.mark.unit
+class TestPromptSerialization:
+    """Test the binary prompt format"""
+    
+    def test_round_trip_dataclass_items(self):
+        """Test a list of prompt items survives serialization"""
+        items = [FakePromptItem(
+            ref_code=np.arange(32, dtype=np.int64).reshape(8, 4),
+            ref_spk_embedding=np.random.rand(16).astype(np.float32),
+            x_vector_only_mode=False,
+            icl_mode=True,
+            ref_text="Reference transcript",
+        )]
+        
+        restored, metadata = deserialize_prompt(serialize_prompt(items, {"cache_key": "abc"}))
+        
+        assert metadata == {"cache_key": "abc"}
+        assert isinstance(restored, list) and len(restored) == 1
+        item = restored[0]
+        assert isinstance(item, FakePromptItem)
+        np.testing.assert_array_equal(item.ref_code, items[0].ref_code)
+        np.testing.assert_array_equal(item.ref_spk_embedding, items[0].ref_spk_embedding)
+        assert item.ref_code.dtype == np.int64
+        assert item.icl_mode is True
+        assert item.ref_text == "Reference transcript"
+    
+    def test_round_trip_containers(self):
+        """Test dicts, tuples and None values are preserved"""
+        value = {"prompt": ("a", 1, None), "embedding": np.ones((2, 3), dtype=np.float16)}
+        
+        restored, _ = deserialize_prompt(serialize_prompt(value))
+        
+        assert restored["prompt"] == ("a", 1, None)
+        assert restored["embedding"].dtype == np.float16
+        assert restored["embedding"].shape == (2, 3)
+    
+    def test_rejects_bad_magic(self):
+        """Test blobs from other formats are rejected"""
+        with pytest.raises(PromptSerializationError):
+            deserialize_prompt(b"not a prompt blob at all")
+    
+    def test_rejects_truncated_blob(self):
+        """Test truncated files are rejected instead of yielding garbage"""
+        blob = serialize_prompt([np.zeros(100, dtype=np.float32)])
+        
+        with pytest.raises(PromptSerializationError):
+            deserialize_prompt(blob[:-10])
+    
+    def test_rejects_unsupported_type(self):
+        """Test arbitrary objects are not serialized"""
+        with pytest.raises(PromptSerializationError):
+            serialize_prompt([object()])
@@ -0,0 +1,242 @@
+"""
+Unit tests for incremental streaming utilities
+"""
+import asyncio
+import struct
+import numpy as np
+import pytest
+from app.utils.metrics import PerformanceTracker
+from app.utils.streaming import (
+    SegmentStream,
+    SentenceBuffer,
+    pcm16,
+    segment_pcm_chunks,
+    split_text_segments,
+    wav_stream_header,
+)
+
+
+@pytest.mark.unit
+class TestSplitTextSegments:
+    """Test sentence segmentation of input text"""
+
+    def test_short_text_is_one_segment(self):
+        """Test text within the limit is not split"""
+        assert split_text_segments("Hello there. How are you?", max_chars=150) == [
+            "Hello there. How are you?"
+        ]
+
+    def test_splits_on_sentences(self):
+        """Test text is split at sentence ends"""
+        text = "The first sentence is here. The second one follows! Is this the third?"
+        assert split_text_segments(text, max_chars=40, min_chars=5) == [
+            "The first sentence is here.",
+            "The second one follows!",
+            "Is this the third?",
+        ]
+
+    def test_splits_cjk_sentences(self):
+        """Test CJK terminators split without following whitespace"""
+        text = "今天天气很好。我们去公园散步吧！你觉得怎么样？"
+        assert split_text_segments(text, max_chars=10, min_chars=1) == [
+            "今天天气很好。",
+            "我们去公园散步吧！",
+            "你觉得怎么样？",
+        ]
+
+    def test_long_sentence_split_at_clauses(self):
+        """Test over-long sentences are split at clause boundaries"""
+        text = "When the rain stopped, the children ran outside, and the dog followed them happily."
+        segments = split_text_segments(text, max_chars=40, min_chars=5)
+
+        assert len(segments) > 1
+        assert all(len(segment) <= 40 for segment in segments)
+        assert " ".join(segments) == text
+
+    def test_unpunctuated_text_split_at_spaces(self):
+        """Test long text without punctuation still respects the limit"""
+        text = " ".join(["word"] * 60)
+        segments = split_text_segments(text, max_chars=50, min_chars=5)
+
+        assert all(len(segment) <= 50 for segment in segments)
+        assert " ".join(segments) == text
+
+    def test_short_segments_merged(self):
+        """Test tiny sentences are merged into a neighbour"""
+        text = "Yes. " + "This is a considerably longer sentence that follows it."
+        assert split_text_segments(text, max_chars=58, min_chars=10) == [
+            "Yes. This is a considerably longer sentence that follows it."
+        ]
+
+    def test_splitting_disabled(self):
+        """Test max_chars=0 keeps the whole text"""
+        text = "One. Two. Three."
+        assert split_text_segments(text, max_chars=0) == [text]
+
+    def test_empty_text(self):
+        """Test whitespace-only text has no segments"""
+        assert split_text_segments("   ") == []
+
+
+@pytest.mark.unit
+class TestSegmentStream:
+    """Test ordered, bounded segment generation"""
+
+    @pytest.mark.asyncio
+    async def test_segments_in_order(self):
+        """Test segments are returned in order followed by None"""
+        async def synthesize(text):
+            await asyncio.sleep(0.01 if text == "a" else 0)
+            return np.full(10, ord(text), dtype=np.float32), 24000
+
+        stream = SegmentStream(["a", "b", "c"], synthesize)
+        results = []
+        while (segment := await stream.next()) is not None:
+            results.append(chr(int(segment[0][0])))
+
+        assert results == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_generation_bounded_by_buffer(self):
+        """Test the producer does not run far ahead of the consumer"""
+        started = []
+
+        async def synthesize(text):
+            started.append(text)
+            return np.zeros(10), 24000
+
+        stream = SegmentStream([str(i) for i in range(10)], synthesize, max_buffered=2)
+        await stream.next()
+        await asyncio.sleep(0.05)
+
+        # One taken, two buffered, one waiting to be queued
+        assert len(started) <= 4
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_error_raised_at_failing_segment(self):
+        """Test a synthesis error surfaces when its segment is requested"""
+        async def synthesize(text):
+            if text == "bad":
+                raise RuntimeError("boom")
+            return np.zeros(10), 24000
+
+        stream = SegmentStream(["good", "bad"], synthesize)
+        assert await stream.next() is not None
+        with pytest.raises(RuntimeError, match="boom"):
+            await stream.next()
+
+    @pytest.mark.asyncio
+    async def test_nothing_runs_until_body_is_iterated(self):
+        """Test only the first segment is generated before the response body is iterated"""
+        started = []
+
+        async def synthesize(text):
+            started.append(text)
+            return np.zeros(10), 24000
+
+        tasks = asyncio.all_tasks()
+        stream = SegmentStream(["a", "b", "c"], synthesize, max_buffered=1)
+        first = await stream.first()
+        await asyncio.sleep(0.05)
+
+        # A client gone before the body starts leaves no producer behind
+        assert started == ["a"]
+        assert asyncio.all_tasks() == tasks
+
+        chunks = [chunk async for chunk in segment_pcm_chunks(stream, first, PerformanceTracker())]
+        assert started == ["a", "b", "c"]
+        assert len(chunks) == 3
+
+
+@pytest.mark.unit
+class TestBinaryStreaming:
+    """Test raw PCM and streamed WAV output"""
+
+    def test_pcm16_byte_order(self):
+        """Test float audio is scaled and clipped into the requested byte order"""
+        audio = np.array([0.0, 0.5, -1.0, 2.0], dtype=np.float32)
+
+        little = pcm16(audio)
+        big = pcm16(audio, big_endian=True)
+
+        assert little.tolist() == [0, 16383, -32767, 32767]
+        assert big.tolist() == little.tolist()
+        assert little.tobytes() == big.byteswap().tobytes()
+
+    def test_wav_stream_header(self):
+        """Test the WAV header describes 16-bit mono PCM of unknown length"""
+        header = wav_stream_header(24000)
+        riff, riff_size, wave, fmt, _, audio_format, channels, rate, byte_rate, align, bits, data, data_size = \
+            struct.unpack("<4sI4s4sIHHIIHH4sI", header)
+
+        assert len(header) == 44
+        assert (riff, wave, fmt, data) == (b"RIFF", b"WAVE", b"fmt ", b"data")
+        assert (audio_format, channels, rate, bits) == (1, 1, 24000, 16)
+        assert byte_rate == 48000 and align == 2
+        assert riff_size == data_size == 0xFFFFFFFF
+
+    @pytest.mark.asyncio
+    async def test_pcm_chunks_are_views_of_each_segment(self):
+        """Test chunks cover every segment in order without per-chunk encoding"""
+        segments = {"a": np.full(24000, 0.25), "b": np.full(12000, -0.25)}
+
+        async def synthesize(text):
+            return segments[text], 24000
+
+        stream = SegmentStream(["a", "b"], synthesize)
+        first = await stream.next()
+        chunks = [
+            chunk async for chunk in
+            segment_pcm_chunks(stream, first, PerformanceTracker(), chunk_duration=0.25)
+        ]
+
+        assert all(isinstance(chunk, memoryview) for chunk in chunks)
+        assert len(chunks) == 6
+        pcm = np.frombuffer(b"".join(chunks), dtype=">i2")
+        np.testing.assert_array_equal(pcm, pcm16(np.concatenate(list(segments.values()))))
+
+
+@pytest.mark.unit
+class TestSentenceBuffer:
+    """Test cutting incrementally arriving text into segments"""
+
+    def test_waits_for_whitespace_after_terminator(self):
+        """Test a period is not a boundary until the next token shows it ends a sentence"""
+        buffer = SentenceBuffer(max_chars=150, min_chars=5)
+
+        assert buffer.push("Pi is about 3.") == []
+        assert buffer.push("14 and that is enough.") == []
+        assert buffer.push(" Next") == ["Pi is about 3.14 and that is enough."]
+        assert buffer.flush() == ["Next"]
+
+    def test_short_sentences_held_until_min_chars(self):
+        """Test tiny sentences are released together once long enough"""
+        buffer = SentenceBuffer(max_chars=150, min_chars=20)
+
+        assert buffer.push("Yes. ") == []
+        assert buffer.push("Of course we can. ") == ["Yes. Of course we can."]
+
+    def test_cjk_boundary_is_immediate(self):
+        """Test CJK terminators cut without waiting for whitespace"""
+        buffer = SentenceBuffer(max_chars=150, min_chars=1)
+        assert buffer.push("你好。今天") == ["你好。"]
+        assert buffer.flush() == ["今天"]
+
+    def test_long_run_without_boundary_is_cut(self):
+        """Test text without sentence ends is released once over max_chars"""
+        buffer = SentenceBuffer(max_chars=30, min_chars=5)
+        segments = []
+        for word in ["word "] * 20:
+            segments.extend(buffer.push(word))
+        segments.extend(buffer.flush())
+
+        assert all(len(segment) <= 30 for segment in segments)
+        assert " ".join(segments) == " ".join(["word"] * 20)
+
+    def test_clear(self):
+        """Test clear drops buffered text"""
+        buffer = SentenceBuffer()
+        buffer.push("Half a sent")
+        buffer.clear()
+        assert buffer.flush() == []